@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Count how often the native code has to grow a response buffer mid-call, with
+# and without adaptive buffer sizing.  Eight simulated threads each hold a
+# buffer while they call a random mix of methods.  The "native" side grows the
+# buffer through the same resize function the G2 library is given, using the
+# C runtime's allocator, so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import random
+
+from senzing.G2Library import ALLOCATOR_PROTOTYPES, G2BufferPool, G2NativeFunctions
+
+CALLS = 20000
+THREADS = 8
+
+# method: (share of calls, smallest response, largest response)
+WORKLOAD = {
+    "findNetworkByEntityID": (0.05, 1000000, 4000000),
+    "getEntityByEntityID": (0.25, 60000, 300000),
+    "getRecord": (0.40, 500, 2000),
+    "addRecordWithInfo": (0.30, 100, 400),
+}
+
+if os.name == "nt":
+    c_runtime = ctypes.cdll.msvcrt
+else:
+    c_runtime = ctypes.CDLL(ctypes.util.find_library("c"))
+
+native = G2NativeFunctions()
+for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+    function = c_runtime[symbol[3:]]
+    function.argtypes = argtypes
+    function.restype = restype
+    setattr(native, symbol, function)
+
+
+def native_call(buffer, length):
+    if buffer.size.value < length + 1:
+        buffer.ptr.value = buffer.resize(buffer.ptr, length + 1)
+        buffer.size.value = length + 1
+    ctypes.memset(buffer.ptr.value + length, 0, 1)
+    ctypes.memset(buffer.ptr, ord("x"), min(length, 64))
+
+
+def run(adaptive):
+    generator = random.Random(1234)
+    methods = list(WORKLOAD)
+    weights = [WORKLOAD[method][0] for method in methods]
+    pool = G2BufferPool(adaptive=adaptive).bind(native)
+    held = []
+    for call in range(CALLS):
+        method = generator.choices(methods, weights)[0]
+        smallest, largest = WORKLOAD[method][1:]
+        buffer = pool.acquire(method)
+        length = generator.randint(smallest, largest)
+        native_call(buffer, length)
+        buffer.length = length  # as value() would measure it
+        held.append(buffer)
+        if len(held) == THREADS:
+            for buffer in held:
+                pool.release(buffer)
+            held = []
+    return pool
+
+
+for sizing in (False, True):
+    sized_pool = run(sizing)
+    print("adaptive={0}".format(sizing))
+    for method_name, stats in sorted(sized_pool.stats().items()):
+        print(
+            "  {0:<24} {1:6d} calls {2:6d} resizes {3:10,d} byte estimate".format(
+                method_name, stats["calls"], stats["resizes"], stats["estimate"]
+            )
+        )
+    print("  {0:,d} bytes pooled".format(sized_pool.pooled_bytes()))
@@ -0,0 +1,78 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure bulk loading of skewed records with and without key affinity.  Half
+# of the records resolve to a few hot entities.  Each record is a 1 ms native
+# call that holds its entity; a call that waits more than 5 ms for the entity
+# fails with G2RetryTimeoutExceededException, like G2_addRecord does under
+# contention, and is retried by a G2RetryScheduler.  The C runtime's usleep()
+# stands in for the native call so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import random
+import threading
+import time
+
+from senzing.G2Bulk import bulk_map
+from senzing.G2Exception import G2RetryTimeoutExceededException
+from senzing.G2Retry import G2RetryScheduler
+
+RECORDS = 4000
+HOT_ENTITIES = 8
+HOT_SHARE = 0.5
+WAIT_SECONDS = 0.005
+
+if os.name == "nt":
+    sleep = ctypes.windll.kernel32.Sleep
+    sleep_arg = 1
+else:
+    sleep = ctypes.CDLL(ctypes.util.find_library("c")).usleep
+    sleep_arg = 1000
+
+entity_locks = {}
+
+
+def add(record):
+    lock = entity_locks[record[2]]
+    if not lock.acquire(timeout=WAIT_SECONDS):
+        raise G2RetryTimeoutExceededException("retry timeout on {0}".format(record[2]))
+    try:
+        sleep(sleep_arg)
+    finally:
+        lock.release()
+
+
+def entity_of(record):
+    return record[2]
+
+
+random.seed(1)
+records = []
+for i in range(RECORDS):
+    if random.random() < HOT_SHARE:
+        entity = "hot-{0}".format(random.randrange(HOT_ENTITIES))
+    else:
+        entity = "entity-{0}".format(i)
+    entity_locks[entity] = threading.Lock()
+    records.append(("TEST", str(i), entity))
+
+for workers in (4, 8, 16):
+    for key in (None, entity_of):
+        retry = G2RetryScheduler(max_attempts=100, initial_delay=0.005)
+        started = time.perf_counter()
+        for result in bulk_map(
+            add, records, workers, False, 8 * workers, retry=retry, key=key
+        ):
+            pass
+        seconds = time.perf_counter() - started
+        print(
+            "{0:2d} workers {1:<11} {2:8.0f} records/s {3:6d} retries".format(
+                workers,
+                "no affinity" if key is None else "affinity",
+                RECORDS / seconds,
+                retry.retried,
+            )
+        )
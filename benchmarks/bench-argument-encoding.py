@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Compare preparing the string arguments of one addRecord() call the old way
+# against the fast path: str encoded inline, bytes passed through and the
+# data source code and load ID taken from the interning cache.
+# -----------------------------------------------------------------------------
+
+import timeit
+
+from senzing.G2NativeApi import prepare_interned_argument, prepare_string_argument
+
+CALLS = 1000000
+
+dataSourceCode = "CUSTOMERS"
+recordID = "1001"
+load_id = "LOAD-2023-04-03"
+jsonText = '{"NAME_FULL": "Robert Smith", "DATE_OF_BIRTH": "1985-02-15", "ADDR_FULL": "123 Main Street, Las Vegas NV 89132"}'
+jsonBytes = jsonText.encode()
+
+
+def old_prepare_string_argument(stringToPrepare):
+    if stringToPrepare is None:
+        return b""
+    if type(stringToPrepare) == str:
+        return stringToPrepare.encode("utf-8")
+    elif type(stringToPrepare) == bytearray:
+        return stringToPrepare.decode().encode("utf-8")
+    elif type(stringToPrepare) == bytes:
+        return str(stringToPrepare).encode("utf-8")
+    return stringToPrepare
+
+
+def old_str():
+    return (
+        old_prepare_string_argument(dataSourceCode),
+        old_prepare_string_argument(recordID),
+        old_prepare_string_argument(jsonText),
+        old_prepare_string_argument(load_id),
+    )
+
+
+def fast_str():
+    return (
+        prepare_interned_argument(dataSourceCode),
+        (
+            recordID.encode()
+            if type(recordID) is str
+            else (
+                recordID
+                if type(recordID) is bytes
+                else prepare_string_argument(recordID)
+            )
+        ),
+        (
+            jsonText.encode()
+            if type(jsonText) is str
+            else (
+                jsonText
+                if type(jsonText) is bytes
+                else prepare_string_argument(jsonText)
+            )
+        ),
+        prepare_interned_argument(load_id),
+    )
+
+
+def fast_bytes():
+    return (
+        prepare_interned_argument(dataSourceCode),
+        (
+            recordID.encode()
+            if type(recordID) is str
+            else (
+                recordID
+                if type(recordID) is bytes
+                else prepare_string_argument(recordID)
+            )
+        ),
+        (
+            jsonBytes.encode()
+            if type(jsonBytes) is str
+            else (
+                jsonBytes
+                if type(jsonBytes) is bytes
+                else prepare_string_argument(jsonBytes)
+            )
+        ),
+        prepare_interned_argument(load_id),
+    )
+
+
+for name, func in (
+    ("old, str record", old_str),
+    ("fast, str record", fast_str),
+    ("fast, bytes record", fast_bytes),
+):
+    seconds = min(timeit.repeat(func, number=CALLS, repeat=5))
+    print("{0:<20} {1:8.1f} ns/call".format(name, seconds / CALLS * 1e9))
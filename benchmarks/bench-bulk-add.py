@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure how bulk calls scale with the number of threads.  Each record is a
+# 1 ms native call that releases the GIL, like G2_addRecord does; the C
+# runtime's usleep() stands in for it so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import time
+
+from senzing.G2Bulk import bulk_map
+
+RECORDS = 2000
+
+if os.name == "nt":
+    sleep = ctypes.windll.kernel32.Sleep
+    sleep_arg = 1
+else:
+    sleep = ctypes.CDLL(ctypes.util.find_library("c")).usleep
+    sleep_arg = 1000
+
+
+def add(record):
+    sleep(sleep_arg)
+
+
+for workers in (1, 2, 4, 8, 16):
+    for ordered in (True, False):
+        started = time.perf_counter()
+        for result in bulk_map(add, range(RECORDS), workers, ordered):
+            pass
+        seconds = time.perf_counter() - started
+        print(
+            "{0:2d} workers {1:<9} {2:8.0f} records/s".format(
+                workers, "ordered" if ordered else "unordered", RECORDS / seconds
+            )
+        )
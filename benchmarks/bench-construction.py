@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Compare loading the library and binding its symbols in every constructor
+# against the process-wide loader.  The C runtime is injected as the G2 library
+# so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import timeit
+
+from senzing import G2Config, G2Diagnostic, G2Engine, G2Product
+from senzing.G2Library import G2BufferPool, bind_prototypes, set_library_path
+from senzing.G2Engine import _NATIVE_API
+
+OBJECTS = 10000
+
+library = "msvcrt" if os.name == "nt" else ctypes.util.find_library("c")
+set_library_path("G2", library)
+
+
+def per_object():
+    # What every constructor used to do: load the library, then bind its
+    # symbols onto a fresh handle.
+    lib_handle = ctypes.cdll.LoadLibrary(library)
+    native = bind_prototypes(lib_handle, _NATIVE_API.prototypes)
+    return G2BufferPool().bind(native)
+
+
+for name, func in (
+    ("load per object", per_object),
+    ("G2Engine", G2Engine),
+    ("G2Diagnostic", G2Diagnostic),
+    ("G2Config", G2Config),
+    ("G2Product", G2Product),
+):
+    seconds = min(timeit.repeat(func, number=OBJECTS, repeat=5))
+    print("{0:<20} {1:8.2f} us/object".format(name, seconds / OBJECTS * 1e6))
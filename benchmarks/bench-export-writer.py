@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure writing an export of 500 000 lines to gzip files: on the thread
+# reading the export, and with G2ExportWriter and its background workers.
+# The export is read from memory in 1 MB chunks of complete lines, as
+# G2Engine.iterExport(lines=False) returns them, so it runs without the
+# Senzing library.  "reader" is the time the reading thread spends writing.
+# -----------------------------------------------------------------------------
+
+import gzip
+import os
+import random
+import tempfile
+import time
+
+from senzing.G2ExportWriter import G2ExportWriter
+
+LINES = 500000
+CHUNK_SIZE = 1 << 20
+
+random.seed(1)
+DATA = b"".join(
+    b'{"RESOLVED_ENTITY":{"ENTITY_ID":%d,"ENTITY_NAME":"%s","RECORDS":'
+    b'[{"DATA_SOURCE":"TEST","RECORD_ID":"%d"}]}}\n'
+    % (i, b"%x" % random.getrandbits(64), random.getrandbits(32))
+    for i in range(LINES)
+)
+
+
+def chunks():
+    start = 0
+    while start < len(DATA):
+        end = DATA.find(b"\n", start + CHUNK_SIZE) + 1 or len(DATA)
+        yield DATA[start:end]
+        start = end
+
+
+def inline(directory):
+    with gzip.open(os.path.join(directory, "export.jsonl.gz"), "wb", 6) as file:
+        for chunk in chunks():
+            file.write(chunk)
+    return time.perf_counter()
+
+
+def threaded(workers):
+    def write(directory):
+        writer = G2ExportWriter(
+            directory, shard_size=16 << 20, level=6, workers=workers
+        )
+        for chunk in chunks():
+            writer.write(chunk)
+        reader = time.perf_counter()
+        writer.close()
+        return reader
+
+    return write
+
+
+for name, function in (
+    ("gzip on the reader", inline),
+    ("G2ExportWriter 1", threaded(1)),
+    ("G2ExportWriter 4", threaded(4)),
+):
+    with tempfile.TemporaryDirectory() as output_directory:
+        started = time.perf_counter()
+        read = function(output_directory)
+        ended = time.perf_counter()
+    print(
+        "{0:<20} {1:10.0f} lines/s  reader {2:6.3f} s  total {3:6.3f} s".format(
+            name,
+            LINES / (ended - started),
+            read - started,
+            ended - started,
+        )
+    )
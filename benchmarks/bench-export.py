@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure reading an export of 200 000 lines with the usual fetchNext loop and
+# with iterExport, over lines and over chunks.  The native G2_fetchNext
+# copies the export from memory, either a line per call or as much as fits
+# in the buffer, so it runs without the Senzing library and the time is the
+# wrappers' and the fake fetch's.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import time
+
+from senzing.G2Engine import G2Engine
+from senzing.G2Library import (
+    ALLOCATOR_PROTOTYPES,
+    G2BufferPool,
+    G2NativeFunctions,
+    set_library_path,
+)
+
+# The benchmark writes into the buffers behind byref() arguments and swaps
+# the engine's native functions for a fake export.
+# pylint: disable=protected-access
+
+LINES = 200000
+
+if os.name == "nt":
+    c_runtime = ctypes.cdll.msvcrt
+else:
+    c_runtime = ctypes.CDLL(ctypes.util.find_library("c"))
+
+DATA = b"".join(
+    b'{"RESOLVED_ENTITY":{"ENTITY_ID":%d,"RECORDS":[{"DATA_SOURCE":"TEST",'
+    b'"RECORD_ID":"%d"}]}}\n' % (i, i)
+    for i in range(LINES)
+)
+
+
+class ExportNative(G2NativeFunctions):
+    def __init__(self, per_line):
+        for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+            function = c_runtime[symbol[3:]]
+            function.argtypes = argtypes
+            function.restype = restype
+            setattr(self, symbol, function)
+        self.per_line = per_line
+        self.position = 0
+
+    def G2_exportJSONEntityReport(self, flags, handle):
+        self.position = 0
+        handle._obj.value = 1
+        return 0
+
+    def G2_fetchNext(self, handle, buf, size):
+        end = min(self.position + size - 1, len(DATA))
+        if self.per_line:
+            newline = DATA.find(b"\n", self.position, end)
+            if newline >= 0:
+                end = newline + 1
+        chunk = DATA[self.position : end]
+        self.position = end
+        ctypes.memmove(buf, chunk + b"\0", len(chunk) + 1)
+        return len(chunk)
+
+    def G2_closeExport(self, handle):
+        return 0
+
+
+def fetch_next(engine):
+    handle = engine.exportJSONEntityReport()
+    response = bytearray()
+    count = 0
+    while engine.fetchNext(handle, response):
+        # A response holds several lines when they are fetched as a stream.
+        count += len(response.splitlines())
+    engine.closeExport(handle)
+    return count
+
+
+def iter_export(engine):
+    with engine.iterExport() as export:
+        return sum(1 for line in export)
+
+
+def iter_export_chunks(engine):
+    with engine.iterExport(lines=False) as export:
+        return sum(chunk.count(b"\n") for chunk in export)
+
+
+set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+export_engine = G2Engine()
+set_library_path("G2", None)
+
+for fetch_lines in (True, False):
+    export_engine._native = ExportNative(fetch_lines)
+    export_engine.buffer_pool = G2BufferPool().bind(export_engine._native)
+    for name, read_export in (
+        ("fetchNext", fetch_next),
+        ("iterExport", iter_export),
+        ("iterExport chunks", iter_export_chunks),
+    ):
+        started = time.perf_counter()
+        lines_read = read_export(export_engine)
+        seconds = time.perf_counter() - started
+        assert lines_read == LINES
+        print(
+            "{0:<10} {1:<20} {2:10.0f} lines/s".format(
+                "line" if fetch_lines else "stream", name, LINES / seconds
+            )
+        )
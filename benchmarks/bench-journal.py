@@ -0,0 +1,49 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure the cost of committing a G2Loader's progress to a G2LoadJournal.
+# The engine does nothing, so the loader runs as fast as its own pipeline
+# does and the journal's share of the time is as large as it can be.
+# -----------------------------------------------------------------------------
+
+import os
+import tempfile
+import time
+
+from senzing.G2LoadJournal import G2LoadJournal
+from senzing.G2Loader import G2Loader
+
+RECORDS = 200000
+REPEAT = 3
+
+
+class NullEngine(object):
+    def addRecord(self, dataSourceCode, recordId, jsonData, load_id=None):
+        pass
+
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "records.jsonl")
+    with open(path, "wb") as file:
+        for i in range(RECORDS):
+            file.write(
+                b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d",'
+                b' "NAME_FULL": "Robert Smith"}\n' % i
+            )
+    for journal in (False, True):
+        best = None
+        for repeat in range(REPEAT):
+            loader = G2Loader(NullEngine(), workers=4)
+            if journal:
+                loader.journal = G2LoadJournal(
+                    os.path.join(directory, "journal-{0}".format(repeat))
+                )
+            started = time.perf_counter()
+            loader.load([path])
+            seconds = time.perf_counter() - started
+            best = seconds if best is None else min(best, seconds)
+        print(
+            "{0:<11} {1:10.0f} records/s".format(
+                "journal" if journal else "no journal", RECORDS / best
+            )
+        )
@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Compare setting ctypes prototypes on every call against binding them once.
+# Uses the C runtime's strlen() so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import timeit
+
+from senzing.G2Library import bind_prototypes
+
+CALLS = 1000000
+
+if os.name == "nt":
+    lib_handle = ctypes.cdll.msvcrt
+else:
+    lib_handle = ctypes.CDLL(ctypes.util.find_library("c"))
+
+argument = b'{"NAME_FULL": "Robert Smith", "DATE_OF_BIRTH": "1985-02-15"}'
+
+
+def per_call():
+    lib_handle.strlen.argtypes = [ctypes.c_char_p]
+    lib_handle.strlen.restype = ctypes.c_size_t
+    return lib_handle.strlen(argument)
+
+
+native = bind_prototypes(lib_handle, {"strlen": ([ctypes.c_char_p], ctypes.c_size_t)})
+
+
+def pre_bound():
+    return native.strlen(argument)
+
+
+for name, func in (("per-call prototypes", per_call), ("bound once", pre_bound)):
+    seconds = min(timeit.repeat(func, number=CALLS, repeat=5))
+    print("{0:<20} {1:8.1f} ns/call".format(name, seconds / CALLS * 1e9))
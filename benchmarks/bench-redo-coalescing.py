@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure draining a redo backlog in which most records ask for the
+# reevaluation of a few hot records, e.g. after a feature went generic,
+# without and with a prefetch window that coalesces them.  Each process
+# call is a 1 ms native call; the C runtime's usleep() stands in for it so
+# it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import collections
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+
+from senzing.G2RedoProcessor import G2RedoProcessor
+
+RECORDS = 5000
+TARGETS = 200
+
+if os.name == "nt":
+    sleep = ctypes.windll.kernel32.Sleep
+    sleep_arg = 1
+else:
+    sleep = ctypes.CDLL(ctypes.util.find_library("c")).usleep
+    sleep_arg = 1000
+
+
+class RedoEngine(object):
+    def __init__(self):
+        self.queue = collections.deque(
+            b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d", "DSRC_ACTION": "X"}'
+            % (i % TARGETS)
+            for i in range(RECORDS)
+        )
+        self.lock = threading.Lock()
+
+    def getRedoRecordBytes(self):
+        with self.lock:
+            return self.queue.popleft() if self.queue else b""
+
+    def countRedoRecords(self):
+        return len(self.queue)
+
+    def process(self, record):
+        sleep(sleep_arg)
+
+
+for prefetch in (0, 256, 1024):
+    engine = RedoEngine()
+    processor = G2RedoProcessor(
+        engine,
+        max_workers=16,
+        records_per_worker=100,
+        scale_interval=0.1,
+        prefetch=prefetch,
+    )
+    started = time.perf_counter()
+    processor.drain()
+    seconds = time.perf_counter() - started
+    metrics = processor.metrics()
+    print(
+        "{0:<24} {1:8.0f} records/s {2:6d} processed {3:6.1%} coalesced".format(
+            "prefetch {0}".format(prefetch),
+            RECORDS / seconds,
+            metrics["processed"],
+            metrics["coalescing_ratio"],
+        )
+    )
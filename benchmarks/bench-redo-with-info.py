@@ -0,0 +1,104 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure the Python overhead per redo record of processRedoRecord, of
+# processRedoRecordWithInfo as it was (getRedoRecord and processWithInfo into
+# temporary bytearrays, copied into the outputs) and of the single pass
+# processRedoRecordWithInfo and processRedoRecordWithInfoBytes.  The native
+# functions return at once, with buffers allocated by the C runtime, so it
+# runs without the Senzing library and the time is the wrappers' alone.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import timeit
+
+from senzing.G2Engine import G2Engine
+from senzing.G2Library import (
+    ALLOCATOR_PROTOTYPES,
+    G2BufferPool,
+    G2NativeFunctions,
+    set_library_path,
+)
+
+# The benchmark writes into the buffers behind byref() arguments and swaps
+# the engine's native functions for stubs.
+# pylint: disable=protected-access
+
+CALLS = 100000
+
+if os.name == "nt":
+    c_runtime = ctypes.cdll.msvcrt
+else:
+    c_runtime = ctypes.CDLL(ctypes.util.find_library("c"))
+
+RECORD = (
+    b'{"UMF_PROC":{"NAME":"REEVAL_ENTITY","PARAMS":[{"PARAM":{"NAME":"ENTITY_ID",'
+    b'"VALUE":"1"}}]},"DSRC_ACTION":"X"}\0'
+)
+INFO = b'{"DATA_SOURCE":"","RECORD_ID":"","AFFECTED_ENTITIES":[{"ENTITY_ID":1}]}\0'
+
+
+def response(ptr, size, resize, value):
+    ctypes.memmove(ptr._obj, value, len(value))
+    return 0
+
+
+native = G2NativeFunctions()
+for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+    function = c_runtime[symbol[3:]]
+    function.argtypes = argtypes
+    function.restype = restype
+    setattr(native, symbol, function)
+native.G2_getRedoRecord = lambda ptr, size, resize: response(ptr, size, resize, RECORD)
+native.G2_processRedoRecord = native.G2_getRedoRecord
+native.G2_processWithInfo = lambda record, flags, ptr, size, resize: response(
+    ptr, size, resize, INFO
+)
+
+set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+engine = G2Engine()
+set_library_path("G2", None)
+engine._native = native
+engine.buffer_pool = G2BufferPool().bind(native)
+
+response_buffer = bytearray()
+info_buffer = bytearray()
+
+
+def process_redo_record():
+    engine.processRedoRecord(response_buffer)
+
+
+def two_pass():
+    # processRedoRecordWithInfo before the single pass version.
+    response_buffer[::] = b""
+    info_buffer[::] = b""
+    getRecordResponse = bytearray()
+    getRecordResponse[::] = b""
+    engine.getRedoRecord(getRecordResponse)
+    response_buffer.extend(getRecordResponse)
+    if len(getRecordResponse) > 0:
+        processWithInfoResponse = bytearray()
+        processWithInfoResponse[::] = b""
+        engine.processWithInfo(getRecordResponse, processWithInfoResponse, 0)
+        info_buffer.extend(processWithInfoResponse)
+
+
+def single_pass():
+    engine.processRedoRecordWithInfo(response_buffer, info_buffer)
+
+
+def single_pass_bytes():
+    engine.processRedoRecordWithInfoBytes()
+
+
+for name, func in (
+    ("processRedoRecord", process_redo_record),
+    ("WithInfo, two passes", two_pass),
+    ("WithInfo, single pass", single_pass),
+    ("WithInfoBytes", single_pass_bytes),
+):
+    seconds = min(timeit.repeat(func, number=CALLS, repeat=5))
+    print("{0:<24} {1:8.2f} us/record".format(name, seconds / CALLS * 1e6))
@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure draining a redo backlog with the usual single threaded loop of
+# getRedoRecord and process, and with a G2RedoProcessor.  Each process call
+# is a 1 ms native call; the C runtime's usleep() stands in for it so it
+# runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import collections
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+
+from senzing.G2RedoProcessor import G2RedoProcessor
+
+RECORDS = 5000
+
+if os.name == "nt":
+    sleep = ctypes.windll.kernel32.Sleep
+    sleep_arg = 1
+else:
+    sleep = ctypes.CDLL(ctypes.util.find_library("c")).usleep
+    sleep_arg = 1000
+
+
+class RedoEngine(object):
+    def __init__(self):
+        self.queue = collections.deque(b"{}" for _ in range(RECORDS))
+        self.lock = threading.Lock()
+
+    def getRedoRecordBytes(self):
+        with self.lock:
+            return self.queue.popleft() if self.queue else b""
+
+    def countRedoRecords(self):
+        return len(self.queue)
+
+    def process(self, record):
+        sleep(sleep_arg)
+
+
+engine = RedoEngine()
+started = time.perf_counter()
+while True:
+    redo_record = engine.getRedoRecordBytes()
+    if not redo_record:
+        break
+    engine.process(redo_record)
+seconds = time.perf_counter() - started
+print("{0:<24} {1:8.0f} records/s".format("loop", RECORDS / seconds))
+
+for workers in (4, 16):
+    engine = RedoEngine()
+    processor = G2RedoProcessor(
+        engine, max_workers=workers, records_per_worker=100, scale_interval=0.1
+    )
+    started = time.perf_counter()
+    processor.drain()
+    seconds = time.perf_counter() - started
+    print(
+        "{0:<24} {1:8.0f} records/s".format(
+            "G2RedoProcessor {0} max".format(workers), RECORDS / seconds
+        )
+    )
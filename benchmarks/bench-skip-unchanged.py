@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Measure reloading unchanged records with and without a fingerprint store.
+# Each record the engine resolves is a 1 ms native call that releases the
+# GIL, like G2_addRecord does; the C runtime's usleep() stands in for it so it
+# runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import tempfile
+import time
+
+from senzing.G2Bulk import bulk_map
+from senzing.G2Fingerprint import G2FingerprintStore
+
+RECORDS = 10000
+WORKERS = 8
+
+if os.name == "nt":
+    sleep = ctypes.windll.kernel32.Sleep
+    sleep_arg = 1
+else:
+    sleep = ctypes.CDLL(ctypes.util.find_library("c")).usleep
+    sleep_arg = 1000
+
+records = [
+    (
+        "TEST",
+        str(i),
+        '{{"RECORD_ID": "{0}", "NAME_FULL": "Robert Smith {0}",'
+        ' "ADDR_FULL": "{0} Main Street, Las Vegas NV"}}'.format(i),
+    )
+    for i in range(RECORDS)
+]
+
+
+def add(record):
+    sleep(sleep_arg)
+
+
+def load(store, canonical):
+    if store is None:
+        function = add
+    else:
+
+        def function(record):
+            record_fingerprint = store.fingerprint(record[2])
+            if not store.unchanged(record[0], record[1], record_fingerprint):
+                add(record)
+                store.put(record[0], record[1], record_fingerprint)
+
+    started = time.perf_counter()
+    for result in bulk_map(function, records, WORKERS, False):
+        pass
+    if store is not None:
+        store.flush()
+    return RECORDS / (time.perf_counter() - started)
+
+
+print("{0:<28} {1:10.0f} records/s".format("no fingerprints", load(None, True)))
+with tempfile.TemporaryDirectory() as directory:
+    for canonical_json in (True, False):
+        path = os.path.join(directory, "{0}.db".format(canonical_json))
+        with G2FingerprintStore(path, canonical=canonical_json) as fingerprints:
+            first = load(fingerprints, canonical_json)
+            again = load(fingerprints, canonical_json)
+        print(
+            "{0:<28} {1:10.0f} records/s first load, {2:10.0f} records/s reload".format(
+                "canonical" if canonical_json else "raw", first, again
+            )
+        )
@@ -0,0 +1,61 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Compare copying a large response out of the return buffer against returning
+# a zero-copy view of it.  The buffer is allocated with the C runtime's malloc,
+# realloc and free and filled directly, so it runs without the Senzing library.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import ctypes.util
+import os
+import timeit
+import tracemalloc
+
+from senzing.G2Library import ALLOCATOR_PROTOTYPES, G2NativeFunctions, G2NativeBuffer
+
+CALLS = 200
+
+if os.name == "nt":
+    c_runtime = ctypes.cdll.msvcrt
+else:
+    c_runtime = ctypes.CDLL(ctypes.util.find_library("c"))
+
+native = G2NativeFunctions()
+for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+    function = c_runtime[symbol[3:]]
+    function.argtypes = argtypes
+    function.restype = restype
+    setattr(native, symbol, function)
+
+buffer = G2NativeBuffer(native)
+
+
+def copied():
+    response = bytearray()
+    response[::] = b""
+    response += buffer.value()
+    return response
+
+
+def zero_copy():
+    return buffer.view()
+
+
+for size in (64 * 1024, 1024 * 1024, 16 * 1024 * 1024):
+    buffer.ptr.value = buffer.resize(buffer.ptr, size + 1)
+    buffer.size.value = size + 1
+    ctypes.memset(buffer.ptr, ord("x"), size)
+    ctypes.memset(buffer.ptr.value + size, 0, 1)
+    print("{0} KB response".format(size // 1024))
+    for name, func in (("copied", copied), ("zero-copy view", zero_copy)):
+        seconds = min(timeit.repeat(func, number=CALLS, repeat=5))
+        tracemalloc.start()
+        func()
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            "  {0:<16} {1:10.1f} us/call {2:12,d} bytes allocated".format(
+                name, seconds / CALLS * 1e6, allocated
+            )
+        )
@@ -0,0 +1,204 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from .G2Bulk import default_workers
+
+__all__ = ["AsyncG2Engine"]
+
+# -----------------------------------------------------------------------------
+# Method classes
+# -----------------------------------------------------------------------------
+
+QUERY = "query"
+WRITE = "write"
+REDO = "redo"
+
+# Methods are classified by name, so the <name>Bytes variants fall in the same
+# class as the method they return the response of.
+
+_REDO_PREFIXES = ("process", "getRedoRecord", "countRedoRecords")
+_WRITE_PREFIXES = ("add", "delete", "replace", "reevaluate")
+_QUERY_PREFIXES = ("get", "find", "why", "how", "search", "checkRecord", "stats")
+
+# Bulk methods run their own pool of threads and are not wrapped.
+
+_EXCLUDED = ("addRecords", "deleteRecords", "reevaluateEntities")
+
+
+def method_class(name):
+    # type: (str) -> str
+    """The class of a G2Engine method: QUERY, WRITE, REDO, or None if it is
+    not available asynchronously"""
+
+    if name in _EXCLUDED:
+        return None
+    if name.startswith(_REDO_PREFIXES):
+        return REDO
+    if name.startswith(_WRITE_PREFIXES):
+        return WRITE
+    if name.startswith(_QUERY_PREFIXES):
+        return QUERY
+    return None
+
+
+# -----------------------------------------------------------------------------
+# AsyncG2Engine class
+# -----------------------------------------------------------------------------
+
+
+class AsyncG2Engine(object):
+    """Awaitable G2Engine query, add/delete/replace/reevaluate and redo methods
+
+    Each method, e.g. await engine.getEntityByEntityIDBytes(1), runs the
+    G2Engine method of the same name on a dedicated thread pool.  The calls
+    of each method class (QUERY, WRITE and REDO) are limited by their own
+    semaphore, so one class cannot fill the pool and starve the others.
+    Cancelling a call that is still waiting for its semaphore or for a
+    thread removes it without calling the engine.  Cancelling a call that is
+    running returns at once, but its native call finishes in the background.
+
+    Attributes:
+        engine: the initialized G2Engine the calls are made on
+        workers: number of threads of the executor
+        limits: dict of method class to the most calls of that class
+            submitted to the executor at once
+        controllers: dict of method class to the G2ConcurrencyController
+            that adapts the calls of that class in flight
+    """
+
+    def __init__(self, engine, workers=None, limits=None, controllers=None):
+        # type: (G2Engine, int, dict, dict) -> None
+        """AsyncG2Engine class initialization
+
+        Args:
+            engine: the initialized G2Engine to call
+            workers: number of threads, defaults to the number of CPUs
+            limits: dict of method class to its limit.  By default queries
+                and writes may each use every thread and redo processing half
+                of them.
+            controllers: dict of method class to a G2ConcurrencyController.
+                The controller gates the calls of its class on the executor
+                threads, within the limit of the class, which defaults to the
+                controller's max_limit.  A call waiting for the controller
+                holds a thread, so the limits of the other classes should
+                leave threads for it.
+        """
+
+        if workers is None:
+            workers = default_workers()
+        self.engine = engine
+        self.workers = workers
+        self.limits = {QUERY: workers, WRITE: workers, REDO: max(1, workers // 2)}
+        self.controllers = dict(controllers or {})
+        for method, controller in self.controllers.items():
+            self.limits[method] = min(workers, controller.max_limit)
+        if limits:
+            self.limits.update(limits)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="AsyncG2Engine"
+        )
+        # Semaphore of each (event loop, method class), kept only while a
+        # call holds or waits for it.  An unused semaphore has every slot
+        # free, so dropping it and creating a new one changes nothing, and
+        # the semaphore, which refers to its loop, never keeps a finished
+        # loop alive.
+        self._semaphores = weakref.WeakValueDictionary()
+        self._futures = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = method_class(name)
+        if method is None or name.startswith("_"):
+            raise AttributeError(
+                "{0!r} object has no attribute {1!r}".format(type(self).__name__, name)
+            )
+        function = getattr(self.engine, name)
+        controller = self.controllers.get(method)
+        if controller is not None:
+            function = controller.wrap(function)
+
+        @functools.wraps(function)
+        async def call(*args, **kwargs):
+            return await self.run(method, function, *args, **kwargs)
+
+        # Cached, so later lookups do not come back here.
+        self.__dict__[name] = call
+        return call
+
+    def _semaphore(self, method):
+        # Semaphores are created on first use, in the running event loop.
+        key = (asyncio.get_running_loop(), method)
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._semaphores[key] = asyncio.Semaphore(
+                    self.limits[method]
+                )
+        return semaphore
+
+    async def run(self, method, function, *args, **kwargs):
+        """Call function on the executor within the limit of a method class
+
+        Args:
+            method: QUERY, WRITE or REDO
+            function: the callable to run, e.g. a G2Engine method
+
+        Return:
+            the return value of function
+        """
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(method)
+        await semaphore.acquire()
+        if self._closed:
+            semaphore.release()
+            raise asyncio.CancelledError()
+        try:
+            future = self._executor.submit(function, *args, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+
+        # The slot is held until the call finishes or is cancelled before it
+        # starts, even if the awaiting task is cancelled while it runs.
+        def release(future):
+            with self._lock:
+                self._futures.discard(future)
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # the event loop is closed
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait=True):
+        # type: (bool) -> None
+        """Stop the executor, cancelling the calls that have not started
+
+        Args:
+            wait: True to wait for the running calls to finish
+        """
+
+        # Calls still waiting for their semaphore are cancelled when they
+        # acquire it.
+        self._closed = True
+        with self._lock:
+            futures = list(self._futures)
+            self._semaphores.clear()
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Wait for the running calls without blocking the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
@@ -0,0 +1,468 @@
+import collections
+import functools
+import itertools
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from .G2Exception import G2Exception
+
+__all__ = ["G2AffinityExecutor", "G2BulkResult"]
+
+# -----------------------------------------------------------------------------
+# Bulk results
+# -----------------------------------------------------------------------------
+
+# Returned by the function of a bulk call for an item it did not need to call
+# the engine for.
+
+SKIPPED = object()
+
+
+class G2BulkResult(object):
+    """Outcome of one item of a bulk call such as G2Engine.addRecords
+
+    Attributes:
+        index: position of the item in the input
+        item: the item as it was passed in
+        info: the info document returned for the item, or None
+        exception: the G2Exception raised for the item, or None
+        attempts: number of times the item was tried
+        skipped: True if the item needed no engine call, e.g. an unchanged
+            record
+    """
+
+    __slots__ = ("index", "item", "info", "exception", "attempts", "skipped")
+
+    def __init__(
+        self, index, item, info=None, exception=None, attempts=1, skipped=False
+    ):
+        self.index = index
+        self.item = item
+        self.info = info
+        self.exception = exception
+        self.attempts = attempts
+        self.skipped = skipped
+
+    @property
+    def ok(self):
+        # type: () -> bool
+        """True if the item succeeded"""
+
+        return self.exception is None
+
+    def __repr__(self):
+        return "G2BulkResult(index={0}, ok={1})".format(self.index, self.ok)
+
+
+def affected_entities(info):
+    # type: (object) -> list
+    """IDs of the AFFECTED_ENTITIES of an info document
+
+    Args:
+        info: the info document of a WithInfo call, as str or bytes, or None
+    """
+
+    if not info:
+        return []
+    document = json.loads(info)
+    return [entity["ENTITY_ID"] for entity in document.get("AFFECTED_ENTITIES", [])]
+
+
+def collect_affected(function, affected):
+    # type: (function, set) -> function
+    """function, adding the affected entities of the info document it
+    returns to the set affected
+
+    The calls of a bulk call each return the entities they changed; their
+    union is what a caller usually acts on, e.g. the entities to export
+    again after a purge.
+    """
+
+    lock = threading.Lock()
+
+    @functools.wraps(function)
+    def call(item):
+        info = function(item)
+        entity_ids = affected_entities(info)
+        with lock:
+            affected.update(entity_ids)
+        return info
+
+    return call
+
+
+# -----------------------------------------------------------------------------
+# Key affinity
+# -----------------------------------------------------------------------------
+
+
+def record_key(record):
+    # type: (object) -> tuple
+    """Affinity key of a record: its (DATA_SOURCE, RECORD_ID)
+
+    Args:
+        record: an addRecords (dataSourceCode, recordID, jsonData) tuple or a
+            G2LoaderRecord
+    """
+
+    if isinstance(record, (tuple, list)):
+        return (record[0], record[1])
+    return (record.data_source, record.record_id)
+
+
+class G2AffinityExecutor(Executor):
+    """Thread pool that never runs two calls with the same key at once
+
+    Calls with the same key contend inside the engine, e.g. two addRecord
+    calls for the same record or for records that resolve to the same hot
+    entity, and often end in a G2RetryTimeoutExceededException.  Each call is
+    queued in the lane its key hashes to and each thread owns a lane, so the
+    calls with the same key run one after another, in the order they were
+    submitted, and the others run in parallel.  A thread whose lane is empty,
+    or only holds calls whose key is running, steals the oldest call it may
+    run from the longest other lane.
+
+    Attributes:
+        workers: number of threads and lanes
+        stolen: calls run by a thread other than the owner of their lane
+    """
+
+    def __init__(self, workers, thread_name_prefix="G2Affinity"):
+        # type: (int, str) -> None
+        """G2AffinityExecutor class initialization
+
+        Args:
+            workers: number of threads and lanes
+            thread_name_prefix: prefix of the names of the threads
+        """
+
+        self.workers = workers
+        self.stolen = 0
+        self._lanes = [collections.deque() for _ in range(workers)]
+        self._running_keys = set()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._next_lane = itertools.count()
+        self._threads = []
+        for lane in range(workers):
+            thread = threading.Thread(
+                target=self._work,
+                args=(lane,),
+                name="{0}_{1}".format(thread_name_prefix, lane),
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Run fn(*args, **kwargs) with no key, on any thread"""
+
+        return self.submit_with_key(None, fn, *args, **kwargs)
+
+    def submit_with_key(self, key, fn, /, *args, **kwargs):
+        # type: (object, function, ...) -> Future
+        """Run fn(*args, **kwargs) after the calls already submitted with the
+        same key, and never at the same time as another call with that key
+
+        Args:
+            key: hashable affinity key, or None for no affinity
+
+        Return:
+            concurrent.futures.Future of the call
+        """
+
+        future = Future()
+        if key is None:
+            lane = next(self._next_lane) % self.workers
+        else:
+            lane = hash(key) % self.workers
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._lanes[lane].append((key, future, fn, args, kwargs))
+            self._condition.notify()
+        return future
+
+    def _take_from(self, lane):
+        # The oldest call of the lane whose key is not running.  The calls
+        # before it all have running keys, so calls with the same key are
+        # taken in order.
+        for position, call in enumerate(lane):
+            key = call[0]
+            if key is None or key not in self._running_keys:
+                if position == 0:
+                    lane.popleft()
+                else:
+                    del lane[position]
+                if key is not None:
+                    self._running_keys.add(key)
+                return call
+        return None
+
+    def _take(self, lane):
+        call = self._take_from(self._lanes[lane])
+        if call is None:
+            for victim in sorted(self._lanes, key=len, reverse=True):
+                if not victim:
+                    break
+                if victim is not self._lanes[lane]:
+                    call = self._take_from(victim)
+                    if call is not None:
+                        self.stolen += 1
+                        break
+        return call
+
+    def _work(self, lane):
+        while True:
+            with self._condition:
+                while True:
+                    call = self._take(lane)
+                    if call is not None:
+                        break
+                    if self._shutdown and not any(self._lanes):
+                        self._condition.notify_all()
+                        return
+                    self._condition.wait()
+            key, future, fn, args, kwargs = call
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as ex:
+                    future.set_exception(ex)
+                else:
+                    future.set_result(result)
+            # Calls waiting for the key may run now.
+            with self._condition:
+                if key is not None:
+                    self._running_keys.discard(key)
+                if self._shutdown:
+                    self._condition.notify_all()
+                else:
+                    self._condition.notify()
+            del call, future, fn, args, kwargs
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        # type: (bool, bool) -> None
+        """Stop accepting calls once the submitted ones have run
+
+        Args:
+            wait: True to wait for the threads to finish
+            cancel_futures: True to cancel the calls that have not started
+        """
+
+        with self._condition:
+            self._shutdown = True
+            if cancel_futures:
+                for lane in self._lanes:
+                    for call in lane:
+                        call[1].cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+# -----------------------------------------------------------------------------
+# Bulk execution
+# -----------------------------------------------------------------------------
+
+
+def default_workers():
+    # type: () -> int
+    """Number of threads used when a bulk call is not given one"""
+
+    return os.cpu_count() or 1
+
+
+def _run(function, index, item, attempts=1):
+    # type: (function, int, object, int) -> G2BulkResult
+    """Call function on item, capturing a G2Exception in the result"""
+
+    try:
+        info = function(item)
+    except G2Exception as ex:
+        return G2BulkResult(index, item, exception=ex, attempts=attempts)
+    if info is SKIPPED:
+        return G2BulkResult(index, item, attempts=attempts, skipped=True)
+    return G2BulkResult(index, item, info, attempts=attempts)
+
+
+def _executor(function, workers, key):
+    # The executor of a bulk call and the function submitting an item to it.
+    if key is None:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="G2Bulk")
+
+        def submit(index, item, attempts=1):
+            return executor.submit(_run, function, index, item, attempts)
+
+    else:
+        executor = G2AffinityExecutor(workers, thread_name_prefix="G2Bulk")
+
+        def submit(index, item, attempts=1):
+            return executor.submit_with_key(
+                key(item), _run, function, index, item, attempts
+            )
+
+    return executor, submit
+
+
+def _pool_size(workers, max_pending):
+    # The defaults of bulk_map()'s workers and max_pending.
+    if workers is None:
+        workers = default_workers()
+    if max_pending is None:
+        max_pending = 2 * workers
+    return workers, max(max_pending, workers, 1)
+
+
+def bulk_map(
+    function,
+    items,
+    workers=None,
+    ordered=True,
+    max_pending=None,
+    retry=None,
+    key=None,
+):
+    # type: (function, iterable, int, bool, int, G2RetryScheduler, function) -> generator
+    """Call function on every item from a bounded pool of threads
+
+    The native calls release the GIL, so the calls run in parallel.  items is
+    read only as fast as the calls finish: at most max_pending items are read
+    but not yet yielded at any time.
+
+    Args:
+        function: called with each item.  Its return value is the result's
+            info, or SKIPPED to mark the result skipped.  A G2Exception it
+            raises is the result's exception; any other exception stops the
+            bulk call and is raised to the caller.
+        items: iterable of the items
+        workers: number of threads, defaults to the number of CPUs
+        ordered: True to yield results in input order, False to yield each one
+            as soon as it is finished
+        max_pending: most items in flight, defaults to twice workers.  Items
+            waiting for a retry are not counted, nor in order the finished
+            results waiting behind one, so they do not hold back the other
+            items.  Those results are held for at most the retry's delay.
+        retry: G2RetryScheduler of the items that fail with a retryable
+            exception.  The result of such an item is yielded after its last
+            attempt.
+        key: function returning the affinity key of an item, e.g.
+            record_key.  Items with the same key are called one at a time, in
+            input order, on a G2AffinityExecutor.  A retried item runs after
+            the items of its key that were submitted while it waited.
+
+    Return:
+        generator of G2BulkResult, one per item.  Closing it early cancels the
+            items that have not started and waits for the running ones.
+    """
+
+    if retry is not None:
+        return _bulk_map_retry(
+            function, items, workers, ordered, max_pending, retry, key
+        )
+    return _bulk_map(function, items, workers, ordered, max_pending, key)
+
+
+def _bulk_map(function, items, workers, ordered, max_pending, key):
+    # bulk_map() without retries: the pending futures, in input order.
+    workers, max_pending = _pool_size(workers, max_pending)
+
+    executor, submit_item = _executor(function, workers, key)
+    pending = collections.deque()
+    finished = queue.SimpleQueue()
+    item_iterator = enumerate(items)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    index, item = next(item_iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = submit_item(index, item)
+                if not ordered:
+                    future.add_done_callback(finished.put)
+                pending.append(future)
+            if not pending:
+                return
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = finished.get()
+                pending.remove(future)
+            yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _bulk_map_retry(function, items, workers, ordered, max_pending, retry, key):
+    # bulk_map() with the failed items re-submitted by a retry scheduler.
+    # Every finished future is put on one queue; in order, the results wait
+    # in finished_results until the results before them are yielded.  The
+    # indexes of the items waiting in the scheduler are in retrying.
+    workers, max_pending = _pool_size(workers, max_pending)
+
+    executor, submit_item = _executor(function, workers, key)
+    running = set()
+    finished = queue.SimpleQueue()
+    unyielded = collections.deque()
+    finished_results = {}
+    retrying = set()
+    item_iterator = enumerate(items)
+    exhausted = False
+
+    def submit(index, item, attempts):
+        future = submit_item(index, item, attempts)
+        running.add(future)
+        future.add_done_callback(finished.put)
+
+    try:
+        while True:
+            for item, attempts, index in retry.due():
+                retrying.discard(index)
+                submit(index, item, attempts + 1)
+            # The results finished behind a waiting head are not counted.
+            buffered = len(finished_results)
+            if ordered and unyielded and unyielded[0] in retrying:
+                buffered = 0
+            while not exhausted and len(running) + buffered < max_pending:
+                try:
+                    index, item = next(item_iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                submit(index, item, 1)
+                if ordered:
+                    unyielded.append(index)
+            if ordered and unyielded and unyielded[0] in finished_results:
+                yield finished_results.pop(unyielded.popleft())
+                continue
+            if not running and not retry:
+                return
+            try:
+                future = finished.get(timeout=retry.next_due())
+            except queue.Empty:
+                continue
+            running.discard(future)
+            result = future.result()
+            if not result.ok and retry.schedule(
+                result.item, result.attempts, result.exception, result.index
+            ):
+                retrying.add(result.index)
+                continue
+            if ordered:
+                finished_results[result.index] = result
+            else:
+                yield result
+    finally:
+        for future in running:
+            future.cancel()
+        retry.clear()
+        executor.shutdown(wait=True)
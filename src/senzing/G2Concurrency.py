@@ -0,0 +1,276 @@
+import collections
+import functools
+import threading
+import time
+
+from .G2Exception import G2RetryableException
+
+__all__ = ["G2ConcurrencyController"]
+
+VEGAS = "vegas"
+AIMD = "aimd"
+
+# -----------------------------------------------------------------------------
+# G2ConcurrencyController class
+# -----------------------------------------------------------------------------
+
+
+class G2ConcurrencyController(object):
+    """Adapts the number of engine calls in flight to the engine's latency
+
+    The best number of concurrent addRecord or query calls depends on the
+    database latency, which drifts.  The controller gates the calls it
+    wraps so at most limit of them run at once, and adjusts limit after
+    every window of completed calls:
+
+    vegas: like TCP Vegas, the lowest latency seen is taken as the latency
+        of an idle engine.  limit * (1 - min_latency / latency) estimates the
+        calls that are queued inside the engine rather than being worked
+        on.  Fewer than alpha queued raises the limit by one, more than beta
+        lowers it by one.  The lowest latency rises with the engine's
+        latency when it is measured at a lower load, so every probe_windows
+        windows the limit is halved for one window, and that window's lowest
+        latency replaces it before the limit is restored.  A lowest latency
+        measured while the engine was still saturated is corrected by the
+        following probes.
+    aimd: the limit is raised by one after every window, and multiplied by
+        backoff when the window's mean latency is above latency_threshold.
+
+    With either algorithm a window with a G2RetryableException multiplies
+    the limit by backoff.  The limit is only raised when the calls used it,
+    so a loader that is slow to feed records does not drive it to max_limit.
+
+    Attributes:
+        min_limit: lowest limit
+        max_limit: highest limit
+        algorithm: VEGAS or AIMD
+        history: the most recent changes of the limit, as (time, old limit,
+            new limit, reason, mean latency) tuples
+    """
+
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=64,
+        algorithm=VEGAS,
+        alpha=3.0,
+        beta=6.0,
+        backoff=0.9,
+        latency_threshold=None,
+        window=10,
+        probe_windows=50,
+        history_size=100,
+        clock=time.perf_counter,
+    ):
+        # type: (int, int, int, str, float, float, float, float, int, int, int, function) -> None
+        """G2ConcurrencyController class initialization
+
+        Args:
+            initial_limit: calls allowed in flight at first
+            min_limit: lowest limit
+            max_limit: highest limit
+            algorithm: VEGAS or AIMD
+            alpha: vegas, most queued calls for the limit to be raised
+            beta: vegas, fewest queued calls for the limit to be lowered
+            backoff: factor the limit is multiplied by to lower it quickly
+            latency_threshold: aimd, mean latency in seconds above which the
+                limit is lowered
+            window: fewest calls of a window, a window also has at least
+                limit calls
+            probe_windows: vegas, windows after which the lowest latency is
+                measured again, so a lasting rise of the engine's latency is
+                followed
+            history_size: changes of the limit kept in history
+            clock: function returning the current time, in seconds
+        """
+
+        if algorithm not in (VEGAS, AIMD):
+            raise ValueError("Unknown algorithm {0!r}".format(algorithm))
+        if algorithm == AIMD and latency_threshold is None:
+            raise ValueError("aimd needs a latency_threshold")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.algorithm = algorithm
+        self.alpha = alpha
+        self.beta = beta
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+        self.window = window
+        self.probe_windows = probe_windows
+        self.clock = clock
+        self.history = collections.deque(maxlen=history_size)
+        self._limit = float(max(min_limit, min(max_limit, initial_limit)))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._min_latency = None
+        self._windows = 0
+        self._probe_limit = None
+        self._calls = 0
+        self._failures = 0
+        self._latency = None
+        self._throughput = 0.0
+        self._increases = 0
+        self._decreases = 0
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_started = self.clock()
+        self._window_calls = 0
+        self._window_latency = 0.0
+        self._window_min_latency = None
+        self._window_failures = 0
+        self._window_max_in_flight = self._in_flight
+
+    @property
+    def limit(self):
+        # type: () -> int
+        """Calls allowed in flight"""
+
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        # type: () -> int
+        """Calls running"""
+
+        return self._in_flight
+
+    def acquire(self):
+        # type: () -> None
+        """Wait until one more call may run"""
+
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            self._window_max_in_flight = max(
+                self._window_max_in_flight, self._in_flight
+            )
+
+    def release(self, latency, failed=False):
+        # type: (float, bool) -> None
+        """End a call started with acquire()
+
+        Args:
+            latency: seconds the call took
+            failed: True if the call failed with a G2RetryableException
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            self._calls += 1
+            self._window_calls += 1
+            self._window_latency += latency
+            if self._window_min_latency is None or latency < self._window_min_latency:
+                self._window_min_latency = latency
+            if failed:
+                self._failures += 1
+                self._window_failures += 1
+            if self._window_calls >= max(self.window, int(self._limit)):
+                self._adjust()
+                self._condition.notify_all()
+            else:
+                self._condition.notify()
+
+    def wrap(self, function):
+        # type: (function) -> function
+        """function, gated and timed by the controller"""
+
+        @functools.wraps(function)
+        def call(*args, **kwargs):
+            self.acquire()
+            started = self.clock()
+            failed = False
+            try:
+                return function(*args, **kwargs)
+            except G2RetryableException:
+                failed = True
+                raise
+            finally:
+                self.release(self.clock() - started, failed)
+
+        return call
+
+    def _adjust(self):
+        # Called at the end of a window, with the condition held.
+        now = self.clock()
+        latency = self._window_latency / self._window_calls
+        elapsed = now - self._window_started
+        self._latency = latency
+        self._throughput = self._window_calls / elapsed if elapsed > 0 else 0.0
+        self._windows += 1
+        probed = self._probe_limit
+        self._probe_limit = None
+        if probed is not None or self._min_latency is None:
+            self._min_latency = self._window_min_latency
+        else:
+            self._min_latency = min(self._min_latency, self._window_min_latency)
+        # Only raise a limit the calls reached.
+        saturated = self._window_max_in_flight >= int(self._limit)
+        limit = self._limit if probed is None else probed
+        reason = None
+        if self._window_failures:
+            limit = limit * self.backoff
+            reason = "retryable failures"
+        elif probed is not None:
+            # The probe window ran at half the limit, which comes back.
+            reason = "probe"
+        elif self.algorithm == AIMD:
+            if latency > self.latency_threshold:
+                limit = self._limit * self.backoff
+                reason = "latency above threshold"
+            elif saturated:
+                limit = self._limit + 1
+                reason = "latency below threshold"
+        else:
+            queued = (
+                self._limit * (1.0 - self._min_latency / latency) if latency else 0.0
+            )
+            if self._windows % self.probe_windows == 0:
+                self._probe_limit = self._limit
+                limit = self._limit / 2
+                reason = "probe"
+            elif queued > self.beta:
+                limit = self._limit - 1
+                reason = "{0:.1f} calls queued".format(queued)
+            elif queued < self.alpha and saturated:
+                limit = self._limit + 1
+                reason = "{0:.1f} calls queued".format(queued)
+        limit = max(self.min_limit, min(self.max_limit, limit))
+        if int(limit) != int(self._limit):
+            if limit > self._limit:
+                self._increases += 1
+            else:
+                self._decreases += 1
+            self.history.append((now, int(self._limit), int(limit), reason, latency))
+        self._limit = limit
+        self._reset_window()
+
+    def metrics(self):
+        # type: () -> dict
+        """The controller's state and decisions
+
+        Return:
+            dict: limit, in_flight, calls, failures, latency (mean seconds of
+                the last window), min_latency, throughput (calls per second
+                of the last window), increases and decreases of the limit
+        """
+
+        with self._condition:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "calls": self._calls,
+                "failures": self._failures,
+                "latency": self._latency,
+                "min_latency": self._min_latency,
+                "throughput": self._throughput,
+                "increases": self._increases,
+                "decreases": self._decreases,
+            }
+
+    def __repr__(self):
+        return "G2ConcurrencyController(limit={0}, in_flight={1})".format(
+            self.limit, self._in_flight
+        )
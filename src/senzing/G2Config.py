@@ -4,49 +4,24 @@ import os
 import functools
 import warnings
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Exception import G2Exception
+from .G2Library import G2BufferPool, G2ReturnBuffer, load_library
+from .G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    STRING,
+    HANDLE,
+    APPEND_RESPONSE,
+    NEW_HANDLE,
+    CHECK_NONE,
+    prepare_string_argument,
 )
 
 __all__ = ["G2Config"]
 SENZING_PRODUCT_ID = "5040"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
-
-    def __init__(self, *args, **kwargs):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {}".format(self.buf))
-
-
-tls_var = MyBuffer()
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
+tls_var = G2ReturnBuffer()
 
 
 def deprecated(instance):
@@ -71,31 +46,116 @@ def deprecated(instance):
     return the_decorator
 
 
+_PROTOTYPES = {
+    "G2Config_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2Config_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2Config_clearLastException": ([], None),
+    "G2Config_getLastExceptionCode": ([], c_int),
+}
+
+# G2Config methods that only prepare their arguments, make one native call and
+# check its return code.  They are generated from this table by G2NativeApi.
+
+_NATIVE_CALLS = [
+    G2NativeCall(
+        "create",
+        "G2Config_create",
+        [],
+        returns=NEW_HANDLE,
+        doc="""Creates a new config handle from the stored template""",
+    ),
+    G2NativeCall(
+        "load",
+        "G2Config_load",
+        [("jsonConfig", STRING)],
+        returns=NEW_HANDLE,
+        doc="""Creates a new config handle from a json config string""",
+    ),
+    G2NativeCall(
+        "close",
+        "G2Config_close",
+        [("configHandle", HANDLE)],
+        check=CHECK_NONE,
+        doc="""Closes a config handle""",
+    ),
+    G2NativeCall(
+        "save",
+        "G2Config_save",
+        [("configHandle", HANDLE), ("response", APPEND_RESPONSE)],
+        doc="""Saves a config handle""",
+    ),
+    G2NativeCall(
+        "listDataSources",
+        "G2Config_listDataSources",
+        [("configHandle", HANDLE), ("response", APPEND_RESPONSE)],
+        doc="""lists a set of data sources""",
+    ),
+    G2NativeCall(
+        "addDataSource",
+        "G2Config_addDataSource",
+        [
+            ("configHandle", HANDLE),
+            ("inputJson", STRING),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Adds a data source""",
+    ),
+    G2NativeCall(
+        "deleteDataSource",
+        "G2Config_deleteDataSource",
+        [("configHandle", HANDLE), ("inputJson", STRING)],
+        doc="""Deletes a data source""",
+    ),
+    G2NativeCall(
+        "destroy",
+        "G2Config_destroy",
+        [],
+        check=CHECK_NONE,
+        doc="""Uninitializes the engine
+        This should be done once per process after init(...) is called.
+        After it is called the engine will no longer function.
+
+        Args:
+
+        Return:
+            None
+        """,
+    ),
+]
+
+_NATIVE_API = G2NativeApi(
+    "G2Config", "G2Config_getLastException", tls_var, _NATIVE_CALLS, _PROTOTYPES
+)
+
+
 # -----------------------------------------------------------------------------
 # G2Config class
 # -----------------------------------------------------------------------------
 
 
+@_NATIVE_API.install
 class G2Config(object):
     """G2 config module access library
 
     Attributes:
         _lib_handle: A boolean indicating if we like SPAM or not.
-        _resize_func_def: resize function definition
-        _resize_func: resize function pointer
+        _native: typed native functions bound once from _lib_handle
+        buffer_pool: G2BufferPool of the native response buffers
         _module_name: CME module name
         _ini_file_name: name and location of .ini file
     """
 
-    def __init__(self, *args, **kwargs):
-        # type: () -> None
-        """G2Config class initialization"""
+    def __init__(self, *args, buffer_pool=None, **kwargs):
+        # type: (G2BufferPool) -> None
+        """G2Config class initialization
+
+        Args:
+            buffer_pool: G2BufferPool the response buffers are borrowed from.
+                A new pool with the default limits is used if it is None.
+        """
 
         try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2.so")
+            self._lib_handle, self._native = load_library("G2", _NATIVE_API.prototypes)
         except OSError as ex:
             print(
                 "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
@@ -108,8 +168,9 @@ class G2Config(object):
             )
             raise G2Exception("Failed to load the G2 library")
 
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
+        if buffer_pool is None:
+            buffer_pool = G2BufferPool()
+        self.buffer_pool = buffer_pool.bind(self._native)
 
     # -----------------------------------------------------------------------------
     # Internal helper methods
@@ -119,19 +180,7 @@ class G2Config(object):
         # type: (str) -> str
         """Internal processing function"""
 
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
+        return prepare_string_argument(stringToPrepare)
 
     # -----------------------------------------------------------------------------
     # Public API
@@ -150,8 +199,7 @@ class G2Config(object):
         if self._debug:
             print("Initializing G2 Config")
 
-        self._lib_handle.G2Config_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2Config_init(
+        ret_code = self._native.G2Config_init(
             self._module_name, self._ini_params, self._debug
         )
 
@@ -159,24 +207,19 @@ class G2Config(object):
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     @deprecated(1302)
     def clearLastException(self, *args, **kwargs):
         """Clears the last exception"""
 
-        self._lib_handle.G2Config_clearLastException.restype = None
-        self._lib_handle.G2Config_clearLastException.argtypes = []
-        self._lib_handle.G2Config_clearLastException()
+        self._native.G2Config_clearLastException()
 
     @deprecated(1303)
     def getLastException(self, *args, **kwargs):
         """Gets the last exception"""
 
-        self._lib_handle.G2Config_getLastException.restype = c_int
-        self._lib_handle.G2Config_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        self._native.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
         resultString = tls_var.buf.value.decode("utf-8")
         return resultString
 
@@ -184,152 +227,5 @@ class G2Config(object):
     def getLastExceptionCode(self, *args, **kwargs):
         """Gets the last exception code"""
 
-        self._lib_handle.G2Config_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2Config_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2Config_getLastExceptionCode()
+        exception_code = self._native.G2Config_getLastExceptionCode()
         return exception_code
-
-    def create(self, *args, **kwargs):
-        """Creates a new config handle from the stored template"""
-        self._lib_handle.G2Config_create.restype = c_int
-        self._lib_handle.G2Config_create.argtypes = [POINTER(c_void_p)]
-        configHandle = c_void_p(0)
-        ret_code = self._lib_handle.G2Config_create(byref(configHandle))
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return configHandle.value
-
-    def load(self, jsonConfig, *args, **kwargs):
-        """Creates a new config handle from a json config string"""
-        _jsonConfig = self.prepareStringArgument(jsonConfig)
-        self._lib_handle.G2Config_load.restype = c_int
-        self._lib_handle.G2Config_load.argtypes = [c_char_p, POINTER(c_void_p)]
-        configHandle = c_void_p(0)
-        ret_code = self._lib_handle.G2Config_load(_jsonConfig, byref(configHandle))
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return configHandle.value
-
-    def close(self, configHandle, *args, **kwargs):
-        """Closes a config handle"""
-        self._lib_handle.G2Config_close.restype = c_int
-        self._lib_handle.G2Config_close.argtypes = [c_void_p]
-        self._lib_handle.G2Config_close(c_void_p(configHandle))
-
-    def save(self, configHandle, response, *args, **kwargs):
-        """Saves a config handle"""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Config_save.argtypes = [
-            c_void_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Config_save(
-            configHandle, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def listDataSources(self, configHandle, response, *args, **kwargs):
-        """lists a set of data sources"""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Config_listDataSources.argtypes = [
-            c_void_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Config_listDataSources(
-            configHandle, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def addDataSource(self, configHandle, inputJson, response, *args, **kwargs):
-        """Adds a data source"""
-        _inputJson = self.prepareStringArgument(inputJson)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Config_addDataSource.argtypes = [
-            c_void_p,
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Config_addDataSource(
-            configHandle,
-            _inputJson,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def deleteDataSource(self, configHandle, inputJson, *args, **kwargs):
-        """Deletes a data source"""
-        _inputJson = self.prepareStringArgument(inputJson)
-        self._lib_handle.G2Config_deleteDataSource.argtypes = [c_void_p, c_char_p]
-        ret_code = self._lib_handle.G2Config_deleteDataSource(configHandle, _inputJson)
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Config has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Config_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def destroy(self, *args, **kwargs):
-        """Uninitializes the engine
-        This should be done once per process after init(...) is called.
-        After it is called the engine will no longer function.
-
-        Args:
-
-        Return:
-            None
-        """
-
-        self._lib_handle.G2Config_destroy()
@@ -4,50 +4,25 @@ import os
 import functools
 import warnings
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Exception import G2Exception
+from .G2Library import G2BufferPool, G2ReturnBuffer, load_library
+from .G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    STRING,
+    CONFIG_ID,
+    RESPONSE,
+    INT64_OUT,
+    CHECK_NONE,
+    prepare_int_argument,
+    prepare_string_argument,
 )
 
 __all__ = ["G2ConfigMgr"]
 SENZING_PRODUCT_ID = "5041"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
-
-    def __init__(self):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {}".format(self.buf))
-
-
-tls_var = MyBuffer()
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
+tls_var = G2ReturnBuffer()
 
 
 def deprecated(instance):
@@ -72,31 +47,98 @@ def deprecated(instance):
     return the_decorator
 
 
+_PROTOTYPES = {
+    "G2ConfigMgr_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2ConfigMgr_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2ConfigMgr_getDefaultConfigID": ([POINTER(c_longlong)], c_int),
+    "G2ConfigMgr_clearLastException": ([], None),
+    "G2ConfigMgr_getLastExceptionCode": ([], c_int),
+}
+
+# G2ConfigMgr methods that only prepare their arguments, make one native call and
+# check its return code.  They are generated from this table by G2NativeApi.
+
+_NATIVE_CALLS = [
+    G2NativeCall(
+        "addConfig",
+        "G2ConfigMgr_addConfig",
+        [("configStr", STRING), ("configComments", STRING), ("configID", INT64_OUT)],
+        doc="""registers a new configuration document in the datastore""",
+    ),
+    G2NativeCall(
+        "getConfig",
+        "G2ConfigMgr_getConfig",
+        [("configID", CONFIG_ID), ("response", RESPONSE)],
+        doc="""retrieves the registered configuration document from the datastore""",
+    ),
+    G2NativeCall(
+        "getConfigList",
+        "G2ConfigMgr_getConfigList",
+        [("response", RESPONSE)],
+        doc="""retrieves a list of known configurations from the datastore""",
+    ),
+    G2NativeCall(
+        "setDefaultConfigID",
+        "G2ConfigMgr_setDefaultConfigID",
+        [("configID", CONFIG_ID)],
+        doc="""sets the default config identifier in the datastore""",
+    ),
+    G2NativeCall(
+        "replaceDefaultConfigID",
+        "G2ConfigMgr_replaceDefaultConfigID",
+        [("oldConfigID", CONFIG_ID), ("newConfigID", CONFIG_ID)],
+        doc="""sets the default config identifier in the datastore""",
+    ),
+    G2NativeCall(
+        "destroy",
+        "G2ConfigMgr_destroy",
+        [],
+        check=CHECK_NONE,
+        doc="""Uninitializes the engine
+        This should be done once per process after init(...) is called.
+        After it is called the engine will no longer function.
+
+        Args:
+
+        Return:
+            None
+        """,
+    ),
+]
+
+_NATIVE_API = G2NativeApi(
+    "G2ConfigMgr", "G2ConfigMgr_getLastException", tls_var, _NATIVE_CALLS, _PROTOTYPES
+)
+
+
 # -----------------------------------------------------------------------------
 # G2ConfigMgr class
 # -----------------------------------------------------------------------------
 
 
+@_NATIVE_API.install
 class G2ConfigMgr(object):
     """G2 config-manager module access library
 
     Attributes:
         _lib_handle: A boolean indicating if we like SPAM or not.
-        _resize_func_def: resize function definition
-        _resize_func: resize function pointer
+        _native: typed native functions bound once from _lib_handle
+        buffer_pool: G2BufferPool of the native response buffers
         _module_name: CME module name
         _ini_params: a JSON string containing INI parameters
     """
 
-    def __init__(self, *args, **kwargs):
-        # type: () -> None
-        """Class initialization"""
+    def __init__(self, *args, buffer_pool=None, **kwargs):
+        # type: (G2BufferPool) -> None
+        """Class initialization
+
+        Args:
+            buffer_pool: G2BufferPool the response buffers are borrowed from.
+                A new pool with the default limits is used if it is None.
+        """
 
         try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2.so")
+            self._lib_handle, self._native = load_library("G2", _NATIVE_API.prototypes)
         except OSError as ex:
             print(
                 "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
@@ -109,8 +151,9 @@ class G2ConfigMgr(object):
             )
             raise G2Exception("Failed to load the G2 library")
 
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
+        if buffer_pool is None:
+            buffer_pool = G2BufferPool()
+        self.buffer_pool = buffer_pool.bind(self._native)
 
     # -----------------------------------------------------------------------------
     # Internal helper methods
@@ -119,39 +162,14 @@ class G2ConfigMgr(object):
     def prepareIntArgument(self, valueToPrepare):
         # type: (str) -> int
         """Internal processing function"""
-        """ This converts many types of values to an integer """
-
-        # handle null string
-        if valueToPrepare is None:
-            return 0
-        # if string is unicode, transcode to utf-8 str
-        if type(valueToPrepare) == str:
-            return int(valueToPrepare.encode("utf-8"))
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(valueToPrepare) == bytearray:
-            return int(valueToPrepare)
-        elif type(valueToPrepare) == bytes:
-            return int(valueToPrepare)
-        # input is already an int
-        return valueToPrepare
+
+        return prepare_int_argument(valueToPrepare)
 
     def prepareStringArgument(self, stringToPrepare):
         # type: (str) -> str
         """Internal processing function"""
 
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
+        return prepare_string_argument(stringToPrepare)
 
     # -----------------------------------------------------------------------------
     # Public API
@@ -176,162 +194,23 @@ class G2ConfigMgr(object):
         if self._debug:
             print("Initializing G2 Config Manager")
 
-        self._lib_handle.G2ConfigMgr_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2ConfigMgr_init(
+        ret_code = self._native.G2ConfigMgr_init(
             self._module_name, self._ini_params, self._debug
         )
         if self._debug:
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def addConfig(self, configStr, configComments, configID, *args, **kwargs):
-        """registers a new configuration document in the datastore"""
-        _configStr = self.prepareStringArgument(configStr)
-        _configComments = self.prepareStringArgument(configComments)
-        configID[::] = b""
-        cID = c_longlong(0)
-        self._lib_handle.G2ConfigMgr_addConfig.argtypes = [
-            c_char_p,
-            c_char_p,
-            POINTER(c_longlong),
-        ]
-        self._lib_handle.G2ConfigMgr_addConfig.restype = c_int
-        ret_code = self._lib_handle.G2ConfigMgr_addConfig(
-            _configStr, _configComments, cID
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        configID += str(cID.value).encode()
-
-    def getConfig(self, configID, response, *args, **kwargs):
-        """retrieves the registered configuration document from the datastore"""
-        configID_ = self.prepareIntArgument(configID)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2ConfigMgr_getConfig.restype = c_int
-        self._lib_handle.G2ConfigMgr_getConfig.argtypes = [
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2ConfigMgr_getConfig(
-            configID_, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def getConfigList(self, response, *args, **kwargs):
-        """retrieves a list of known configurations from the datastore"""
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2ConfigMgr_getConfigList.restype = c_int
-        self._lib_handle.G2ConfigMgr_getConfigList.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2ConfigMgr_getConfigList(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def setDefaultConfigID(self, configID, *args, **kwargs):
-        """sets the default config identifier in the datastore"""
-        configID_ = self.prepareIntArgument(configID)
-        self._lib_handle.G2ConfigMgr_setDefaultConfigID.restype = c_int
-        self._lib_handle.G2ConfigMgr_setDefaultConfigID.argtypes = [c_longlong]
-        ret_code = self._lib_handle.G2ConfigMgr_setDefaultConfigID(configID_)
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def replaceDefaultConfigID(self, oldConfigID, newConfigID, *args, **kwargs):
-        """sets the default config identifier in the datastore"""
-        oldConfigID_ = self.prepareIntArgument(oldConfigID)
-        newConfigID_ = self.prepareIntArgument(newConfigID)
-        self._lib_handle.G2ConfigMgr_replaceDefaultConfigID.restype = c_int
-        self._lib_handle.G2ConfigMgr_replaceDefaultConfigID.argtypes = [
-            c_longlong,
-            c_longlong,
-        ]
-        ret_code = self._lib_handle.G2ConfigMgr_replaceDefaultConfigID(
-            oldConfigID_, newConfigID_
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     def getDefaultConfigID(self, configID, *args, **kwargs):
         """gets the default config identifier from the datastore"""
         configID[::] = b""
         cID = c_longlong(0)
-        self._lib_handle.G2ConfigMgr_getDefaultConfigID.argtypes = [POINTER(c_longlong)]
-        self._lib_handle.G2ConfigMgr_getDefaultConfigID.restype = c_int
-        ret_code = self._lib_handle.G2ConfigMgr_getDefaultConfigID(cID)
+        ret_code = self._native.G2ConfigMgr_getDefaultConfigID(cID)
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2ConfigMgr has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2ConfigMgr_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
         if cID.value:
             configID += str(cID.value).encode()
@@ -340,17 +219,13 @@ class G2ConfigMgr(object):
     def clearLastException(self, *args, **kwargs):
         """Clears the last exception"""
 
-        self._lib_handle.G2ConfigMgr_clearLastException.restype = None
-        self._lib_handle.G2ConfigMgr_clearLastException.argtypes = []
-        self._lib_handle.G2ConfigMgr_clearLastException()
+        self._native.G2ConfigMgr_clearLastException()
 
     @deprecated(1403)
     def getLastException(self, *args, **kwargs):
         """Gets the last exception"""
 
-        self._lib_handle.G2ConfigMgr_getLastException.restype = c_int
-        self._lib_handle.G2ConfigMgr_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2ConfigMgr_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        self._native.G2ConfigMgr_getLastException(tls_var.buf, sizeof(tls_var.buf))
         resultString = tls_var.buf.value.decode("utf-8")
         return resultString
 
@@ -358,20 +233,5 @@ class G2ConfigMgr(object):
     def getLastExceptionCode(self, *args, **kwargs):
         """Gets the last exception code"""
 
-        self._lib_handle.G2ConfigMgr_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2ConfigMgr_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2ConfigMgr_getLastExceptionCode()
+        exception_code = self._native.G2ConfigMgr_getLastExceptionCode()
         return exception_code
-
-    def destroy(self, *args, **kwargs):
-        """Uninitializes the engine
-        This should be done once per process after init(...) is called.
-        After it is called the engine will no longer function.
-
-        Args:
-
-        Return:
-            None
-        """
-
-        self._lib_handle.G2ConfigMgr_destroy()
@@ -4,49 +4,34 @@ import os
 import functools
 import warnings
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Exception import G2Exception
+from .G2Library import G2BufferPool, G2ReturnBuffer, load_library
+from .G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    STRING,
+    INT,
+    INT64,
+    UINT64,
+    SIZE,
+    BOOL,
+    CONFIG_ID,
+    HANDLE,
+    APPEND_RESPONSE,
+    NEW_HANDLE,
+    RETURN_CODE,
+    CHECK_NEGATIVE,
+    CHECK_NONE,
+    prepare_boolean_argument,
+    prepare_int_argument,
+    prepare_string_argument,
 )
 
 __all__ = ["G2Diagnostic"]
 SENZING_PRODUCT_ID = "5042"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
-
-    def __init__(self):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {}".format(self.buf))
-
-
-tls_var = MyBuffer()
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
+tls_var = G2ReturnBuffer()
 
 
 def deprecated(instance):
@@ -71,31 +56,270 @@ def deprecated(instance):
     return the_decorator
 
 
+_PROTOTYPES = {
+    "G2Diagnostic_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2Diagnostic_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2Diagnostic_initWithConfigID": ([c_char_p, c_char_p, c_longlong, c_int], c_int),
+    "G2Diagnostic_fetchNextEntityBySize": ([c_void_p, c_char_p, c_size_t], c_int),
+    "G2Diagnostic_clearLastException": ([], None),
+    "G2Diagnostic_getLastExceptionCode": ([], c_int),
+}
+
+# G2Diagnostic methods that only prepare their arguments, make one native call and
+# check its return code.  They are generated from this table by G2NativeApi.
+
+_NATIVE_CALLS = [
+    G2NativeCall(
+        "reinit",
+        "G2Diagnostic_reinit",
+        [("initConfigID", CONFIG_ID)],
+        check=CHECK_NEGATIVE,
+    ),
+    G2NativeCall(
+        "getEntityDetails",
+        "G2Diagnostic_getEntityDetails",
+        [
+            ("entityID", INT64),
+            ("includeInternalFeatures", BOOL),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Get the details for the resolved entity
+        Args:
+            entityID: The entity ID to get results for
+            includeInternalFeatures: boolean value indicating whether to include internal features
+        """,
+    ),
+    G2NativeCall(
+        "getRelationshipDetails",
+        "G2Diagnostic_getRelationshipDetails",
+        [
+            ("relationshipID", INT64),
+            ("includeInternalFeatures", BOOL),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Get the details for the resolved entity relationship
+        Args:
+            relationshipID: The relationship ID to get results for
+            includeInternalFeatures: boolean value indicating whether to include internal features
+        """,
+    ),
+    G2NativeCall(
+        "getEntityResume",
+        "G2Diagnostic_getEntityResume",
+        [("entityID", INT64), ("response", APPEND_RESPONSE)],
+        doc="""Get the related records for the resolved entity
+        Args:
+            entityID: The entity ID to get results for
+        """,
+    ),
+    G2NativeCall(
+        "getEntityListBySize",
+        "G2Diagnostic_getEntityListBySize",
+        [("entitySize", UINT64)],
+        returns=NEW_HANDLE,
+        doc="""Generate a list of resolved entities of a particular size
+
+        Args:
+            entitySize: The size of the resolved entity (observed entity count)
+        """,
+    ),
+    G2NativeCall(
+        "closeEntityListBySize",
+        "G2Diagnostic_closeEntityListBySize",
+        [("sizedEntityHandle", HANDLE)],
+        check=CHECK_NONE,
+    ),
+    G2NativeCall(
+        "checkDBPerf",
+        "G2Diagnostic_checkDBPerf",
+        [("secondsToRun", INT), ("response", APPEND_RESPONSE)],
+        doc="""Retrieve JSON of DB performance test""",
+    ),
+    G2NativeCall(
+        "getDBInfo",
+        "G2Diagnostic_getDBInfo",
+        [("response", APPEND_RESPONSE)],
+        doc="""Retrieve JSON of DB information""",
+    ),
+    G2NativeCall(
+        "getDataSourceCounts",
+        "G2Diagnostic_getDataSourceCounts",
+        [("response", APPEND_RESPONSE)],
+        doc="""Retrieve record counts by data source and entity type.""",
+    ),
+    G2NativeCall(
+        "getMappingStatistics",
+        "G2Diagnostic_getMappingStatistics",
+        [("includeInternalFeatures", BOOL), ("response", APPEND_RESPONSE)],
+        doc="""Retrieve data source mapping statistics.
+        Args:
+            includeInternalFeatures: boolean value indicating whether to include derived features
+        """,
+    ),
+    G2NativeCall(
+        "getGenericFeatures",
+        "G2Diagnostic_getGenericFeatures",
+        [
+            ("featureType", STRING),
+            ("maximumEstimatedCount", SIZE),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Retrieve generic features.
+        Args:
+            featureType: the feature type to find generics for
+            maximumEstimatedCount: the maximum estimated count for the generics to find
+        """,
+    ),
+    G2NativeCall(
+        "getEntitySizeBreakdown",
+        "G2Diagnostic_getEntitySizeBreakdown",
+        [
+            ("minimumEntitySize", SIZE),
+            ("includeInternalFeatures", BOOL),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Retrieve data source mapping statistics.
+        Args:
+            minimumEntitySize: the minimum entity size to report on
+            includeInternalFeatures: boolean value indicating whether to include derived features
+        """,
+    ),
+    G2NativeCall(
+        "getFeature",
+        "G2Diagnostic_getFeature",
+        [("libFeatID", INT64), ("response", APPEND_RESPONSE)],
+        doc="""Retrieve feature information.
+        Args:
+            libFeatID: the feature ID to report on
+        """,
+    ),
+    G2NativeCall(
+        "getResolutionStatistics",
+        "G2Diagnostic_getResolutionStatistics",
+        [("response", APPEND_RESPONSE)],
+        doc="""Retrieve resolution statistics.""",
+    ),
+    G2NativeCall(
+        "destroy",
+        "G2Diagnostic_destroy",
+        [],
+        check=CHECK_NONE,
+        doc="""Uninitializes the engine
+        This should be done once per process after init(...) is called.
+        After it is called the engine will no longer function.
+
+        Args:
+
+        Return:
+            None
+        """,
+    ),
+    G2NativeCall(
+        "getPhysicalCores",
+        "G2Diagnostic_getPhysicalCores",
+        [],
+        returns=RETURN_CODE,
+        check=CHECK_NONE,
+        doc="""Retrieve number of physical CPU cores
+
+        Return:
+            int: number of cores
+        """,
+    ),
+    G2NativeCall(
+        "getLogicalCores",
+        "G2Diagnostic_getLogicalCores",
+        [],
+        returns=RETURN_CODE,
+        check=CHECK_NONE,
+        doc="""Retrieve number of logical CPU cores
+
+        Return:
+            int: number of cores
+        """,
+    ),
+    G2NativeCall(
+        "getTotalSystemMemory",
+        "G2Diagnostic_getTotalSystemMemory",
+        [],
+        returns=RETURN_CODE,
+        restype=c_longlong,
+        check=CHECK_NONE,
+        doc="""Retrieve total system memory
+
+        Return:
+            int: number of bytes
+        """,
+    ),
+    G2NativeCall(
+        "getAvailableMemory",
+        "G2Diagnostic_getAvailableMemory",
+        [],
+        returns=RETURN_CODE,
+        restype=c_longlong,
+        check=CHECK_NONE,
+        doc="""Retrieve available memory
+
+        Return:
+            int: number of bytes
+        """,
+    ),
+    G2NativeCall(
+        "findEntitiesByFeatureIDs",
+        "G2Diagnostic_findEntitiesByFeatureIDs",
+        [("features", STRING), ("response", APPEND_RESPONSE)],
+        doc="""Retrieve entities based on supplied features.
+        Args:
+            features: Json document containing an entity id (one to exclude) and list of features.
+        """,
+    ),
+]
+
+_NATIVE_API = G2NativeApi(
+    "G2Diagnostic",
+    "G2Diagnostic_getLastException",
+    tls_var,
+    _NATIVE_CALLS,
+    _PROTOTYPES,
+    response_views=True,
+)
+
+
 # -----------------------------------------------------------------------------
 # G2Diagnostic class
 # -----------------------------------------------------------------------------
 
 
+@_NATIVE_API.install
 class G2Diagnostic(object):
     """G2 diagnostic module access library
 
     Attributes:
         _lib_handle: A boolean indicating if we like SPAM or not.
-        _resize_func_def: resize function definition
-        _resize_func: resize function pointer
+        _native: typed native functions bound once from _lib_handle
+        buffer_pool: G2BufferPool of the native response buffers
+        _zero_copy: True if responses are returned as read-only memoryviews
         _module_name: CME module name
         _ini_file_name: name and location of .ini file
     """
 
-    def __init__(self, *args, **kwargs):
-        # type: (str, str, bool) -> None
-        """G2Diagnostic class initialization"""
+    def __init__(self, *args, zero_copy=False, buffer_pool=None, **kwargs):
+        # type: (bool, G2BufferPool) -> None
+        """G2Diagnostic class initialization
+
+        Args:
+            zero_copy: return responses as read-only memoryviews instead of
+                appending them to the response bytearray, which is left
+                untouched and may be None.  A view keeps its response buffer
+                alive, but a line returned by fetchNextEntityBySize is only
+                valid until the next call on the same thread; use
+                senzing.copy_response(view) to keep a copy.
+            buffer_pool: G2BufferPool the response buffers are borrowed from.
+                A new pool with the default limits is used if it is None.
+        """
 
         try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2.so")
+            self._lib_handle, self._native = load_library("G2", _NATIVE_API.prototypes)
         except OSError as ex:
             print(
                 "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
@@ -108,55 +332,33 @@ class G2Diagnostic(object):
             )
             raise G2Exception("Failed to load the G2 library")
 
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
+        if buffer_pool is None:
+            buffer_pool = G2BufferPool()
+        self.buffer_pool = buffer_pool.bind(self._native)
+
+        self._zero_copy = zero_copy
 
     # -----------------------------------------------------------------------------
     # Internal helper methods
     # -----------------------------------------------------------------------------
 
     def prepareBooleanArgument(self, booleanToPrepare):
-        booleanValue = 0
-        if booleanToPrepare:
-            booleanValue = 1
-        return booleanToPrepare
+        # type: (bool) -> int
+        """Internal processing function"""
+
+        return prepare_boolean_argument(booleanToPrepare)
 
     def prepareIntArgument(self, valueToPrepare):
         # type: (str) -> int
         """Internal processing function"""
-        """ This converts many types of values to an integer """
-
-        # handle null string
-        if valueToPrepare is None:
-            return 0
-        # if string is unicode, transcode to utf-8 str
-        if type(valueToPrepare) == str:
-            return int(valueToPrepare.encode("utf-8"))
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(valueToPrepare) == bytearray:
-            return int(valueToPrepare)
-        elif type(valueToPrepare) == bytes:
-            return int(valueToPrepare)
-        # input is already an int
-        return valueToPrepare
+
+        return prepare_int_argument(valueToPrepare)
 
     def prepareStringArgument(self, stringToPrepare):
         # type: (str) -> str
         """Internal processing function"""
 
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
+        return prepare_string_argument(stringToPrepare)
 
     # -----------------------------------------------------------------------------
     # Public API
@@ -175,8 +377,7 @@ class G2Diagnostic(object):
         if self._debug:
             print("Initializing G2 diagnostic module")
 
-        self._lib_handle.G2Diagnostic_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2Diagnostic_init(
+        ret_code = self._native.G2Diagnostic_init(
             self._module_name, self._ini_params, self._debug
         )
 
@@ -184,10 +385,7 @@ class G2Diagnostic(object):
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     @deprecated(1202)
     def initWithConfigIDV2(self, engine_name_, ini_params_, initConfigID_, debug_):
@@ -205,539 +403,56 @@ class G2Diagnostic(object):
         if self._debug:
             print("Initializing G2 diagnostic module")
 
-        self._lib_handle.G2Diagnostic_initWithConfigID.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            c_int,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_initWithConfigID(
+        ret_code = self._native.G2Diagnostic_initWithConfigID(
             self._engine_name, self._ini_params, configIDValue, self._debug
         )
         if self._debug:
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     @deprecated(1203)
     def reinitV2(self, initConfigID_):
         self.reinit(initConfigID_)
 
-    def reinit(self, initConfigID, *args, **kwargs):
-
-        configIDValue = int(self.prepareStringArgument(initConfigID))
-
-        self._lib_handle.G2Diagnostic_reinit.argtypes = [c_longlong]
-        ret_code = self._lib_handle.G2Diagnostic_reinit(configIDValue)
-
-        if ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def getEntityDetails(
-        self, entityID, includeInternalFeatures, response, *args, **kwargs
-    ):
-        # type: (int) -> str
-        """Get the details for the resolved entity
-        Args:
-            entityID: The entity ID to get results for
-            includeInternalFeatures: boolean value indicating whether to include internal features
-        """
-
-        _includeInternalFeatures = self.prepareBooleanArgument(includeInternalFeatures)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getEntityDetails.argtypes = [
-            c_longlong,
-            c_int,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getEntityDetails(
-            entityID,
-            _includeInternalFeatures,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getRelationshipDetails(
-        self, relationshipID, includeInternalFeatures, response, *args, **kwargs
-    ):
-        # type: (int) -> str
-        """Get the details for the resolved entity relationship
-        Args:
-            relationshipID: The relationship ID to get results for
-            includeInternalFeatures: boolean value indicating whether to include internal features
-        """
-
-        _includeInternalFeatures = self.prepareBooleanArgument(includeInternalFeatures)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getRelationshipDetails.argtypes = [
-            c_longlong,
-            c_int,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getRelationshipDetails(
-            relationshipID,
-            _includeInternalFeatures,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getEntityResume(self, entityID, response, *args, **kwargs):
-        # type: (int) -> str
-        """Get the related records for the resolved entity
-        Args:
-            entityID: The entity ID to get results for
-        """
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getEntityResume.argtypes = [
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getEntityResume(
-            entityID, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getEntityListBySize(self, entitySize, *args, **kwargs):
-        """Generate a list of resolved entities of a particular size
-
-        Args:
-            entitySize: The size of the resolved entity (observed entity count)
-        """
-        self._lib_handle.G2Diagnostic_getEntityListBySize.restype = c_int
-        self._lib_handle.G2Diagnostic_getEntityListBySize.argtypes = [
-            c_ulonglong,
-            POINTER(c_void_p),
-        ]
-        sizedEntityHandle = c_void_p(0)
-        ret_code = self._lib_handle.G2Diagnostic_getEntityListBySize(
-            entitySize, byref(sizedEntityHandle)
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
+    def fetchNextEntityBySize(self, sizedEntityHandle, response, *args, **kwargs):
+        if self._zero_copy:
+            return _NATIVE_API.fetch_view(
+                self._native,
+                self._native.G2Diagnostic_fetchNextEntityBySize,
+                sizedEntityHandle,
             )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return sizedEntityHandle.value
 
-    def fetchNextEntityBySize(self, sizedEntityHandle, response, *args, **kwargs):
         response[::] = b""
-        self._lib_handle.G2Diagnostic_fetchNextEntityBySize.restype = c_int
-        self._lib_handle.G2Diagnostic_fetchNextEntityBySize.argtypes = [
-            c_void_p,
-            c_char_p,
-            c_size_t,
-        ]
-        resultValue = self._lib_handle.G2Diagnostic_fetchNextEntityBySize(
+        resultValue = self._native.G2Diagnostic_fetchNextEntityBySize(
             c_void_p(sizedEntityHandle), tls_var.buf, sizeof(tls_var.buf)
         )
         while resultValue != 0:
 
-            if resultValue == -1:
-                raise G2NotInitializedException(
-                    "G2Diagnostic has not been successfully initialized"
-                )
-            elif resultValue < 0:
-                self._lib_handle.G2Diagnostic_getLastException(
-                    tls_var.buf, sizeof(tls_var.buf)
-                )
-                raise TranslateG2ModuleException(tls_var.buf.value)
+            if resultValue < 0:
+                raise _NATIVE_API.error(self._native, resultValue)
 
             response += tls_var.buf.value
             if (response.decode())[-1] == "\n":
                 break
             else:
-                resultValue = self._lib_handle.G2Diagnostic_fetchNextEntityBySize(
+                resultValue = self._native.G2Diagnostic_fetchNextEntityBySize(
                     c_void_p(sizedEntityHandle), tls_var.buf, sizeof(tls_var.buf)
                 )
         return response
 
-    def closeEntityListBySize(self, sizedEntityHandle, *args, **kwargs):
-        self._lib_handle.G2Diagnostic_closeEntityListBySize.restype = c_int
-        self._lib_handle.G2Diagnostic_closeEntityListBySize.argtypes = [c_void_p]
-        self._lib_handle.G2Diagnostic_closeEntityListBySize(c_void_p(sizedEntityHandle))
-
-    def checkDBPerf(self, secondsToRun, response, *args, **kwargs):
-        # type: () -> object,int
-        """Retrieve JSON of DB performance test"""
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_checkDBPerf.argtypes = [
-            c_int,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_checkDBPerf(
-            secondsToRun, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getDBInfo(self, response, *args, **kwargs):
-        # type: () -> object,int
-        """Retrieve JSON of DB information"""
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getDBInfo.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getDBInfo(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getDataSourceCounts(self, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve record counts by data source and entity type."""
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getDataSourceCounts.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getDataSourceCounts(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getMappingStatistics(self, includeInternalFeatures, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve data source mapping statistics.
-        Args:
-            includeInternalFeatures: boolean value indicating whether to include derived features
-        """
-
-        _includeInternalFeatures = self.prepareBooleanArgument(includeInternalFeatures)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getMappingStatistics.argtypes = [
-            c_int,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getMappingStatistics(
-            _includeInternalFeatures,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getGenericFeatures(
-        self, featureType, maximumEstimatedCount, response, *args, **kwargs
-    ):
-        # type: () -> object
-        """Retrieve generic features.
-        Args:
-            featureType: the feature type to find generics for
-            maximumEstimatedCount: the maximum estimated count for the generics to find
-        """
-
-        _featureType = self.prepareStringArgument(featureType)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getGenericFeatures.argtypes = [
-            c_char_p,
-            c_size_t,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getGenericFeatures(
-            _featureType,
-            maximumEstimatedCount,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getEntitySizeBreakdown(
-        self, minimumEntitySize, includeInternalFeatures, response, *args, **kwargs
-    ):
-        # type: () -> object
-        """Retrieve data source mapping statistics.
-        Args:
-            minimumEntitySize: the minimum entity size to report on
-            includeInternalFeatures: boolean value indicating whether to include derived features
-        """
-
-        _includeInternalFeatures = self.prepareBooleanArgument(includeInternalFeatures)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getEntitySizeBreakdown.argtypes = [
-            c_size_t,
-            c_int,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getEntitySizeBreakdown(
-            minimumEntitySize,
-            _includeInternalFeatures,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getFeature(self, libFeatID, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve feature information.
-        Args:
-            libFeatID: the feature ID to report on
-        """
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getFeature.restype = c_int
-        self._lib_handle.G2Diagnostic_getFeature.argtypes = [
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getFeature(
-            libFeatID, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getResolutionStatistics(self, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve resolution statistics."""
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_getResolutionStatistics.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_getResolutionStatistics(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def destroy(self, *args, **kwargs):
-        """Uninitializes the engine
-        This should be done once per process after init(...) is called.
-        After it is called the engine will no longer function.
-
-        Args:
-
-        Return:
-            None
-        """
-
-        self._lib_handle.G2Diagnostic_destroy()
-
-    def getPhysicalCores(self, *args, **kwargs):
-        # type: () -> object
-        """Retrieve number of physical CPU cores
-
-        Return:
-            int: number of cores
-        """
-
-        self._lib_handle.G2Diagnostic_getPhysicalCores.argtypes = []
-        return self._lib_handle.G2Diagnostic_getPhysicalCores()
-
-    def getLogicalCores(self, *args, **kwargs):
-        # type: () -> object
-        """Retrieve number of logical CPU cores
-
-        Return:
-            int: number of cores
-        """
-
-        self._lib_handle.G2Diagnostic_getLogicalCores.argtypes = []
-        return self._lib_handle.G2Diagnostic_getLogicalCores()
-
-    def getTotalSystemMemory(self, *args, **kwargs):
-        # type: () -> object
-        """Retrieve total system memory
-
-        Return:
-            int: number of bytes
-        """
-
-        self._lib_handle.G2Diagnostic_getTotalSystemMemory.argtypes = []
-        self._lib_handle.G2Diagnostic_getTotalSystemMemory.restype = c_longlong
-        return self._lib_handle.G2Diagnostic_getTotalSystemMemory()
-
-    def getAvailableMemory(self, *args, **kwargs):
-        # type: () -> object
-        """Retrieve available memory
-
-        Return:
-            int: number of bytes
-        """
-
-        self._lib_handle.G2Diagnostic_getAvailableMemory.argtypes = []
-        self._lib_handle.G2Diagnostic_getAvailableMemory.restype = c_longlong
-        return self._lib_handle.G2Diagnostic_getAvailableMemory()
-
     @deprecated(1204)
     def clearLastException(self, *args, **kwargs):
         """Clears the last exception"""
 
-        self._lib_handle.G2Diagnostic_clearLastException.restype = None
-        self._lib_handle.G2Diagnostic_clearLastException.argtypes = []
-        self._lib_handle.G2Diagnostic_clearLastException()
+        self._native.G2Diagnostic_clearLastException()
 
     @deprecated(1205)
     def getLastException(self, *args, **kwargs):
         """Gets the last exception"""
 
-        self._lib_handle.G2Diagnostic_getLastException.restype = c_int
-        self._lib_handle.G2Diagnostic_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2Diagnostic_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        self._native.G2Diagnostic_getLastException(tls_var.buf, sizeof(tls_var.buf))
         resultString = tls_var.buf.value.decode("utf-8")
         return resultString
 
@@ -745,39 +460,5 @@ class G2Diagnostic(object):
     def getLastExceptionCode(self, *args, **kwargs):
         """Gets the last exception code"""
 
-        self._lib_handle.G2Diagnostic_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2Diagnostic_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2Diagnostic_getLastExceptionCode()
+        exception_code = self._native.G2Diagnostic_getLastExceptionCode()
         return exception_code
-
-    def findEntitiesByFeatureIDs(self, features, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve entities based on supplied features.
-        Args:
-            features: Json document containing an entity id (one to exclude) and list of features.
-        """
-
-        _features = self.prepareStringArgument(features)
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Diagnostic_findEntitiesByFeatureIDs.argtypes = [
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Diagnostic_findEntitiesByFeatureIDs(
-            _features, pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Diagnostic has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Diagnostic_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
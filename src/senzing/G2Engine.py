@@ -1,14 +1,40 @@
 from ctypes import *
 import threading
+import json
 import os
 import functools
 import warnings
 
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Bulk import SKIPPED, bulk_map, collect_affected
+from .G2Exception import G2Exception
+from .G2Library import (
+    RESIZE_FUNC_TYPE,
+    G2BufferPool,
+    G2NativeBuffer,
+    G2ReturnBuffer,
+    load_library,
+)
+from .G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    STRING,
+    INTERNED,
+    INT,
+    INT64,
+    CONFIG_ID,
+    HANDLE,
+    IGNORED,
+    RESPONSE,
+    APPEND_RESPONSE,
+    INT64_OUT,
+    NEW_HANDLE,
+    RETURN_CODE,
+    CHECK_NEGATIVE,
+    CHECK_NONE,
+    prepare_int_argument,
+    prepare_interned_argument,
+    prepare_string_argument,
 )
 from .G2EngineFlags import G2EngineFlags
 
@@ -16,73 +42,7 @@ __all__ = ["G2Engine"]
 SENZING_PRODUCT_ID = "5043"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
-
-    def __init__(self):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {} of type {}".format(self.buf,type(self.buf)))
-
-
-tls_var = MyBuffer()
-tls_var3 = MyBuffer()
-
-
-class MyBuffer2(threading.local):
-
-    def __init__(self, g2_engine, size=65535):
-        self.bufSize = c_size_t(size)
-        g2_engine._lib_handle.G2_malloc.restype = c_void_p
-        self.buf = g2_engine._lib_handle.G2_malloc(self.bufSize)
-        # print("Created new Buffer {} of type {}".format(self.buf,type(self.buf)))
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
-
-
-def resize_return_buffer3(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var3.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var3.buf = create_string_buffer(size_)
-            tls_var3.bufSize = size_
-        elif tls_var3.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var3.bufSize))
-            foo = tls_var3.buf
-            tls_var3.buf = create_string_buffer(size_)
-            tls_var3.bufSize = size_
-            memmove(tls_var3.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var3.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var3.buf))
-        tls_var3.bufSize = size_
-    return addressof(tls_var3.buf)
+tls_var = G2ReturnBuffer()
 
 
 def deprecated(instance):
@@ -107,213 +67,53 @@ def deprecated(instance):
     return the_decorator
 
 
-# -----------------------------------------------------------------------------
-# G2Engine class
-# -----------------------------------------------------------------------------
-
-
-class G2Engine(object):
-    """G2 engine access library
-
-    Attributes:
-        _lib_handle: A boolean indicating if we like SPAM or not.
-        _resize_func_def: resize function definition
-        _resize_func: resize function pointer
-        _engine_name: CME engine name
-        _ini_file_name: name and location of .ini file
-    """
-
-    def __init__(self, *args, **kwargs):
-        # type: () -> None
-        """G2Engine class initialization"""
-
-        try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2.so")
-        except OSError as ex:
-            print(
-                "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
-            )
-            print(
-                "ERROR: For more information see https://senzing.zendesk.com/hc/en-us/articles/115002408867-Introduction-G2-Quickstart"
-            )
-            print(
-                "ERROR: If you are running Ubuntu or Debian please also review the ssl and crypto information at https://senzing.zendesk.com/hc/en-us/articles/115010259947-System-Requirements"
-            )
-            raise G2Exception("Failed to load the G2 library")
-
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
-        self._resize_func_def3 = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func3 = self._resize_func_def(resize_return_buffer3)
-        self._resize_func_def2 = CFUNCTYPE(c_void_p, c_void_p, c_size_t)
-        self._resize_func2 = self._resize_func_def2(self._lib_handle.G2_realloc)
-
-        self.tls_var2 = MyBuffer2(self)
-        self.info_buf = MyBuffer2(self)
-
-    # -----------------------------------------------------------------------------
-    # Internal helper methods
-    # -----------------------------------------------------------------------------
-
-    def prepareIntArgument(self, valueToPrepare):
-        # type: (str) -> int
-        """Internal processing function"""
-        """ This converts many types of values to an integer """
-
-        # handle null string
-        if valueToPrepare is None:
-            return 0
-        # if string is unicode, transcode to utf-8 str
-        if type(valueToPrepare) == str:
-            return int(valueToPrepare.encode("utf-8"))
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(valueToPrepare) == bytearray:
-            return int(valueToPrepare)
-        elif type(valueToPrepare) == bytes:
-            return int(valueToPrepare)
-        # input is already an int
-        return valueToPrepare
-
-    def prepareStringArgument(self, stringToPrepare):
-        # type: (str) -> str
-        """Internal processing function"""
-
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
-
-    # -----------------------------------------------------------------------------
-    # Public API
-    # -----------------------------------------------------------------------------
-
-    @deprecated(1001)
-    def initV2(self, engine_name_, ini_params_, debug_=False):
-        self.init(engine_name_, ini_params_, debug_)
-
-    def init(self, engine_name_, ini_params_, debug_=False, *args, **kwargs):
-
-        self._engine_name = self.prepareStringArgument(engine_name_)
-        self._ini_params = self.prepareStringArgument(ini_params_)
-        self._debug = debug_
-        if self._debug:
-            print("Initializing G2 engine")
-
-        self._lib_handle.G2_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2_init(
-            self._engine_name, self._ini_params, self._debug
-        )
-
-        if self._debug:
-            print("Initialization Status: " + str(ret_code))
-
-        if ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    @deprecated(1002)
-    def initWithConfigIDV2(self, engine_name_, ini_params_, initConfigID_, debug_):
-        self.initWithConfigID(engine_name_, ini_params_, initConfigID_, debug_)
-
-    def initWithConfigID(
-        self, engine_name_, ini_params_, initConfigID_, debug_, *args, **kwargs
-    ):
-
-        configIDValue = self.prepareIntArgument(initConfigID_)
-
-        self._engine_name = self.prepareStringArgument(engine_name_)
-        self._ini_params = self.prepareStringArgument(ini_params_)
-        self._debug = debug_
-        if self._debug:
-            print("Initializing G2 engine")
-
-        self._lib_handle.G2_initWithConfigID.argtypes = [
+_PROTOTYPES = {
+    "G2_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2_initWithConfigID": ([c_char_p, c_char_p, c_longlong, c_int], c_int),
+    "G2_clearLastException": ([], None),
+    "G2_getLastExceptionCode": ([], c_int),
+    "G2_primeEngine": ([], c_int),
+    "G2_fetchNext": ([c_void_p, c_char_p, c_size_t], c_int),
+    "G2_addRecordWithReturnedRecordID": (
+        [c_char_p, c_char_p, c_char_p, c_char_p, c_size_t],
+        c_int,
+    ),
+    "G2_addRecordWithInfoWithReturnedRecordID": (
+        [
+            c_char_p,
             c_char_p,
             c_char_p,
             c_longlong,
-            c_int,
-        ]
-        ret_code = self._lib_handle.G2_initWithConfigID(
-            self._engine_name, self._ini_params, configIDValue, self._debug
-        )
-
-        if self._debug:
-            print("Initialization Status: " + str(ret_code))
-
-        if ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    @deprecated(1003)
-    def reinitV2(self, initConfigID_):
-        self.reinit(initConfigID_)
-
-    def reinit(self, initConfigID_, *args, **kwargs):
-
-        configIDValue = self.prepareIntArgument(initConfigID_)
-
-        self._lib_handle.G2_reinit.argtypes = [c_longlong]
-        ret_code = self._lib_handle.G2_reinit(configIDValue)
-
-        if ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    @deprecated(1022)
-    def clearLastException(self, *args, **kwargs):
-        """Clears the last exception"""
-
-        self._lib_handle.G2_clearLastException.restype = None
-        self._lib_handle.G2_clearLastException.argtypes = []
-        self._lib_handle.G2_clearLastException()
-
-    @deprecated(1023)
-    def getLastException(self, *args, **kwargs):
-        """Gets the last exception"""
-
-        self._lib_handle.G2_getLastException.restype = c_int
-        self._lib_handle.G2_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-        resultString = tls_var.buf.value.decode("utf-8")
-        return resultString
-
-    @deprecated(1024)
-    def getLastExceptionCode(self, *args, **kwargs):
-        """Gets the last exception code"""
-
-        self._lib_handle.G2_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2_getLastExceptionCode()
-        return exception_code
-
-    def primeEngine(self, *args, **kwargs):
-        ret_code = self._lib_handle.G2_primeEngine()
-        if self._debug:
-            print("Initialization Status: " + str(ret_code))
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def process(self, input_umf_, *args, **kwargs):
-        # type: (str) -> None
-        """Generic process function without return
+            c_char_p,
+            c_size_t,
+            POINTER(c_void_p),
+            POINTER(c_size_t),
+            RESIZE_FUNC_TYPE,
+        ],
+        c_int,
+    ),
+    "G2_exportConfig": (
+        [POINTER(c_void_p), POINTER(c_size_t), RESIZE_FUNC_TYPE],
+        c_int,
+    ),
+}
+
+# G2Engine methods that only prepare their arguments, make one native call and
+# check its return code.  They are generated from this table by G2NativeApi.
+
+_NATIVE_CALLS = [
+    G2NativeCall(
+        "reinit",
+        "G2_reinit",
+        [("initConfigID_", CONFIG_ID)],
+        check=CHECK_NEGATIVE,
+    ),
+    G2NativeCall(
+        "process",
+        "G2_process",
+        [("input_umf_", STRING)],
+        doc="""Generic process function without return
         This method will send a record for processing in g2.
 
         Args:
@@ -321,24 +121,13 @@ class G2Engine(object):
 
         Return:
             None
-        """
-
-        input_umf_string = self.prepareStringArgument(input_umf_)
-        self._lib_handle.G2_process.argtypes = [c_char_p]
-        self._lib_handle.G2_process.restype = c_int
-        ret_code = self._lib_handle.G2_process(input_umf_string)
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def processWithInfo(self, input_umf_, response, flags=0, *args, **kwargs):
-        # type: (str, str, int) -> int
-        """Generic process function without return
+        """,
+    ),
+    G2NativeCall(
+        "processWithInfo",
+        "G2_processWithInfo",
+        [("input_umf_", STRING), ("response", RESPONSE), ("flags", INT64, 0)],
+        doc="""Generic process function without return
         This method will send a record for processing in g2.
 
         Args:
@@ -348,40 +137,13 @@ class G2Engine(object):
 
         Return:
             None
-        """
-
-        input_umf_string = self.prepareStringArgument(input_umf_)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_processWithInfo.argtypes = [
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_processWithInfo(
-            input_umf_string,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def processWithResponse(self, input_umf_, response, *args, **kwargs):
-        """Generic process function that returns results
+        """,
+    ),
+    G2NativeCall(
+        "processWithResponse",
+        "G2_processWithResponseResize",
+        [("input_umf_", STRING), ("response", APPEND_RESPONSE)],
+        doc="""Generic process function that returns results
         This method will send a record for processing in g2. It is a synchronous
         call, i.e. it will wait until g2 actually processes the record, and then
         optionally return any response message.
@@ -391,430 +153,129 @@ class G2Engine(object):
             response: If there is a response to the message it will be returned here.
                     Note there are performance benefits of calling the process method
                     that doesn't need a response message.
-        """
-
-        # type: (str) -> str
-        """  resolves an entity synchronously
-        Args:
-            input_umf_: G2 style JSON
-        """
-
-        input_umf_string = self.prepareStringArgument(input_umf_)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_processWithResponseResize.argtypes = [
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_processWithResponseResize(
-            input_umf_string,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def checkRecord(self, input_umf_, recordQueryList, response, *args, **kwargs):
-        # type: (str,str,str) -> str
-        """Scores the input record against the specified one
+        """,
+    ),
+    G2NativeCall(
+        "checkRecord",
+        "G2_checkRecord",
+        [
+            ("input_umf_", STRING),
+            ("recordQueryList", STRING),
+            ("response", APPEND_RESPONSE),
+        ],
+        doc="""Scores the input record against the specified one
         Args:
             input_umf_: A JSON document containing the attribute information
                 for the observation.
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
-        """
-
-        _inputUmfString = self.prepareStringArgument(input_umf_)
-        _recordQueryList = self.prepareStringArgument(recordQueryList)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_checkRecord.argtypes = [
-            c_char_p,
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_checkRecord(
-            _inputUmfString,
-            _recordQueryList,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def exportJSONEntityReport(
-        self, flags=G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS, *args, **kwargs
-    ):
-        """Generate a JSON export
+        """,
+    ),
+    G2NativeCall(
+        "exportJSONEntityReport",
+        "G2_exportJSONEntityReport",
+        [("flags", INT64, G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS)],
+        returns=NEW_HANDLE,
+        doc="""Generate a JSON export
         This is used to export entity data from known entities.  This function
         returns an export-handle that can be read from to get the export data
         in the requested format.  The export-handle should be read using the "G2_fetchNext"
         function, and closed when work is complete.
-        """
-        self._lib_handle.G2_exportJSONEntityReport.restype = c_int
-        self._lib_handle.G2_exportJSONEntityReport.argtypes = [
-            c_longlong,
-            POINTER(c_void_p),
-        ]
-        exportHandle = c_void_p(0)
-        ret_code = self._lib_handle.G2_exportJSONEntityReport(
-            flags, byref(exportHandle)
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return exportHandle.value
-
-    def exportCSVEntityReport(
-        self,
-        headersForCSV,
-        flags=G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        """Generate a CSV export
+        """,
+    ),
+    G2NativeCall(
+        "exportCSVEntityReport",
+        "G2_exportCSVEntityReport",
+        [
+            ("headersForCSV", STRING),
+            ("flags", INT64, G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS),
+        ],
+        returns=NEW_HANDLE,
+        doc="""Generate a CSV export
         This is used to export entity data from known entities.  This function
         returns an export-handle that can be read from to get the export data
         in the requested format.  The export-handle should be read using the "G2_fetchNext"
         function, and closed when work is complete.  The first output row returned
         by the export-handle contains the CSV column headers as a string.  Each
         following row contains the exported entity data.
-        """
-        _headersForCSV = self.prepareStringArgument(headersForCSV)
-        self._lib_handle.G2_exportCSVEntityReport.restype = c_int
-        self._lib_handle.G2_exportCSVEntityReport.argtypes = [
-            c_char_p,
-            c_longlong,
-            POINTER(c_void_p),
-        ]
-        exportHandle = c_void_p(0)
-        ret_code = self._lib_handle.G2_exportCSVEntityReport(
-            _headersForCSV, flags, byref(exportHandle)
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return exportHandle.value
-
-    def fetchNext(self, exportHandle, response, *args, **kwargs):
-        """Fetch a record from an export
-        Args:
-            exportHandle: handle from generated export
-
-        Returns:
-            str: Record fetched, empty if there is no more data
-        """
-        response[::] = b""
-        self._lib_handle.G2_fetchNext.restype = c_int
-        self._lib_handle.G2_fetchNext.argtypes = [c_void_p, c_char_p, c_size_t]
-        resultValue = self._lib_handle.G2_fetchNext(
-            c_void_p(exportHandle), tls_var.buf, sizeof(tls_var.buf)
-        )
-        while resultValue != 0:
-
-            if resultValue == -1:
-                raise G2NotInitializedException(
-                    "G2Engine has not been successfully initialized"
-                )
-            elif resultValue < 0:
-                self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-                raise TranslateG2ModuleException(tls_var.buf.value)
-
-            response += tls_var.buf.value
-            if (response)[-1] == 0x0A:
-                break
-            else:
-                resultValue = self._lib_handle.G2_fetchNext(
-                    c_void_p(exportHandle), tls_var.buf, sizeof(tls_var.buf)
-                )
-        return response
-
-    def closeExport(self, exportHandle, *args, **kwargs):
-        self._lib_handle.G2_closeExport.restype = c_int
-        self._lib_handle.G2_closeExport.argtypes = [c_void_p]
-        self._lib_handle.G2_closeExport(c_void_p(exportHandle))
-
-    def addRecord(
-        self, dataSourceCode, recordId, jsonData, load_id=None, *args, **kwargs
-    ):
-        # type: (str,str,str,str) -> int
-        """Loads the JSON record
+        """,
+    ),
+    G2NativeCall(
+        "closeExport",
+        "G2_closeExport",
+        [("exportHandle", HANDLE)],
+        check=CHECK_NONE,
+    ),
+    G2NativeCall(
+        "addRecord",
+        "G2_addRecord",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("jsonData", STRING),
+            ("load_id", INTERNED, None),
+        ],
+        doc="""Loads the JSON record
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             jsonData: A JSON document containing the attribute information
                 for the observation.
             load_id: The observation load ID for the record, can be null and will default to dataSourceCode
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        _jsonData = self.prepareStringArgument(jsonData)
-        self._lib_handle.G2_addRecord.restype = c_int
-        self._lib_handle.G2_addRecord.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-        ]
-        ret_code = self._lib_handle.G2_addRecord(
-            _dataSourceCode, _recordId, _jsonData, _load_id
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def addRecordWithReturnedRecordID(
-        self, dataSourceCode, recordID, jsonData, load_id=None, *args, **kwargs
-    ):
-        # type: (str,str,str,str) -> int
-        """Loads the JSON record
+        """,
+    ),
+    G2NativeCall(
+        "addRecordWithInfo",
+        "G2_addRecordWithInfo",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("jsonData", STRING),
+            ("response", RESPONSE),
+            ("load_id", INTERNED, None),
+            ("flags", INT64, 0),
+        ],
+        doc="""Loads the JSON record and returns info about the load
         Args:
             dataSourceCode: The data source for the observation.
-            recordID: A memory buffer for returning the recordID
+            recordID: The ID for the record
             jsonData: A JSON document containing the attribute information
                 for the observation.
-            load_id: The observation load ID for the record, can be null and will default to dataSourceCode
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _jsonData = self.prepareStringArgument(jsonData)
-        _load_id = self.prepareStringArgument(load_id)
-        recordID[::] = b""
-        self._lib_handle.G2_addRecordWithReturnedRecordID.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_size_t,
-        ]
-        ret_code = self._lib_handle.G2_addRecordWithReturnedRecordID(
-            _dataSourceCode, _jsonData, _load_id, tls_var.buf, sizeof(tls_var.buf)
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        recordID += tls_var.buf.value
-
-    def addRecordWithInfo(
-        self,
-        dataSourceCode,
-        recordId,
-        jsonData,
-        response,
-        load_id=None,
-        flags=0,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str,str,str,str,int) -> str
-        """Loads the JSON record and returns info about the load
-        Args:
-            dataSourceCode: The data source for the observation.
-            recordID: The ID for the record
-            jsonData: A JSON document containing the attribute information
-                for the observation.
-            response: Json document with info about the modified resolved entities
-            load_id: The observation load ID for the record, can be null and will default to dataSourceCode
-            flags: reserved for future use
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        _jsonData = self.prepareStringArgument(jsonData)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_addRecordWithInfo.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_addRecordWithInfo(
-            _dataSourceCode,
-            _recordId,
-            _jsonData,
-            _load_id,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def addRecordWithInfoWithReturnedRecordID(
-        self,
-        dataSourceCode,
-        jsonData,
-        recordID,
-        info,
-        load_id=None,
-        flags=0,
-        *args,
-        **kwargs
-    ):
-        """Loads the JSON record
-        Args:
-            dataSourceCode: The data source for the observation.
-            recordID: A memory buffer for returning the recordID
-            jsonData: A JSON document containing the attribute information
-                for the observation.
-            info: Json document with info about the modified resolved entities
+            response: Json document with info about the modified resolved entities
             load_id: The observation load ID for the record, can be null and will default to dataSourceCode
             flags: reserved for future use
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _jsonData = self.prepareStringArgument(jsonData)
-        _load_id = self.prepareStringArgument(load_id)
-
-        recordID[::] = b""
-
-        info[::] = b""
-        infoBuf = c_char_p(addressof(tls_var3.buf))
-        infoBufSize = c_size_t(tls_var3.bufSize)
-
-        # Make sure we have enough room to receive the Record ID
-        resize_return_buffer(tls_var.buf, 100)
-
-        self._lib_handle.G2_addRecordWithInfoWithReturnedRecordID.restype = c_int
-        self._lib_handle.G2_addRecordWithInfoWithReturnedRecordID.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            c_char_p,
-            c_size_t,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def3,
-        ]
-        ret_code = self._lib_handle.G2_addRecordWithInfoWithReturnedRecordID(
-            _dataSourceCode,
-            _jsonData,
-            _load_id,
-            flags,
-            tls_var.buf,
-            sizeof(tls_var.buf),
-            pointer(infoBuf),
-            pointer(infoBufSize),
-            self._resize_func3,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        recordID += tls_var.buf.value
-        info += tls_var3.buf.value
-
-    def replaceRecord(
-        self, dataSourceCode, recordId, jsonData, load_id=None, *args, **kwargs
-    ):
-        # type: (str,str,str,str) -> int
-        """Replace the JSON record, loads if doesn't exist
+        """,
+    ),
+    G2NativeCall(
+        "replaceRecord",
+        "G2_replaceRecord",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("jsonData", STRING),
+            ("load_id", INTERNED, None),
+        ],
+        doc="""Replace the JSON record, loads if doesn't exist
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             jsonData: A JSON document containing the attribute information
                 for the observation.
             load_id: The load ID for the record, can be null and will default to dataSourceCode
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        _jsonData = self.prepareStringArgument(jsonData)
-        ret_code = self._lib_handle.G2_replaceRecord(
-            _dataSourceCode, _recordId, _jsonData, _load_id
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def replaceRecordWithInfo(
-        self,
-        dataSourceCode,
-        recordId,
-        jsonData,
-        response,
-        load_id=None,
-        flags=0,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str,str,str) -> int
-        """Replace the JSON record, loads if doesn't exist
+        """,
+    ),
+    G2NativeCall(
+        "replaceRecordWithInfo",
+        "G2_replaceRecordWithInfo",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("jsonData", STRING),
+            ("response", RESPONSE),
+            ("load_id", INTERNED, None),
+            ("flags", INT64, 0),
+        ],
+        doc="""Replace the JSON record, loads if doesn't exist
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
@@ -823,424 +284,155 @@ class G2Engine(object):
             response: Json document with info about the modified resolved entities
             load_id: The load ID for the record, can be null and will default to dataSourceCode
             flags: reserved for future use
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        _jsonData = self.prepareStringArgument(jsonData)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_replaceRecordWithInfo.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_replaceRecordWithInfo(
-            _dataSourceCode,
-            _recordId,
-            _jsonData,
-            _load_id,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def deleteRecord(self, dataSourceCode, recordId, load_id=None, *args, **kwargs):
-        # type: (str,str,str) -> int
-        """Delete the record
+        """,
+    ),
+    G2NativeCall(
+        "deleteRecord",
+        "G2_deleteRecord",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("load_id", INTERNED, None),
+        ],
+        doc="""Delete the record
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             load_id: The load ID for the record, can be null and will default to dataSourceCode
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        ret_code = self._lib_handle.G2_deleteRecord(
-            _dataSourceCode, _recordId, _load_id
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def deleteRecordWithInfo(
-        self, dataSourceCode, recordId, response, load_id=None, flags=0, *args, **kwargs
-    ):
-        # type: (str,str,str,str,int) -> int
-        """Delete the record
+        """,
+    ),
+    G2NativeCall(
+        "deleteRecordWithInfo",
+        "G2_deleteRecordWithInfo",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("response", RESPONSE),
+            ("load_id", INTERNED, None),
+            ("flags", INT64, 0),
+        ],
+        doc="""Delete the record
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             response: A bytearray for returning the response document; if an error occurred, an error response is stored here
             load_id: The load ID for the record, can be null and will default to dataSourceCode
             flags: reserved for future use
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _load_id = self.prepareStringArgument(load_id)
-        _recordId = self.prepareStringArgument(recordId)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_deleteRecordWithInfo.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_deleteRecordWithInfo(
-            _dataSourceCode,
-            _recordId,
-            _load_id,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def reevaluateRecord(self, dataSourceCode, recordId, flags=0, *args, **kwargs):
-        # type: (str,str,int) -> int
-        """Reevaluate the JSON record
+        """,
+    ),
+    G2NativeCall(
+        "reevaluateRecord",
+        "G2_reevaluateRecord",
+        [("dataSourceCode", INTERNED), ("recordId", STRING), ("flags", INT64, 0)],
+        doc="""Reevaluate the JSON record
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             flags: Bitwise control flags
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _recordId = self.prepareStringArgument(recordId)
-        self._lib_handle.G2_reevaluateRecord.restype = c_int
-        self._lib_handle.G2_reevaluateRecord.argtypes = [c_char_p, c_char_p, c_longlong]
-        ret_code = self._lib_handle.G2_reevaluateRecord(
-            _dataSourceCode, _recordId, flags
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def reevaluateRecordWithInfo(
-        self, dataSourceCode, recordId, response, flags=0, *args, **kwargs
-    ):
-        # type: (str,str,str,int) -> int
-        """Reevaluate the JSON record and return modified resolved entities
+        """,
+    ),
+    G2NativeCall(
+        "reevaluateRecordWithInfo",
+        "G2_reevaluateRecordWithInfo",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordId", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, 0),
+        ],
+        doc="""Reevaluate the JSON record and return modified resolved entities
         Args:
             dataSourceCode: The data source for the observation.
             recordID: The ID for the record
             response: json document with modified resolved entities
             flags: Bitwise control flags
-        """
-
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _recordId = self.prepareStringArgument(recordId)
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_reevaluateRecordWithInfo.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_reevaluateRecordWithInfo(
-            _dataSourceCode,
-            _recordId,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def reevaluateEntity(self, entityID, flags=0, *args, **kwargs):
-        # type: (int,int) -> int
-        """Reevaluate the JSON record
+        """,
+    ),
+    G2NativeCall(
+        "reevaluateEntity",
+        "G2_reevaluateEntity",
+        [("entityID", INT64), ("flags", INT64, 0)],
+        doc="""Reevaluate the JSON record
         Args:
             entityID: The entity ID to reevaluate.
             flags: Bitwise control flags
-        """
-
-        self._lib_handle.G2_reevaluateEntity.argtypes = [c_longlong, c_longlong]
-        ret_code = self._lib_handle.G2_reevaluateEntity(entityID, flags)
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-    def reevaluateEntityWithInfo(self, entityID, response, flags=0, *args, **kwargs):
-        # type: (int,int,str) -> int
-        """Reevaluate the JSON record and return the modified resolved entities
+        """,
+    ),
+    G2NativeCall(
+        "reevaluateEntityWithInfo",
+        "G2_reevaluateEntityWithInfo",
+        [("entityID", INT64), ("response", RESPONSE), ("flags", INT64, 0)],
+        doc="""Reevaluate the JSON record and return the modified resolved entities
         Args:
             entityID: The entity ID to reevaluate.
 
             response: json document with modified resolved entities
             flags: Bitwise control flags
-        """
-
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_reevaluateEntityWithInfo.argtypes = [
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_reevaluateEntityWithInfo(
-            entityID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    @deprecated(1004)
-    def searchByAttributesV2(self, jsonData, flags, response):
-        self.searchByAttributes(jsonData, response, flags)
-
-    def searchByAttributes(
-        self,
-        jsonData,
-        response,
-        flags=G2EngineFlags.G2_SEARCH_BY_ATTRIBUTES_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,bytearray) -> int
-        """Find records matching the provided attributes
+        """,
+    ),
+    G2NativeCall(
+        "searchByAttributes",
+        "G2_searchByAttributes_V2",
+        [
+            ("jsonData", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_SEARCH_BY_ATTRIBUTES_DEFAULT_FLAGS),
+        ],
+        doc="""Find records matching the provided attributes
         Args:
             jsonData: A JSON document containing the attribute information to search.
             flags: control flags.
             response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-        response[::] = b""
-        _jsonData = self.prepareStringArgument(jsonData)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_searchByAttributes_V2.argtypes = [
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_searchByAttributes_V2(
-            _jsonData,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def searchByAttributesV3(
-        self,
-        jsonData,
-        searchProfile,
-        response,
-        flags=G2EngineFlags.G2_SEARCH_BY_ATTRIBUTES_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str,bytearray) -> int
-        """Find records matching the provided attributes
+        """,
+    ),
+    G2NativeCall(
+        "searchByAttributesV3",
+        "G2_searchByAttributes_V3",
+        [
+            ("jsonData", STRING),
+            ("searchProfile", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_SEARCH_BY_ATTRIBUTES_DEFAULT_FLAGS),
+        ],
+        doc="""Find records matching the provided attributes
         Args:
             jsonData: A JSON document containing the attribute information to search.
             searchProfile: A search profile name.
             flags: control flags.
             response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-        response[::] = b""
-        _jsonData = self.prepareStringArgument(jsonData)
-        _searchProfile = self.prepareStringArgument(searchProfile)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_searchByAttributes_V3.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_searchByAttributes_V3(
-            _jsonData,
-            _searchProfile,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    @deprecated(1005)
-    def findPathByEntityIDV2(
-        self, startEntityID, endEntityID, maxDegree, flags, response
-    ):
-        self.findPathByEntityID(startEntityID, endEntityID, maxDegree, response, flags)
-
-    def findPathByEntityID(
-        self,
-        startEntityID,
-        endEntityID,
-        maxDegree,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (int) -> str
-        """Find a path between two entities in the system.
+        """,
+    ),
+    G2NativeCall(
+        "findPathByEntityID",
+        "G2_findPathByEntityID_V2",
+        [
+            ("startEntityID", INT64),
+            ("endEntityID", INT64),
+            ("maxDegree", INT),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two entities in the system.
         Args:
             startEntityID: The entity ID you want to find the path from
             endEntityID: The entity ID you want to find the path to
             maxDegree: The maximum path length to search for
             flags: control flags.
             response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathByEntityID_V2.restype = c_int
-        self._lib_handle.G2_findPathByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            c_int,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathByEntityID_V2(
-            startEntityID,
-            endEntityID,
-            maxDegree,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    @deprecated(1006)
-    def findNetworkByEntityIDV2(
-        self, entityList, maxDegree, buildOutDegree, maxEntities, flags, response
-    ):
-        self.findNetworkByEntityID(
-            entityList, maxDegree, buildOutDegree, maxEntities, response, flags
-        )
-
-    def findNetworkByEntityID(
-        self,
-        entityList,
-        maxDegree,
-        buildOutDegree,
-        maxEntities,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (int) -> str
-        """Find a network between entities in the system.
+        """,
+    ),
+    G2NativeCall(
+        "findNetworkByEntityID",
+        "G2_findNetworkByEntityID_V2",
+        [
+            ("entityList", STRING),
+            ("maxDegree", INT),
+            ("buildOutDegree", INT),
+            ("maxEntities", INT),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a network between entities in the system.
         Args:
             entityList: The entities to search for the network of
             maxDegree: The maximum path length to search for between entities
@@ -1248,78 +440,21 @@ class G2Engine(object):
             maxEntities: The maximum number of entities to include in the result
             flags: control flags.
             response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        _entityList = self.prepareStringArgument(entityList)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findNetworkByEntityID_V2.restype = c_int
-        self._lib_handle.G2_findNetworkByEntityID_V2.argtypes = [
-            c_char_p,
-            c_int,
-            c_int,
-            c_int,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findNetworkByEntityID_V2(
-            _entityList,
-            maxDegree,
-            buildOutDegree,
-            maxEntities,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    @deprecated(1007)
-    def findPathByRecordIDV2(
-        self,
-        startDsrcCode,
-        startRecordId,
-        endDsrcCode,
-        endRecordId,
-        maxDegree,
-        flags,
-        response,
-    ):
-        self.findPathByRecordID(
-            startDsrcCode,
-            startRecordId,
-            endDsrcCode,
-            endRecordId,
-            maxDegree,
-            response,
-            flags,
-        )
-
-    def findPathByRecordID(
-        self,
-        startDsrcCode,
-        startRecordId,
-        endDsrcCode,
-        endRecordId,
-        maxDegree,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str) -> str
-        """Find a path between two records in the system.
+        """,
+    ),
+    G2NativeCall(
+        "findPathByRecordID",
+        "G2_findPathByRecordID_V2",
+        [
+            ("startDsrcCode", INTERNED),
+            ("startRecordId", STRING),
+            ("endDsrcCode", INTERNED),
+            ("endRecordId", STRING),
+            ("maxDegree", INT),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two records in the system.
         Args:
             startDataSourceCode: The data source for the record you want to find the path from
             startRecordID: The ID for the record you want to find the path from
@@ -1328,69 +463,20 @@ class G2Engine(object):
             maxDegree: The maximum path length to search for
             flags: control flags.
             response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        _startDsrcCode = self.prepareStringArgument(startDsrcCode)
-        _startRecordId = self.prepareStringArgument(startRecordId)
-        _endDsrcCode = self.prepareStringArgument(endDsrcCode)
-        _endRecordId = self.prepareStringArgument(endRecordId)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathByRecordID_V2.restype = c_int
-        self._lib_handle.G2_findPathByRecordID_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_int,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathByRecordID_V2(
-            _startDsrcCode,
-            _startRecordId,
-            _endDsrcCode,
-            _endRecordId,
-            maxDegree,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    @deprecated(1008)
-    def findNetworkByRecordIDV2(
-        self, recordList, maxDegree, buildOutDegree, maxEntities, flags, response
-    ):
-        self.findNetworkByRecordID(
-            recordList, maxDegree, buildOutDegree, maxEntities, response, flags
-        )
-
-    def findNetworkByRecordID(
-        self,
-        recordList,
-        maxDegree,
-        buildOutDegree,
-        maxEntities,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str) -> str
-        """Find a network between entities in the system.
+        """,
+    ),
+    G2NativeCall(
+        "findNetworkByRecordID",
+        "G2_findNetworkByRecordID_V2",
+        [
+            ("recordList", STRING),
+            ("maxDegree", INT),
+            ("buildOutDegree", INT),
+            ("maxEntities", INT),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a network between entities in the system.
         Args:
             recordList: The records to search for the network of
             maxDegree: The maximum path length to search for between entities
@@ -1398,607 +484,1153 @@ class G2Engine(object):
             maxEntities: The maximum number of entities to include in the result
             flags: control flags.
             response: A bytearray for returning the response document.
+        """,
+    ),
+    G2NativeCall(
+        "whyRecordInEntity",
+        "G2_whyRecordInEntity_V2",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordID", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "whyEntityByRecordID",
+        "G2_whyEntityByRecordID_V2",
+        [
+            ("dataSourceCode", INTERNED),
+            ("recordID", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "whyEntityByEntityID",
+        "G2_whyEntityByEntityID_V2",
+        [
+            ("entityID", INT64),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "howEntityByEntityID",
+        "G2_howEntityByEntityID_V2",
+        [
+            ("entityID", INT64),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_HOW_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "getVirtualEntityByRecordID",
+        "G2_getVirtualEntityByRecordID_V2",
+        [
+            ("recordList", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_HOW_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "whyEntities",
+        "G2_whyEntities_V2",
+        [
+            ("entityID1", INT64),
+            ("entityID2", INT64),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "whyRecords",
+        "G2_whyRecords_V2",
+        [
+            ("dataSourceCode1", STRING),
+            ("recordID1", STRING),
+            ("dataSourceCode2", STRING),
+            ("recordID2", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS),
+        ],
+    ),
+    G2NativeCall(
+        "findPathExcludingByEntityID",
+        "G2_findPathExcludingByEntityID_V2",
+        [
+            ("startEntityID", INT64),
+            ("endEntityID", INT64),
+            ("maxDegree", INT),
+            ("excludedEntities", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two entities in the system.
+        Args:
+            startEntityID: The entity ID you want to find the path from
+            endEntityID: The entity ID you want to find the path to
+            maxDegree: The maximum path length to search for
+            excludedEntities: JSON document containing entities to exclude
+            flags: control flags
+            response: A bytearray for returning the response document.
+        """,
+    ),
+    G2NativeCall(
+        "findPathIncludingSourceByEntityID",
+        "G2_findPathIncludingSourceByEntityID_V2",
+        [
+            ("startEntityID", INT64),
+            ("endEntityID", INT64),
+            ("maxDegree", INT),
+            ("excludedEntities", STRING),
+            ("requiredDsrcs", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two entities in the system.
+        Args:
+            startEntityID: The entity ID you want to find the path from
+            endEntityID: The entity ID you want to find the path to
+            maxDegree: The maximum path length to search for
+            excludedEntities: JSON document containing entities to exclude
+            requiredDsrcs: JSON document containing data sources to require
+            flags: control flags
+            response: A bytearray for returning the response document.
+        """,
+    ),
+    G2NativeCall(
+        "findPathExcludingByRecordID",
+        "G2_findPathExcludingByRecordID_V2",
+        [
+            ("startDsrcCode", INTERNED),
+            ("startRecordId", STRING),
+            ("endDsrcCode", INTERNED),
+            ("endRecordId", STRING),
+            ("maxDegree", INT),
+            ("excludedEntities", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two records in the system.
+        Args:
+            startDataSourceCode: The data source for the record you want to find the path from
+            startRecordID: The ID for the record you want to find the path from
+            endDataSourceCode: The data source for the record you want to find the path to
+            endRecordID: The ID for the record you want to find the path to
+            maxDegree: The maximum path length to search for
+            excludedEntities: JSON document containing entities to exclude
+            flags: control flags
+            response: A bytearray for returning the response document.
+        """,
+    ),
+    G2NativeCall(
+        "findPathIncludingSourceByRecordID",
+        "G2_findPathIncludingSourceByRecordID_V2",
+        [
+            ("startDsrcCode", INTERNED),
+            ("startRecordId", STRING),
+            ("endDsrcCode", INTERNED),
+            ("endRecordId", STRING),
+            ("maxDegree", INT),
+            ("excludedEntities", STRING),
+            ("requiredDsrcs", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS),
+        ],
+        doc="""Find a path between two records in the system.
+        Args:
+            startDataSourceCode: The data source for the record you want to find the path from
+            startRecordID: The ID for the record you want to find the path from
+            endDataSourceCode: The data source for the record you want to find the path to
+            endRecordID: The ID for the record you want to find the path to
+            maxDegree: The maximum path length to search for
+            excludedEntities: JSON document containing entities to exclude
+            requiredDsrcs: JSON document containing data sources to require
+            flags: control flags
+            response: A bytearray for returning the response document.
+        """,
+    ),
+    G2NativeCall(
+        "getEntityByEntityID",
+        "G2_getEntityByEntityID_V2",
+        [
+            ("entityID", INT64),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_ENTITY_DEFAULT_FLAGS),
+        ],
+        doc="""Find the entity with the given ID
+        Args:
+            entityID: The entity ID you want returned.  Typically referred to as
+                    ENTITY_ID in JSON results.
+            flags: control flags.
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "getEntityByRecordID",
+        "G2_getEntityByRecordID_V2",
+        [
+            ("dsrcCode", INTERNED),
+            ("recordId", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_ENTITY_DEFAULT_FLAGS),
+        ],
+        doc="""Get the entity containing the specified record
+        Args:
+            dataSourceCode: The data source for the observation.
+            recordID: The ID for the record
+            flags: control flags.
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "findInterestingEntitiesByEntityID",
+        "G2_findInterestingEntitiesByEntityID",
+        [("entityID", INT64), ("response", RESPONSE), ("flags", INT64, 0)],
+        doc="""Find interesting entities close to the entity with the given ID
+        Args:
+            entityID: The entity ID you want to search around.
+            flags: control flags.
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "findInterestingEntitiesByRecordID",
+        "G2_findInterestingEntitiesByRecordID",
+        [
+            ("dsrcCode", INTERNED),
+            ("recordId", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, 0),
+        ],
+        doc="""Find interesting entities close to the entity with the specified record
+        Args:
+            dataSourceCode: The data source for the observation to search around.
+            recordID: The ID for the record to search around.
+            flags: control flags.
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "getRedoRecord",
+        "G2_getRedoRecord",
+        [("response", RESPONSE)],
+        doc="""Get the next Redo record
+        Args:
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "processRedoRecord",
+        "G2_processRedoRecord",
+        [("response", RESPONSE), ("flags", IGNORED, 0)],
+        doc="""Process the next Redo record
+        Args:
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "countRedoRecords",
+        "G2_countRedoRecords",
+        [],
+        returns=RETURN_CODE,
+        doc="""Get the redo records left
+        Args:
+
+        Return:
+            int: the number of redo records in the queue.
+        """,
+    ),
+    G2NativeCall(
+        "getRecord",
+        "G2_getRecord_V2",
+        [
+            ("dsrcCode", INTERNED),
+            ("recordId", STRING),
+            ("response", RESPONSE),
+            ("flags", INT64, G2EngineFlags.G2_RECORD_DEFAULT_FLAGS),
+        ],
+        doc="""Get the specified record
+        Args:
+            dataSourceCode: The data source for the observation.
+            recordID: The ID for the record
+            flags: control flags.
+            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
+        """,
+    ),
+    G2NativeCall(
+        "stats",
+        "G2_stats",
+        [("response", APPEND_RESPONSE)],
+        doc="""Retrieve the workload statistics for the current process.
+        Resets them after retrieved.
+
+        Args:
+
+        """,
+    ),
+    G2NativeCall(
+        "getActiveConfigID",
+        "G2_getActiveConfigID",
+        [("configID", INT64_OUT)],
+        doc="""Retrieve the active config ID for the G2 engine
+
+        Args:
+            configID: A bytearray for returning the identifier value for the config
+        """,
+    ),
+    G2NativeCall(
+        "getRepositoryLastModifiedTime",
+        "G2_getRepositoryLastModifiedTime",
+        [("lastModifiedTime", INT64_OUT)],
+        doc="""Retrieve the last modified time stamp of the entity store repository
+
+        Args:
+            lastModifiedTime: A bytearray for returning the last modified time of the data repository
+        """,
+    ),
+    G2NativeCall(
+        "purgeRepository",
+        "G2_purgeRepository",
+        [("reset_resolver_", IGNORED, True)],
+        doc="""Purges the G2 repository
+
+        Args:
+            reset_resolver: Re-initializes the engine.  Should be left True.
+
+        Return:
+            None
+        """,
+    ),
+    G2NativeCall(
+        "destroy",
+        "G2_destroy",
+        [],
+        check=CHECK_NONE,
+        doc="""Uninitializes the engine
+        This should be done once per process after init(...) is called.
+        After it is called the engine will no longer function.
+
+        Args:
+
+        Return:
+            None
+        """,
+    ),
+]
+
+_NATIVE_API = G2NativeApi(
+    "G2Engine",
+    "G2_getLastException",
+    tls_var,
+    _NATIVE_CALLS,
+    _PROTOTYPES,
+    response_views=True,
+    value_methods=True,
+)
+
+
+# -----------------------------------------------------------------------------
+# Export iteration
+# -----------------------------------------------------------------------------
+
+
+def _close_export(export):
+    # export is [engine, handle] until it is closed, then empty.
+    if export:
+        engine, handle = export
+        del export[:]
+        engine.closeExport(handle)
+
+
+def _last_newline(view):
+    # The offset after the last newline of view, 0 if there is none.  Only
+    # the end of view is copied to look for it, a larger part each time.
+    start = len(view)
+    step = 4096
+    while start:
+        begin = max(0, start - step)
+        found = bytes(view[begin:start]).rfind(b"\n")
+        if found >= 0:
+            return begin + found + 1
+        start = begin
+        step *= 4
+    return 0
+
+
+def _fetch_export(export, native, chunk_size):
+    # Chunks of complete lines.  A chunk without a newline is the start of a
+    # line longer than chunk_size, carried until the line is complete.  The
+    # generator is started up to its first yield when it is created, so
+    # closing or collecting it at any point closes the export.
+    fetch_next = native.G2_fetchNext
+    handle = c_void_p(export[1])
+    buf = create_string_buffer(chunk_size)
+    buffer_view = memoryview(buf).cast("B")
+    # The byte before the terminating NUL of a full buffer is cleared before
+    # each fetch, so a full buffer is told apart without measuring it.
+    last = chunk_size - 2
+    partial = []
+    try:
+        yield
+        while True:
+            buffer_view[last] = 0
+            ret_code = fetch_next(handle, buf, chunk_size)
+            if ret_code < 0:
+                raise _NATIVE_API.error(native, ret_code)
+            if ret_code == 0:
+                break
+            if buffer_view[last]:
+                # A full buffer, which usually ends within a line, is copied
+                # once up to its last newline, through a view of it.
+                length = chunk_size - 1
+                chunk = buffer_view[:length]
+                end = _last_newline(chunk)
+            else:
+                # A shorter chunk usually ends with a newline, and buf.value
+                # is then the only copy.
+                chunk = buf.value
+                length = len(chunk)
+                end = chunk.rfind(b"\n") + 1
+            if not end:
+                partial.append(bytes(chunk))
+                continue
+            lines = bytes(chunk[:end])
+            if partial:
+                partial.append(lines)
+                yield b"".join(partial)
+                partial = []
+            else:
+                yield lines
+            if end < length:
+                partial.append(bytes(chunk[end:]))
+        if partial:
+            yield b"".join(partial)
+    finally:
+        _close_export(export)
+
+
+def _split_lines(chunks):
+    # All the lines of a chunk are split in one pass.
+    for chunk in chunks:
+        lines = chunk.split(b"\n")
+        if not lines[-1]:
+            lines.pop()
+        yield from lines
+
+
+class _ExportIterator(object):
+    """Iterator over the lines of an export, see G2Engine.iterExport()
+
+    The export is closed once the lines are exhausted, when the iterator is
+    closed or leaves a with block, and when it is collected.
+    """
+
+    def __init__(self, engine, native, handle, chunk_size, lines):
+        self._export = [engine, handle]
+        self._chunks = _fetch_export(self._export, native, chunk_size)
+        next(self._chunks)
+        self._iterator = _split_lines(self._chunks) if lines else self._chunks
+
+    def __iter__(self):
+        return self._iterator
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        # type: () -> None
+        """Close the export"""
+
+        self._iterator.close()
+        self._chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# -----------------------------------------------------------------------------
+# G2Engine class
+# -----------------------------------------------------------------------------
+
+
+@_NATIVE_API.install
+class G2Engine(object):
+    """G2 engine access library
+
+    Attributes:
+        _lib_handle: A boolean indicating if we like SPAM or not.
+        _native: typed native functions bound once from _lib_handle
+        buffer_pool: G2BufferPool of the native response buffers
+        _zero_copy: True if responses are returned as read-only memoryviews
+        _engine_name: CME engine name
+        _ini_file_name: name and location of .ini file
+    """
+
+    def __init__(self, *args, zero_copy=False, buffer_pool=None, **kwargs):
+        # type: (bool, G2BufferPool) -> None
+        """G2Engine class initialization
+
+        Args:
+            zero_copy: return responses as read-only memoryviews instead of
+                copying them into the response bytearray, which is left
+                untouched and may be None.  A view keeps its response buffer
+                alive, but a line returned by fetchNext is only valid until
+                the next call on the same thread; use
+                senzing.copy_response(view) to keep a copy.
+            buffer_pool: G2BufferPool the response buffers are borrowed from.
+                A new pool with the default limits is used if it is None.
         """
 
-        response[::] = b""
-        _recordList = self.prepareStringArgument(recordList)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findNetworkByRecordID_V2.restype = c_int
-        self._lib_handle.G2_findNetworkByRecordID_V2.argtypes = [
-            c_char_p,
-            c_int,
-            c_int,
-            c_int,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findNetworkByRecordID_V2(
-            _recordList,
-            maxDegree,
-            buildOutDegree,
-            maxEntities,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
+        try:
+            self._lib_handle, self._native = load_library("G2", _NATIVE_API.prototypes)
+        except OSError as ex:
+            print(
+                "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
             )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            print(
+                "ERROR: For more information see https://senzing.zendesk.com/hc/en-us/articles/115002408867-Introduction-G2-Quickstart"
+            )
+            print(
+                "ERROR: If you are running Ubuntu or Debian please also review the ssl and crypto information at https://senzing.zendesk.com/hc/en-us/articles/115010259947-System-Requirements"
+            )
+            raise G2Exception("Failed to load the G2 library")
 
-        response += tls_var.buf.value
+        if buffer_pool is None:
+            buffer_pool = G2BufferPool()
+        self.buffer_pool = buffer_pool.bind(self._native)
 
-    def whyRecordInEntity(
-        self,
-        dataSourceCode,
-        recordID,
-        response,
-        flags=G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
+        self._zero_copy = zero_copy
+        self._redo_buffers = threading.local()
 
-        response[::] = b""
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _recordID = self.prepareStringArgument(recordID)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_whyRecordInEntity_V2.restype = c_int
-        self._lib_handle.G2_whyRecordInEntity_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_whyRecordInEntity_V2(
-            _dataSourceCode,
-            _recordID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
+    # -----------------------------------------------------------------------------
+    # Internal helper methods
+    # -----------------------------------------------------------------------------
+
+    def prepareIntArgument(self, valueToPrepare):
+        # type: (str) -> int
+        """Internal processing function"""
+
+        return prepare_int_argument(valueToPrepare)
+
+    def prepareStringArgument(self, stringToPrepare):
+        # type: (str) -> str
+        """Internal processing function"""
+
+        return prepare_string_argument(stringToPrepare)
+
+    # -----------------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------------
+
+    @deprecated(1001)
+    def initV2(self, engine_name_, ini_params_, debug_=False):
+        self.init(engine_name_, ini_params_, debug_)
+
+    def init(self, engine_name_, ini_params_, debug_=False, *args, **kwargs):
+
+        self._engine_name = self.prepareStringArgument(engine_name_)
+        self._ini_params = self.prepareStringArgument(ini_params_)
+        self._debug = debug_
+        if self._debug:
+            print("Initializing G2 engine")
+
+        ret_code = self._native.G2_init(
+            self._engine_name, self._ini_params, self._debug
         )
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        if self._debug:
+            print("Initialization Status: " + str(ret_code))
 
-        response += tls_var.buf.value
+        if ret_code < 0:
+            raise _NATIVE_API.last_error(self._native)
 
-    @deprecated(1009)
-    def whyEntityByRecordIDV2(self, dataSourceCode, recordID, flags, response):
-        self.whyEntityByRecordID(dataSourceCode, recordID, response, flags)
+    @deprecated(1002)
+    def initWithConfigIDV2(self, engine_name_, ini_params_, initConfigID_, debug_):
+        self.initWithConfigID(engine_name_, ini_params_, initConfigID_, debug_)
 
-    def whyEntityByRecordID(
-        self,
-        dataSourceCode,
-        recordID,
-        response,
-        flags=G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
+    def initWithConfigID(
+        self, engine_name_, ini_params_, initConfigID_, debug_, *args, **kwargs
     ):
 
-        response[::] = b""
-        _dataSourceCode = self.prepareStringArgument(dataSourceCode)
-        _recordID = self.prepareStringArgument(recordID)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_whyEntityByRecordID_V2.restype = c_int
-        self._lib_handle.G2_whyEntityByRecordID_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_whyEntityByRecordID_V2(
-            _dataSourceCode,
-            _recordID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
+        configIDValue = self.prepareIntArgument(initConfigID_)
+
+        self._engine_name = self.prepareStringArgument(engine_name_)
+        self._ini_params = self.prepareStringArgument(ini_params_)
+        self._debug = debug_
+        if self._debug:
+            print("Initializing G2 engine")
+
+        ret_code = self._native.G2_initWithConfigID(
+            self._engine_name, self._ini_params, configIDValue, self._debug
         )
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        if self._debug:
+            print("Initialization Status: " + str(ret_code))
 
-        response += tls_var.buf.value
+        if ret_code < 0:
+            raise _NATIVE_API.last_error(self._native)
 
-    @deprecated(1010)
-    def whyEntityByEntityIDV2(self, entityID, flags, response):
-        self.whyEntityByEntityID(entityID, response, flags)
+    @deprecated(1003)
+    def reinitV2(self, initConfigID_):
+        self.reinit(initConfigID_)
 
-    def whyEntityByEntityID(
-        self,
-        entityID,
-        response,
-        flags=G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
+    @deprecated(1022)
+    def clearLastException(self, *args, **kwargs):
+        """Clears the last exception"""
+
+        self._native.G2_clearLastException()
+
+    @deprecated(1023)
+    def getLastException(self, *args, **kwargs):
+        """Gets the last exception"""
+
+        self._native.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        resultString = tls_var.buf.value.decode("utf-8")
+        return resultString
+
+    @deprecated(1024)
+    def getLastExceptionCode(self, *args, **kwargs):
+        """Gets the last exception code"""
+
+        exception_code = self._native.G2_getLastExceptionCode()
+        return exception_code
+
+    def primeEngine(self, *args, **kwargs):
+        ret_code = self._native.G2_primeEngine()
+        if self._debug:
+            print("Initialization Status: " + str(ret_code))
+
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
+
+    def fetchNext(self, exportHandle, response, *args, **kwargs):
+        """Fetch a record from an export
+        Args:
+            exportHandle: handle from generated export
+
+        Returns:
+            str: Record fetched, empty if there is no more data
+        """
+        if self._zero_copy:
+            return _NATIVE_API.fetch_view(
+                self._native, self._native.G2_fetchNext, exportHandle
+            )
 
         response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_whyEntityByEntityID_V2.restype = c_int
-        self._lib_handle.G2_whyEntityByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_whyEntityByEntityID_V2(
-            entityID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
+        resultValue = self._native.G2_fetchNext(
+            c_void_p(exportHandle), tls_var.buf, sizeof(tls_var.buf)
         )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        while resultValue != 0:
 
-        response += tls_var.buf.value
+            if resultValue < 0:
+                raise _NATIVE_API.error(self._native, resultValue)
 
-    @deprecated(1011)
-    def howEntityByEntityIDV2(self, entityID, flags, response):
-        self.howEntityByEntityID(entityID, response, flags)
+            response += tls_var.buf.value
+            if (response)[-1] == 0x0A:
+                break
+            else:
+                resultValue = self._native.G2_fetchNext(
+                    c_void_p(exportHandle), tls_var.buf, sizeof(tls_var.buf)
+                )
+        return response
 
-    def howEntityByEntityID(
+    def iterExport(
         self,
-        entityID,
-        response,
-        flags=G2EngineFlags.G2_HOW_ENTITY_DEFAULT_FLAGS,
+        flags=G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS,
+        headersForCSV=None,
+        chunk_size=1 << 20,
+        lines=True,
         *args,
         **kwargs
     ):
+        # type: (int, str, int, bool) -> _ExportIterator
+        """Iterate over a JSON or CSV export
 
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_howEntityByEntityID_V2.restype = c_int
-        self._lib_handle.G2_howEntityByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_howEntityByEntityID_V2(
-            entityID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        The export is read chunk_size bytes at a time instead of through the
+        64 KB buffer of fetchNext, and all the lines of a chunk are split at
+        once.  A line longer than chunk_size is carried over the following
+        chunks.  The export is closed with closeExport once it is exhausted,
+        or when the iterator is closed, e.g. at the end of a with block:
 
-        response += tls_var.buf.value
+            with engine.iterExport(flags) as export:
+                for line in export:
+                    ...
 
-    @deprecated(1012)
-    def getVirtualEntityByRecordIDV2(self, recordList, flags, response):
-        self.getVirtualEntityByRecordID(recordList, response, flags)
+        Args:
+            flags: export flags
+            headersForCSV: column headers of a CSV export, None for a JSON
+                export
+            chunk_size: size of the buffer each chunk is fetched into
+            lines: True to iterate over the lines, False over chunks of
+                complete lines, e.g. to write them to a file
 
-    def getVirtualEntityByRecordID(
-        self,
-        recordList,
-        response,
-        flags=G2EngineFlags.G2_HOW_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
+        Return:
+            iterator of bytes: the lines without their newline, or the chunks
+                with the newline of every line
+        """
+
+        if headersForCSV is None:
+            handle = self.exportJSONEntityReport(flags)
+        else:
+            handle = self.exportCSVEntityReport(headersForCSV, flags)
+        return _ExportIterator(self, self._native, handle, chunk_size, lines)
+
+    def addRecordWithReturnedRecordID(
+        self, dataSourceCode, recordID, jsonData, load_id=None, *args, **kwargs
     ):
+        # type: (str,str,str,str) -> int
+        """Loads the JSON record
+        Args:
+            dataSourceCode: The data source for the observation.
+            recordID: A memory buffer for returning the recordID
+            jsonData: A JSON document containing the attribute information
+                for the observation.
+            load_id: The observation load ID for the record, can be null and will default to dataSourceCode
+        """
 
-        response[::] = b""
-        _recordList = self.prepareStringArgument(recordList)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_getVirtualEntityByRecordID_V2.restype = c_int
-        self._lib_handle.G2_getVirtualEntityByRecordID_V2.argtypes = [
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_getVirtualEntityByRecordID_V2(
-            _recordList,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
+        _dataSourceCode = prepare_interned_argument(dataSourceCode)
+        _jsonData = self.prepareStringArgument(jsonData)
+        _load_id = prepare_interned_argument(load_id)
+        recordID[::] = b""
+        ret_code = self._native.G2_addRecordWithReturnedRecordID(
+            _dataSourceCode, _jsonData, _load_id, tls_var.buf, sizeof(tls_var.buf)
         )
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
-    @deprecated(1013)
-    def whyEntitiesV2(self, entityID1, entityID2, flags, response):
-        self.whyEntities(entityID1, entityID2, response, flags)
+        recordID += tls_var.buf.value
 
-    def whyEntities(
+    def addRecordWithInfoWithReturnedRecordID(
         self,
-        entityID1,
-        entityID2,
-        response,
-        flags=G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS,
+        dataSourceCode,
+        jsonData,
+        recordID,
+        info,
+        load_id=None,
+        flags=0,
         *args,
         **kwargs
     ):
+        """Loads the JSON record
+        Args:
+            dataSourceCode: The data source for the observation.
+            recordID: A memory buffer for returning the recordID
+            jsonData: A JSON document containing the attribute information
+                for the observation.
+            info: Json document with info about the modified resolved entities
+            load_id: The observation load ID for the record, can be null and will default to dataSourceCode
+            flags: reserved for future use
+        """
 
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_whyEntities_V2.restype = c_int
-        self._lib_handle.G2_whyEntities_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_whyEntities_V2(
-            entityID1,
-            entityID2,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
+        _dataSourceCode = prepare_interned_argument(dataSourceCode)
+        _jsonData = self.prepareStringArgument(jsonData)
+        _load_id = prepare_interned_argument(load_id)
+
+        recordID[::] = b""
+
+        info[::] = b""
+
+        # Make sure we have enough room to receive the Record ID
+        tls_var.resize(tls_var.buf, 100)
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
+        infoBuf = self.buffer_pool.acquire("addRecordWithInfoWithReturnedRecordID")
+        try:
+            ret_code = self._native.G2_addRecordWithInfoWithReturnedRecordID(
+                _dataSourceCode,
+                _jsonData,
+                _load_id,
+                flags,
+                tls_var.buf,
+                sizeof(tls_var.buf),
+                byref(infoBuf.ptr),
+                byref(infoBuf.size),
+                infoBuf.resize,
             )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
 
-        response += tls_var.buf.value
+            if ret_code < 0:
+                raise _NATIVE_API.error(self._native, ret_code)
 
-    @deprecated(1014)
-    def whyRecordsV2(
-        self, dataSourceCode1, recordID1, dataSourceCode2, recordID2, flags, response
-    ):
-        self.whyRecords(
-            dataSourceCode1, recordID1, dataSourceCode2, recordID2, response, flags
-        )
+            recordID += tls_var.buf.value
+            info += infoBuf.value()
+        finally:
+            self.buffer_pool.release(infoBuf)
 
-    def whyRecords(
+    def addRecords(
         self,
-        dataSourceCode1,
-        recordID1,
-        dataSourceCode2,
-        recordID2,
-        response,
-        flags=G2EngineFlags.G2_WHY_ENTITY_DEFAULT_FLAGS,
+        records,
+        workers=None,
+        with_info=False,
+        ordered=True,
+        flags=0,
+        max_pending=None,
+        retry=None,
+        key=None,
+        fingerprints=None,
+        concurrency=None,
+        affected=None,
         *args,
         **kwargs
     ):
+        """Loads many JSON records from a bounded pool of threads
+        Args:
+            records: An iterable of (dataSourceCode, recordID, jsonData) or
+                (dataSourceCode, recordID, jsonData, load_id) tuples.  It is only
+                read as fast as the records are loaded.
+            workers: The number of threads, defaults to the number of CPUs
+            with_info: True to return the info about the modified resolved
+                entities of each record
+            ordered: True to return the results in the order of the records,
+                False to return each one as soon as its record is loaded
+            flags: Flags passed to addRecordWithInfo
+            max_pending: The most records read but not yet returned, defaults
+                to twice the number of threads
+            retry: A G2RetryScheduler.  Records that fail with a
+                G2RetryableException are tried again after a delay, without
+                holding a thread while they wait.
+            key: A function returning the affinity key of a record, e.g.
+                G2Bulk.record_key for its (dataSourceCode, recordID).  Records
+                with the same key are never added at the same time.
+            fingerprints: A G2FingerprintStore.  Records whose JSON has not
+                changed since they were last added are skipped, and the
+                fingerprints of the added records are stored.
+            concurrency: A G2ConcurrencyController adapting the number of
+                records added at once to the engine's latency.  workers
+                defaults to its max_limit.
+            affected: A set the IDs of the entities modified by the adds are
+                added to.  The info of each record is then returned as if
+                with_info was set.
 
-        response[::] = b""
-        _dataSourceCode1 = self.prepareStringArgument(dataSourceCode1)
-        _recordID1 = self.prepareStringArgument(recordID1)
-        _dataSourceCode2 = self.prepareStringArgument(dataSourceCode2)
-        _recordID2 = self.prepareStringArgument(recordID2)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_whyRecords_V2.restype = c_int
-        self._lib_handle.G2_whyRecords_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_whyRecords_V2(
-            _dataSourceCode1,
-            _recordID1,
-            _dataSourceCode2,
-            _recordID2,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        Return:
+            generator of G2BulkResult, one per record.  info is the info
+                document, as bytes, if with_info is set.  exception is the
+                G2Exception raised for a record that failed to load.  skipped
+                is set for an unchanged record.
+        """
 
-        response += tls_var.buf.value
+        if with_info or affected is not None:
+
+            def add(record):
+                return self.addRecordWithInfoBytes(*record, flags=flags)
+
+        else:
+
+            def add(record):
+                self.addRecord(*record)
+
+        if concurrency is not None:
+            # Only the engine calls are timed, not the fingerprint checks.
+            add = concurrency.wrap(add)
+            if workers is None:
+                workers = concurrency.max_limit
+        if affected is not None:
+            add = collect_affected(add, affected)
+        if fingerprints is None:
+            return bulk_map(add, records, workers, ordered, max_pending, retry, key)
+
+        def add_unless_unchanged(record):
+            record_fingerprint = fingerprints.fingerprint(record[2])
+            if fingerprints.unchanged(record[0], record[1], record_fingerprint):
+                return SKIPPED
+            info = add(record)
+            fingerprints.put(record[0], record[1], record_fingerprint)
+            return info
+
+        def add_records():
+            try:
+                yield from bulk_map(
+                    add_unless_unchanged,
+                    records,
+                    workers,
+                    ordered,
+                    max_pending,
+                    retry,
+                    key,
+                )
+            finally:
+                fingerprints.flush()
 
-    @deprecated(1015)
-    def findPathExcludingByEntityIDV2(
-        self, startEntityID, endEntityID, maxDegree, excludedEntities, flags, response
-    ):
-        self.findPathExcludingByEntityID(
-            startEntityID, endEntityID, maxDegree, excludedEntities, response, flags
-        )
+        return add_records()
 
-    def findPathExcludingByEntityID(
+    def deleteRecords(
         self,
-        startEntityID,
-        endEntityID,
-        maxDegree,
-        excludedEntities,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
+        records,
+        workers=None,
+        with_info=False,
+        ordered=True,
+        flags=0,
+        max_pending=None,
+        retry=None,
+        key=None,
+        fingerprints=None,
+        concurrency=None,
+        affected=None,
         *args,
         **kwargs
     ):
-        # type: (int) -> str
-        """Find a path between two entities in the system.
+        """Deletes many records from a bounded pool of threads
         Args:
-            startEntityID: The entity ID you want to find the path from
-            endEntityID: The entity ID you want to find the path to
-            maxDegree: The maximum path length to search for
-            excludedEntities: JSON document containing entities to exclude
-            flags: control flags
-            response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        _excludedEntities = self.prepareStringArgument(excludedEntities)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathExcludingByEntityID_V2.restype = c_int
-        self._lib_handle.G2_findPathExcludingByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            c_int,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathExcludingByEntityID_V2(
-            startEntityID,
-            endEntityID,
-            maxDegree,
-            _excludedEntities,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
+            records: An iterable of (dataSourceCode, recordID) or
+                (dataSourceCode, recordID, load_id) tuples.  It is only read
+                as fast as the records are deleted.
+            workers: The number of threads, defaults to the number of CPUs
+            with_info: True to return the info about the modified resolved
+                entities of each record
+            ordered: True to return the results in the order of the records,
+                False to return each one as soon as its record is deleted
+            flags: Flags passed to deleteRecordWithInfo
+            max_pending: The most records read but not yet returned, defaults
+                to twice the number of threads
+            retry: A G2RetryScheduler.  Records that fail with a
+                G2RetryableException are tried again after a delay.
+            key: A function returning the affinity key of a record, e.g.
+                G2Bulk.record_key.  Records with the same key are never
+                deleted at the same time.
+            fingerprints: A G2FingerprintStore the deleted records are
+                removed from, so they are added again by the next load.
+            concurrency: A G2ConcurrencyController adapting the number of
+                records deleted at once.  workers defaults to its max_limit.
+            affected: A set the IDs of the entities modified by the deletes
+                are added to.  The info of each record is then returned as if
+                with_info was set.
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        Return:
+            generator of G2BulkResult, one per record
+        """
 
-        response += tls_var.buf.value
+        if with_info or affected is not None:
+
+            def delete(record):
+                return self.deleteRecordWithInfoBytes(*record, flags=flags)
+
+        else:
+
+            def delete(record):
+                self.deleteRecord(*record)
+
+        if concurrency is not None:
+            # Only the engine calls are timed.
+            delete = concurrency.wrap(delete)
+            if workers is None:
+                workers = concurrency.max_limit
+        if affected is not None:
+            delete = collect_affected(delete, affected)
+        if fingerprints is None:
+            return bulk_map(delete, records, workers, ordered, max_pending, retry, key)
+
+        def delete_fingerprint(record):
+            info = delete(record)
+            fingerprints.delete(record[0], record[1])
+            return info
+
+        def delete_records():
+            try:
+                yield from bulk_map(
+                    delete_fingerprint,
+                    records,
+                    workers,
+                    ordered,
+                    max_pending,
+                    retry,
+                    key,
+                )
+            finally:
+                fingerprints.flush()
 
-    @deprecated(1016)
-    def findPathIncludingSourceByEntityIDV2(
-        self,
-        startEntityID,
-        endEntityID,
-        maxDegree,
-        excludedEntities,
-        requiredDsrcs,
-        flags,
-        response,
-    ):
-        self.findPathIncludingSourceByEntityID(
-            startEntityID,
-            endEntityID,
-            maxDegree,
-            excludedEntities,
-            requiredDsrcs,
-            response,
-            flags,
-        )
+        return delete_records()
 
-    def findPathIncludingSourceByEntityID(
+    def reevaluateEntities(
         self,
-        startEntityID,
-        endEntityID,
-        maxDegree,
-        excludedEntities,
-        requiredDsrcs,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
+        entity_ids,
+        workers=None,
+        with_info=False,
+        ordered=True,
+        flags=0,
+        max_pending=None,
+        retry=None,
+        concurrency=None,
+        affected=None,
+        distinct=True,
         *args,
         **kwargs
     ):
-        # type: (int) -> str
-        """Find a path between two entities in the system.
+        """Reevaluates many entities from a bounded pool of threads, e.g.
+        after a configuration change
         Args:
-            startEntityID: The entity ID you want to find the path from
-            endEntityID: The entity ID you want to find the path to
-            maxDegree: The maximum path length to search for
-            excludedEntities: JSON document containing entities to exclude
-            requiredDsrcs: JSON document containing data sources to require
-            flags: control flags
-            response: A bytearray for returning the response document.
+            entity_ids: An iterable of entity IDs.  An ID that was already
+                read is dropped, so each entity is reevaluated once and the
+                results are numbered by the distinct IDs, unless distinct is
+                False.
+            workers: The number of threads, defaults to the number of CPUs
+            with_info: True to return the info about the modified resolved
+                entities of each entity
+            ordered: True to return the results in the order of the IDs,
+                False to return each one as soon as it is reevaluated
+            flags: Flags passed to reevaluateEntity
+            max_pending: The most IDs read but not yet returned, defaults
+                to twice the number of threads
+            retry: A G2RetryScheduler.  Entities that fail with a
+                G2RetryableException are tried again after a delay.
+            concurrency: A G2ConcurrencyController adapting the number of
+                entities reevaluated at once.  workers defaults to its
+                max_limit.
+            affected: A set the IDs of the entities modified by the
+                reevaluations are added to, merging the info of every
+                entity.  The info of each entity is then returned as if
+                with_info was set.
+            distinct: True to drop the IDs already read.  Every distinct ID
+                is kept in a set until the generator ends, about 70 bytes
+                per ID, e.g. 700 MB for 10 million entities; pass False for
+                IDs that are already distinct, e.g. from an export.
+
+        Return:
+            generator of G2BulkResult, one per distinct entity ID.  item is
+                the entity ID, as an int.
         """
 
-        response[::] = b""
-        _excludedEntities = self.prepareStringArgument(excludedEntities)
-        _requiredDsrcs = self.prepareStringArgument(requiredDsrcs)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathIncludingSourceByEntityID_V2.restype = c_int
-        self._lib_handle.G2_findPathIncludingSourceByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            c_int,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathIncludingSourceByEntityID_V2(
-            startEntityID,
-            endEntityID,
-            maxDegree,
-            _excludedEntities,
-            _requiredDsrcs,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
+        if with_info or affected is not None:
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            def reevaluate(entity_id):
+                return self.reevaluateEntityWithInfoBytes(entity_id, flags)
 
-        response += tls_var.buf.value
+        else:
 
-    @deprecated(1017)
-    def findPathExcludingByRecordIDV2(
+            def reevaluate(entity_id):
+                self.reevaluateEntity(entity_id, flags)
+
+        if concurrency is not None:
+            # Only the engine calls are timed.
+            reevaluate = concurrency.wrap(reevaluate)
+            if workers is None:
+                workers = concurrency.max_limit
+        if affected is not None:
+            reevaluate = collect_affected(reevaluate, affected)
+
+        def distinct_ids():
+            seen = set()
+            for entity_id in entity_ids:
+                entity_id = int(entity_id)
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    yield entity_id
+
+        if distinct:
+            ids = distinct_ids()
+        else:
+            ids = map(int, entity_ids)
+        return bulk_map(reevaluate, ids, workers, ordered, max_pending, retry)
+
+    @deprecated(1004)
+    def searchByAttributesV2(self, jsonData, flags, response):
+        self.searchByAttributes(jsonData, response, flags)
+
+    @deprecated(1005)
+    def findPathByEntityIDV2(
+        self, startEntityID, endEntityID, maxDegree, flags, response
+    ):
+        self.findPathByEntityID(startEntityID, endEntityID, maxDegree, response, flags)
+
+    @deprecated(1006)
+    def findNetworkByEntityIDV2(
+        self, entityList, maxDegree, buildOutDegree, maxEntities, flags, response
+    ):
+        self.findNetworkByEntityID(
+            entityList, maxDegree, buildOutDegree, maxEntities, response, flags
+        )
+
+    @deprecated(1007)
+    def findPathByRecordIDV2(
         self,
         startDsrcCode,
         startRecordId,
         endDsrcCode,
         endRecordId,
         maxDegree,
-        excludedEntities,
         flags,
         response,
     ):
-        self.findPathExcludingByRecordID(
+        self.findPathByRecordID(
             startDsrcCode,
             startRecordId,
             endDsrcCode,
             endRecordId,
             maxDegree,
-            excludedEntities,
             response,
             flags,
         )
 
-    def findPathExcludingByRecordID(
+    @deprecated(1008)
+    def findNetworkByRecordIDV2(
+        self, recordList, maxDegree, buildOutDegree, maxEntities, flags, response
+    ):
+        self.findNetworkByRecordID(
+            recordList, maxDegree, buildOutDegree, maxEntities, response, flags
+        )
+
+    @deprecated(1009)
+    def whyEntityByRecordIDV2(self, dataSourceCode, recordID, flags, response):
+        self.whyEntityByRecordID(dataSourceCode, recordID, response, flags)
+
+    @deprecated(1010)
+    def whyEntityByEntityIDV2(self, entityID, flags, response):
+        self.whyEntityByEntityID(entityID, response, flags)
+
+    @deprecated(1011)
+    def howEntityByEntityIDV2(self, entityID, flags, response):
+        self.howEntityByEntityID(entityID, response, flags)
+
+    @deprecated(1012)
+    def getVirtualEntityByRecordIDV2(self, recordList, flags, response):
+        self.getVirtualEntityByRecordID(recordList, response, flags)
+
+    @deprecated(1013)
+    def whyEntitiesV2(self, entityID1, entityID2, flags, response):
+        self.whyEntities(entityID1, entityID2, response, flags)
+
+    @deprecated(1014)
+    def whyRecordsV2(
+        self, dataSourceCode1, recordID1, dataSourceCode2, recordID2, flags, response
+    ):
+        self.whyRecords(
+            dataSourceCode1, recordID1, dataSourceCode2, recordID2, response, flags
+        )
+
+    @deprecated(1015)
+    def findPathExcludingByEntityIDV2(
+        self, startEntityID, endEntityID, maxDegree, excludedEntities, flags, response
+    ):
+        self.findPathExcludingByEntityID(
+            startEntityID, endEntityID, maxDegree, excludedEntities, response, flags
+        )
+
+    @deprecated(1016)
+    def findPathIncludingSourceByEntityIDV2(
         self,
-        startDsrcCode,
-        startRecordId,
-        endDsrcCode,
-        endRecordId,
+        startEntityID,
+        endEntityID,
         maxDegree,
         excludedEntities,
-        response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str) -> str
-        """Find a path between two records in the system.
-        Args:
-            startDataSourceCode: The data source for the record you want to find the path from
-            startRecordID: The ID for the record you want to find the path from
-            endDataSourceCode: The data source for the record you want to find the path to
-            endRecordID: The ID for the record you want to find the path to
-            maxDegree: The maximum path length to search for
-            excludedEntities: JSON document containing entities to exclude
-            flags: control flags
-            response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        _startDsrcCode = self.prepareStringArgument(startDsrcCode)
-        _startRecordId = self.prepareStringArgument(startRecordId)
-        _endDsrcCode = self.prepareStringArgument(endDsrcCode)
-        _endRecordId = self.prepareStringArgument(endRecordId)
-        _excludedEntities = self.prepareStringArgument(excludedEntities)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathExcludingByRecordID_V2.restype = c_int
-        self._lib_handle.G2_findPathExcludingByRecordID_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_int,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathExcludingByRecordID_V2(
-            _startDsrcCode,
-            _startRecordId,
-            _endDsrcCode,
-            _endRecordId,
+        requiredDsrcs,
+        flags,
+        response,
+    ):
+        self.findPathIncludingSourceByEntityID(
+            startEntityID,
+            endEntityID,
             maxDegree,
-            _excludedEntities,
+            excludedEntities,
+            requiredDsrcs,
+            response,
             flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
         )
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    @deprecated(1018)
-    def findPathIncludingSourceByRecordIDV2(
+    @deprecated(1017)
+    def findPathExcludingByRecordIDV2(
         self,
         startDsrcCode,
         startRecordId,
@@ -2006,23 +1638,22 @@ class G2Engine(object):
         endRecordId,
         maxDegree,
         excludedEntities,
-        requiredDsrcs,
         flags,
         response,
     ):
-        self.findPathIncludingSourceByRecordID(
+        self.findPathExcludingByRecordID(
             startDsrcCode,
             startRecordId,
             endDsrcCode,
             endRecordId,
             maxDegree,
             excludedEntities,
-            requiredDsrcs,
             response,
             flags,
         )
 
-    def findPathIncludingSourceByRecordID(
+    @deprecated(1018)
+    def findPathIncludingSourceByRecordIDV2(
         self,
         startDsrcCode,
         startRecordId,
@@ -2031,458 +1662,110 @@ class G2Engine(object):
         maxDegree,
         excludedEntities,
         requiredDsrcs,
+        flags,
         response,
-        flags=G2EngineFlags.G2_FIND_PATH_DEFAULT_FLAGS,
-        *args,
-        **kwargs
     ):
-        # type: (str,str) -> str
-        """Find a path between two records in the system.
-        Args:
-            startDataSourceCode: The data source for the record you want to find the path from
-            startRecordID: The ID for the record you want to find the path from
-            endDataSourceCode: The data source for the record you want to find the path to
-            endRecordID: The ID for the record you want to find the path to
-            maxDegree: The maximum path length to search for
-            excludedEntities: JSON document containing entities to exclude
-            requiredDsrcs: JSON document containing data sources to require
-            flags: control flags
-            response: A bytearray for returning the response document.
-        """
-
-        response[::] = b""
-        _startDsrcCode = self.prepareStringArgument(startDsrcCode)
-        _startRecordId = self.prepareStringArgument(startRecordId)
-        _endDsrcCode = self.prepareStringArgument(endDsrcCode)
-        _endRecordId = self.prepareStringArgument(endRecordId)
-        _excludedEntities = self.prepareStringArgument(excludedEntities)
-        _requiredDsrcs = self.prepareStringArgument(requiredDsrcs)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findPathIncludingSourceByRecordID_V2.restype = c_int
-        self._lib_handle.G2_findPathIncludingSourceByRecordID_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_int,
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findPathIncludingSourceByRecordID_V2(
-            _startDsrcCode,
-            _startRecordId,
-            _endDsrcCode,
-            _endRecordId,
+        self.findPathIncludingSourceByRecordID(
+            startDsrcCode,
+            startRecordId,
+            endDsrcCode,
+            endRecordId,
             maxDegree,
-            _excludedEntities,
-            _requiredDsrcs,
+            excludedEntities,
+            requiredDsrcs,
+            response,
             flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
         )
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
     @deprecated(1019)
     def getEntityByEntityIDV2(self, entityID, flags, response):
         self.getEntityByEntityID(entityID, response, flags)
 
-    def getEntityByEntityID(
-        self,
-        entityID,
-        response,
-        flags=G2EngineFlags.G2_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (int,bytearray) -> int
-        """Find the entity with the given ID
-        Args:
-            entityID: The entity ID you want returned.  Typically referred to as
-                    ENTITY_ID in JSON results.
-            flags: control flags.
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_getEntityByEntityID_V2.restype = c_int
-        self._lib_handle.G2_getEntityByEntityID_V2.argtypes = [
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_getEntityByEntityID_V2(
-            entityID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
     @deprecated(1020)
     def getEntityByRecordIDV2(self, dsrcCode, recordId, flags, response):
         self.getEntityByRecordID(dsrcCode, recordId, response, flags)
 
-    def getEntityByRecordID(
-        self,
-        dsrcCode,
-        recordId,
-        response,
-        flags=G2EngineFlags.G2_ENTITY_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str,bytearray) -> int
-        """Get the entity containing the specified record
-        Args:
-            dataSourceCode: The data source for the observation.
-            recordID: The ID for the record
-            flags: control flags.
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        _dsrcCode = self.prepareStringArgument(dsrcCode)
-        _recordId = self.prepareStringArgument(recordId)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_getEntityByRecordID_V2.restype = c_int
-        self._lib_handle.G2_getEntityByRecordID_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_getEntityByRecordID_V2(
-            _dsrcCode,
-            _recordId,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def findInterestingEntitiesByEntityID(
-        self, entityID, response, flags=0, *args, **kwargs
-    ):
-        # type: (int,bytearray) -> int
-        """Find interesting entities close to the entity with the given ID
-        Args:
-            entityID: The entity ID you want to search around.
-            flags: control flags.
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findInterestingEntitiesByEntityID.restype = c_int
-        self._lib_handle.G2_findInterestingEntitiesByEntityID.argtypes = [
-            c_longlong,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findInterestingEntitiesByEntityID(
-            entityID,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
+    def _redoBuffers(self):
+        # The record and info buffers of the calling thread.  Redo records
+        # are processed in a loop on long lived threads, so each thread keeps
+        # its own pair instead of taking two from the pool for every record.
+        buffers = getattr(self._redo_buffers, "buffers", None)
+        if buffers is None:
+            size = self.buffer_pool.shrink_size
+            buffers = (
+                G2NativeBuffer(self._native, size),
+                G2NativeBuffer(self._native, size),
             )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        # Add the bytes to the response bytearray from calling function
-        response += tls_var.buf.value
-
-    def findInterestingEntitiesByRecordID(
-        self, dsrcCode, recordId, response, flags=0, *args, **kwargs
-    ):
-        # type: (str,str,bytearray) -> int
-        """Find interesting entities close to the entity with the specified record
-        Args:
-            dataSourceCode: The data source for the observation to search around.
-            recordID: The ID for the record to search around.
-            flags: control flags.
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        _dsrcCode = self.prepareStringArgument(dsrcCode)
-        _recordId = self.prepareStringArgument(recordId)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_findInterestingEntitiesByRecordID.restype = c_int
-        self._lib_handle.G2_findInterestingEntitiesByRecordID.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_findInterestingEntitiesByRecordID(
-            _dsrcCode,
-            _recordId,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
+            self._redo_buffers.buffers = buffers
+        return buffers
+
+    def _processRedoRecordWithInfo(self, flags):
+        # Fetch the next redo record and process it, in one pass over the
+        # thread's buffers.  Returns the (record, info) bytes, both empty if
+        # the redo queue is empty.
+        recordBuf, infoBuf = self._redoBuffers()
+        ret_code = self._native.G2_getRedoRecord(
+            byref(recordBuf.ptr), byref(recordBuf.size), recordBuf.resize
         )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def getRedoRecord(self, response, *args, **kwargs):
-        # type: (bytearray) -> int
-        """Get the next Redo record
-        Args:
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_getRedoRecord.restype = c_int
-        self._lib_handle.G2_getRedoRecord.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_getRedoRecord(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
+        record = recordBuf.value()
+        if not record:
+            return record, record
+        ret_code = self._native.G2_processWithInfo(
+            record, flags, byref(infoBuf.ptr), byref(infoBuf.size), infoBuf.resize
         )
+        if ret_code < 0:
+            # The record is off the queue, keep it so the caller can retry it.
+            error = _NATIVE_API.error(self._native, ret_code)
+            error.redo_record = record
+            raise error
+        info = infoBuf.value()
+        # A buffer grown for large responses keeps its capacity while they
+        # last, and is shrunk by the pool's shrink_after policy once they
+        # stop, so an unusually large one does not stay pinned to the thread.
+        self.buffer_pool.trim(recordBuf)
+        self.buffer_pool.trim(infoBuf)
+        return record, info
 
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
-
-    def processRedoRecord(self, response, flags=0, *args, **kwargs):
-        # type: (bytearray) -> int
+    def processRedoRecordWithInfo(self, response, info, flags=0, *args, **kwargs):
+        # type: (bytearray, bytearray, int) -> None
         """Process the next Redo record
-        Args:
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
 
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_processRedoRecord.restype = c_int
-        self._lib_handle.G2_processRedoRecord.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_processRedoRecord(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += responseBuf.value
+        If processing the record fails, the G2Exception raised has the
+        record, which is no longer on the queue, as bytes in its redo_record
+        attribute.
 
-    def processRedoRecordWithInfo(self, response, info, flags=0, *args, **kwargs):
-        # type: (bytearray) -> int
-        """Process the next Redo record
         Args:
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-            response: A bytearray for returning the info about changed resolved entities
+            response: A bytearray for returning the redo record that was processed, empty if there was none.
+            info: A bytearray for returning the info about changed resolved entities
+            flags: reserved for future use
         """
 
-        # clear the output params
         response[::] = b""
         info[::] = b""
-
-        # get a redo record
-        getRecordResponse = bytearray()
-        getRecordResponse[::] = b""
-        self.getRedoRecord(getRecordResponse, args, kwargs)
-        response += getRecordResponse
-
-        # get the record to be processed
-        inputUMF = getRecordResponse
-
-        # process the redo record
-        if len(inputUMF) > 0:
-            processWithInfoResponse = bytearray()
-            processWithInfoResponse[::] = b""
-            self.processWithInfo(inputUMF, processWithInfoResponse, flags, args, kwargs)
-            info += processWithInfoResponse
-
-    def countRedoRecords(self, *args, **kwargs):
-        # type: () -> int
-        """Get the redo records left
-        Args:
-
-        Return:
-            int: the number of redo records in the queue.
-        """
-
-        ret_code = self._lib_handle.G2_countRedoRecords()
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        return ret_code
+        record, recordInfo = self._processRedoRecordWithInfo(flags)
+        response += record
+        info += recordInfo
+
+    def processRedoRecordWithInfoBytes(self, flags=0, parse=False, *args, **kwargs):
+        # type: (int, bool) -> tuple
+        """Same as processRedoRecordWithInfo, but returns the redo record
+        and the info as a (record, info) tuple of bytes, both empty if there
+        was no redo record, or of the parsed JSON documents, both None if
+        there was no redo record, if parse is set"""
+
+        record, info = self._processRedoRecordWithInfo(flags)
+        if parse:
+            if not record:
+                return None, None
+            return json.loads(record), json.loads(info)
+        return record, info
 
     @deprecated(1021)
     def getRecordV2(self, dsrcCode, recordId, flags, response):
         self.getRecord(dsrcCode, recordId, response, flags)
 
-    def getRecord(
-        self,
-        dsrcCode,
-        recordId,
-        response,
-        flags=G2EngineFlags.G2_RECORD_DEFAULT_FLAGS,
-        *args,
-        **kwargs
-    ):
-        # type: (str,str,bytearray) -> int
-        """Get the specified record
-        Args:
-            dataSourceCode: The data source for the observation.
-            recordID: The ID for the record
-            flags: control flags.
-            response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
-        """
-
-        response[::] = b""
-        _dsrcCode = self.prepareStringArgument(dsrcCode)
-        _recordId = self.prepareStringArgument(recordId)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_getRecord_V2.restype = c_int
-        self._lib_handle.G2_getRecord_V2.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_longlong,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_getRecord_V2(
-            _dsrcCode,
-            _recordId,
-            flags,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-    def stats(self, response, *args, **kwargs):
-        # type: () -> object
-        """Retrieve the workload statistics for the current process.
-        Resets them after retrieved.
-
-        Args:
-
-        """
-
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_stats.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_stats(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
     def exportConfig(self, response, configID, *args, **kwargs):
         # type: (bytearray) -> int
         """Retrieve the G2 engine configuration
@@ -2491,124 +1774,27 @@ class G2Engine(object):
             response: A bytearray for returning the response document; if an error occurred, an error response is stored here.
         """
 
-        response[::] = b""
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2_exportConfig.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2_exportConfig(
-            pointer(responseBuf), pointer(responseSize), self._resize_func
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        response += tls_var.buf.value
-
-        if type(configID) == bytearray:
-            configID[::] = b""
-            cID = c_longlong(0)
-            self._lib_handle.G2_getActiveConfigID.argtypes = [POINTER(c_longlong)]
-            ret_code2 = self._lib_handle.G2_getActiveConfigID(cID)
-
-            if ret_code2 == -1:
-                raise G2NotInitializedException(
-                    "G2Engine has not been successfully initialized"
-                )
-            elif ret_code2 < 0:
-                self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-                raise TranslateG2ModuleException(tls_var.buf.value)
-
-            configID += str(cID.value).encode()
-
-    def getActiveConfigID(self, configID, *args, **kwargs):
-        # type: (bytearray) -> object
-        """Retrieve the active config ID for the G2 engine
-
-        Args:
-            configID: A bytearray for returning the identifier value for the config
-        """
-
-        configID[::] = b""
-        cID = c_longlong(0)
-        self._lib_handle.G2_getActiveConfigID.argtypes = [POINTER(c_longlong)]
-        ret_code = self._lib_handle.G2_getActiveConfigID(cID)
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        configID += str(cID.value).encode()
-
-    def getRepositoryLastModifiedTime(self, lastModifiedTime, *args, **kwargs):
-        # type: (bytearray) -> object
-        """Retrieve the last modified time stamp of the entity store repository
-
-        Args:
-            lastModifiedTime: A bytearray for returning the last modified time of the data repository
-        """
-
-        lastModifiedTime[::] = b""
-        lastModifiedTimeStamp = c_longlong(0)
-        self._lib_handle.G2_getRepositoryLastModifiedTime.argtypes = [
-            POINTER(c_longlong)
-        ]
-        ret_code = self._lib_handle.G2_getRepositoryLastModifiedTime(
-            lastModifiedTimeStamp
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
-
-        lastModifiedTime += str(lastModifiedTimeStamp.value).encode()
-
-    def purgeRepository(self, reset_resolver_=True, *args, **kwargs):
-        # type: (bool) -> None
-        """Purges the G2 repository
-
-        Args:
-            reset_resolver: Re-initializes the engine.  Should be left True.
-
-        Return:
-            None
-        """
-
-        ret_code = self._lib_handle.G2_purgeRepository()
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Engine has not been successfully initialized"
+        if not self._zero_copy:
+            response[::] = b""
+        responseBuf = self.buffer_pool.acquire("exportConfig")
+        try:
+            ret_code = self._native.G2_exportConfig(
+                byref(responseBuf.ptr), byref(responseBuf.size), responseBuf.resize
             )
-        elif ret_code < 0:
-            self._lib_handle.G2_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
 
-    def destroy(self, *args, **kwargs):
-        """Uninitializes the engine
-        This should be done once per process after init(...) is called.
-        After it is called the engine will no longer function.
+            if ret_code < 0:
+                raise _NATIVE_API.error(self._native, ret_code)
 
-        Args:
+            if self._zero_copy:
+                view = responseBuf.view()
+            else:
+                response += responseBuf.value()
+        finally:
+            self.buffer_pool.release(responseBuf)
 
-        Return:
-            None
-        """
+        if type(configID) == bytearray:
+            self.getActiveConfigID(configID)
 
-        self._lib_handle.G2_destroy()
+        if self._zero_copy:
+            return view
+        return None
@@ -0,0 +1,372 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import queue
+import threading
+
+from .G2EngineFlags import G2EngineFlags
+
+__all__ = ["G2ExportWriter"]
+
+# -----------------------------------------------------------------------------
+# Compression
+# -----------------------------------------------------------------------------
+
+
+def _open_gzip(file, level):
+    return gzip.GzipFile(
+        fileobj=file, mode="wb", compresslevel=9 if level is None else level
+    )
+
+
+def _open_bz2(file, level):
+    return bz2.BZ2File(file, "wb", compresslevel=9 if level is None else level)
+
+
+def _open_lzma(file, level):
+    return lzma.LZMAFile(file, "wb", preset=level)
+
+
+# The file extension and the function wrapping a binary file in a compressor
+# of each compression.  The stdlib compressors release the GIL while they
+# compress, so shards are compressed in parallel on threads.
+
+COMPRESSIONS = {
+    None: ("", None),
+    "gzip": (".gz", _open_gzip),
+    "bz2": (".bz2", _open_bz2),
+    "lzma": (".xz", _open_lzma),
+}
+
+# -----------------------------------------------------------------------------
+# Shards
+# -----------------------------------------------------------------------------
+
+
+class _Shard(object):
+    """One output file, and the chunks of lines queued for it"""
+
+    __slots__ = ("path", "offset", "bytes", "lines", "file_bytes", "chunks")
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+        self.bytes = 0
+        self.lines = 0
+        self.file_bytes = None
+        self.chunks = queue.SimpleQueue()
+
+
+# -----------------------------------------------------------------------------
+# G2ExportWriter class
+# -----------------------------------------------------------------------------
+
+
+class G2ExportWriter(object):
+    """Writes an export to compressed shard files on background threads
+
+    The thread reading the export only splits it into shards and queues the
+    chunks of each shard; worker threads compress and write them.  A shard
+    ends at the line that fills it to shard_size bytes, before compression,
+    so a shard is opened by a worker while the previous ones are still being
+    compressed, and up to workers shards are compressed at once.  Once the
+    writer is closed, a manifest lists every shard with its line count and
+    the offset of its first line and byte in the export.
+
+    By default write() never waits for the workers, so the chunks of a
+    reader faster than compression are held in memory; max_pending bounds
+    them.
+
+    Attributes:
+        directory: directory of the shard files and the manifest
+        prefix: start of the name of every file
+        compression: None, "gzip", "bz2" or "lzma"
+        shard_size: most bytes of lines of a shard, a longer line has a
+            shard of its own
+        lines: lines written, once the writer is closed
+        bytes: bytes of lines written
+        shards: manifest entries of the shards, once the writer is closed
+    """
+
+    def __init__(
+        self,
+        directory,
+        prefix="export",
+        compression="gzip",
+        shard_size=256 << 20,
+        level=None,
+        workers=None,
+        max_pending=None,
+        suffix=".jsonl",
+    ):
+        # type: (str, str, str, int, int, int, int, str) -> None
+        """G2ExportWriter class initialization
+
+        Args:
+            directory: directory of the shard files, created if it does not
+                exist
+            prefix: start of the name of every file
+            compression: None, "gzip", "bz2" or "lzma"
+            shard_size: most bytes of lines of a shard, before compression
+            level: compression level, the compressor's default if None
+            workers: compression threads, defaults to the number of CPUs, at
+                most 4
+            max_pending: most bytes queued for the workers before write()
+                waits, None to never wait
+            suffix: extension of the shard files before the compression's,
+                e.g. ".csv"
+        """
+
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {0!r}".format(compression))
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.shard_size = shard_size
+        self.level = level
+        self.max_pending = max_pending
+        self.suffix = suffix
+        self.lines = 0
+        self.bytes = 0
+        self.shards = []
+        self._extension, self._open = COMPRESSIONS[compression]
+        self._shard = None
+        self._all_shards = []
+        self._jobs = queue.SimpleQueue()
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._error = None
+        self._closed = False
+        self._workers = [
+            threading.Thread(
+                target=self._work,
+                name="G2ExportWriter-{0}".format(index),
+                daemon=True,
+            )
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def manifest_path(self):
+        # type: () -> str
+        """Path of the manifest"""
+
+        return os.path.join(self.directory, self.prefix + ".manifest.json")
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def write(self, data):
+        # type: (bytes) -> None
+        """Queue complete lines, each with its newline
+
+        Args:
+            data: one or more lines, e.g. a chunk of G2Engine.iterExport()
+                with lines=False.  A missing newline at the end is added.
+        """
+
+        self._raise_error()
+        if not data:
+            return
+        if data[-1:] != b"\n":
+            data = bytes(data) + b"\n"
+        with self._condition:
+            if self.max_pending is not None:
+                while self._pending > self.max_pending and self._error is None:
+                    self._condition.wait()
+            self._pending += len(data)
+        self.bytes += len(data)
+        while data:
+            shard = self._shard
+            if shard is None:
+                shard = self._new_shard()
+            room = self.shard_size - shard.bytes
+            if len(data) <= room:
+                part, data = data, b""
+            else:
+                end = data.rfind(b"\n", 0, room) + 1
+                if not end:
+                    if shard.bytes:
+                        self._end_shard()
+                        continue
+                    end = data.find(b"\n") + 1
+                part, data = data[:end], data[end:]
+            shard.bytes += len(part)
+            shard.chunks.put(part)
+            if shard.bytes >= self.shard_size:
+                self._end_shard()
+
+    def writelines(self, lines):
+        # type: (iterable) -> None
+        """Queue lines without their newline, e.g. of G2Engine.iterExport()"""
+
+        self.write(b"".join(line + b"\n" for line in lines))
+
+    def export(
+        self,
+        engine,
+        flags=G2EngineFlags.G2_EXPORT_DEFAULT_FLAGS,
+        headersForCSV=None,
+        chunk_size=1 << 20,
+    ):
+        # type: (G2Engine, int, str, int) -> dict
+        """Write a whole export and close the writer
+
+        Args:
+            engine: the G2Engine to export from
+            flags: export flags
+            headersForCSV: column headers of a CSV export, None for a JSON
+                export
+            chunk_size: passed to G2Engine.iterExport()
+
+        Return:
+            dict: the manifest
+        """
+
+        with engine.iterExport(
+            flags, headersForCSV, chunk_size=chunk_size, lines=False
+        ) as chunks:
+            for chunk in chunks:
+                self.write(chunk)
+        return self.close()
+
+    def _new_shard(self):
+        index = len(self._all_shards)
+        name = "{0}-{1:05d}{2}{3}".format(
+            self.prefix, index, self.suffix, self._extension
+        )
+        offset = 0
+        if self._all_shards:
+            previous = self._all_shards[-1]
+            offset = previous.offset + previous.bytes
+        shard = _Shard(os.path.join(self.directory, name), offset)
+        self._all_shards.append(shard)
+        self._shard = shard
+        self._jobs.put(shard)
+        return shard
+
+    def _end_shard(self):
+        self._shard.chunks.put(None)
+        self._shard = None
+
+    # -------------------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------------------
+
+    def _work(self):
+        while True:
+            shard = self._jobs.get()
+            if shard is None:
+                return
+            try:
+                self._compress(shard)
+            except BaseException as ex:
+                with self._condition:
+                    if self._error is None:
+                        self._error = ex
+                    self._condition.notify_all()
+                # Drop the rest of the shard.
+                while True:
+                    chunk = shard.chunks.get()
+                    if chunk is None:
+                        break
+                    self._written(len(chunk))
+
+    def _compress(self, shard):
+        with open(shard.path, "wb") as file:
+            output = file if self._open is None else self._open(file, self.level)
+            try:
+                while True:
+                    chunk = shard.chunks.get()
+                    if chunk is None:
+                        break
+                    output.write(chunk)
+                    shard.lines += chunk.count(b"\n")
+                    self._written(len(chunk))
+            finally:
+                if output is not file:
+                    output.close()
+        shard.file_bytes = os.path.getsize(shard.path)
+
+    def _written(self, size):
+        with self._condition:
+            self._pending -= size
+            self._condition.notify_all()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    # -------------------------------------------------------------------------
+    # Closing
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        # type: () -> dict
+        """Wait for the workers, then write the manifest
+
+        Return:
+            dict: the manifest: compression, lines, bytes and shards, each a
+                dict of path (relative to directory), first_line (0 based),
+                lines, offset and bytes of its lines in the export, and
+                file_bytes
+        """
+
+        if not self._closed:
+            self._closed = True
+            if self._shard is not None:
+                self._end_shard()
+            for _ in self._workers:
+                self._jobs.put(None)
+            for worker in self._workers:
+                worker.join()
+            self._raise_error()
+            first_line = 0
+            for shard in self._all_shards:
+                self.shards.append(
+                    {
+                        "path": os.path.basename(shard.path),
+                        "first_line": first_line,
+                        "lines": shard.lines,
+                        "offset": shard.offset,
+                        "bytes": shard.bytes,
+                        "file_bytes": shard.file_bytes,
+                    }
+                )
+                first_line += shard.lines
+            self.lines = first_line
+            self._write_manifest()
+        return self.manifest()
+
+    def manifest(self):
+        # type: () -> dict
+        """The manifest written by close()"""
+
+        return {
+            "compression": self.compression,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "shards": self.shards,
+        }
+
+    def _write_manifest(self):
+        temporary = self.manifest_path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.manifest(), file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.manifest_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from .G2Exception import G2BadInputException
+
+__all__ = ["G2FingerprintStore"]
+
+# -----------------------------------------------------------------------------
+# Fingerprints
+# -----------------------------------------------------------------------------
+
+FINGERPRINT_SIZE = 16
+
+
+def fingerprint(json_data, canonical=True):
+    # type: (object, bool) -> bytes
+    """Digest of a record's JSON document
+
+    Args:
+        json_data: the JSON document, as str or bytes
+        canonical: True to hash the document with its keys sorted and
+            without whitespace, so documents that only differ in key order
+            or formatting have the same fingerprint.  False to hash the
+            document as it is, which is faster.
+
+    Return:
+        bytes: FINGERPRINT_SIZE byte BLAKE2b digest
+    """
+
+    if canonical:
+        try:
+            document = json.loads(json_data)
+        except ValueError as ex:
+            raise G2BadInputException("Invalid JSON: {0}".format(ex))
+        encoded = json.dumps(
+            document, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+    elif isinstance(json_data, str):
+        encoded = json_data.encode()
+    else:
+        encoded = bytes(json_data)
+    return hashlib.blake2b(encoded, digest_size=FINGERPRINT_SIZE).digest()
+
+
+def _key_text(value):
+    # Keys are stored as text whether they were passed as str or bytes.
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode()
+    return str(value)
+
+
+# -----------------------------------------------------------------------------
+# G2FingerprintStore class
+# -----------------------------------------------------------------------------
+
+
+class G2FingerprintStore(object):
+    """Fingerprints of the records sent to the engine, in an SQLite file
+
+    A reload only needs to send the records that are new or changed since
+    the last load.  The store maps each (DATA_SOURCE, RECORD_ID) to the
+    fingerprint of the document last added, so the unchanged records can be
+    skipped without an engine call.  Fingerprints are only stored once the
+    engine has accepted the record.  Writes are buffered and committed
+    batch_size at a time; the buffered ones are visible to unchanged() at
+    once.  Worker processes may each open the same file.
+
+    Attributes:
+        path: path of the SQLite file
+        canonical: True if fingerprints are computed from the canonical JSON
+    """
+
+    def __init__(self, path, canonical=True, batch_size=1000, timeout=60.0):
+        # type: (str, bool, int, float) -> None
+        """G2FingerprintStore class initialization
+
+        Args:
+            path: path of the SQLite file, created if it does not exist
+            canonical: passed to fingerprint()
+            batch_size: writes buffered before they are committed
+            timeout: seconds to wait for another process holding the file
+        """
+
+        self.path = path
+        self.canonical = canonical
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " data_source TEXT NOT NULL,"
+            " record_id TEXT NOT NULL,"
+            " fingerprint BLOB NOT NULL,"
+            " PRIMARY KEY (data_source, record_id)"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def fingerprint(self, json_data):
+        # type: (object) -> bytes
+        """Fingerprint of a JSON document, see fingerprint()"""
+
+        return fingerprint(json_data, self.canonical)
+
+    def get(self, data_source, record_id):
+        # type: (str, str) -> bytes
+        """The stored fingerprint of a record, or None"""
+
+        key = (_key_text(data_source), _key_text(record_id))
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            row = self._connection.execute(
+                "SELECT fingerprint FROM fingerprints"
+                " WHERE data_source = ? AND record_id = ?",
+                key,
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def unchanged(self, data_source, record_id, record_fingerprint):
+        # type: (str, str, bytes) -> bool
+        """True if the record was stored with this fingerprint"""
+
+        return self.get(data_source, record_id) == record_fingerprint
+
+    def put(self, data_source, record_id, record_fingerprint):
+        # type: (str, str, bytes) -> None
+        """Store the fingerprint of a record the engine accepted"""
+
+        self._buffer(data_source, record_id, record_fingerprint)
+
+    def delete(self, data_source, record_id):
+        # type: (str, str) -> None
+        """Forget a record, e.g. one deleted from the engine"""
+
+        self._buffer(data_source, record_id, None)
+
+    def _buffer(self, data_source, record_id, record_fingerprint):
+        key = (_key_text(data_source), _key_text(record_id))
+        with self._lock:
+            self._pending[key] = record_fingerprint
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        # type: () -> None
+        """Commit the buffered writes"""
+
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        puts = []
+        deletes = []
+        for key, record_fingerprint in self._pending.items():
+            if record_fingerprint is None:
+                deletes.append(key)
+            else:
+                puts.append(key + (record_fingerprint,))
+        with self._connection:
+            if puts:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO fingerprints"
+                    " (data_source, record_id, fingerprint) VALUES (?, ?, ?)",
+                    puts,
+                )
+            if deletes:
+                self._connection.executemany(
+                    "DELETE FROM fingerprints"
+                    " WHERE data_source = ? AND record_id = ?",
+                    deletes,
+                )
+        self._pending.clear()
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM fingerprints"
+            ).fetchone()[0]
+
+    def close(self):
+        # type: () -> None
+        """Commit the buffered writes and close the file"""
+
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -4,49 +4,23 @@ import os
 import functools
 import warnings
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Exception import G2Exception
+from .G2Library import RESIZE_FUNC_TYPE, G2ReturnBuffer, load_library
+from .G2NativeApi import (
+    G2NativeApi,
+    prepare_string_argument,
 )
 
 __all__ = ["G2Hasher"]
 SENZING_PRODUCT_ID = "5045"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
+tls_var = G2ReturnBuffer()
 
-    def __init__(self):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {}".format(self.buf))
-
-
-tls_var = MyBuffer()
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
+# The hasher library is separate from the G2 library's allocator, so its
+# responses are still grown by a Python resize callback.  tls_var.resize works
+# on the calling thread's buffer, so one callback serves every instance.
+_RESIZE_FUNC = RESIZE_FUNC_TYPE(tls_var.resize)
 
 
 def deprecated(instance):
@@ -71,6 +45,31 @@ def deprecated(instance):
     return the_decorator
 
 
+_PROTOTYPES = {
+    "G2Hasher_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2Hasher_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2Hasher_initWithConfig": ([c_char_p, c_char_p, c_char_p, c_int], c_int),
+    "G2Hasher_clearLastException": ([], None),
+    "G2Hasher_getLastExceptionCode": ([], c_int),
+    "G2Hasher_exportTokenLibrary": (
+        [POINTER(c_char_p), POINTER(c_size_t), RESIZE_FUNC_TYPE],
+        c_int,
+    ),
+    "G2Hasher_process": (
+        [c_char_p, POINTER(c_char_p), POINTER(c_size_t), RESIZE_FUNC_TYPE],
+        c_int,
+    ),
+    "G2Hasher_destroy": ([], c_int),
+}
+
+# The hasher library is optional, so its methods check _hasherSupported and are
+# written out rather than generated.
+
+_NATIVE_API = G2NativeApi(
+    "G2Hasher", "G2Hasher_getLastException", tls_var, [], _PROTOTYPES
+)
+
+
 # -----------------------------------------------------------------------------
 # G2Hasher class
 # -----------------------------------------------------------------------------
@@ -81,6 +80,7 @@ class G2Hasher(object):
 
     Attributes:
         _lib_handle: A boolean indicating if we like SPAM or not.
+        _native: typed native functions bound once from _lib_handle
         _resize_func_def: resize function definition
         _resize_func: resize function pointer
         _hasher_name: CME hasher name
@@ -89,16 +89,15 @@ class G2Hasher(object):
 
     def __init__(self, *args, **kwargs):
         try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2Hasher.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2Hasher.so")
+            self._lib_handle, self._native = load_library(
+                "G2Hasher", _NATIVE_API.prototypes
+            )
             self._hasherSupported = True
         except OSError:
             self._hasherSupported = False
 
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
+        self._resize_func_def = RESIZE_FUNC_TYPE
+        self._resize_func = _RESIZE_FUNC
 
     # -----------------------------------------------------------------------------
     # Internal helper methods
@@ -108,19 +107,7 @@ class G2Hasher(object):
         # type: (str) -> str
         """Internal processing function"""
 
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
+        return prepare_string_argument(stringToPrepare)
 
     # -----------------------------------------------------------------------------
     # Public API
@@ -141,8 +128,7 @@ class G2Hasher(object):
         if self._debug:
             print("Initializing G2 Hasher")
 
-        self._lib_handle.G2Hasher_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2Hasher_init(
+        ret_code = self._native.G2Hasher_init(
             self._hasher_name, self._ini_params, self._debug
         )
 
@@ -150,8 +136,7 @@ class G2Hasher(object):
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     @deprecated(1502)
     def initWithConfigV2(self, hasher_name_, ini_params_, config_, debug_):
@@ -172,13 +157,7 @@ class G2Hasher(object):
         if self._debug:
             print("Initializing G2 Hasher")
 
-        self._lib_handle.G2Hasher_initWithConfig.argtypes = [
-            c_char_p,
-            c_char_p,
-            c_char_p,
-            c_int,
-        ]
-        ret_code = self._lib_handle.G2Hasher_initWithConfig(
+        ret_code = self._native.G2Hasher_initWithConfig(
             self._hasher_name, self._ini_params, self._config, self._debug
         )
 
@@ -186,8 +165,7 @@ class G2Hasher(object):
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     def reportHasherNotIncluded(self, *args, **kwargs):
         raise G2Exception("Hashing functions not available")
@@ -200,17 +178,13 @@ class G2Hasher(object):
             None
         """
 
-        self._lib_handle.G2Hasher_clearLastException.restype = None
-        self._lib_handle.G2Hasher_clearLastException.argtypes = []
-        self._lib_handle.G2Hasher_clearLastException()
+        self._native.G2Hasher_clearLastException()
 
     @deprecated(1504)
     def getLastException(self, *args, **kwargs):
         """Gets the last exception"""
 
-        self._lib_handle.G2Hasher_getLastException.restype = c_int
-        self._lib_handle.G2Hasher_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        self._native.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
         resultString = tls_var.buf.value.decode("utf-8")
         return resultString
 
@@ -218,9 +192,7 @@ class G2Hasher(object):
     def getLastExceptionCode(self, *args, **kwargs):
         """Gets the last exception code"""
 
-        self._lib_handle.G2Hasher_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2Hasher_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2Hasher_getLastExceptionCode()
+        exception_code = self._native.G2Hasher_getLastExceptionCode()
         return exception_code
 
     def exportTokenLibrary(self, response, *args, **kwargs):
@@ -229,21 +201,11 @@ class G2Hasher(object):
             self.reportHasherNotIncluded()
         responseBuf = c_char_p(addressof(tls_var.buf))
         responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Hasher_exportTokenLibrary.argtypes = [
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Hasher_exportTokenLibrary(
+        ret_code = self._native.G2Hasher_exportTokenLibrary(
             pointer(responseBuf), pointer(responseSize), self._resize_func
         )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Hasher has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
         response += responseBuf.value
 
@@ -254,26 +216,15 @@ class G2Hasher(object):
         _record = self.prepareStringArgument(record)
         responseBuf = c_char_p(addressof(tls_var.buf))
         responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Hasher_process.argtypes = [
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Hasher_process(
+        ret_code = self._native.G2Hasher_process(
             _record, pointer(responseBuf), pointer(responseSize), self._resize_func
         )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Hasher has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Hasher_getLastException(tls_var.buf, sizeof(tls_var.buf))
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
         response += responseBuf.value
 
     def destroy(self, *args, **kwargs):
         """shuts down G2Module"""
         if self._hasherSupported:
-            self._lib_handle.G2Hasher_destroy()
+            self._native.G2Hasher_destroy()
@@ -0,0 +1,539 @@
+from ctypes import *
+import os
+import threading
+import weakref
+
+__all__ = ["G2BufferPool", "copy_response"]
+
+# Signature of the resize callback handed to every native call that returns a
+# variable sized response:  void* resize(void* buffer, size_t size)
+
+RESIZE_FUNC_TYPE = CFUNCTYPE(c_void_p, c_void_p, c_size_t)
+
+# The G2 library's own allocator.  Response buffers are allocated, grown and
+# freed with it, so the native code resizes them without calling back into
+# Python.
+
+ALLOCATOR_PROTOTYPES = {
+    "G2_malloc": ([c_size_t], c_void_p),
+    "G2_realloc": ([c_void_p, c_size_t], c_void_p),
+    "G2_free": ([c_void_p], None),
+}
+
+# -----------------------------------------------------------------------------
+# Native function binding
+# -----------------------------------------------------------------------------
+
+
+class G2NativeFunctions(object):
+    """Typed native functions bound from a single library handle.
+
+    Each attribute is a ctypes function pointer named after its symbol
+    (e.g. G2_addRecord) whose argtypes and restype were set exactly once when
+    it was bound.  Symbols missing from the loaded library are not bound, so
+    using one raises AttributeError, as calling it on the raw handle would.
+    """
+
+
+_native_tables = weakref.WeakKeyDictionary()
+_native_tables_lock = threading.Lock()
+
+
+def bind_prototypes(lib_handle, prototypes):
+    # type: (CDLL, dict) -> G2NativeFunctions
+    """Resolve and type the given symbols once per library handle
+    Args:
+        lib_handle: the ctypes library handle the symbols come from
+        prototypes: dict of symbol name to an (argtypes, restype) tuple
+
+    Return:
+        G2NativeFunctions: the table of bound functions for lib_handle
+    """
+
+    with _native_tables_lock:
+        native = _native_tables.get(lib_handle)
+        if native is None:
+            native = G2NativeFunctions()
+            _native_tables[lib_handle] = native
+        for symbol, (argtypes, restype) in prototypes.items():
+            if symbol in native.__dict__:
+                continue
+            try:
+                # Indexing returns a private function pointer, so the types set
+                # here are never shared with, or changed by, other users of
+                # the handle.
+                function = lib_handle[symbol]
+            except AttributeError:
+                continue
+            function.argtypes = argtypes
+            function.restype = restype
+            setattr(native, symbol, function)
+    return native
+
+
+# -----------------------------------------------------------------------------
+# Library loading
+# -----------------------------------------------------------------------------
+
+# Library files loaded for each library name, by platform.
+
+LIBRARY_FILES = {
+    "G2": "G2.dll" if os.name == "nt" else "libG2.so",
+    "G2Hasher": "G2Hasher.dll" if os.name == "nt" else "libG2Hasher.so",
+}
+
+_library_paths = {}
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+def set_library_path(name, path):
+    # type: (str, str) -> None
+    """Load a library from an alternate path, e.g. a stub library in tests
+    Args:
+        name: the library name, "G2" or "G2Hasher"
+        path: the file to load, or None to restore the default
+
+    Objects created afterwards use the library at path.  Objects that already
+    exist keep the handle they were created with.
+    """
+
+    with _libraries_lock:
+        if path is None:
+            _library_paths.pop(name, None)
+        else:
+            _library_paths[name] = path
+        for key in [key for key in _libraries if key[0] == name]:
+            del _libraries[key]
+
+
+def load_library(name, prototypes):
+    # type: (str, dict) -> tuple
+    """Load a library once per process and bind its typed symbol table
+    Args:
+        name: the library name, "G2" or "G2Hasher"
+        prototypes: dict of symbol name to an (argtypes, restype) tuple
+
+    Return:
+        tuple: the shared (CDLL, G2NativeFunctions) for the library
+
+    Raises OSError if the library cannot be loaded.  Failures are not cached,
+    so a later call retries once the environment has been set up.
+    """
+
+    key = (name, id(prototypes))
+    loaded = _libraries.get(key)
+    if loaded is not None and loaded[2] is prototypes:
+        return loaded[:2]
+    with _libraries_lock:
+        lib_handle = None
+        for (loaded_name, _), loaded in _libraries.items():
+            if loaded_name == name:
+                lib_handle = loaded[0]
+                break
+        if lib_handle is None:
+            lib_handle = cdll.LoadLibrary(_library_paths.get(name, LIBRARY_FILES[name]))
+        loaded = (lib_handle, bind_prototypes(lib_handle, prototypes), prototypes)
+        _libraries[key] = loaded
+    return loaded[:2]
+
+
+# -----------------------------------------------------------------------------
+# Return buffers
+# -----------------------------------------------------------------------------
+
+# The native calls report the capacity of the return buffer, not the length of
+# the response written into it, so responses are measured with the C runtime's
+# strnlen() rather than by copying them out with buf.value.
+
+_c_runtime = bind_prototypes(
+    cdll.msvcrt if os.name == "nt" else CDLL(None),
+    {"strnlen": ([c_void_p, c_size_t], c_size_t)},
+)
+
+
+def copy_response(response):
+    # type: (memoryview) -> bytes
+    """Copy of a response, kept after the next call of a zero-copy instance
+
+    Args:
+        response: a memoryview returned in zero-copy mode, or the bytes or
+            bytearray response of a copying instance
+    Return:
+        bytes: the response, response itself if it is already bytes
+    """
+
+    if type(response) is bytes:
+        return response
+    return bytes(response)
+
+
+class G2NativeBuffer(object):
+    """Response buffer allocated, grown and freed by the G2 library
+
+    The native call is passed byref(ptr), byref(size) and resize, and updates
+    ptr and size in place when it reallocates the buffer.
+
+    Attributes:
+        ptr: c_void_p holding the address of the buffer
+        size: c_size_t holding the capacity of the buffer in bytes
+        resize: the native G2_realloc, typed as the resize callback
+        length: length of the last response read with value() or view()
+        calls: calls served by a pooled buffer since one needed its capacity
+        acquired_size: capacity when the buffer was taken from its pool
+        sizes: response size statistics of the method that took it
+    """
+
+    _free = None
+
+    def __init__(self, native, size=65535):
+        self.resize = cast(native.G2_realloc, RESIZE_FUNC_TYPE)
+        self._malloc = native.G2_malloc
+        self.ptr = c_void_p(self._malloc(size))
+        if not self.ptr.value:
+            raise MemoryError("G2_malloc failed to allocate {0} bytes".format(size))
+        self.size = c_size_t(size)
+        self._free = native.G2_free
+        self._view = None
+        self.length = None
+        self.calls = 0
+        self.acquired_size = size
+        self.sizes = None
+
+    def __del__(self):
+        if self._free is not None:
+            self._free(self.ptr)
+
+    def value(self):
+        # type: () -> bytes
+        """Copy of the response in the buffer"""
+
+        response = string_at(self.ptr.value)
+        self.length = len(response)
+        return response
+
+    def view(self):
+        # type: () -> memoryview
+        """Read-only view of the response in the buffer without copying it
+
+        The view keeps the buffer alive, and a buffer with a view is never
+        reallocated or reused, so the memory stays valid for as long as the
+        view exists.
+        """
+        # The array, and so every view of it, keeps the buffer alive.
+        array = (c_char * self.size.value).from_address(self.ptr.value)
+        array.owner = self
+        self._view = weakref.ref(array)
+        self.length = _c_runtime.strnlen(self.ptr, self.size.value)
+        return memoryview(array).cast("B")[: self.length].toreadonly()
+
+    def in_use(self):
+        # type: () -> bool
+        """True if a view of the buffer still exists"""
+
+        return self._view is not None and self._view() is not None
+
+    def shrink(self, size):
+        # type: (int) -> None
+        """Reallocate the buffer down to size bytes"""
+
+        ptr = self.resize(self.ptr, size)
+        if ptr:
+            self.ptr.value = ptr
+            self.size.value = size
+
+    def reserve(self, size):
+        # type: (int) -> bool
+        """Replace the buffer with an empty one of size bytes
+
+        Unlike growing it with G2_realloc, the old contents are not copied.
+        Returns False, keeping the old buffer, if the allocation fails.
+        """
+        ptr = self._malloc(size)
+        if not ptr:
+            return False
+        self._free(self.ptr)
+        self.ptr.value = ptr
+        self.size.value = size
+        return True
+
+
+def _capacity(buffer):
+    return buffer.size.value
+
+
+class _G2ResponseSizes(object):
+    """Running estimate of the response sizes of one method
+
+    The estimate is mean + 2 * deviation, where both are exponentially
+    weighted like TCP's smoothed round-trip time and its variation.  For
+    the roughly normal spread of response sizes that is close to the 95th
+    percentile.
+    """
+
+    __slots__ = ("calls", "resizes", "mean", "deviation")
+
+    def __init__(self, size):
+        self.calls = 0
+        self.resizes = 0
+        self.mean = float(size)
+        self.deviation = 0.0
+
+    def add(self, length):
+        error = length - self.mean
+        self.mean += error / 8
+        self.deviation += (abs(error) - self.deviation) / 4
+
+    def estimate(self):
+        return int(self.mean + 2 * self.deviation)
+
+
+class G2BufferPool(object):
+    """Bounded pool of the native response buffers used by one instance
+
+    A buffer is taken from the pool for the duration of a native call and
+    returned afterwards, so concurrent calls on many threads share a few
+    buffers and none is pinned by a thread.  A buffer that a zero-copy view
+    still references is not returned; it is freed when the view is.
+
+    When adaptive, the pool keeps a running estimate of each method's
+    response size and hands out a buffer at least that large, so methods
+    with large responses are rarely grown by the native code mid-call.
+
+    Args:
+        max_pooled_bytes: largest total capacity of the idle buffers kept in
+            the pool.  Buffers that do not fit are shrunk or freed.
+        shrink_size: capacity of new buffers, and the capacity oversized
+            buffers are shrunk back to
+        shrink_after: number of calls an oversized buffer may serve without
+            a response that needs it before it is shrunk
+        adaptive: size buffers from the estimated response size of the method
+        max_allocated_bytes: buffers are only sized up front while the total
+            capacity of the pool's idle and borrowed buffers stays within it
+    """
+
+    def __init__(
+        self,
+        max_pooled_bytes=64 * 1024 * 1024,
+        shrink_size=65535,
+        shrink_after=100,
+        adaptive=True,
+        max_allocated_bytes=256 * 1024 * 1024,
+    ):
+        self.max_pooled_bytes = max_pooled_bytes
+        self.shrink_size = shrink_size
+        self.shrink_after = shrink_after
+        self.adaptive = adaptive
+        self.max_allocated_bytes = max_allocated_bytes
+        self._native = None
+        self._lock = threading.Lock()
+        self._idle = []
+        self._pooled_bytes = 0
+        self._allocated_bytes = 0
+        self._sizes = {}
+
+    def bind(self, native):
+        # type: (G2NativeFunctions) -> G2BufferPool
+        """Allocate buffers with the G2_malloc, G2_realloc and G2_free of native"""
+
+        if self._native is None:
+            self._native = native
+        return self
+
+    def acquire(self, method=None):
+        # type: (str) -> G2NativeBuffer
+        """Take a buffer from the pool for a call of method
+
+        Args:
+            method: name of the calling method, used to size the buffer and
+                to report its statistics
+        """
+
+        size = self.shrink_size
+        sizes = None
+        if method is not None:
+            sizes = self._sizes.get(method)
+            if sizes is None:
+                sizes = self._sizes.setdefault(method, _G2ResponseSizes(size))
+            sizes.calls += 1
+            if self.adaptive:
+                # Round up to whole pages so the estimate does not cause a
+                # reallocation for every few bytes it drifts.
+                size = (sizes.estimate() | 4095) + 1
+
+        with self._lock:
+            # Take the smallest idle buffer that is large enough, or else the
+            # largest one.
+            buffer = None
+            if self._idle:
+                fits = [idle for idle in self._idle if idle.size.value >= size]
+                if fits:
+                    buffer = min(fits, key=_capacity)
+                else:
+                    buffer = max(self._idle, key=_capacity)
+                self._idle.remove(buffer)
+            if buffer is not None:
+                self._pooled_bytes -= buffer.size.value
+                growth = size - buffer.size.value
+            else:
+                growth = size
+            if growth > 0:
+                if self._allocated_bytes + growth > self.max_allocated_bytes:
+                    growth = 0
+                    if buffer is None:
+                        size = self.shrink_size
+                        growth = size
+                self._allocated_bytes += growth
+
+        if buffer is None:
+            buffer = G2NativeBuffer(self._native, size)
+        elif growth > 0 and not buffer.reserve(size):
+            with self._lock:
+                self._allocated_bytes -= growth
+        buffer.length = None
+        buffer.acquired_size = buffer.size.value
+        buffer.sizes = sizes
+        return buffer
+
+    def release(self, buffer):
+        # type: (G2NativeBuffer) -> None
+        """Return a buffer taken with acquire to the pool"""
+
+        size = buffer.size.value
+        grown = size - buffer.acquired_size
+        sizes = buffer.sizes
+        if sizes is not None:
+            if grown > 0:
+                sizes.resizes += 1
+            if buffer.length is not None:
+                sizes.add(buffer.length)
+
+        if buffer.in_use():
+            with self._lock:
+                self._allocated_bytes -= buffer.acquired_size
+            return
+
+        self.trim(buffer, grown > 0)
+        size = buffer.size.value
+        if (
+            size > self.shrink_size
+            and self._pooled_bytes + size > self.max_pooled_bytes
+        ):
+            buffer.shrink(self.shrink_size)
+            buffer.calls = 0
+        with self._lock:
+            self._allocated_bytes += buffer.size.value - buffer.acquired_size
+            if self._pooled_bytes + buffer.size.value <= self.max_pooled_bytes:
+                self._idle.append(buffer)
+                self._pooled_bytes += buffer.size.value
+            else:
+                # Freed once the caller drops it.
+                self._allocated_bytes -= buffer.size.value
+
+    def trim(self, buffer, grown=False):
+        # type: (G2NativeBuffer, bool) -> None
+        """Count a call served by a buffer, and shrink the buffer back to
+        shrink_size once it served shrink_after calls in a row without a
+        response that needed its capacity
+
+        release() trims every buffer returned to the pool; a caller keeping
+        a buffer across calls trims it after each one.
+
+        Args:
+            buffer: the buffer, with the length of the call's response
+            grown: True if the native code grew the buffer during the call
+        """
+
+        if grown or (buffer.length or 0) >= self.shrink_size:
+            buffer.calls = 0
+        else:
+            buffer.calls += 1
+        if buffer.size.value > self.shrink_size and buffer.calls >= self.shrink_after:
+            buffer.shrink(self.shrink_size)
+            buffer.calls = 0
+
+    def pooled_bytes(self):
+        # type: () -> int
+        """Total capacity of the idle buffers in the pool"""
+
+        return self._pooled_bytes
+
+    def allocated_bytes(self):
+        # type: () -> int
+        """Total capacity of the idle and borrowed buffers of the pool"""
+
+        return self._allocated_bytes
+
+    def stats(self):
+        # type: () -> dict
+        """Response statistics of each method that used the pool
+
+        Return:
+            dict: method name to a dict of its calls, the number of calls in
+                which the native code had to grow the buffer (resizes) and
+                the current size estimate in bytes
+        """
+        return dict(
+            (
+                method,
+                {
+                    "calls": sizes.calls,
+                    "resizes": sizes.resizes,
+                    "estimate": sizes.estimate(),
+                },
+            )
+            for method, sizes in self._sizes.items()
+        )
+
+    def clear(self):
+        # type: () -> None
+        """Free every idle buffer in the pool"""
+
+        with self._lock:
+            for buffer in self._idle:
+                self._allocated_bytes -= buffer.size.value
+            self._idle = []
+            self._pooled_bytes = 0
+
+
+class G2ReturnBuffer(threading.local):
+    """Thread-local buffer for fixed size responses and exceptions
+
+    Attributes:
+        buf: the ctypes character buffer for the current thread
+        bufSize: the capacity of buf in bytes
+    """
+
+    def __init__(self):
+        self.buf = create_string_buffer(65535)
+        self.bufSize = sizeof(self.buf)
+
+    def resize(self, buf_, size_):
+        """callback function that resizes buf when it is too small
+        Args:
+        size_: size the return buffer needs to be
+        """
+        try:
+            if not self.buf:
+                self.buf = create_string_buffer(size_)
+                self.bufSize = size_
+            elif self.bufSize < size_:
+                foo = self.buf
+                self.buf = create_string_buffer(size_)
+                self.bufSize = size_
+                memmove(self.buf, foo, sizeof(foo))
+        except AttributeError:
+            self.buf = create_string_buffer(size_)
+            self.bufSize = size_
+        return addressof(self.buf)
+
+    def view(self):
+        # type: () -> memoryview
+        """Read-only view of the response in buf without copying it
+
+        The view shares memory with the buffer, so it is only valid until the
+        next native call on this thread.  Use copy_response(view) to keep a
+        copy.
+        """
+        size = _c_runtime.strnlen(self.buf, self.bufSize)
+        return memoryview(self.buf).cast("B")[:size].toreadonly()
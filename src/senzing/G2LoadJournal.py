@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+
+__all__ = ["G2LoadJournal"]
+
+# -----------------------------------------------------------------------------
+# Progress of one input
+# -----------------------------------------------------------------------------
+
+
+class _Progress(object):
+    """Lines of one input that are committed
+
+    Lines 1 to committed are all done.  The loader threads finish out of
+    order, so the ranges done after a line that is still running are kept
+    as sorted, disjoint [start, end) ranges until the gap before them closes.
+    """
+
+    __slots__ = ("committed", "ranges", "complete")
+
+    def __init__(self, committed=0, ranges=None, complete=False):
+        self.committed = committed
+        self.ranges = ranges or []
+        self.complete = complete
+
+    def add(self, start, end):
+        # Ranges may overlap the ones already done, e.g. a chunk whose lines
+        # were partly done before a restart.
+        start = max(start, self.committed + 1)
+        if start >= end:
+            return
+        merged = []
+        for range_start, range_end in sorted(self.ranges + [[start, end]]):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        if merged[0][0] == self.committed + 1:
+            self.committed = merged.pop(0)[1] - 1
+        self.ranges = merged
+
+    def done(self, line_number):
+        if line_number <= self.committed:
+            return True
+        for start, end in self.ranges:
+            if line_number < start:
+                return False
+            if line_number < end:
+                return True
+        return False
+
+
+# -----------------------------------------------------------------------------
+# G2LoadJournal class
+# -----------------------------------------------------------------------------
+
+
+class G2LoadJournal(object):
+    """Crash safe journal of the lines of each input that have been loaded
+
+    A loader commits the lines of a chunk once every record of the chunk has
+    been added, failed or skipped.  The journal keeps, for each input, a low
+    watermark below which every line is committed and the few ranges
+    committed out of order above it.  A restarted load skips the committed
+    lines, so it resumes where the previous one stopped without adding a
+    committed record again.
+
+    The journal is written at most once per interval, to a temporary file
+    that replaces the journal file, so a crash leaves the last complete
+    journal.  Records added after the last write are added again on restart.
+
+    Attributes:
+        path: path of the journal file
+        interval: most seconds between writes
+    """
+
+    def __init__(self, path, interval=1.0):
+        # type: (str, float) -> None
+        """G2LoadJournal class initialization
+
+        Args:
+            path: path of the journal file, read if it exists
+            interval: most seconds between writes
+        """
+
+        self.path = path
+        self.interval = interval
+        self._inputs = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._written = time.monotonic()
+        if os.path.exists(path):
+            with open(path) as file:
+                document = json.load(file)
+            for name, progress in document["inputs"].items():
+                self._inputs[name] = _Progress(
+                    progress["committed"], progress["ranges"], progress["complete"]
+                )
+
+    def _progress(self, name):
+        progress = self._inputs.get(name)
+        if progress is None:
+            progress = self._inputs[name] = _Progress()
+        return progress
+
+    @staticmethod
+    def input_name(path):
+        # type: (str) -> str
+        """Name of a file in the journal: its absolute path"""
+
+        return os.path.abspath(path)
+
+    def committed(self, name):
+        # type: (str) -> int
+        """Number of leading lines of an input that are committed"""
+
+        with self._lock:
+            return self._progress(name).committed
+
+    def complete(self, name):
+        # type: (str) -> bool
+        """True if every line of an input is committed"""
+
+        with self._lock:
+            return self._progress(name).complete
+
+    def filter(self, name, line_number, lines):
+        # type: (str, int, list) -> list
+        """The lines of a chunk with the committed ones blanked out
+
+        Args:
+            name: name of the input
+            line_number: line number of the first line of the chunk
+            lines: the lines of the chunk
+
+        Return:
+            list: the lines, or None if they are all committed
+        """
+
+        with self._lock:
+            progress = self._progress(name)
+            end = line_number + len(lines)
+            if end - 1 <= progress.committed:
+                return None
+            if line_number > progress.committed and not progress.ranges:
+                return lines
+            done = [progress.done(line_number + offset) for offset in range(len(lines))]
+        if all(done):
+            return None
+        return [b"" if line_done else line for line_done, line in zip(done, lines)]
+
+    def commit(self, name, line_number, count):
+        # type: (str, int, int) -> None
+        """Commit count lines of an input starting at line_number"""
+
+        with self._lock:
+            self._progress(name).add(line_number, line_number + count)
+            self._dirty = True
+            if time.monotonic() - self._written >= self.interval:
+                self._write()
+
+    def finish(self, name):
+        # type: (str) -> None
+        """Mark every line of an input committed"""
+
+        with self._lock:
+            self._progress(name).complete = True
+            self._dirty = True
+            self._write()
+
+    def flush(self):
+        # type: () -> None
+        """Write the journal if it changed since it was last written"""
+
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        document = {
+            "inputs": {
+                name: {
+                    "committed": progress.committed,
+                    "ranges": progress.ranges,
+                    "complete": progress.complete,
+                }
+                for name, progress in self._inputs.items()
+            }
+        }
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(document, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._dirty = False
+        self._written = time.monotonic()
+
+    def close(self):
+        # type: () -> None
+        """Write the journal"""
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
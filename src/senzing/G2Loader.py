@@ -0,0 +1,958 @@
+import bisect
+import bz2
+import collections
+import gzip
+import json
+import lzma
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from .G2Bulk import SKIPPED, bulk_map
+from .G2Engine import G2Engine
+from .G2Exception import G2BadInputException, G2Exception
+from .G2Fingerprint import G2FingerprintStore
+from .G2LoadJournal import G2LoadJournal
+
+__all__ = ["G2Loader", "G2ProcessLoader"]
+
+# -----------------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------------
+
+# Compressed files are recognized by their leading bytes, not their names.
+
+_COMPRESSION_MAGIC = [
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+]
+
+
+def open_records(path):
+    # type: (str) -> io.BufferedIOBase
+    """Open a JSON lines file, decompressing gzip, bz2 and xz files
+
+    Return:
+        a binary file object yielding the uncompressed lines
+    """
+
+    with open(path, "rb") as file:
+        magic = file.read(6)
+    for prefix, opener in _COMPRESSION_MAGIC:
+        if magic.startswith(prefix):
+            return opener(path, "rb")
+    return open(path, "rb")
+
+
+def read_chunks(file, chunk_size=1048576):
+    # type: (io.BufferedIOBase, int) -> generator
+    """Split a binary file into chunks of whole lines
+
+    Each block read is split on newlines at once.  A line that spans blocks is
+    carried over to the next chunk.
+
+    Return:
+        generator of (line_number, lines): the 1-based number of the first
+            line of the chunk and the list of its lines, without newlines
+    """
+
+    line_number = 1
+    carry = b""
+    while True:
+        block = file.read(chunk_size)
+        if not block:
+            break
+        end = block.rfind(b"\n")
+        if end < 0:
+            carry += block
+            continue
+        lines = (carry + block[:end]).split(b"\n")
+        carry = block[end + 1 :]
+        yield line_number, lines
+        line_number += len(lines)
+    if carry:
+        yield line_number, [carry]
+
+
+# -----------------------------------------------------------------------------
+# Parsing
+# -----------------------------------------------------------------------------
+
+# Plain string values of the two keys.  Values with escapes, numbers and keys
+# that appear more than once are left to json.loads().
+
+_DATA_SOURCE = re.compile(rb'"DATA_SOURCE"\s*:\s*"([^"\\]*)"')
+_RECORD_ID = re.compile(rb'"RECORD_ID"\s*:\s*"([^"\\]*)"')
+
+
+class G2LoaderRecord(object):
+    """One record read from a JSON lines file
+
+    Attributes:
+        data_source: DATA_SOURCE of the record, as bytes
+        record_id: RECORD_ID of the record, as bytes
+        line: the JSON document, as bytes
+        line_number: 1-based line number of the record in its file
+    """
+
+    __slots__ = ("data_source", "record_id", "line", "line_number")
+
+    def __init__(self, data_source, record_id, line, line_number):
+        self.data_source = data_source
+        self.record_id = record_id
+        self.line = line
+        self.line_number = line_number
+
+    def __repr__(self):
+        return "G2LoaderRecord({0!r}, {1!r}, line {2})".format(
+            self.data_source, self.record_id, self.line_number
+        )
+
+
+def record_line(record, attempts, exception):
+    # type: (G2LoaderRecord, int, Exception) -> bytes
+    """G2DeadLetterFile format writing the JSON line of a failed record"""
+
+    return record.line
+
+
+def _add_changed(add_record, fingerprints, record, load_id):
+    # type: (function, G2FingerprintStore, G2LoaderRecord, str) -> object
+    """Add a record with add_record, e.g. G2Engine.addRecord, unless its
+    fingerprint is stored, then store it
+
+    Return:
+        SKIPPED if the record is unchanged, otherwise None
+    """
+
+    record_fingerprint = fingerprints.fingerprint(record.line)
+    if fingerprints.unchanged(record.data_source, record.record_id, record_fingerprint):
+        return SKIPPED
+    add_record(record.data_source, record.record_id, record.line, load_id)
+    fingerprints.put(record.data_source, record.record_id, record_fingerprint)
+    return None
+
+
+def _key_value(document, key, default):
+    value = document.get(key, default)
+    if value is None:
+        raise G2BadInputException("Record has no {0}".format(key))
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return str(value).encode("utf-8")
+
+
+def parse_record(line, line_number, data_source=None):
+    # type: (bytes, int, str) -> G2LoaderRecord
+    """Extract DATA_SOURCE and RECORD_ID from a JSON line
+
+    The keys are found with a regular expression when they appear once with
+    a plain string value, and by parsing the whole line otherwise.
+
+    Args:
+        line: the JSON document
+        line_number: line number of the record in its file
+        data_source: DATA_SOURCE used for records without one
+
+    Raises G2BadInputException if the line is not a JSON object or lacks a key.
+    """
+
+    if line.count(b'"DATA_SOURCE"') == 1 and line.count(b'"RECORD_ID"') == 1:
+        data_source_match = _DATA_SOURCE.search(line)
+        record_id_match = _RECORD_ID.search(line)
+        if data_source_match and record_id_match:
+            return G2LoaderRecord(
+                data_source_match.group(1), record_id_match.group(1), line, line_number
+            )
+    try:
+        document = json.loads(line)
+    except ValueError as ex:
+        raise G2BadInputException("Invalid JSON: {0}".format(ex))
+    if not isinstance(document, dict):
+        raise G2BadInputException("Record is not a JSON object")
+    return G2LoaderRecord(
+        _key_value(document, "DATA_SOURCE", data_source),
+        _key_value(document, "RECORD_ID", None),
+        line,
+        line_number,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Pipeline
+# -----------------------------------------------------------------------------
+
+
+class G2LoaderStage(object):
+    """Throughput of one stage of a G2Loader
+
+    Attributes:
+        name: name of the stage
+        records: records the stage has finished
+        seconds: time its threads spent working, excluding time waiting on
+            the other stages
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.records = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, records, seconds):
+        # type: (int, float) -> None
+        """Count records finished in seconds of work"""
+
+        with self._lock:
+            self.records += records
+            self.seconds += seconds
+
+    def rate(self):
+        # type: () -> float
+        """Records per second of work"""
+
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return "{0:<8} {1:10d} records {2:10.1f} s {3:12.0f} records/s".format(
+            self.name, self.records, self.seconds, self.rate()
+        )
+
+
+# Marks the end of a queue's input.
+
+_DONE = object()
+
+
+class _ChunkTracker(object):
+    """Records of the chunks being loaded, to commit each chunk to a
+    G2LoadJournal once all its records are done"""
+
+    def __init__(self, journal, name):
+        self.journal = journal
+        self.name = name
+        self._starts = []
+        self._remaining = {}
+
+    def add(self, line_number, count, records):
+        # type: (int, int, int) -> None
+        """Track a chunk of count lines with the given number of records"""
+
+        if not records:
+            self.journal.commit(self.name, line_number, count)
+            return
+        bisect.insort(self._starts, line_number)
+        self._remaining[line_number] = [records, count]
+
+    def done(self, line_number):
+        # type: (int) -> None
+        """Count the record of a line done, committing its chunk if it was
+        the last one"""
+
+        index = bisect.bisect_right(self._starts, line_number) - 1
+        start = self._starts[index]
+        chunk = self._remaining[start]
+        chunk[0] -= 1
+        if not chunk[0]:
+            del self._starts[index]
+            del self._remaining[start]
+            self.journal.commit(self.name, start, chunk[1])
+
+
+class G2Loader(object):
+    """Loads JSON lines files through a pipeline of threads
+
+    A reader thread decompresses each file and splits it into chunks of
+    lines, a pool of parser threads extracts the DATA_SOURCE and RECORD_ID of
+    every line and a pool of loader threads passes the records to
+    G2Engine.addRecord.  The stages are connected by bounded queues, so the
+    native engine keeps loading while the next chunk is read and parsed.
+
+    Attributes:
+        engine: the initialized G2Engine records are added with
+        reader: G2LoaderStage of the reader thread
+        parser: G2LoaderStage of the parser threads
+        loader: G2LoaderStage of the loader threads
+        loaded: records added
+        failed: records that could not be parsed or added
+        skipped: unchanged records that were not added
+        seconds: time spent in load()
+    """
+
+    def __init__(
+        self,
+        engine,
+        workers=None,
+        parsers=2,
+        chunk_size=1048576,
+        queue_size=8,
+        load_id=None,
+        data_source=None,
+        on_failure=None,
+        retry=None,
+        key=None,
+        fingerprints=None,
+        journal=None,
+        concurrency=None,
+    ):
+        # type: (G2Engine, int, int, int, int, str, str, function, G2RetryScheduler, function, G2FingerprintStore, G2LoadJournal, G2ConcurrencyController) -> None
+        """G2Loader class initialization
+
+        Args:
+            engine: the initialized G2Engine records are added with
+            workers: number of loader threads, defaults to the number of CPUs
+            parsers: number of parser threads
+            chunk_size: bytes read from a file at a time
+            queue_size: chunks that may wait between two stages
+            load_id: load ID passed to addRecord
+            data_source: DATA_SOURCE of records without one
+            on_failure: called with (path, line_number, exception) for every
+                record that could not be parsed or added
+            retry: G2RetryScheduler of the records that fail with a
+                retryable exception.  on_failure is only called after their
+                last attempt.  Its dead letter handler is passed the
+                G2LoaderRecord; G2DeadLetterFile(path, file_format=record_line)
+                writes a file that can be loaded again.
+            key: function returning the affinity key of a G2LoaderRecord,
+                e.g. G2Bulk.record_key.  Records with the same key are never
+                added at the same time.
+            fingerprints: G2FingerprintStore of the records already loaded.
+                Records whose JSON has not changed are skipped.
+            journal: G2LoadJournal the lines of each file are committed to
+                once loaded.  The lines it already holds are not loaded
+                again, so a load that was stopped resumes where it stopped.
+            concurrency: G2ConcurrencyController adapting the number of
+                addRecord calls running at once to the engine's latency.
+                workers defaults to its max_limit.
+        """
+
+        if workers is None and concurrency is not None:
+            workers = concurrency.max_limit
+        self.engine = engine
+        self.workers = workers
+        self.parsers = parsers
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.load_id = load_id
+        self.data_source = data_source
+        self.on_failure = on_failure
+        self.retry = retry
+        self.key = key
+        self.fingerprints = fingerprints
+        self.journal = journal
+        self.concurrency = concurrency
+        self.reader = G2LoaderStage("read")
+        self.parser = G2LoaderStage("parse")
+        self.loader = G2LoaderStage("load")
+        self.loaded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    def stages(self):
+        # type: () -> list
+        """The G2LoaderStage of each stage, in pipeline order"""
+
+        return [self.reader, self.parser, self.loader]
+
+    def report(self):
+        # type: () -> str
+        """Records per second of every stage and of the whole load"""
+
+        lines = [str(stage) for stage in self.stages()]
+        total = self.loaded + self.failed + self.skipped
+        lines.append(
+            "{0:<8} {1:10d} records {2:10.1f} s {3:12.0f} records/s, {4} failed".format(
+                "total",
+                total,
+                self.seconds,
+                total / self.seconds if self.seconds else 0.0,
+                self.failed,
+            )
+        )
+        if self.skipped:
+            lines[-1] += ", {0} skipped".format(self.skipped)
+        return "\n".join(lines)
+
+    def _failure(self, path, line_number, exception):
+        self.failed += 1
+        if self.on_failure is not None:
+            self.on_failure(path, line_number, exception)
+
+    def _put(self, to_queue, item, stop):
+        # Wait for room in the queue unless the load is being stopped.
+        while not stop.is_set():
+            try:
+                to_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, from_queue, stop):
+        # Wait for an item unless the load is being stopped.
+        while not stop.is_set():
+            try:
+                return from_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def _read(self, path, chunks, stop):
+        try:
+            with open_records(path) as file:
+                chunk_iterator = read_chunks(file, self.chunk_size)
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    chunk = next(chunk_iterator, None)
+                    if chunk is None:
+                        break
+                    self.reader.add(len(chunk[1]), time.perf_counter() - started)
+                    if self.journal is not None:
+                        chunk = self._uncommitted(path, chunk)
+                        if chunk is None:
+                            continue
+                    if not self._put(chunks, chunk, stop):
+                        break
+        except BaseException as ex:
+            self._put(chunks, ex, stop)
+        for _ in range(self.parsers):
+            self._put(chunks, _DONE, stop)
+
+    def _uncommitted(self, path, chunk):
+        # The chunk with the lines committed by an earlier load blanked out,
+        # or None if they all are.
+        line_number, lines = chunk
+        name = G2LoadJournal.input_name(path)
+        lines = self.journal.filter(name, line_number, lines)
+        return None if lines is None else (line_number, lines)
+
+    def _parse(self, path, chunks, records, stop):
+        try:
+            while True:
+                chunk = self._get(chunks, stop)
+                if chunk is _DONE or isinstance(chunk, BaseException):
+                    self._put(records, chunk, stop)
+                    return
+                started = time.perf_counter()
+                line_number, lines = chunk
+                parsed = []
+                for offset, line in enumerate(lines):
+                    if not line.strip():
+                        continue
+                    try:
+                        parsed.append(
+                            parse_record(line, line_number + offset, self.data_source)
+                        )
+                    except G2BadInputException as ex:
+                        parsed.append((line_number + offset, ex))
+                self.parser.add(len(parsed), time.perf_counter() - started)
+                if not self._put(records, (line_number, len(lines), parsed), stop):
+                    return
+        except BaseException as ex:
+            self._put(records, ex, stop)
+
+    def _records(self, path, records, tracker):
+        # Flatten the parsed chunks for the loader threads, reporting the
+        # lines that could not be parsed.
+        remaining = self.parsers
+        while remaining:
+            chunk = records.get()
+            if chunk is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(chunk, BaseException):
+                raise chunk
+            line_number, count, parsed = chunk
+            if tracker is not None:
+                tracker.add(
+                    line_number,
+                    count,
+                    sum(1 for record in parsed if isinstance(record, G2LoaderRecord)),
+                )
+            for record in parsed:
+                if isinstance(record, G2LoaderRecord):
+                    yield record
+                else:
+                    self._failure(path, *record)
+
+    def _add(self, record):
+        started = time.perf_counter()
+        try:
+            if self.fingerprints is None:
+                self._add_record(
+                    record.data_source, record.record_id, record.line, self.load_id
+                )
+                return None
+            return _add_changed(
+                self._add_record, self.fingerprints, record, self.load_id
+            )
+        finally:
+            self.loader.add(1, time.perf_counter() - started)
+
+    def load(self, paths):
+        # type: (list) -> int
+        """Load every record of the given JSON lines files
+
+        Args:
+            paths: paths of the files, loaded one after another
+
+        Return:
+            int: the number of records added
+        """
+
+        started = time.perf_counter()
+        self._add_record = self.engine.addRecord
+        if self.concurrency is not None:
+            self._add_record = self.concurrency.wrap(self._add_record)
+        try:
+            for path in paths:
+                if self.journal is None:
+                    self._load_file(path)
+                    continue
+                name = G2LoadJournal.input_name(path)
+                if not self.journal.complete(name):
+                    self._load_file(path)
+                    self.journal.finish(name)
+        finally:
+            if self.fingerprints is not None:
+                self.fingerprints.flush()
+            if self.journal is not None:
+                self.journal.flush()
+        self.seconds += time.perf_counter() - started
+        return self.loaded
+
+    def _load_file(self, path):
+        chunks = queue.Queue(self.queue_size)
+        records = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._read, args=(path, chunks, stop), name="G2LoaderRead"
+            )
+        ]
+        for _ in range(self.parsers):
+            threads.append(
+                threading.Thread(
+                    target=self._parse,
+                    args=(path, chunks, records, stop),
+                    name="G2LoaderParse",
+                )
+            )
+        tracker = None
+        if self.journal is not None:
+            tracker = _ChunkTracker(self.journal, G2LoadJournal.input_name(path))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for result in bulk_map(
+                self._add,
+                self._records(path, records, tracker),
+                self.workers,
+                ordered=False,
+                retry=self.retry,
+                key=self.key,
+            ):
+                if result.skipped:
+                    self.skipped += 1
+                elif result.ok:
+                    self.loaded += 1
+                else:
+                    self._failure(path, result.item.line_number, result.exception)
+                if tracker is not None:
+                    tracker.done(result.item.line_number)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
+# -----------------------------------------------------------------------------
+# Process pool
+# -----------------------------------------------------------------------------
+
+# Messages sent back by the worker processes.
+
+_BATCH = "batch"
+_EXITED = "exited"
+
+
+def _summarize_failure(line_number, exception):
+    # type: (int, G2Exception) -> tuple
+    """Picklable (line_number, class name, message) of a failed record"""
+
+    message = " ".join(str(arg) for arg in exception.args if arg is not exception)
+    return (line_number, type(exception).__name__, message)
+
+
+def _restore_failure(summary):
+    # type: (tuple) -> tuple
+    """The (line_number, exception) of a failure summary"""
+
+    line_number, class_name, message = summary
+    exception_class = getattr(sys.modules[G2Exception.__module__], class_name, None)
+    if not (
+        isinstance(exception_class, type) and issubclass(exception_class, G2Exception)
+    ):
+        exception_class = G2Exception
+    return line_number, exception_class(message)
+
+
+def _load_process(settings, tasks, results):
+    # Runs in each worker process: initialize one engine, load batches of
+    # lines until told to stop, then destroy the engine.  The exited message
+    # is sent even when the engine fails to initialize, with the error for
+    # the loading process to raise.
+    engine = settings["engine_class"]()
+    initialized = False
+    fingerprints = None
+    error = None
+    try:
+        if settings["config_id"] is None:
+            engine.init(
+                settings["engine_name"], settings["ini_params"], settings["debug"]
+            )
+        else:
+            engine.initWithConfigID(
+                settings["engine_name"],
+                settings["ini_params"],
+                settings["config_id"],
+                settings["debug"],
+            )
+        initialized = True
+        load_id = settings["load_id"]
+        if settings["fingerprints"] is not None:
+            fingerprints = G2FingerprintStore(settings["fingerprints"])
+
+        def add(record):
+            if fingerprints is not None:
+                return _add_changed(engine.addRecord, fingerprints, record, load_id)
+            engine.addRecord(record.data_source, record.record_id, record.line, load_id)
+            return None
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            path, line_number, lines = task
+            started = time.perf_counter()
+            records = []
+            failures = []
+            for offset, line in enumerate(lines):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(
+                        parse_record(
+                            line, line_number + offset, settings["data_source"]
+                        )
+                    )
+                except G2BadInputException as ex:
+                    failures.append(_summarize_failure(line_number + offset, ex))
+            parsed_count = len(records) + len(failures)
+            parsed = time.perf_counter()
+            loaded = 0
+            skipped = 0
+            for result in bulk_map(add, records, settings["threads"], ordered=False):
+                if result.skipped:
+                    skipped += 1
+                elif result.ok:
+                    loaded += 1
+                else:
+                    failures.append(
+                        _summarize_failure(result.item.line_number, result.exception)
+                    )
+            results.put(
+                (
+                    _BATCH,
+                    path,
+                    line_number,
+                    len(lines),
+                    parsed_count,
+                    len(records),
+                    loaded,
+                    skipped,
+                    failures,
+                    parsed - started,
+                    time.perf_counter() - parsed,
+                )
+            )
+    except Exception as ex:
+        error = _summarize_failure(None, ex)
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
+        if initialized:
+            engine.destroy()
+        results.put((_EXITED, os.getpid(), error))
+
+
+class G2ProcessLoader(G2Loader):
+    """Loads JSON lines files with a pool of processes, each with its own engine
+
+    The calling process reads the files and sends chunks of raw lines to the
+    workers over a bounded queue.  Each worker initializes one G2Engine,
+    parses and adds the records of every chunk it receives and sends back a
+    summary of the chunk.  Parsing runs in the workers, so it is not limited
+    by the GIL of a single process.  When the files are loaded, every worker
+    destroys its engine and exits.
+
+    Attributes:
+        reader: G2LoaderStage of the reading process
+        parser: G2LoaderStage of the parsing in all workers
+        loader: G2LoaderStage of the loading in all workers
+        loaded: records added
+        failed: records that could not be parsed or added
+        skipped: unchanged records that were not added
+        seconds: time spent in load()
+    """
+
+    def __init__(
+        self,
+        ini_params,
+        engine_name="pySenzingLoad",
+        config_id=None,
+        processes=None,
+        threads=1,
+        chunk_size=1048576,
+        queue_size=None,
+        load_id=None,
+        data_source=None,
+        on_failure=None,
+        start_method=None,
+        debug=False,
+        engine_class=None,
+        fingerprints=None,
+        journal=None,
+    ):
+        # type: (str, str, int, int, int, int, int, str, str, function, str, bool, type, str, G2LoadJournal) -> None
+        """G2ProcessLoader class initialization
+
+        Args:
+            ini_params: engine configuration JSON shared by every worker
+            engine_name: name passed to G2Engine.init
+            config_id: configuration ID passed to G2Engine.initWithConfigID,
+                or None to use G2Engine.init
+            processes: number of worker processes, defaults to the number of
+                CPUs
+            threads: loader threads in each worker
+            chunk_size: bytes read from a file at a time
+            queue_size: chunks that may wait for a worker, defaults to twice
+                the number of processes
+            load_id: load ID passed to addRecord
+            data_source: DATA_SOURCE of records without one
+            on_failure: called with (path, line_number, exception) for every
+                record that could not be parsed or added
+            start_method: multiprocessing start method, e.g. "fork" or
+                "forkserver", or None for the platform default
+            debug: initialize the engines verbosely
+            engine_class: class the workers create their engine from,
+                defaults to G2Engine
+            fingerprints: path of the G2FingerprintStore file every worker
+                opens.  Records whose JSON has not changed are skipped.
+            journal: G2LoadJournal the lines of each file are committed to
+                once loaded.  The lines it already holds are not loaded
+                again, so a load that was stopped resumes where it stopped.
+        """
+
+        super().__init__(
+            None,
+            workers=threads,
+            chunk_size=chunk_size,
+            load_id=load_id,
+            data_source=data_source,
+            on_failure=on_failure,
+            journal=journal,
+        )
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if engine_class is None:
+            engine_class = G2Engine
+        self.processes = processes
+        self.queue_size = queue_size or 2 * processes
+        self.start_method = start_method
+        self._settings = {
+            "engine_class": engine_class,
+            "engine_name": engine_name,
+            "ini_params": ini_params,
+            "config_id": config_id,
+            "debug": debug,
+            "load_id": load_id,
+            "data_source": data_source,
+            "threads": threads,
+            "fingerprints": fingerprints,
+        }
+
+    @staticmethod
+    def _check_workers(workers):
+        # Raise if a worker died without exiting cleanly.
+        for worker in workers:
+            if worker.exitcode not in (None, 0):
+                raise G2Exception(
+                    "Loader process {0} exited with code {1}".format(
+                        worker.pid, worker.exitcode
+                    )
+                )
+
+    def _receive(self, results, workers):
+        # Handle one message from a worker.  Returns False once a worker has
+        # exited, and raises if one failed or died without exiting cleanly.
+        while True:
+            try:
+                message = results.get(timeout=1.0)
+                break
+            except queue.Empty:
+                self._check_workers(workers)
+        if message[0] == _EXITED:
+            error = message[2]
+            if error is not None:
+                raise _restore_failure(error)[1]
+            return False
+        (
+            _,
+            path,
+            line_number,
+            count,
+            parsed,
+            added,
+            loaded,
+            skipped,
+            failures,
+            parse_seconds,
+            load_seconds,
+        ) = message
+        self.parser.add(parsed, parse_seconds)
+        self.loader.add(added, load_seconds)
+        self.loaded += loaded
+        self.skipped += skipped
+        for summary in failures:
+            self._failure(path, *_restore_failure(summary))
+        if self.journal is not None:
+            name = G2LoadJournal.input_name(path)
+            self.journal.commit(name, line_number, count)
+            self._outstanding[path] -= 1
+            if not self._outstanding[path] and path in self._read_paths:
+                self.journal.finish(name)
+        return True
+
+    def _send(self, tasks, results, workers, task):
+        # Queue a task for the workers, handling their results while the
+        # queue is full.  Returns the number of workers that exited meanwhile,
+        # and raises if one failed or they have all died.
+        exited = 0
+        while True:
+            try:
+                tasks.put(task, timeout=0.1)
+                return exited
+            except queue.Full:
+                while not results.empty():
+                    if not self._receive(results, workers):
+                        exited += 1
+                self._check_workers(workers)
+                if not any(worker.is_alive() for worker in workers):
+                    raise G2Exception("Every loader process exited")
+
+    def load(self, paths):
+        # type: (list) -> int
+        """Load every record of the given JSON lines files
+
+        Args:
+            paths: paths of the files, read one after another
+
+        Return:
+            int: the number of records added
+        """
+
+        started = time.perf_counter()
+        context = multiprocessing.get_context(self.start_method)
+        tasks = context.Queue(self.queue_size)
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=_load_process,
+                args=(self._settings, tasks, results),
+                name="G2ProcessLoader-{0}".format(index),
+            )
+            for index in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        running = len(workers)
+        # Chunks of each file sent but not loaded yet, and the files read to
+        # the end, to tell when a file is complete in the journal.
+        self._outstanding = collections.Counter()
+        self._read_paths = set()
+        try:
+            for path in paths:
+                if self.journal is not None and self.journal.complete(
+                    G2LoadJournal.input_name(path)
+                ):
+                    continue
+                with open_records(path) as file:
+                    chunk_iterator = read_chunks(file, self.chunk_size)
+                    while True:
+                        read_started = time.perf_counter()
+                        chunk = next(chunk_iterator, None)
+                        if chunk is None:
+                            break
+                        self.reader.add(
+                            len(chunk[1]), time.perf_counter() - read_started
+                        )
+                        if self.journal is not None:
+                            chunk = self._uncommitted(path, chunk)
+                            if chunk is None:
+                                continue
+                            self._outstanding[path] += 1
+                        running -= self._send(tasks, results, workers, (path,) + chunk)
+                self._read_paths.add(path)
+                if self.journal is not None and not self._outstanding[path]:
+                    self.journal.finish(G2LoadJournal.input_name(path))
+            for _ in workers:
+                running -= self._send(tasks, results, workers, None)
+            while running:
+                if not self._receive(results, workers):
+                    running -= 1
+        finally:
+            if running:
+                self._stop(tasks, results, workers)
+            for worker in workers:
+                worker.join()
+            tasks.close()
+            results.close()
+            if self.journal is not None:
+                self.journal.flush()
+        self.seconds += time.perf_counter() - started
+        return self.loaded
+
+    def _stop(self, tasks, results, workers, timeout=30.0):
+        # Stop the workers after the chunks they are loading, so each still
+        # destroys its engine.  Workers that do not exit in time are
+        # terminated.
+        try:
+            while True:
+                tasks.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in workers:
+            try:
+                tasks.put_nowait(None)
+            except queue.Full:
+                break
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(
+            worker.is_alive() for worker in workers
+        ):
+            # A worker cannot exit until its messages have been read.
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
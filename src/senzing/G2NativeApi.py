@@ -0,0 +1,580 @@
+from collections import OrderedDict
+from ctypes import *
+import json
+import linecache
+
+from .G2Exception import TranslateG2ModuleException, G2NotInitializedException
+from .G2Library import ALLOCATOR_PROTOTYPES, RESIZE_FUNC_TYPE
+
+__all__ = []
+
+# -----------------------------------------------------------------------------
+# Argument preparation
+# -----------------------------------------------------------------------------
+
+
+# bytearrays at least this long are passed to the native call in place rather
+# than copied into bytes.  Below it, copying is cheaper than wrapping.
+
+BORROW_BYTEARRAY_SIZE = 4096
+
+
+def prepare_string_argument(stringToPrepare):
+    # type: (str) -> bytes
+    """Internal processing function"""
+
+    # str and bytes are checked first: they are what nearly every call passes
+    argumentType = type(stringToPrepare)
+    if argumentType is str:
+        return stringToPrepare.encode("utf-8")
+    if argumentType is bytes:
+        return stringToPrepare
+    # handle null string
+    if stringToPrepare is None:
+        return b""
+    # bytearray and memoryview are assumed to hold utf-8
+    if isinstance(stringToPrepare, (bytearray, memoryview)):
+        return _prepare_buffer_argument(stringToPrepare)
+    # subclasses of str and bytes
+    if isinstance(stringToPrepare, str):
+        stringToPrepare = stringToPrepare.encode("utf-8")
+    elif isinstance(stringToPrepare, bytes):
+        stringToPrepare = bytes(stringToPrepare)
+    return stringToPrepare
+
+
+def _prepare_buffer_argument(stringToPrepare):
+    # type: (bytearray) -> bytes
+    """prepare_string_argument for a bytearray or memoryview"""
+
+    if isinstance(stringToPrepare, bytearray):
+        if len(stringToPrepare) < BORROW_BYTEARRAY_SIZE:
+            return bytes(stringToPrepare)
+        # CPython keeps a bytearray's contents NUL terminated, so it can be
+        # passed as a C string without copying.
+        return (c_char * len(stringToPrepare)).from_buffer(stringToPrepare)
+    # A contiguous view of a whole bytes object is NUL terminated; any other
+    # view, e.g. a reversed or strided one, is copied to add the terminator.
+    if (
+        type(stringToPrepare.obj) is bytes
+        and stringToPrepare.c_contiguous
+        and stringToPrepare.nbytes == len(stringToPrepare.obj)
+    ):
+        return stringToPrepare.obj
+    return stringToPrepare.tobytes()
+
+
+# Encoded values of low-cardinality arguments, such as data source codes and
+# load IDs, that repeat on almost every call.  When the cache is full the least
+# recently used value is evicted.  A hit in an OrderedDict is cheaper than in a
+# functools.lru_cache, which costs more than encoding a short code again.
+
+
+class _G2InternCache(object):
+    """Least recently used cache of encoded str and bytes arguments"""
+
+    __slots__ = ("size", "values")
+
+    def __init__(self, size):
+        self.size = size
+        self.values = OrderedDict()
+
+
+_intern_cache = _G2InternCache(256)
+
+
+def set_intern_cache_size(size):
+    # type: (int) -> None
+    """Set how many distinct data source codes and load IDs are kept encoded
+    Args:
+        size: the number of values to keep, or 0 to disable the cache
+    """
+
+    _intern_cache.size = size
+    _intern_cache.values.clear()
+
+
+def prepare_interned_argument(stringToPrepare):
+    # type: (str) -> bytes
+    """Internal processing function for low-cardinality string arguments"""
+
+    values = _intern_cache.values
+    try:
+        prepared = values[stringToPrepare]
+        values.move_to_end(stringToPrepare)
+        return prepared
+    # Unhashable arguments, and values evicted by another thread since the
+    # lookup, are encoded again.
+    except (KeyError, TypeError, ValueError):
+        pass
+    prepared = prepare_string_argument(stringToPrepare)
+    # Only str and bytes are cached.  They are immutable and never compare
+    # equal to the numbers or to each other.
+    argumentType = type(stringToPrepare)
+    if (argumentType is str or argumentType is bytes) and _intern_cache.size > 0:
+        values[stringToPrepare] = prepared
+        if len(values) > _intern_cache.size:
+            values.popitem(last=False)
+    return prepared
+
+
+def prepare_int_argument(valueToPrepare):
+    # type: (str) -> int
+    """Internal processing function"""
+    """ This converts many types of values to an integer """
+
+    # handle null string
+    if valueToPrepare is None:
+        return 0
+    # if string is unicode, transcode to utf-8 str
+    if type(valueToPrepare) == str:
+        return int(valueToPrepare.encode("utf-8"))
+    # if input is bytearray, assume utf-8 and convert to str
+    elif type(valueToPrepare) == bytearray:
+        return int(valueToPrepare)
+    elif type(valueToPrepare) == bytes:
+        return int(valueToPrepare)
+    # input is already an int
+    return valueToPrepare
+
+
+def prepare_boolean_argument(booleanToPrepare):
+    # type: (bool) -> int
+    """Internal processing function"""
+
+    booleanValue = 0
+    if booleanToPrepare:
+        booleanValue = 1
+    return booleanValue
+
+
+# -----------------------------------------------------------------------------
+# Argument kinds
+# -----------------------------------------------------------------------------
+
+
+class G2ArgumentKind(object):
+    """How a wrapper parameter is passed to, or returned from, a native call
+
+    Attributes:
+        name: name used in reprs and error messages
+        argtypes: ctypes the kind contributes to the native prototype
+        convert: expression converting the parameter ({0}) to its native value
+        output: True if the native function writes the value back
+    """
+
+    def __init__(self, name, argtypes, convert="{0}", output=False):
+        self.name = name
+        self.argtypes = argtypes
+        self.convert = convert
+        self.output = output
+
+    def __repr__(self):
+        return self.name
+
+
+_RESPONSE_ARGTYPES = [POINTER(c_void_p), POINTER(c_size_t), RESIZE_FUNC_TYPE]
+
+# Input kinds, passed in the order they are declared.
+
+STRING = G2ArgumentKind(
+    "STRING",
+    [c_char_p],
+    "({0}.encode() if type({0}) is str"
+    " else {0} if type({0}) is bytes"
+    " else prepare_string_argument({0}))",
+)
+INTERNED = G2ArgumentKind("INTERNED", [c_char_p], "prepare_interned_argument({0})")
+INT = G2ArgumentKind("INT", [c_int])
+INT64 = G2ArgumentKind("INT64", [c_longlong])
+UINT64 = G2ArgumentKind("UINT64", [c_ulonglong])
+SIZE = G2ArgumentKind("SIZE", [c_size_t])
+BOOL = G2ArgumentKind("BOOL", [c_int], "prepare_boolean_argument({0})")
+CONFIG_ID = G2ArgumentKind("CONFIG_ID", [c_longlong], "prepare_int_argument({0})")
+HANDLE = G2ArgumentKind("HANDLE", [c_void_p])
+
+# Accepted for compatibility but never passed to the native function.
+
+IGNORED = G2ArgumentKind("IGNORED", [])
+
+# Output kinds, passed after all of the inputs.  RESPONSE clears the caller's
+# bytearray before appending the response, APPEND_RESPONSE only appends.
+
+RESPONSE = G2ArgumentKind("RESPONSE", _RESPONSE_ARGTYPES, output=True)
+APPEND_RESPONSE = G2ArgumentKind("APPEND_RESPONSE", _RESPONSE_ARGTYPES, output=True)
+INT64_OUT = G2ArgumentKind("INT64_OUT", [POINTER(c_longlong)], output=True)
+
+# Return kinds.  NEW_HANDLE is passed last and its value returned.
+
+RETURN_CODE = G2ArgumentKind("RETURN_CODE", [])
+NEW_HANDLE = G2ArgumentKind("NEW_HANDLE", [POINTER(c_void_p)], output=True)
+
+# How the return code is checked.
+
+CHECK_INITIALIZED = "initialized"  # -1 is G2NotInitializedException, < 0 raises
+CHECK_NEGATIVE = "negative"  # < 0 raises
+CHECK_NONE = None  # never raises
+
+# -----------------------------------------------------------------------------
+# Native call specification
+# -----------------------------------------------------------------------------
+
+
+class G2NativeCall(object):
+    """Specification of one wrapper method and the native function it calls
+
+    Attributes:
+        name: name of the generated method
+        symbol: native symbol the method calls
+        parameters: list of (name, kind) or (name, kind, default) tuples in
+            Python signature order
+        returns: None, RETURN_CODE or NEW_HANDLE
+        restype: ctypes restype of the native function
+        check: CHECK_INITIALIZED, CHECK_NEGATIVE or CHECK_NONE
+        doc: docstring of the generated method
+    """
+
+    def __init__(
+        self,
+        name,
+        symbol,
+        parameters=(),
+        returns=None,
+        restype=c_int,
+        check=CHECK_INITIALIZED,
+        doc=None,
+    ):
+        self.name = name
+        self.symbol = symbol
+        self.parameters = list(parameters)
+        self.returns = returns
+        self.restype = restype
+        self.check = check
+        self.doc = doc
+
+    def prototype(self):
+        # type: () -> tuple
+        """The (argtypes, restype) prototype of the native function"""
+
+        inputs = [p[1] for p in self.parameters if not p[1].output]
+        outputs = [p[1] for p in self.parameters if p[1].output]
+        if self.returns is not None:
+            outputs.append(self.returns)
+        argtypes = []
+        for argument_kind in inputs + outputs:
+            argtypes.extend(argument_kind.argtypes)
+        return (argtypes, self.restype)
+
+
+# Suffix of the methods that return the response instead of writing it into a
+# bytearray, e.g. getEntityByEntityIDBytes.
+
+VALUE_SUFFIX = "Bytes"
+
+
+def _returns_response(call):
+    # type: (G2NativeCall) -> bool
+    """True if the only output of call is a single response document"""
+
+    outputs = [p[1] for p in call.parameters if p[1].output]
+    return call.returns is None and outputs in ([RESPONSE], [APPEND_RESPONSE])
+
+
+class _G2NativeMethod(object):
+    """Class attribute that generates its wrapper method on first access"""
+
+    def __init__(self, api, owner, call, value=False):
+        self._api = api
+        self._owner = owner
+        self._call = call
+        self._value = value
+
+    def __get__(self, instance, owner=None):
+        function = self._api.generate(self._owner, self._call, self._value)
+        setattr(self._owner, function.__name__, function)
+        return function.__get__(instance, owner)
+
+
+class G2NativeApi(object):
+    """The native calls made by one G2 module
+
+    The wrapper methods of a class are generated from its G2NativeCall
+    specifications the first time each one is used, so every method shares
+    the same argument preparation, response buffer handling and error
+    checking.
+
+    Attributes:
+        module_name: class name used in G2NotInitializedException messages
+        last_exception: native symbol returning the last exception message
+        response_buffer: G2ReturnBuffer used for exceptions and fixed size
+            responses
+        calls: dict of method name to G2NativeCall
+        prototypes: dict of symbol to (argtypes, restype) for bind_prototypes,
+            including the native allocator used for response buffers
+        response_views: True if methods return a view of the response instead
+            of copying it when the instance's _zero_copy attribute is set
+        value_methods: True if every call returning a single response also
+            gets a <name>Bytes method returning the response as bytes, or
+            parsed from JSON, instead of writing it into a bytearray
+    """
+
+    def __init__(
+        self,
+        module_name,
+        last_exception,
+        response_buffer,
+        calls,
+        prototypes,
+        response_views=False,
+        value_methods=False,
+    ):
+        self.module_name = module_name
+        self.last_exception = last_exception
+        self.response_buffer = response_buffer
+        self.calls = dict((call.name, call) for call in calls)
+        self.prototypes = dict(ALLOCATOR_PROTOTYPES)
+        self.prototypes.update(prototypes)
+        for call in calls:
+            self.prototypes[call.symbol] = call.prototype()
+        self.response_views = response_views
+        self.value_methods = value_methods
+
+    # -----------------------------------------------------------------------------
+    # Error handling
+    # -----------------------------------------------------------------------------
+
+    def error(self, native, ret_code):
+        # type: (G2NativeFunctions, int) -> G2Exception
+        """The exception for a negative return code"""
+
+        if ret_code == -1:
+            return G2NotInitializedException(
+                "{0} has not been successfully initialized".format(self.module_name)
+            )
+        return self.last_error(native)
+
+    def last_error(self, native):
+        # type: (G2NativeFunctions) -> G2Exception
+        """The exception for the last error reported by the native module"""
+
+        buf = self.response_buffer.buf
+        getattr(native, self.last_exception)(buf, sizeof(buf))
+        return TranslateG2ModuleException(buf.value)
+
+    def fetch_view(self, native, fetch_next, handle):
+        # type: (G2NativeFunctions, function, int) -> memoryview
+        """Read-only view of the next line of an export or entity list
+
+        Args:
+            native: typed native functions of the calling instance
+            fetch_next: native function filling a buffer with the next chunk
+            handle: handle returned when the export or list was opened
+
+        Return:
+            memoryview: the line, empty if there is no more data.  It shares
+                the response buffer when the line fits in one chunk.
+        """
+
+        buf = self.response_buffer.buf
+        line = None
+        while True:
+            ret_code = fetch_next(c_void_p(handle), buf, sizeof(buf))
+            if ret_code < 0:
+                raise self.error(native, ret_code)
+            if ret_code == 0:
+                break
+            view = self.response_buffer.view()
+            if line is None:
+                if view[-1:] == b"\n":
+                    return view
+                line = bytearray(view)
+            else:
+                line += view
+                if line[-1:] == b"\n":
+                    break
+        return memoryview(line or b"").toreadonly()
+
+    # -----------------------------------------------------------------------------
+    # Method generation
+    # -----------------------------------------------------------------------------
+
+    def install(self, cls):
+        """Class decorator adding a lazily generated method for every call
+
+        Instances of the class need a _native table of bound functions and a
+        buffer_pool G2BufferPool, plus _zero_copy if response_views is set.
+        """
+
+        for name, call in self.calls.items():
+            methods = [(name, False)]
+            if self.value_methods and _returns_response(call):
+                methods.append((name + VALUE_SUFFIX, True))
+            for method_name, value in methods:
+                if method_name in cls.__dict__:
+                    raise ValueError(
+                        "{0}.{1} is both written out and generated".format(
+                            cls.__name__, method_name
+                        )
+                    )
+                setattr(cls, method_name, _G2NativeMethod(self, cls, call, value))
+        return cls
+
+    def generate(self, owner, call, value=False):
+        """Build the wrapper method for call
+
+        If value is set, the method returns the response instead of taking a
+        response bytearray, and parses it as JSON if its parse argument is set.
+        """
+
+        namespace = {
+            "_api": self,
+            "_json_loads": json.loads,
+            "byref": byref,
+            "c_longlong": c_longlong,
+            "c_void_p": c_void_p,
+            "prepare_string_argument": prepare_string_argument,
+            "prepare_interned_argument": prepare_interned_argument,
+            "prepare_int_argument": prepare_int_argument,
+            "prepare_boolean_argument": prepare_boolean_argument,
+        }
+        signature = ["self"]
+        for parameter in call.parameters:
+            name = parameter[0]
+            # A value method returns the response instead of taking it.
+            if value and parameter[1] in (RESPONSE, APPEND_RESPONSE):
+                continue
+            if len(parameter) > 2:
+                namespace["_default_" + name] = parameter[2]
+                signature.append("{0}=_default_{0}".format(name))
+            else:
+                signature.append(name)
+
+        method_name = call.name
+        doc = call.doc
+        if value:
+            method_name += VALUE_SUFFIX
+            signature.append("parse=False")
+            doc = (
+                "Same as {0}, but returns the response as bytes instead of"
+                " writing it into a bytearray, or the parsed JSON document if"
+                " parse is set"
+            ).format(call.name)
+        signature.extend(["*args", "**kwargs"])
+        lines = ["def {0}({1}):".format(method_name, ", ".join(signature))]
+        lines.extend("    " + line for line in self._body(call, value))
+        function = _compile_method(owner, method_name, lines, namespace)
+        function.__doc__ = doc
+        return function
+
+    def _body(self, call, value):
+        # type: (G2NativeCall, bool) -> list
+        """The source lines of the body of the wrapper method for call"""
+
+        pooled = False
+        before = []
+        native_args = []
+        output_args = []
+        after = []
+
+        for parameter in call.parameters:
+            name, argument_kind = parameter[0], parameter[1]
+            if argument_kind in (RESPONSE, APPEND_RESPONSE):
+                pooled = True
+                output_args.extend(
+                    ["byref(_buffer.ptr)", "byref(_buffer.size)", "_buffer.resize"]
+                )
+                response_before, response_after = self._response_code(
+                    call, name, argument_kind, value
+                )
+                before.extend(response_before)
+                after.extend(response_after)
+            elif argument_kind is INT64_OUT:
+                before.append('{0}[::] = b""'.format(name))
+                before.append("_{0}Value = c_longlong(0)".format(name))
+                output_args.append("byref(_{0}Value)".format(name))
+                after.append("{0} += str(_{0}Value.value).encode()".format(name))
+            elif argument_kind is not IGNORED:
+                native_args.append(argument_kind.convert.format(name))
+
+        if call.returns is NEW_HANDLE:
+            before.append("_handle = c_void_p(0)")
+            output_args.append("byref(_handle)")
+            after.append("return _handle.value")
+        elif call.returns is RETURN_CODE:
+            after.append("return ret_code")
+
+        body = [
+            "ret_code = self._native.{0}({1})".format(
+                call.symbol, ", ".join(native_args + output_args)
+            )
+        ]
+        if call.check == CHECK_INITIALIZED:
+            body.append("if ret_code < 0:")
+            body.append("    raise _api.error(self._native, ret_code)")
+        elif call.check == CHECK_NEGATIVE:
+            body.append("if ret_code < 0:")
+            body.append("    raise _api.last_error(self._native)")
+        body.extend(after)
+
+        # The response buffer is borrowed from the instance's pool for the
+        # duration of the call.
+        if pooled:
+            before.append('_buffer = self.buffer_pool.acquire("{0}")'.format(call.name))
+            before.append("try:")
+            before.extend("    " + line for line in body)
+            before.append("finally:")
+            before.append("    self.buffer_pool.release(_buffer)")
+        else:
+            before.extend(body)
+        return before
+
+    def _response_code(self, call, name, argument_kind, value):
+        # type: (G2NativeCall, str, G2ArgumentKind, bool) -> tuple
+        """The (before, after) lines around the native call of a response
+        parameter, which is passed the pooled _buffer"""
+
+        if value:
+            return [], [
+                "if parse:",
+                "    return _json_loads(_buffer.value())",
+                "return _buffer.value()",
+            ]
+        # In zero-copy mode the response argument is left untouched and may be
+        # None.
+        views = self.response_views and call.returns is None
+        before = []
+        after = []
+        if argument_kind is RESPONSE:
+            if views:
+                before.append("if not self._zero_copy:")
+                before.append('    {0}[::] = b""'.format(name))
+            else:
+                before.append('{0}[::] = b""'.format(name))
+        if views:
+            after.append("if self._zero_copy:")
+            after.append("    return _buffer.view()")
+        after.append("{0} += _buffer.value()".format(name))
+        return before, after
+
+
+def _compile_method(owner, method_name, lines, namespace):
+    # type: (type, str, list, dict) -> function
+    """Compile the source lines of a generated method of owner"""
+
+    source = "\n".join(lines) + "\n"
+
+    # Register the source so tracebacks through generated methods show it.
+    filename = "<{0}.{1}>".format(owner.__name__, method_name)
+    linecache.cache[filename] = (
+        len(source),
+        None,
+        source.splitlines(True),
+        filename,
+    )
+    # The source is built from the call table, never from caller input.
+    exec(compile(source, filename, "exec"), namespace)  # pylint: disable=exec-used
+
+    function = namespace[method_name]
+    function.__module__ = owner.__module__
+    function.__qualname__ = "{0}.{1}".format(owner.__name__, method_name)
+    return function
@@ -4,49 +4,20 @@ import os
 import functools
 import warnings
 
-from .G2Exception import (
-    TranslateG2ModuleException,
-    G2NotInitializedException,
-    G2Exception,
+from .G2Exception import G2Exception
+from .G2Library import RESIZE_FUNC_TYPE, G2BufferPool, G2ReturnBuffer, load_library
+from .G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    CHECK_NONE,
+    prepare_string_argument,
 )
 
 __all__ = ["G2Product"]
 SENZING_PRODUCT_ID = "5046"  # See https://github.com/senzing-garage/knowledge-base/blob/main/lists/senzing-component-ids.md
 
 
-class MyBuffer(threading.local):
-
-    def __init__(self):
-        self.buf = create_string_buffer(65535)
-        self.bufSize = sizeof(self.buf)
-        # print("Created new Buffer {}".format(self.buf))
-
-
-tls_var = MyBuffer()
-
-
-def resize_return_buffer(buf_, size_):
-    """callback function that resizes return buffer when it is too small
-    Args:
-    size_: size the return buffer needs to be
-    """
-    try:
-        if not tls_var.buf:
-            # print("New RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-        elif tls_var.bufSize < size_:
-            # print("RESIZE_RETURN_BUF {}:{}/{}".format(buf_,size_,tls_var.bufSize))
-            foo = tls_var.buf
-            tls_var.buf = create_string_buffer(size_)
-            tls_var.bufSize = size_
-            memmove(tls_var.buf, foo, sizeof(foo))
-    except AttributeError:
-        # print("AttributeError RESIZE_RETURN_BUF {}:{}".format(buf_,size_))
-        tls_var.buf = create_string_buffer(size_)
-        # print("Created new Buffer {}".format(tls_var.buf))
-        tls_var.bufSize = size_
-    return addressof(tls_var.buf)
+tls_var = G2ReturnBuffer()
 
 
 def deprecated(instance):
@@ -71,31 +42,75 @@ def deprecated(instance):
     return the_decorator
 
 
+_PROTOTYPES = {
+    "G2Product_init": ([c_char_p, c_char_p, c_int], c_int),
+    "G2Product_getLastException": ([c_char_p, c_size_t], c_int),
+    "G2Product_license": ([], c_char_p),
+    "G2Product_validateLicenseFile": (
+        [c_char_p, POINTER(c_void_p), POINTER(c_size_t), RESIZE_FUNC_TYPE],
+        c_int,
+    ),
+    "G2Product_validateLicenseStringBase64": (
+        [c_char_p, POINTER(c_void_p), POINTER(c_size_t), RESIZE_FUNC_TYPE],
+        c_int,
+    ),
+    "G2Product_version": ([], c_char_p),
+    "G2Product_clearLastException": ([], None),
+    "G2Product_getLastExceptionCode": ([], c_int),
+}
+
+# G2Product methods that only prepare their arguments, make one native call and
+# check its return code.  They are generated from this table by G2NativeApi.
+
+_NATIVE_CALLS = [
+    G2NativeCall(
+        "destroy",
+        "G2Product_destroy",
+        [],
+        check=CHECK_NONE,
+        doc="""Uninitializes the engine
+        This should be done once per process after init(...) is called.
+        After it is called the engine will no longer function.
+
+        Args: (None)
+
+        """,
+    ),
+]
+
+_NATIVE_API = G2NativeApi(
+    "G2Product", "G2Product_getLastException", tls_var, _NATIVE_CALLS, _PROTOTYPES
+)
+
+
 # -----------------------------------------------------------------------------
 # G2Product class
 # -----------------------------------------------------------------------------
 
 
+@_NATIVE_API.install
 class G2Product(object):
     """G2 product module access library
 
     Attributes:
         _lib_handle: A boolean indicating if we like SPAM or not.
-        _resize_func_def: resize function definition
-        _resize_func: resize function pointer
+        _native: typed native functions bound once from _lib_handle
+        buffer_pool: G2BufferPool of the native response buffers
         _module_name: CME module name
         _ini_file_name: name and location of .ini file
     """
 
-    def __init__(self, *args, **kwargs):
-        # type: () -> None
-        """Class initialization"""
+    def __init__(self, *args, buffer_pool=None, **kwargs):
+        # type: (G2BufferPool) -> None
+        """Class initialization
+
+        Args:
+            buffer_pool: G2BufferPool the response buffers are borrowed from.
+                A new pool with the default limits is used if it is None.
+        """
 
         try:
-            if os.name == "nt":
-                self._lib_handle = cdll.LoadLibrary("G2.dll")
-            else:
-                self._lib_handle = cdll.LoadLibrary("libG2.so")
+            self._lib_handle, self._native = load_library("G2", _NATIVE_API.prototypes)
         except OSError as ex:
             print(
                 "ERROR: Unable to load G2.  Did you remember to setup your environment by sourcing the setupEnv file?"
@@ -108,8 +123,9 @@ class G2Product(object):
             )
             raise G2Exception("Failed to load the G2 library")
 
-        self._resize_func_def = CFUNCTYPE(c_char_p, c_char_p, c_size_t)
-        self._resize_func = self._resize_func_def(resize_return_buffer)
+        if buffer_pool is None:
+            buffer_pool = G2BufferPool()
+        self.buffer_pool = buffer_pool.bind(self._native)
 
     # -----------------------------------------------------------------------------
     # Internal helper methods
@@ -119,19 +135,7 @@ class G2Product(object):
         # type: (str) -> str
         """Internal processing function"""
 
-        # handle null string
-        if stringToPrepare is None:
-            return b""
-        # if string is unicode, transcode to utf-8 str
-        if type(stringToPrepare) == str:
-            return stringToPrepare.encode("utf-8")
-        # if input is bytearray, assume utf-8 and convert to str
-        elif type(stringToPrepare) == bytearray:
-            return stringToPrepare.decode().encode("utf-8")
-        elif type(stringToPrepare) == bytes:
-            return str(stringToPrepare).encode("utf-8")
-        # input is already a str
-        return stringToPrepare
+        return prepare_string_argument(stringToPrepare)
 
     # -----------------------------------------------------------------------------
     # Public API
@@ -150,8 +154,7 @@ class G2Product(object):
         if self._debug:
             print("Initializing G2Product")
 
-        self._lib_handle.G2Product_init.argtypes = [c_char_p, c_char_p, c_int]
-        ret_code = self._lib_handle.G2Product_init(
+        ret_code = self._native.G2Product_init(
             self._module_name, self._ini_params, self._debug
         )
 
@@ -159,10 +162,7 @@ class G2Product(object):
             print("Initialization Status: " + str(ret_code))
 
         if ret_code < 0:
-            self._lib_handle.G2Product_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
-            )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+            raise _NATIVE_API.last_error(self._native)
 
     def license(self, *args, **kwargs):
         # type: () -> object
@@ -174,8 +174,7 @@ class G2Product(object):
             object: JSON document with G2 license details
         """
 
-        self._lib_handle.G2Product_license.restype = c_char_p
-        ret = self._lib_handle.G2Product_license()
+        ret = self._native.G2Product_license()
         return str(ret.decode("utf-8"))
 
     def validateLicenseFile(self, licenseFilePath, *args, **kwargs):
@@ -189,31 +188,19 @@ class G2Product(object):
         """
 
         _licenseFilePath = self.prepareStringArgument(licenseFilePath)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Product_validateLicenseFile.restype = c_int
-        self._lib_handle.G2Product_validateLicenseFile.argtypes = [
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Product_validateLicenseFile(
-            _licenseFilePath,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Product has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Product_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
+        responseBuf = self.buffer_pool.acquire("validateLicenseFile")
+        try:
+            ret_code = self._native.G2Product_validateLicenseFile(
+                _licenseFilePath,
+                byref(responseBuf.ptr),
+                byref(responseBuf.size),
+                responseBuf.resize,
             )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        finally:
+            self.buffer_pool.release(responseBuf)
+
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
         return ret_code
 
@@ -228,30 +215,19 @@ class G2Product(object):
         """
 
         _licenseString = self.prepareStringArgument(licenseString)
-        responseBuf = c_char_p(addressof(tls_var.buf))
-        responseSize = c_size_t(tls_var.bufSize)
-        self._lib_handle.G2Product_validateLicenseStringBase64.restype = c_int
-        self._lib_handle.G2Product_validateLicenseStringBase64.argtypes = [
-            c_char_p,
-            POINTER(c_char_p),
-            POINTER(c_size_t),
-            self._resize_func_def,
-        ]
-        ret_code = self._lib_handle.G2Product_validateLicenseStringBase64(
-            _licenseString,
-            pointer(responseBuf),
-            pointer(responseSize),
-            self._resize_func,
-        )
-        if ret_code == -1:
-            raise G2NotInitializedException(
-                "G2Product has not been successfully initialized"
-            )
-        elif ret_code < 0:
-            self._lib_handle.G2Product_getLastException(
-                tls_var.buf, sizeof(tls_var.buf)
+        responseBuf = self.buffer_pool.acquire("validateLicenseStringBase64")
+        try:
+            ret_code = self._native.G2Product_validateLicenseStringBase64(
+                _licenseString,
+                byref(responseBuf.ptr),
+                byref(responseBuf.size),
+                responseBuf.resize,
             )
-            raise TranslateG2ModuleException(tls_var.buf.value)
+        finally:
+            self.buffer_pool.release(responseBuf)
+
+        if ret_code < 0:
+            raise _NATIVE_API.error(self._native, ret_code)
 
         return ret_code
 
@@ -265,36 +241,20 @@ class G2Product(object):
             object: JSON document with G2 version details
         """
 
-        self._lib_handle.G2Product_version.restype = c_char_p
-        ret = self._lib_handle.G2Product_version()
+        ret = self._native.G2Product_version()
         return str(ret.decode("utf-8"))
 
-    def destroy(self, *args, **kwargs):
-        """Uninitializes the engine
-        This should be done once per process after init(...) is called.
-        After it is called the engine will no longer function.
-
-        Args: (None)
-
-        """
-
-        self._lib_handle.G2Product_destroy()
-
     @deprecated(1102)
     def clearLastException(self, *args, **kwargs):
         """Clears the last exception"""
 
-        self._lib_handle.G2Product_clearLastException.restype = None
-        self._lib_handle.G2Product_clearLastException.argtypes = []
-        self._lib_handle.G2Product_clearLastException()
+        self._native.G2Product_clearLastException()
 
     @deprecated(1103)
     def getLastException(self, *args, **kwargs):
         """Gets the last exception"""
 
-        self._lib_handle.G2Product_getLastException.restype = c_int
-        self._lib_handle.G2Product_getLastException.argtypes = [c_char_p, c_size_t]
-        self._lib_handle.G2Product_getLastException(tls_var.buf, sizeof(tls_var.buf))
+        self._native.G2Product_getLastException(tls_var.buf, sizeof(tls_var.buf))
         resultString = tls_var.buf.value.decode("utf-8")
         return resultString
 
@@ -302,7 +262,5 @@ class G2Product(object):
     def getLastExceptionCode(self, *args, **kwargs):
         """Gets the last exception code"""
 
-        self._lib_handle.G2Product_getLastExceptionCode.restype = c_int
-        self._lib_handle.G2Product_getLastExceptionCode.argtypes = []
-        exception_code = self._lib_handle.G2Product_getLastExceptionCode()
+        exception_code = self._native.G2Product_getLastExceptionCode()
         return exception_code
@@ -0,0 +1,513 @@
+import collections
+import json
+import math
+import threading
+import time
+
+from .G2Bulk import default_workers
+from .G2Exception import G2Exception
+
+__all__ = ["G2RedoProcessor"]
+
+# -----------------------------------------------------------------------------
+# Redo targets
+# -----------------------------------------------------------------------------
+
+
+def redo_target(record):
+    # type: (bytes) -> object
+    """What a redo record makes the engine redo
+
+    Redo records with the same target do the same work, e.g. the many
+    records that each ask for the reevaluation of an entity sharing a
+    feature that went generic.
+
+    Args:
+        record: the redo record, as returned by getRedoRecord
+
+    Return:
+        ("UMF_PROC", name, parameters) for a UMF_PROC record, ("X",
+            DATA_SOURCE, RECORD_ID) for the reevaluation of a record, and
+            the record itself for any other record, so only its exact
+            duplicates share its target
+    """
+
+    try:
+        document = json.loads(record)
+        procedure = document.get("UMF_PROC")
+        if procedure is not None:
+            parameters = tuple(
+                sorted(
+                    (parameter["PARAM"]["NAME"], str(parameter["PARAM"]["VALUE"]))
+                    for parameter in procedure.get("PARAMS", [])
+                )
+            )
+            return ("UMF_PROC", procedure["NAME"], parameters)
+        if document.get("DSRC_ACTION") == "X":
+            return ("X", document["DATA_SOURCE"], document["RECORD_ID"])
+    except (ValueError, AttributeError, KeyError, TypeError):
+        pass
+    return bytes(record)
+
+
+# -----------------------------------------------------------------------------
+# G2RedoProcessor class
+# -----------------------------------------------------------------------------
+
+
+class G2RedoProcessor(object):
+    """Processes the redo queue on a pool of threads sized to its backlog
+
+    Every worker thread takes the next redo record with getRedoRecord and
+    processes it, or with_info fetches and processes it in one pass with
+    processRedoRecordWithInfo.  A worker that finds the queue empty waits before it looks
+    again, twice as long each time up to max_idle_delay, so an idle
+    processor does not keep the engine busy.  Every scale_interval seconds
+    countRedoRecords is polled and the number of workers set to one per
+    records_per_worker records of backlog, between min_workers and
+    max_workers.  After a large load the backlog starts every worker; once
+    it is drained the processor shrinks back to min_workers.
+
+    With prefetch, the workers share a window of up to prefetch redo records
+    fetched ahead.  A record whose target, by redo_target(), is already in
+    the window is coalesced: it is dropped, and only the record in the
+    window is processed.  Records that were taken by a worker are no longer
+    in the window, so a duplicate fetched after that is processed again.
+
+    Attributes:
+        engine: the initialized G2Engine
+        min_workers: fewest worker threads
+        max_workers: most worker threads
+        processed: redo records processed
+        failed: redo records that failed, after their retries
+        fetched: redo records fetched into the prefetch window
+        coalesced: fetched redo records dropped as duplicates
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_workers=None,
+        min_workers=1,
+        records_per_worker=1000,
+        with_info=False,
+        on_info=None,
+        flags=0,
+        on_failure=None,
+        retry=None,
+        scale_interval=1.0,
+        idle_delay=0.01,
+        max_idle_delay=1.0,
+        prefetch=0,
+        coalesce=redo_target,
+        clock=time.monotonic,
+    ):
+        # type: (G2Engine, int, int, int, bool, function, int, function, G2RetryScheduler, float, float, float, int, function, function) -> None
+        """G2RedoProcessor class initialization
+
+        Args:
+            engine: the initialized G2Engine to process the redo records on
+            max_workers: most worker threads, defaults to the number of CPUs
+            min_workers: fewest worker threads, kept even when the queue is
+                empty so new redo records are picked up
+            records_per_worker: backlog of redo records per worker thread
+            with_info: True to process the records with
+                processRedoRecordWithInfo, or processWithInfo for the
+                prefetched and retried ones
+            on_info: called with the info document, as bytes, of every
+                record processed with_info
+            flags: flags passed to processRedoRecordWithInfo and
+                processWithInfo
+            on_failure: called with (record, exception) for a redo record
+                that failed, record is None if getRedoRecord failed
+            retry: G2RetryScheduler of the redo records that fail with a
+                G2RetryableException.  A redo record is off the queue once it
+                is taken, so without retries it is only passed to on_failure.
+            scale_interval: seconds between polls of countRedoRecords
+            idle_delay: seconds an idle worker first waits
+            max_idle_delay: most seconds an idle worker waits
+            prefetch: size of the window of redo records fetched ahead, 0
+                to fetch each record when a worker needs it
+            coalesce: function returning the target of a redo record, the
+                records of the window with the same target are processed
+                once.  None to prefetch without coalescing.
+            clock: function returning the current time, in seconds
+        """
+
+        self.engine = engine
+        self.max_workers = max_workers or default_workers()
+        self.min_workers = min(min_workers, self.max_workers)
+        self.records_per_worker = records_per_worker
+        self.with_info = with_info
+        self.on_info = on_info
+        self.flags = flags
+        self.on_failure = on_failure
+        self.retry = retry
+        self.scale_interval = scale_interval
+        self.idle_delay = idle_delay
+        self.max_idle_delay = max_idle_delay
+        self.prefetch = prefetch
+        self.coalesce = coalesce
+        self.clock = clock
+        self.processed = 0
+        self.failed = 0
+        self.fetched = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._window = collections.OrderedDict()
+        self._fetch_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = {}
+        self._target = 0
+        self._busy = 0
+        self._backlog = 0
+        self._backlog_since = None
+        self._rate = 0.0
+        self._started = None
+        self._seconds = 0.0
+        self._runner = None
+
+    # -------------------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------------------
+
+    def _work(self, index):
+        delay = self.idle_delay
+        while True:
+            with self._lock:
+                # Only the workers above the target exit, so the threads left
+                # are always 0 to target - 1.
+                if self._stop.is_set() or index >= self._target:
+                    del self._threads[index]
+                    return
+                self._busy += 1
+            try:
+                found = self._process_next()
+            finally:
+                with self._lock:
+                    self._busy -= 1
+            if found:
+                delay = self.idle_delay
+            else:
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.max_idle_delay)
+
+    def _next_record(self):
+        # The next redo record and its attempts so far: a retry that is due,
+        # or a record from the queue.  The record is None if it is to be
+        # fetched and processed with info in one pass.
+        if self.retry is not None:
+            due = self.retry.due(1)
+            if due:
+                record, attempts, _ = due[0]
+                return record, attempts
+        if self.prefetch:
+            return self._next_prefetched(), 0
+        if self.with_info:
+            return None, 0
+        return self.engine.getRedoRecordBytes(), 0
+
+    # -------------------------------------------------------------------------
+    # Prefetching
+    # -------------------------------------------------------------------------
+
+    def _take(self):
+        # The oldest record of the window, or None.
+        with self._lock:
+            if self._window:
+                return self._window.popitem(last=False)[1]
+        return None
+
+    def _next_prefetched(self):
+        # One worker at a time tops the window up once it is half empty,
+        # while the others go on taking records from it.
+        with self._lock:
+            low = len(self._window) <= self.prefetch // 2
+        # The lock is only tried, so it cannot be held in a with statement.
+        # pylint: disable-next=consider-using-with
+        if low and self._fetch_lock.acquire(blocking=False):
+            try:
+                self._fetch()
+            finally:
+                self._fetch_lock.release()
+        record = self._take()
+        if record is not None:
+            return record
+        # The window is empty: wait for the worker filling it, or fill it.
+        with self._fetch_lock:
+            record = self._take()
+            if record is not None:
+                return record
+            self._fetch()
+        record = self._take()
+        return b"" if record is None else record
+
+    def _fetch(self):
+        # Fill the window up to prefetch records, or until the queue is
+        # empty, coalescing the records with a target already in it.
+        with self._lock:
+            count = self.prefetch - len(self._window)
+        fetched = []
+        try:
+            while len(fetched) < count:
+                record = self.engine.getRedoRecordBytes()
+                if not record:
+                    break
+                fetched.append(record)
+        finally:
+            if self.coalesce is None:
+                targets = [object() for record in fetched]
+            else:
+                targets = [self.coalesce(record) for record in fetched]
+            with self._lock:
+                self.fetched += len(fetched)
+                for target, record in zip(targets, fetched):
+                    if target in self._window:
+                        self.coalesced += 1
+                    else:
+                        self._window[target] = record
+
+    def _process_next(self):
+        # Process one redo record, False if there was none.
+        try:
+            record, attempts = self._next_record()
+        except G2Exception as ex:
+            self._failure(None, ex)
+            return False
+        if record is None:
+            return self._process_queued()
+        if not record:
+            return False
+        attempts += 1
+        try:
+            if self.with_info:
+                info = self.engine.processWithInfoBytes(record, self.flags)
+                if self.on_info is not None:
+                    self.on_info(info)
+            else:
+                self.engine.process(record)
+        except G2Exception as ex:
+            self._retry(record, attempts, ex)
+            return True
+        with self._lock:
+            self.processed += 1
+        return True
+
+    def _process_queued(self):
+        # Fetch the next redo record and process it with info, in one pass.
+        try:
+            record, info = self.engine.processRedoRecordWithInfoBytes(self.flags)
+        except G2Exception as ex:
+            record = getattr(ex, "redo_record", None)
+            if record is None:
+                # getRedoRecord failed.
+                self._failure(None, ex)
+                return False
+            self._retry(record, 1, ex)
+            return True
+        if not record:
+            return False
+        if self.on_info is not None:
+            self.on_info(info)
+        with self._lock:
+            self.processed += 1
+        return True
+
+    def _retry(self, record, attempts, exception):
+        if self.retry is None or not self.retry.schedule(record, attempts, exception):
+            self._failure(record, exception)
+
+    def _failure(self, record, exception):
+        with self._lock:
+            self.failed += 1
+        if self.on_failure is not None:
+            self.on_failure(record, exception)
+
+    # -------------------------------------------------------------------------
+    # Scaling
+    # -------------------------------------------------------------------------
+
+    def _scale(self, elapsed, processed):
+        # Set the target from the backlog and start the missing workers.
+        # Return the backlog.
+        backlog = self.engine.countRedoRecords() + len(self._window)
+        if self.retry is not None:
+            backlog += len(self.retry)
+        target = math.ceil(backlog / self.records_per_worker)
+        target = max(self.min_workers, min(self.max_workers, target))
+        now = self.clock()
+        with self._lock:
+            self._backlog = backlog
+            if backlog == 0:
+                self._backlog_since = None
+            elif self._backlog_since is None:
+                self._backlog_since = now
+            if elapsed > 0:
+                self._rate = (self.processed - processed) / elapsed
+            self._target = target
+            for index in range(target):
+                if index not in self._threads:
+                    thread = threading.Thread(
+                        target=self._work,
+                        args=(index,),
+                        name="G2Redo-{0}".format(index),
+                        daemon=True,
+                    )
+                    self._threads[index] = thread
+                    thread.start()
+        return backlog
+
+    def _drained(self, done):
+        # True if the queue is empty and no record was being processed since
+        # done, the records finished before the queue was counted.
+        if self.engine.countRedoRecords() or (self.retry and len(self.retry)):
+            return False
+        with self._lock:
+            return (
+                self._busy == 0
+                and not self._window
+                and self.processed + self.failed == done
+            )
+
+    # -------------------------------------------------------------------------
+    # Running
+    # -------------------------------------------------------------------------
+
+    def run(self, drain=False):
+        # type: (bool) -> None
+        """Process redo records until stop() is called
+
+        Args:
+            drain: True to return once the queue is empty and every record
+                taken from it is processed
+        """
+
+        self._stop.clear()
+        self._run(drain)
+
+    def _run(self, drain):
+        self._started = self.clock()
+        scaled = self._started
+        processed = self.processed
+        try:
+            while not self._stop.is_set():
+                now = self.clock()
+                self._scale(now - scaled, processed)
+                scaled = now
+                processed = self.processed
+                if drain:
+                    with self._lock:
+                        done = self.processed + self.failed
+                    if self._drained(done):
+                        break
+                self._stop.wait(self.scale_interval)
+        finally:
+            self._stop.set()
+            self._join()
+            self._seconds += self.clock() - self._started
+            self._started = None
+
+    def drain(self):
+        # type: () -> None
+        """Process redo records until the queue is empty"""
+
+        self.run(drain=True)
+
+    def _join(self):
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join()
+
+    def start(self):
+        # type: () -> None
+        """Run in a background thread until stop() is called"""
+
+        self._stop.clear()
+        self._runner = threading.Thread(
+            target=self._run, args=(False,), name="G2RedoProcessor", daemon=True
+        )
+        self._runner.start()
+
+    def stop(self, wait=True):
+        # type: (bool) -> None
+        """Stop the workers once their current redo records are processed
+
+        Args:
+            wait: True to wait for the workers to stop
+        """
+
+        self._stop.set()
+        if wait and self._runner is not None:
+            self._runner.join()
+            self._runner = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+
+    @property
+    def seconds(self):
+        # type: () -> float
+        """Seconds the processor has run"""
+
+        if self._started is None:
+            return self._seconds
+        return self._seconds + self.clock() - self._started
+
+    def metrics(self):
+        # type: () -> dict
+        """The processor's state
+
+        Return:
+            dict: workers (threads running), target (workers wanted),
+                backlog (redo records in the queue, the prefetch window and
+                waiting for a retry, at the last poll), backlog_age (seconds
+                since the queue was last empty, an upper bound of the age of
+                its oldest record), rate (records per second processed since
+                the previous poll), processed, failed, fetched, coalesced and
+                coalescing_ratio (the share of the fetched records that were
+                coalesced)
+        """
+
+        with self._lock:
+            since = self._backlog_since
+            return {
+                "workers": len(self._threads),
+                "target": self._target,
+                "backlog": self._backlog,
+                "backlog_age": 0.0 if since is None else self.clock() - since,
+                "rate": self._rate,
+                "processed": self.processed,
+                "failed": self.failed,
+                "fetched": self.fetched,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": (
+                    self.coalesced / self.fetched if self.fetched else 0.0
+                ),
+            }
+
+    def report(self):
+        # type: () -> str
+        """Records per second of the redo records processed"""
+
+        seconds = self.seconds
+        report = (
+            "{0:<8} {1:10d} records {2:10.1f} s {3:12.0f} records/s, {4} failed".format(
+                "redo",
+                self.processed + self.failed,
+                seconds,
+                (self.processed + self.failed) / seconds if seconds else 0.0,
+                self.failed,
+            )
+        )
+        if self.coalesced:
+            report += ", {0} coalesced".format(self.coalesced)
+        return report
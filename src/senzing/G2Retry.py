@@ -0,0 +1,224 @@
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+
+from .G2Exception import G2RetryableException
+
+__all__ = ["G2DeadLetterFile", "G2RetryScheduler"]
+
+# -----------------------------------------------------------------------------
+# Dead letter file
+# -----------------------------------------------------------------------------
+
+
+def _json_value(value):
+    # Arguments such as data source codes and records may be bytes.
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode(errors="replace")
+    if isinstance(value, (list, tuple)):
+        return [_json_value(element) for element in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def describe_failure(item, attempts, exception):
+    # type: (object, int, Exception) -> bytes
+    """Default line of G2DeadLetterFile: a JSON document with the item, the
+    number of attempts and the last exception"""
+
+    return json.dumps(
+        {
+            "item": _json_value(item),
+            "attempts": attempts,
+            "exception": type(exception).__name__,
+            "message": str(exception),
+        }
+    ).encode()
+
+
+class G2DeadLetterFile(object):
+    """Appends the items that failed every attempt to a file, one per line
+
+    Attributes:
+        path: path of the file
+        written: lines written
+    """
+
+    def __init__(self, path, file_format=None):
+        # type: (str, function) -> None
+        """G2DeadLetterFile class initialization
+
+        Args:
+            path: path of the file, opened for appending
+            file_format: called with (item, attempts, exception), returns the
+                line to write, as bytes, without its newline.  Defaults to
+                describe_failure().
+        """
+
+        self.path = path
+        self.file_format = describe_failure if file_format is None else file_format
+        self.written = 0
+        # The file stays open for the life of the object, until close().
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        self._lock = threading.Lock()
+
+    def __call__(self, item, attempts, exception):
+        line = self.file_format(item, attempts, exception)
+        with self._lock:
+            self._file.write(line.rstrip(b"\n") + b"\n")
+            self._file.flush()
+            self.written += 1
+
+    def close(self):
+        # type: () -> None
+        """Close the file"""
+
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# -----------------------------------------------------------------------------
+# Retry scheduling
+# -----------------------------------------------------------------------------
+
+
+class G2RetryScheduler(object):
+    """Delayed re-queue of the items of a bulk call that failed with a
+    G2RetryableException
+
+    A failed item is scheduled instead of being retried on the thread that
+    ran it, so the thread goes on with other items while the item waits.
+    Each retry waits a random time up to an exponentially growing limit
+    ("full jitter"), which spreads out the retries of a burst of failures on
+    the same entities.  An item that fails max_attempts times is passed to
+    the dead letter handler.  A scheduler serves one bulk call at a time.
+
+    Attributes:
+        retried: items scheduled for another attempt
+        dead: items that failed every attempt
+    """
+
+    def __init__(
+        self,
+        max_attempts=5,
+        initial_delay=0.1,
+        max_delay=10.0,
+        multiplier=2.0,
+        dead_letter=None,
+        retry_on=(G2RetryableException,),
+        clock=time.monotonic,
+    ):
+        # type: (int, float, float, float, object, tuple, function) -> None
+        """G2RetryScheduler class initialization
+
+        Args:
+            max_attempts: most attempts of an item, including the first
+            initial_delay: limit of the delay before the first retry, in seconds
+            max_delay: limit of the delay before any retry, in seconds
+            multiplier: growth of the limit at every attempt
+            dead_letter: called with (item, attempts, exception) for an item
+                that failed every attempt, e.g. a G2DeadLetterFile, or the
+                path of a G2DeadLetterFile to create
+            retry_on: exception classes that are retried
+            clock: function returning the current time, in seconds
+        """
+
+        if isinstance(dead_letter, str):
+            dead_letter = G2DeadLetterFile(dead_letter)
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.dead_letter = dead_letter
+        self.retry_on = retry_on
+        self.clock = clock
+        self.retried = 0
+        self.dead = 0
+        self._delayed = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._delayed)
+
+    def delay(self, attempts):
+        # type: (int) -> float
+        """Seconds to wait before the next attempt of an item that has
+        failed the given number of times"""
+
+        limit = self.initial_delay * self.multiplier ** (attempts - 1)
+        return random.uniform(0.0, min(self.max_delay, limit))
+
+    def schedule(self, item, attempts, exception, tag=None):
+        # type: (object, int, Exception, object) -> bool
+        """Schedule another attempt of a failed item
+
+        Args:
+            item: the item
+            attempts: attempts of the item so far
+            exception: the exception of the last attempt
+            tag: returned with the item by due(), e.g. its position in the
+                input of a bulk call
+
+        Return:
+            bool: True if the item was scheduled.  False if the exception is
+                not retried, or the item failed every attempt and was passed
+                to the dead letter handler.
+        """
+
+        if not isinstance(exception, self.retry_on):
+            return False
+        if attempts >= self.max_attempts:
+            with self._lock:
+                self.dead += 1
+            if self.dead_letter is not None:
+                self.dead_letter(item, attempts, exception)
+            return False
+        due = self.clock() + self.delay(attempts)
+        with self._lock:
+            heapq.heappush(
+                self._delayed, (due, next(self._sequence), item, attempts, tag)
+            )
+            self.retried += 1
+        return True
+
+    def due(self, limit=None):
+        # type: (int) -> list
+        """Remove and return the (item, attempts, tag) of the items whose
+        delay has passed, at most limit of them"""
+
+        now = self.clock()
+        items = []
+        with self._lock:
+            while self._delayed and self._delayed[0][0] <= now:
+                if limit is not None and len(items) >= limit:
+                    break
+                items.append(heapq.heappop(self._delayed)[2:])
+        return items
+
+    def next_due(self):
+        # type: () -> float
+        """Seconds until the next item is due, or None if none is scheduled"""
+
+        with self._lock:
+            if not self._delayed:
+                return None
+            return max(0.0, self._delayed[0][0] - self.clock())
+
+    def clear(self):
+        # type: () -> list
+        """Remove and return the (item, attempts, tag) of every scheduled item"""
+
+        with self._lock:
+            items = [delayed[2:] for delayed in self._delayed]
+            self._delayed = []
+        return items
@@ -1,55 +1,119 @@
 # Tricky code:
 # Because the filenames are the same as class names in many instances,
-# the __all__ list needs to be constructed from the files before the
-# classes are imported.   For that reason, there is a 2-step process:
-#   1) Use the "names" as filenames to access the "__all__" attribute.
-#   2) Use the "names" as class names.
-
-# Step 1: Import the files so that the __all__ attribute will work with the "name" (e.g. G2Config, G2ConfigMgr)
+# the package attribute for a name can be either the submodule (G2Config.py)
+# or the class defined in it (G2Config).  The classes are what callers want,
+# so:
+#   1) Nothing is imported up front.  __getattr__ imports the submodule that
+#      defines a name the first time the name is used.
+#   2) Importing a submodule makes the import system set the package attribute
+#      of the same name to the submodule.  _G2Package.__setattr__ stores the
+#      class of the same name instead, if the submodule defines one.
 
+import importlib
+import sys
+import types
 import warnings
 
-from . import (
-    G2Config,
-    G2ConfigMgr,
-    G2Diagnostic,
-    G2Engine,
-    G2EngineFlags,
-    G2Exception,
-    G2Hasher,
-    G2Product,
-)
-
-import_lists = [
-    G2Config.__all__,
-    G2ConfigMgr.__all__,
-    G2Diagnostic.__all__,
-    G2Engine.__all__,
-    G2EngineFlags.__all__,
-    G2Exception.__all__,
-    G2Hasher.__all__,
-    G2Product.__all__,
-]
-
-__all__ = []
-for import_list in import_lists:
-    __all__.extend(import_list)
-
-# Step 2: Overwrite the "name" that did point to the file in step #1 to now point to the class.
-# Each of the submodules must have the having an __all__ variable defined for the "*" to work.
-
-from .G2Config import *
-from .G2ConfigMgr import *
-from .G2Diagnostic import *
-from .G2Engine import *
-from .G2EngineFlags import *
-from .G2Exception import *
-from .G2Exception import DEPRECATED_CLASSES
-from .G2Hasher import *
-from .G2Product import *
+# Names exported by each submodule.  These must match the "__all__" variable
+# of the submodule.
+
+_SUBMODULE_EXPORTS = {
+    "AsyncG2Engine": ["AsyncG2Engine"],
+    "G2Bulk": ["G2AffinityExecutor", "G2BulkResult"],
+    "G2Concurrency": ["G2ConcurrencyController"],
+    "G2Config": ["G2Config"],
+    "G2ConfigMgr": ["G2ConfigMgr"],
+    "G2Diagnostic": ["G2Diagnostic"],
+    "G2Engine": ["G2Engine"],
+    "G2EngineFlags": ["G2EngineFlags"],
+    "G2Exception": [
+        "ExceptionCode",
+        "ExceptionMessage",
+        "G2BadInputException",
+        "G2ConfigurationException",
+        "G2DatabaseConnectionLostException",
+        "G2DatabaseException",
+        "G2Exception",
+        "G2LicenseException",
+        "G2NotFoundException",
+        "G2NotInitializedException",
+        "G2RetryTimeoutExceededException",
+        "G2RetryableException",
+        "G2UnhandledException",
+        "G2UnknownDatasourceException",
+        "G2UnrecoverableException",
+        "TranslateG2ModuleException",
+    ],
+    "G2ExportWriter": ["G2ExportWriter"],
+    "G2Fingerprint": ["G2FingerprintStore"],
+    "G2Hasher": ["G2Hasher"],
+    "G2Library": ["G2BufferPool", "copy_response"],
+    "G2LoadJournal": ["G2LoadJournal"],
+    "G2Loader": ["G2Loader", "G2ProcessLoader"],
+    "G2NativeApi": [],
+    "G2Product": ["G2Product"],
+    "G2RedoProcessor": ["G2RedoProcessor"],
+    "G2Retry": ["G2DeadLetterFile", "G2RetryScheduler"],
+}
+
+_EXPORTED_FROM = {
+    name: submodule for submodule, names in _SUBMODULE_EXPORTS.items() for name in names
+}
+
+__all__ = list(_EXPORTED_FROM)
+
+# Bound for linters and type checkers only.  At runtime the names are imported
+# on first use by __getattr__.
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .AsyncG2Engine import AsyncG2Engine
+    from .G2Bulk import G2AffinityExecutor, G2BulkResult
+    from .G2Concurrency import G2ConcurrencyController
+    from .G2Config import G2Config
+    from .G2ConfigMgr import G2ConfigMgr
+    from .G2Diagnostic import G2Diagnostic
+    from .G2Engine import G2Engine
+    from .G2EngineFlags import G2EngineFlags
+    from .G2Exception import (
+        ExceptionCode,
+        ExceptionMessage,
+        G2BadInputException,
+        G2ConfigurationException,
+        G2DatabaseConnectionLostException,
+        G2DatabaseException,
+        G2Exception,
+        G2LicenseException,
+        G2NotFoundException,
+        G2NotInitializedException,
+        G2RetryTimeoutExceededException,
+        G2RetryableException,
+        G2UnhandledException,
+        G2UnknownDatasourceException,
+        G2UnrecoverableException,
+        TranslateG2ModuleException,
+    )
+    from .G2ExportWriter import G2ExportWriter
+    from .G2Fingerprint import G2FingerprintStore
+    from .G2Hasher import G2Hasher
+    from .G2Library import G2BufferPool, copy_response
+    from .G2LoadJournal import G2LoadJournal
+    from .G2Loader import G2Loader, G2ProcessLoader
+    from .G2Product import G2Product
+    from .G2RedoProcessor import G2RedoProcessor
+    from .G2Retry import G2DeadLetterFile, G2RetryScheduler
 
 
 def __getattr__(name):
+    submodule = _EXPORTED_FROM.get(name)
+    if submodule is not None:
+        value = getattr(importlib.import_module("." + submodule, __name__), name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULE_EXPORTS:
+        return importlib.import_module("." + name, __name__)
+    from .G2Exception import DEPRECATED_CLASSES, G2Exception
+
     if name in DEPRECATED_CLASSES:
         replacement_class = DEPRECATED_CLASSES.get(name, G2Exception)
         replacement_class_name = replacement_class.__name__
@@ -61,4 +125,18 @@ def __getattr__(name):
             stacklevel=2,
         )
         return replacement_class
-    raise AttributeError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _G2Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        if isinstance(value, types.ModuleType) and name in _SUBMODULE_EXPORTS:
+            value = getattr(value, name, value)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _G2Package
@@ -0,0 +1,173 @@
+"""Load JSON lines files into Senzing
+
+Usage:
+    python -m senzing.load [options] FILE [FILE ...]
+
+Files may be plain, gzip, bz2 or xz compressed JSON lines.  The engine
+configuration is read from --ini-params or the
+SENZING_ENGINE_CONFIGURATION_JSON environment variable.
+"""
+
+import argparse
+import os
+import sys
+
+from .G2Engine import G2Engine
+from .G2Fingerprint import G2FingerprintStore
+from .G2LoadJournal import G2LoadJournal
+from .G2Loader import G2Loader, G2ProcessLoader
+
+__all__ = []
+
+
+def parse_arguments(argv=None):
+    # type: (list) -> argparse.Namespace
+    """Parse the command line"""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m senzing.load",
+        description="Load JSON lines files into Senzing.",
+    )
+    parser.add_argument("files", metavar="FILE", nargs="+", help="JSON lines file")
+    parser.add_argument(
+        "--ini-params",
+        default=os.environ.get("SENZING_ENGINE_CONFIGURATION_JSON"),
+        help="engine configuration JSON, defaults to"
+        " $SENZING_ENGINE_CONFIGURATION_JSON",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="loader threads, defaults to the number of CPUs, or 1 per process"
+        " with --processes",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="load with this many worker processes, each with its own engine,"
+        " instead of threads sharing one engine",
+    )
+    parser.add_argument(
+        "--start-method",
+        choices=["fork", "forkserver", "spawn"],
+        default=None,
+        help="how worker processes are started, defaults to the platform's",
+    )
+    parser.add_argument("--parsers", type=int, default=2, help="parser threads")
+    parser.add_argument(
+        "--chunk-size", type=int, default=1048576, help="bytes read at a time"
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=8, help="chunks queued between stages"
+    )
+    parser.add_argument("--load-id", default=None, help="load ID of the records")
+    parser.add_argument(
+        "--data-source", default=None, help="DATA_SOURCE of records without one"
+    )
+    parser.add_argument(
+        "--engine-name", default="pySenzingLoad", help="name passed to G2Engine.init"
+    )
+    parser.add_argument(
+        "--config-id",
+        type=int,
+        default=None,
+        help="initialize the engine with this configuration ID",
+    )
+    parser.add_argument(
+        "--fingerprints",
+        metavar="FILE",
+        default=None,
+        help="skip the records that have not changed since they were loaded"
+        " with the same fingerprint file",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="FILE",
+        default=None,
+        help="commit the lines loaded to this journal, and skip the lines it"
+        " holds, to resume a load that was stopped",
+    )
+    parser.add_argument(
+        "--debug", action="store_true", help="initialize the engine verbosely"
+    )
+    arguments = parser.parse_args(argv)
+    if not arguments.ini_params:
+        parser.error("--ini-params or SENZING_ENGINE_CONFIGURATION_JSON must be set")
+    return arguments
+
+
+def print_failure(path, line_number, exception):
+    print("ERROR: {0}:{1}: {2}".format(path, line_number, exception), file=sys.stderr)
+
+
+def main(argv=None):
+    # type: (list) -> int
+    """Load the files named on the command line
+
+    Return:
+        int: exit status, 1 if any record failed to load
+    """
+
+    arguments = parse_arguments(argv)
+    journal = None
+    if arguments.journal:
+        journal = G2LoadJournal(arguments.journal)
+    if arguments.processes:
+        loader = G2ProcessLoader(
+            arguments.ini_params,
+            engine_name=arguments.engine_name,
+            config_id=arguments.config_id,
+            processes=arguments.processes,
+            threads=arguments.workers or 1,
+            chunk_size=arguments.chunk_size,
+            load_id=arguments.load_id,
+            data_source=arguments.data_source,
+            on_failure=print_failure,
+            start_method=arguments.start_method,
+            debug=arguments.debug,
+            fingerprints=arguments.fingerprints,
+            journal=journal,
+        )
+        loader.load(arguments.files)
+        print(loader.report())
+        return 1 if loader.failed else 0
+
+    engine = G2Engine()
+    if arguments.config_id is None:
+        engine.init(arguments.engine_name, arguments.ini_params, arguments.debug)
+    else:
+        engine.initWithConfigID(
+            arguments.engine_name,
+            arguments.ini_params,
+            arguments.config_id,
+            arguments.debug,
+        )
+    fingerprints = None
+    if arguments.fingerprints:
+        fingerprints = G2FingerprintStore(arguments.fingerprints)
+    try:
+        loader = G2Loader(
+            engine,
+            workers=arguments.workers,
+            parsers=arguments.parsers,
+            chunk_size=arguments.chunk_size,
+            queue_size=arguments.queue_size,
+            load_id=arguments.load_id,
+            data_source=arguments.data_source,
+            on_failure=print_failure,
+            fingerprints=fingerprints,
+            journal=journal,
+        )
+        loader.load(arguments.files)
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
+        engine.destroy()
+    print(loader.report())
+    return 1 if loader.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
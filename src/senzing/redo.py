@@ -0,0 +1,132 @@
+"""Process the Senzing redo queue
+
+Usage:
+    python -m senzing.redo [options]
+
+The number of worker threads follows the redo backlog.  Runs until it is
+interrupted, or with --drain until the queue is empty.  The engine
+configuration is read from --ini-params or the
+SENZING_ENGINE_CONFIGURATION_JSON environment variable.
+"""
+
+import argparse
+import os
+import sys
+
+from .G2Engine import G2Engine
+from .G2RedoProcessor import G2RedoProcessor
+
+__all__ = []
+
+
+def parse_arguments(argv=None):
+    # type: (list) -> argparse.Namespace
+    """Parse the command line"""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m senzing.redo",
+        description="Process the Senzing redo queue.",
+    )
+    parser.add_argument(
+        "--ini-params",
+        default=os.environ.get("SENZING_ENGINE_CONFIGURATION_JSON"),
+        help="engine configuration JSON, defaults to"
+        " $SENZING_ENGINE_CONFIGURATION_JSON",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="most worker threads, defaults to the number of CPUs",
+    )
+    parser.add_argument(
+        "--min-workers", type=int, default=1, help="fewest worker threads"
+    )
+    parser.add_argument(
+        "--records-per-worker",
+        type=int,
+        default=1000,
+        help="redo backlog per worker thread",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="redo records fetched ahead, duplicates among them are processed once",
+    )
+    parser.add_argument(
+        "--drain", action="store_true", help="stop once the redo queue is empty"
+    )
+    parser.add_argument(
+        "--with-info",
+        action="store_true",
+        help="write the info document of every redo record to standard output",
+    )
+    parser.add_argument(
+        "--engine-name", default="pySenzingRedo", help="name passed to G2Engine.init"
+    )
+    parser.add_argument(
+        "--config-id",
+        type=int,
+        default=None,
+        help="initialize the engine with this configuration ID",
+    )
+    parser.add_argument(
+        "--debug", action="store_true", help="initialize the engine verbosely"
+    )
+    arguments = parser.parse_args(argv)
+    if not arguments.ini_params:
+        parser.error("--ini-params or SENZING_ENGINE_CONFIGURATION_JSON must be set")
+    return arguments
+
+
+def print_failure(record, exception):
+    print("ERROR: {0}: {1}".format(record, exception), file=sys.stderr)
+
+
+def print_info(info):
+    sys.stdout.buffer.write(info + b"\n")
+
+
+def main(argv=None):
+    # type: (list) -> int
+    """Process the redo queue
+
+    Return:
+        int: exit status, 1 if any redo record failed
+    """
+
+    arguments = parse_arguments(argv)
+    engine = G2Engine()
+    if arguments.config_id is None:
+        engine.init(arguments.engine_name, arguments.ini_params, arguments.debug)
+    else:
+        engine.initWithConfigID(
+            arguments.engine_name,
+            arguments.ini_params,
+            arguments.config_id,
+            arguments.debug,
+        )
+    try:
+        processor = G2RedoProcessor(
+            engine,
+            max_workers=arguments.workers,
+            min_workers=arguments.min_workers,
+            records_per_worker=arguments.records_per_worker,
+            prefetch=arguments.prefetch,
+            with_info=arguments.with_info,
+            on_info=print_info,
+            on_failure=print_failure,
+        )
+        try:
+            processor.run(drain=arguments.drain)
+        except KeyboardInterrupt:
+            pass
+    finally:
+        engine.destroy()
+    print(processor.report(), file=sys.stderr if arguments.with_info else sys.stdout)
+    return 1 if processor.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#! /usr/bin/env python3
+
+import asyncio
+import gc
+import os
+import threading
+import unittest
+import weakref
+
+from senzing.AsyncG2Engine import QUERY, REDO, WRITE, AsyncG2Engine, method_class
+from senzing.G2Concurrency import G2ConcurrencyController
+
+
+class BlockingEngine(object):
+    '''Engine whose methods block until released, recording their calls.'''
+
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.most_running = {}
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def _call(self, kind, name, *args):
+        with self.lock:
+            self.calls.append((name,) + args)
+            self.running += 1
+            self.most_running[kind] = max(self.most_running.get(kind, 0), self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        return name
+
+    def getEntityByEntityIDBytes(self, entityID, flags=0):
+        return self._call(QUERY, "getEntityByEntityIDBytes", entityID)
+
+    def addRecord(self, dataSourceCode, recordId, jsonData, loadId=None):
+        return self._call(WRITE, "addRecord", recordId)
+
+    def processRedoRecord(self, record):
+        return self._call(REDO, "processRedoRecord", record)
+
+    def addRecords(self, records):
+        return []
+
+    def exportConfig(self, response):
+        pass
+
+
+async def wait_for_calls(engine, count):
+    while len(engine.calls) < count:
+        await asyncio.sleep(0.01)
+
+
+class TestMethodClass(unittest.TestCase):
+
+    def test_method_classes(self):
+        '''Test that methods and their Bytes variants are classified by name.'''
+
+        self.assertEqual(method_class("getEntityByEntityID"), QUERY)
+        self.assertEqual(method_class("getEntityByEntityIDBytes"), QUERY)
+        self.assertEqual(method_class("searchByAttributesBytes"), QUERY)
+        self.assertEqual(method_class("addRecordWithInfoBytes"), WRITE)
+        self.assertEqual(method_class("deleteRecord"), WRITE)
+        self.assertEqual(method_class("reevaluateEntity"), WRITE)
+        self.assertEqual(method_class("getRedoRecordBytes"), REDO)
+        self.assertEqual(method_class("processRedoRecordWithInfo"), REDO)
+        self.assertEqual(method_class("countRedoRecords"), REDO)
+        self.assertIsNone(method_class("addRecords"))
+        self.assertIsNone(method_class("deleteRecords"))
+        self.assertIsNone(method_class("reevaluateEntities"))
+        self.assertIsNone(method_class("exportConfig"))
+        self.assertIsNone(method_class("init"))
+
+
+class TestAsyncG2Engine(unittest.TestCase):
+
+    def test_calls(self):
+        '''Test that awaiting a method returns the engine method's result.'''
+
+        engine = BlockingEngine()
+        engine.release.set()
+
+        async def main():
+            async with AsyncG2Engine(engine, workers=2) as async_engine:
+                return await async_engine.getEntityByEntityIDBytes(1)
+
+        self.assertEqual(asyncio.run(main()), "getEntityByEntityIDBytes")
+        self.assertEqual(engine.calls, [("getEntityByEntityIDBytes", 1)])
+
+    def test_event_loops(self):
+        '''Test that the engine can be awaited from successive event loops without keeping them alive.'''
+
+        engine = BlockingEngine()
+        engine.release.set()
+        async_engine = AsyncG2Engine(engine, limits={QUERY: 1})
+        self.assertEqual(async_engine.workers, os.cpu_count() or 1)
+        loops = []
+
+        async def main(calls):
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+            return await asyncio.gather(*(async_engine.getEntityByEntityIDBytes(i) for i in range(calls)))
+
+        try:
+            # The first loop waits on its semaphore, the second does not.
+            self.assertEqual(len(asyncio.run(main(3))), 3)
+            self.assertEqual(len(asyncio.run(main(1))), 1)
+            gc.collect()
+            self.assertEqual([loop() for loop in loops], [None, None])
+        finally:
+            async_engine.shutdown()
+
+    def test_unavailable_methods(self):
+        '''Test that bulk, configuration and unknown methods are not wrapped.'''
+
+        async_engine = AsyncG2Engine(BlockingEngine(), workers=1)
+        try:
+            for name in ("addRecords", "exportConfig", "init", "_call"):
+                with self.assertRaises(AttributeError):
+                    getattr(async_engine, name)
+        finally:
+            async_engine.shutdown()
+
+    def test_limits(self):
+        '''Test that each method class is limited by its own semaphore.'''
+
+        engine = BlockingEngine()
+
+        async def main():
+            async_engine = AsyncG2Engine(engine, workers=4, limits={QUERY: 2, REDO: 1})
+            try:
+                calls = [asyncio.ensure_future(async_engine.getEntityByEntityIDBytes(i)) for i in range(6)]
+                calls += [asyncio.ensure_future(async_engine.processRedoRecord(str(i))) for i in range(3)]
+                await wait_for_calls(engine, 3)
+                await asyncio.sleep(0.1)
+                self.assertEqual(len(engine.calls), 3)
+                engine.release.set()
+                await asyncio.gather(*calls)
+            finally:
+                async_engine.shutdown()
+
+        asyncio.run(main())
+        self.assertEqual(len(engine.calls), 9)
+        self.assertLessEqual(engine.most_running[QUERY], 3)
+        self.assertLessEqual(engine.most_running[REDO], 3)
+
+    def test_controllers(self):
+        '''Test that a method class with a controller runs within the controller's limit.'''
+
+        engine = BlockingEngine()
+        controller = G2ConcurrencyController(initial_limit=2, max_limit=3)
+
+        async def main():
+            async_engine = AsyncG2Engine(engine, workers=8, controllers={QUERY: controller})
+            try:
+                self.assertEqual(async_engine.limits[QUERY], 3)
+                calls = [asyncio.ensure_future(async_engine.getEntityByEntityIDBytes(i)) for i in range(6)]
+                await wait_for_calls(engine, 2)
+                await asyncio.sleep(0.1)
+                self.assertEqual(len(engine.calls), 2)
+                self.assertEqual(controller.in_flight, 2)
+                engine.release.set()
+                await asyncio.gather(*calls)
+            finally:
+                async_engine.shutdown()
+
+        asyncio.run(main())
+        self.assertEqual(len(engine.calls), 6)
+        self.assertEqual(controller.metrics()["calls"], 6)
+
+    def test_cancel_queued(self):
+        '''Test that cancelling calls that have not started never calls the engine.'''
+
+        engine = BlockingEngine()
+
+        async def main():
+            async_engine = AsyncG2Engine(engine, workers=1, limits={WRITE: 2})
+            try:
+                running = asyncio.ensure_future(async_engine.addRecord("TEST", "1", "{}"))
+                # Waiting in the executor queue.
+                queued = asyncio.ensure_future(async_engine.addRecord("TEST", "2", "{}"))
+                # Waiting for the semaphore.
+                waiting = asyncio.ensure_future(async_engine.addRecord("TEST", "3", "{}"))
+                await wait_for_calls(engine, 1)
+                await asyncio.sleep(0.05)
+                queued.cancel()
+                waiting.cancel()
+                await asyncio.sleep(0.05)
+                engine.release.set()
+                self.assertEqual(await running, "addRecord")
+                for call in (queued, waiting):
+                    with self.assertRaises(asyncio.CancelledError):
+                        await call
+                # The cancelled calls gave their slots back.
+                self.assertEqual(await async_engine.addRecord("TEST", "4", "{}"), "addRecord")
+            finally:
+                async_engine.shutdown()
+
+        asyncio.run(main())
+        self.assertEqual([call[1] for call in engine.calls], ["1", "4"])
+
+    def test_shutdown_cancels_queued(self):
+        '''Test that shutdown cancels the calls that have not started.'''
+
+        engine = BlockingEngine()
+
+        async def main():
+            async_engine = AsyncG2Engine(engine, workers=1)
+            calls = [asyncio.ensure_future(async_engine.addRecord("TEST", str(i), "{}")) for i in range(3)]
+            await wait_for_calls(engine, 1)
+            await asyncio.sleep(0.05)
+            async_engine.shutdown(wait=False)
+            engine.release.set()
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertEqual(results[0], "addRecord")
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertIsInstance(results[2], asyncio.CancelledError)
+        self.assertEqual(len(engine.calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,317 @@
+#! /usr/bin/env python3
+
+import ctypes.util
+import inspect
+import threading
+import time
+import unittest
+
+from senzing.G2Bulk import G2AffinityExecutor, G2BulkResult, affected_entities, bulk_map, record_key
+from senzing.G2Concurrency import G2ConcurrencyController
+from senzing.G2Engine import G2Engine
+from senzing.G2Exception import G2BadInputException
+from senzing.G2Library import set_library_path
+
+
+class CountingIterator(object):
+    '''Iterator recording how many items have been read.'''
+
+    def __init__(self, count):
+        self.read = 0
+        self.count = count
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.read == self.count:
+            raise StopIteration
+        self.read += 1
+        return self.read - 1
+
+
+class TestBulkMap(unittest.TestCase):
+
+    def test_ordered(self):
+        '''Test that ordered results follow the input even when later items finish first.'''
+
+        def slow_first(item):
+            time.sleep(0.05 if item == 0 else 0)
+            return item * 2
+
+        results = list(bulk_map(slow_first, range(10), workers=4))
+        self.assertEqual([result.index for result in results], list(range(10)))
+        self.assertEqual([result.info for result in results], [i * 2 for i in range(10)])
+
+    def test_unordered(self):
+        '''Test that unordered results are yielded as they finish.'''
+
+        def slow_first(item):
+            time.sleep(0.2 if item == 0 else 0)
+            return item
+
+        results = list(bulk_map(slow_first, range(4), workers=4, ordered=False))
+        self.assertEqual(sorted(result.index for result in results), [0, 1, 2, 3])
+        self.assertEqual(results[-1].index, 0)
+
+    def test_g2_exceptions_are_results(self):
+        '''Test that a G2Exception becomes the result of its item and others are raised.'''
+
+        def fail_odd(item):
+            if item % 2:
+                raise G2BadInputException("bad record")
+            return item
+
+        results = list(bulk_map(fail_odd, range(4), workers=2))
+        self.assertEqual([result.ok for result in results], [True, False, True, False])
+        self.assertIsInstance(results[1].exception, G2BadInputException)
+        self.assertIsNone(results[1].info)
+
+        def fail(item):
+            raise ValueError(item)
+
+        with self.assertRaises(ValueError):
+            list(bulk_map(fail, range(4), workers=2))
+
+    def test_backpressure(self):
+        '''Test that the input is read no further ahead than max_pending.'''
+
+        items = CountingIterator(100)
+        results = bulk_map(lambda item: item, items, workers=2, max_pending=4)
+        next(results)
+        self.assertLessEqual(items.read, 5)
+        results.close()
+        self.assertLessEqual(items.read, 5)
+
+    def test_parallel(self):
+        '''Test that calls that release the GIL run at the same time.'''
+
+        barrier = threading.Barrier(4, timeout=5)
+        results = list(bulk_map(lambda item: barrier.wait(), range(4), workers=4))
+        self.assertTrue(all(result.ok for result in results))
+
+
+class KeyTracker(object):
+    '''Records the order of the calls of each key and how many ran at once.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.most_running = 0
+        self.most_same_key = 0
+        self.order = {}
+
+    def __call__(self, item):
+        key, value = item
+        with self.lock:
+            self.running[key] = self.running.get(key, 0) + 1
+            self.most_same_key = max(self.most_same_key, self.running[key])
+            self.most_running = max(self.most_running, sum(self.running.values()))
+            self.order.setdefault(key, []).append(value)
+        time.sleep(0.002)
+        with self.lock:
+            self.running[key] -= 1
+        return value
+
+
+class TestAffinityExecutor(unittest.TestCase):
+
+    def test_same_key_serialized(self):
+        '''Test that calls with the same key never overlap and keep their order.'''
+
+        tracker = KeyTracker()
+        executor = G2AffinityExecutor(4)
+        items = [(i % 3, i) for i in range(60)]
+        futures = [executor.submit_with_key(item[0], tracker, item) for item in items]
+        self.assertEqual([future.result(5) for future in futures], list(range(60)))
+        executor.shutdown()
+        self.assertEqual(tracker.most_same_key, 1)
+        self.assertGreater(tracker.most_running, 1)
+        for key in range(3):
+            self.assertEqual(tracker.order[key], list(range(key, 60, 3)))
+
+    def test_work_stealing(self):
+        '''Test that idle threads take calls from a lane holding every key.'''
+
+        class SameLane(object):
+            def __init__(self, value):
+                self.value = value
+
+            def __hash__(self):
+                return 0
+
+        tracker = KeyTracker()
+        executor = G2AffinityExecutor(4)
+        futures = [executor.submit_with_key(SameLane(i), tracker, (i, i)) for i in range(40)]
+        for future in futures:
+            future.result(5)
+        executor.shutdown()
+        self.assertGreater(executor.stolen, 0)
+        self.assertGreater(tracker.most_running, 1)
+
+    def test_shutdown(self):
+        '''Test that shutdown runs or cancels the submitted calls and refuses new ones.'''
+
+        release = threading.Event()
+        executor = G2AffinityExecutor(1)
+        running = executor.submit(release.wait, 5)
+        queued = executor.submit_with_key("key", lambda: "run")
+        cancelled = executor.submit(lambda: "cancelled")
+        self.assertTrue(cancelled.cancel())
+        release.set()
+        executor.shutdown()
+        self.assertTrue(running.result())
+        self.assertEqual(queued.result(), "run")
+        self.assertTrue(cancelled.cancelled())
+        with self.assertRaises(RuntimeError):
+            executor.submit(lambda: None)
+
+    def test_executor_signatures(self):
+        '''Test that submit passes fn and key keyword arguments through, as Executor.submit does.'''
+
+        # The keyword arguments named like the positional-only parameters
+        # are what is tested.
+        # pylint: disable=kwarg-superseded-by-positional-arg
+        executor = G2AffinityExecutor(1)
+        try:
+            arguments = {"fn": 1, "key": 2}
+            self.assertEqual(executor.submit(dict, **arguments).result(), arguments)
+            self.assertEqual(executor.submit_with_key("key", dict, **arguments).result(), arguments)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def test_bulk_map_key(self):
+        '''Test that bulk_map serializes the items with the same key.'''
+
+        tracker = KeyTracker()
+        items = [("TEST", str(i % 4), "{}") for i in range(40)]
+        results = list(bulk_map(lambda record: tracker((record_key(record), record[1])), items, workers=4, key=record_key))
+        self.assertEqual([result.index for result in results], list(range(40)))
+        self.assertEqual(tracker.most_same_key, 1)
+        self.assertGreater(tracker.most_running, 1)
+
+
+class TestAddRecords(unittest.TestCase):
+
+    def setUp(self):
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        self.engine = G2Engine()
+        self.calls = []
+
+    def tearDown(self):
+        set_library_path("G2", None)
+
+    def test_add_records(self):
+        '''Test that each record tuple is passed to addRecord.'''
+
+        self.engine.addRecord = lambda *args: self.calls.append(args)
+        records = [("TEST", str(i), "{}") for i in range(5)] + [("TEST", "5", "{}", "LOAD")]
+        results = list(self.engine.addRecords(records, workers=2))
+        self.assertTrue(all(isinstance(result, G2BulkResult) and result.ok for result in results))
+        self.assertEqual(sorted(self.calls), sorted(records))
+
+    def test_add_records_with_info(self):
+        '''Test that with_info returns each record's info document.'''
+
+        def add_with_info(dataSourceCode, recordID, jsonData, load_id=None, flags=0):
+            return '{{"RECORD_ID":"{0}","FLAGS":{1}}}'.format(recordID, flags).encode()
+
+        self.engine.addRecordWithInfoBytes = add_with_info
+        records = [("TEST", str(i), "{}") for i in range(3)]
+        results = list(self.engine.addRecords(records, workers=2, with_info=True, flags=7))
+        self.assertEqual(results[2].info, b'{"RECORD_ID":"2","FLAGS":7}')
+
+
+
+def info_document(*entity_ids):
+    return ('{"AFFECTED_ENTITIES":[%s]}' % ",".join('{"ENTITY_ID":%d}' % i for i in entity_ids)).encode()
+
+
+class TestDeleteAndReevaluate(unittest.TestCase):
+
+    def setUp(self):
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        self.engine = G2Engine()
+        self.calls = []
+
+    def tearDown(self):
+        set_library_path("G2", None)
+
+    def test_affected_entities(self):
+        '''Test that the affected entity IDs are read from an info document.'''
+
+        self.assertEqual(affected_entities(info_document(3, 1)), [3, 1])
+        self.assertEqual(affected_entities(b'{"DATA_SOURCE":"TEST"}'), [])
+        self.assertEqual(affected_entities(None), [])
+
+    def test_delete_records(self):
+        '''Test that each key tuple is passed to deleteRecord.'''
+
+        self.engine.deleteRecord = lambda *args: self.calls.append(args)
+        records = [("TEST", str(i)) for i in range(5)] + [("TEST", "5", "LOAD")]
+        results = list(self.engine.deleteRecords(records, workers=2))
+        self.assertTrue(all(result.ok and result.info is None for result in results))
+        self.assertEqual(sorted(self.calls), sorted(records))
+
+    def test_delete_records_affected(self):
+        '''Test that the affected entities of every delete are merged into one set.'''
+
+        def delete_with_info(dataSourceCode, recordID, load_id=None, flags=0):
+            self.calls.append(flags)
+            return info_document(int(recordID) % 3, 100)
+
+        self.engine.deleteRecordWithInfoBytes = delete_with_info
+        affected = set()
+        results = list(self.engine.deleteRecords([("TEST", str(i)) for i in range(6)], workers=3, flags=5, affected=affected))
+        self.assertEqual(affected, {0, 1, 2, 100})
+        self.assertEqual(results[4].info, info_document(1, 100))
+        self.assertEqual(self.calls, [5] * 6)
+
+    def test_reevaluate_entities(self):
+        '''Test that each distinct entity ID is reevaluated once.'''
+
+        lock = threading.Lock()
+
+        def reevaluate(entityID, flags=0):
+            with lock:
+                self.calls.append((entityID, flags))
+
+        self.engine.reevaluateEntity = reevaluate
+        results = list(self.engine.reevaluateEntities([3, 1, 3, "2", 1, 2], workers=2, flags=9))
+        self.assertEqual([result.item for result in results], [3, 1, 2])
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        self.assertEqual(sorted(self.calls), [(1, 9), (2, 9), (3, 9)])
+        del self.calls[:]
+        results = list(self.engine.reevaluateEntities([3, 1, 3], workers=2, distinct=False))
+        self.assertEqual([result.item for result in results], [3, 1, 3])
+        self.assertEqual(sorted(self.calls), [(1, 0), (3, 0), (3, 0)])
+
+    def test_reevaluate_entities_with_info(self):
+        '''Test that with_info returns each entity's info document and affected merges them.'''
+
+        self.engine.reevaluateEntityWithInfoBytes = lambda entityID, flags=0: info_document(entityID, entityID + 10)
+        affected = set()
+        results = list(self.engine.reevaluateEntities([1, 2, 1], workers=2, with_info=True, affected=affected))
+        self.assertEqual([result.info for result in results], [info_document(1, 11), info_document(2, 12)])
+        self.assertEqual(affected, {1, 2, 11, 12})
+
+    def test_concurrency_and_signatures(self):
+        '''Test that the bulk methods share their arguments and time only the engine calls with a controller.'''
+
+        self.engine.addRecordWithInfoBytes = lambda dataSourceCode, recordID, jsonData, flags=0: info_document(int(recordID))
+        self.engine.deleteRecord = lambda dataSourceCode, recordID: None
+        self.engine.reevaluateEntity = lambda entityID, flags=0: None
+        controller = G2ConcurrencyController(initial_limit=2, max_limit=3)
+        affected = set()
+        self.assertEqual(len(list(self.engine.addRecords([("TEST", str(i), "{}") for i in range(4)], concurrency=controller, affected=affected))), 4)
+        self.assertEqual(affected, {0, 1, 2, 3})
+        self.assertEqual(len(list(self.engine.deleteRecords([("TEST", str(i)) for i in range(4)], concurrency=controller))), 4)
+        self.assertEqual(len(list(self.engine.reevaluateEntities(range(4), concurrency=controller))), 4)
+        self.assertEqual(controller.metrics()["calls"], 12)
+        shared = ["workers", "with_info", "ordered", "flags", "max_pending", "retry", "concurrency", "affected", "args", "kwargs"]
+        for method in (self.engine.addRecords, self.engine.deleteRecords, self.engine.reevaluateEntities):
+            parameters = inspect.signature(method).parameters
+            self.assertEqual([name for name in parameters if name in shared], shared, method.__name__)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#! /usr/bin/env python3
+
+import threading
+import time
+import unittest
+
+from senzing.G2Bulk import bulk_map
+from senzing.G2Concurrency import AIMD, VEGAS, G2ConcurrencyController
+from senzing.G2Exception import G2RetryableException
+
+
+class Clock(object):
+    '''Simulated time, advanced by the simulated engine.'''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def latency_curve(capacity, base=0.01):
+    '''Latency of an engine that runs capacity calls at once and queues the others.'''
+
+    def latency(in_flight):
+        return base * max(1.0, in_flight / capacity)
+
+    return latency
+
+
+def simulate(controller, clock, latency, rounds):
+    '''Run rounds of calls, each round filling the controller's limit.'''
+
+    limits = []
+    for _ in range(rounds):
+        calls = controller.limit
+        for _ in range(calls):
+            controller.acquire()
+        # Every call of the round sees the same load.
+        call_latency = latency(calls)
+        clock.now += call_latency
+        for _ in range(calls):
+            controller.release(call_latency)
+        limits.append(controller.limit)
+    return limits
+
+
+class SimulatedEngine(object):
+    '''addRecord sleeps for a latency that grows with the calls in flight.'''
+
+    def __init__(self, capacity, base=0.002):
+        self.latency = latency_curve(capacity, base)
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def addRecord(self, dataSourceCode, recordId, jsonData, load_id=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            in_flight = self.in_flight
+        time.sleep(self.latency(in_flight))
+        with self.lock:
+            self.in_flight -= 1
+
+
+class TestG2ConcurrencyController(unittest.TestCase):
+
+    def test_vegas_converges(self):
+        '''Test that vegas raises the limit to the engine's capacity and keeps it near there.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=1, max_limit=100, window=1, clock=clock)
+        limits = simulate(controller, clock, latency_curve(16), 300)
+        # limit * (1 - 16 / limit) queued calls is held between alpha and beta,
+        # apart from the probes.
+        near = [limit for limit in limits[-50:] if 16 <= limit <= 24]
+        self.assertGreaterEqual(len(near), 45)
+        metrics = controller.metrics()
+        self.assertEqual(metrics["limit"], limits[-1])
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertAlmostEqual(metrics["min_latency"], 0.01)
+        self.assertGreater(metrics["increases"], 0)
+        self.assertGreater(metrics["decreases"], 0)
+        self.assertGreater(metrics["throughput"], 0)
+
+    def test_vegas_follows_capacity(self):
+        '''Test that vegas lowers the limit when the engine's capacity drops.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=1, max_limit=100, window=1, probe_windows=20, clock=clock)
+        limits = simulate(controller, clock, latency_curve(32), 200)
+        self.assertGreaterEqual(max(limits[-20:]), 32)
+        limits = simulate(controller, clock, latency_curve(8), 200)
+        near = [limit for limit in limits[-50:] if 4 <= limit <= 14]
+        self.assertGreaterEqual(len(near), 45)
+
+    def test_aimd(self):
+        '''Test that aimd raises the limit while the latency is below the threshold and backs off above it.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=1, max_limit=100, algorithm=AIMD, latency_threshold=0.015, window=1, clock=clock)
+        limits = simulate(controller, clock, latency_curve(10), 200)
+        # Saw tooth between the threshold's limit and backoff times it.
+        self.assertLessEqual(max(limits[-50:]), 15)
+        self.assertGreaterEqual(min(limits[-50:]), 12)
+        reasons = set(change[3] for change in controller.history)
+        self.assertEqual(reasons, {"latency above threshold", "latency below threshold"})
+        self.assertRaises(ValueError, G2ConcurrencyController, algorithm=AIMD)
+        self.assertRaises(ValueError, G2ConcurrencyController, algorithm="other")
+
+    def test_bounds(self):
+        '''Test that the limit stays between min_limit and max_limit.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=2, min_limit=2, max_limit=6, alpha=1.0, beta=1.5, window=1, clock=clock)
+        limits = simulate(controller, clock, latency_curve(100), 40)
+        self.assertEqual(max(limits), 6)
+        self.assertEqual(limits[-1], 6)
+        limits = simulate(controller, clock, latency_curve(1, base=1.0), 40)
+        self.assertEqual(min(limits), 2)
+        self.assertLessEqual(max(limits), 6)
+        self.assertEqual(G2ConcurrencyController(initial_limit=100, max_limit=6).limit, 6)
+
+    def test_retryable_backoff(self):
+        '''Test that a window with a retryable failure multiplies the limit by backoff.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=4, max_limit=100, backoff=0.5, window=1, clock=clock)
+
+        def add(fail):
+            clock.now += 0.01
+            if fail:
+                raise G2RetryableException("busy")
+
+        call = controller.wrap(add)
+        # The window ends after limit calls.
+        for _ in range(3):
+            call(False)
+        self.assertRaises(G2RetryableException, call, True)
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(controller.history[-1][1:4], (4, 2, "retryable failures"))
+        self.assertEqual(controller.metrics()["failures"], 1)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_unsaturated(self):
+        '''Test that the limit is not raised when the calls do not reach it.'''
+
+        clock = Clock()
+        controller = G2ConcurrencyController(initial_limit=4, max_limit=100, window=1, clock=clock)
+        for _ in range(100):
+            controller.acquire()
+            clock.now += 0.01
+            controller.release(0.01)
+        self.assertEqual(controller.limit, 4)
+
+    def test_bulk_map(self):
+        '''Test that bulk_map of a wrapped function never has more calls in flight than the controller's limit.'''
+
+        engine = SimulatedEngine(capacity=4)
+        controller = G2ConcurrencyController(initial_limit=2, max_limit=12, window=4)
+        peaks = []
+        acquire = controller.acquire
+
+        def checked_acquire():
+            acquire()
+            peaks.append(controller.in_flight <= controller.limit)
+
+        controller.acquire = checked_acquire
+        items = [("TEST", str(i), "{}") for i in range(400)]
+        results = list(bulk_map(controller.wrap(lambda item: engine.addRecord(*item)), items, workers=controller.max_limit))
+        self.assertEqual(len(results), 400)
+        self.assertTrue(all(result.exception is None for result in results))
+        self.assertTrue(all(peaks))
+        self.assertLessEqual(engine.peak, 12)
+        self.assertEqual(controller.metrics()["calls"], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+#! /usr/bin/env python3
+
+import bz2
+import ctypes
+import ctypes.util
+import gzip
+import json
+import lzma
+import os
+import tempfile
+import unittest
+
+from senzing.G2Engine import G2Engine
+from senzing.G2Exception import G2BadInputException
+from senzing.G2ExportWriter import G2ExportWriter
+from senzing.G2Library import ALLOCATOR_PROTOTYPES, G2BufferPool, G2NativeFunctions, set_library_path
+
+
+# The fakes write into the buffers behind byref() arguments and replace the
+# engine's native functions.
+# pylint: disable=protected-access
+
+
+class FakeExportNative(G2NativeFunctions):
+    '''Native export of data: G2_fetchNext fills the buffer with as much of the data as fits.'''
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+        self.exports = []
+        self.fetches = 0
+        self.closed = []
+        self.fail_at = None
+        c_runtime = ctypes.cdll.msvcrt if os.name == "nt" else ctypes.CDLL(ctypes.util.find_library("c"))
+        for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+            function = c_runtime[symbol[3:]]
+            function.argtypes = argtypes
+            function.restype = restype
+            setattr(self, symbol, function)
+
+    def G2_getLastException(self, buf, size):
+        ctypes.memmove(buf, b"0023E|Conflicting DATA_SOURCE values\0", 37)
+        return 0
+
+    def G2_exportJSONEntityReport(self, flags, handle):
+        self.exports.append(("JSON", flags))
+        handle._obj.value = 42
+        return 0
+
+    def G2_exportCSVEntityReport(self, headers, flags, handle):
+        self.exports.append(("CSV", headers, flags))
+        handle._obj.value = 42
+        return 0
+
+    def G2_fetchNext(self, handle, buf, size):
+        self.fetches += 1
+        if self.fail_at is not None and self.position >= self.fail_at:
+            return -2
+        chunk = self.data[self.position:self.position + size - 1]
+        self.position += len(chunk)
+        ctypes.memmove(buf, chunk + b"\0", len(chunk) + 1)
+        return len(chunk)
+
+    def G2_closeExport(self, handle):
+        self.closed.append(handle)
+        return 0
+
+
+def make_engine(data):
+    set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+    try:
+        engine = G2Engine()
+    finally:
+        set_library_path("G2", None)
+    native = FakeExportNative(data)
+    engine._native = native
+    engine.buffer_pool = G2BufferPool().bind(native)
+    return engine, native
+
+
+class TestIterExport(unittest.TestCase):
+
+    def make_engine(self, data):
+        return make_engine(data)
+
+    def test_lines(self):
+        '''Test that the lines are the same whatever the chunk size, with long lines carried over chunks.'''
+
+        lines = [b'{"RESOLVED_ENTITY": {"ENTITY_ID": %d}}' % i + b" " * (i % 7) * 10 for i in range(200)]
+        data = b"".join(line + b"\n" for line in lines)
+        for chunk_size in (8, 41, 100, 4096, 1 << 20):
+            engine, native = self.make_engine(data)
+            self.assertEqual(list(engine.iterExport(chunk_size=chunk_size)), lines)
+            self.assertEqual(native.closed, [42])
+        # Most lines of a large chunk are split without a fetch of their own.
+        self.assertEqual(native.fetches, 2)
+
+    def test_long_lines(self):
+        '''Test that the last newline of a full buffer is found far from its end.'''
+
+        lines = [b"%d" % i + b"x" * (i * 7919 % 50000) for i in range(40)]
+        data = b"".join(line + b"\n" for line in lines)
+        for chunk_size in (4097, 65536, 200000):
+            engine, native = self.make_engine(data)
+            self.assertEqual(list(engine.iterExport(chunk_size=chunk_size)), lines)
+
+    def test_chunks(self):
+        '''Test that chunks end at line boundaries and hold the whole export.'''
+
+        data = b"".join(b"line %d\n" % i for i in range(100))
+        engine, native = self.make_engine(data)
+        chunks = list(engine.iterExport(chunk_size=50, lines=False))
+        self.assertEqual(b"".join(chunks), data)
+        self.assertTrue(all(chunk.endswith(b"\n") for chunk in chunks))
+        self.assertGreater(len(chunks), 10)
+
+    def test_last_line_without_newline(self):
+        '''Test that a last line without a newline is returned.'''
+
+        engine, native = self.make_engine(b"one\ntwo\nthree")
+        self.assertEqual(list(engine.iterExport(chunk_size=6)), [b"one", b"two", b"three"])
+        engine, native = self.make_engine(b"")
+        self.assertEqual(list(engine.iterExport()), [])
+        self.assertEqual(native.closed, [42])
+
+    def test_csv(self):
+        '''Test that headersForCSV selects the CSV export.'''
+
+        engine, native = self.make_engine(b"RESOLVED_ENTITY_ID,DATA_SOURCE\n1,TEST\n")
+        self.assertEqual(list(engine.iterExport(5, headersForCSV="RESOLVED_ENTITY_ID,DATA_SOURCE")), [b"RESOLVED_ENTITY_ID,DATA_SOURCE", b"1,TEST"])
+        self.assertEqual(native.exports, [("CSV", b"RESOLVED_ENTITY_ID,DATA_SOURCE", 5)])
+
+    def test_close(self):
+        '''Test that the export is closed once, when the with block is left early or before any line was read.'''
+
+        data = b"".join(b"line %d\n" % i for i in range(100))
+        engine, native = self.make_engine(data)
+        with engine.iterExport(chunk_size=50) as export:
+            self.assertEqual(next(export), b"line 0")
+            for line in export:
+                if line == b"line 10":
+                    break
+        self.assertEqual(native.closed, [42])
+        export.close()
+        self.assertEqual(native.closed, [42])
+        engine, native = self.make_engine(data)
+        with engine.iterExport(lines=False):
+            pass
+        self.assertEqual((native.closed, native.fetches), ([42], 0))
+        engine, native = self.make_engine(data)
+        export = engine.iterExport()
+        next(export)
+        del export
+        self.assertEqual(native.closed, [42])
+
+    def test_error(self):
+        '''Test that a failed fetch raises its G2Exception and closes the export.'''
+
+        engine, native = self.make_engine(b"".join(b"line %d\n" % i for i in range(100)))
+        native.fail_at = 100
+        lines = []
+        with self.assertRaises(G2BadInputException):
+            for line in engine.iterExport(chunk_size=50):
+                lines.append(line)
+        self.assertEqual(lines[:3], [b"line 0", b"line 1", b"line 2"])
+        self.assertEqual(native.closed, [42])
+
+
+def line_chunks(data, size):
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + size) + 1 or len(data)
+        yield data[start:end]
+        start = end
+
+
+DECOMPRESS = {None: lambda data: data, "gzip": gzip.decompress, "bz2": bz2.decompress, "lzma": lzma.decompress}
+
+
+class TestG2ExportWriter(unittest.TestCase):
+
+    def setUp(self):
+        # Cleaned up by addCleanup, as a with block cannot span the test.
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+
+    def read_shards(self, manifest):
+        shards = []
+        for shard in manifest["shards"]:
+            with open(os.path.join(self.directory.name, shard["path"]), "rb") as file:
+                compressed = file.read()
+            self.assertEqual(len(compressed), shard["file_bytes"])
+            shards.append(DECOMPRESS[manifest["compression"]](compressed))
+        return shards
+
+    def test_shards(self):
+        '''Test that the lines are split into shards of at most shard_size bytes, listed in the manifest.'''
+
+        data = b"".join(b'{"RESOLVED_ENTITY": {"ENTITY_ID": %d}}\n' % i for i in range(1000))
+        writer = G2ExportWriter(self.directory.name, shard_size=1000, workers=3)
+        for chunk in line_chunks(data, 777):
+            writer.write(chunk)
+        manifest = writer.close()
+        with open(writer.manifest_path) as file:
+            self.assertEqual(json.load(file), manifest)
+        shards = self.read_shards(manifest)
+        self.assertEqual(b"".join(shards), data)
+        self.assertGreaterEqual(len(shards), 39)
+        self.assertEqual((manifest["lines"], manifest["bytes"], manifest["compression"]), (1000, len(data), "gzip"))
+        first_line = offset = 0
+        for shard, shard_data in zip(manifest["shards"], shards):
+            self.assertLessEqual(shard["bytes"], 1000)
+            self.assertEqual(shard["bytes"], len(shard_data))
+            self.assertEqual((shard["first_line"], shard["offset"]), (first_line, offset))
+            self.assertEqual(shard["lines"], shard_data.count(b"\n"))
+            self.assertEqual(data.split(b"\n")[first_line] + b"\n", shard_data[:shard_data.find(b"\n") + 1])
+            first_line += shard["lines"]
+            offset += shard["bytes"]
+        self.assertEqual(manifest["shards"][0]["path"], "export-00000.jsonl.gz")
+
+    def test_compressions(self):
+        '''Test that every compression writes shards that decompress to the lines.'''
+
+        lines = [b"line %d" % i for i in range(100)]
+        for compression, extension in ((None, ".csv"), ("bz2", ".csv.bz2"), ("lzma", ".csv.xz")):
+            with G2ExportWriter(self.directory.name, prefix=str(compression), compression=compression, shard_size=300, level=1, suffix=".csv") as writer:
+                writer.writelines(lines)
+            manifest = writer.manifest()
+            self.assertEqual(b"".join(self.read_shards(manifest)), b"".join(line + b"\n" for line in lines))
+            self.assertTrue(all(shard["path"].endswith(extension) for shard in manifest["shards"]))
+        with self.assertRaises(ValueError):
+            G2ExportWriter(self.directory.name, compression="zip")
+
+    def test_long_line(self):
+        '''Test that a line longer than shard_size has a shard of its own, and a missing newline is added.'''
+
+        with G2ExportWriter(self.directory.name, shard_size=10) as writer:
+            writer.write(b"one\n")
+            writer.write(b"x" * 25)
+            writer.write(b"two\nthree\n")
+        self.assertEqual(self.read_shards(writer.manifest()), [b"one\n", b"x" * 25 + b"\n", b"two\nthree\n"])
+
+    def test_max_pending(self):
+        '''Test that a writer waiting for the workers writes every line.'''
+
+        data = b"".join(b"line %d\n" % i for i in range(10000))
+        writer = G2ExportWriter(self.directory.name, shard_size=10000, max_pending=100, workers=2)
+        for chunk in line_chunks(data, 1000):
+            writer.write(chunk)
+        self.assertEqual(b"".join(self.read_shards(writer.close())), data)
+
+    def test_export(self):
+        '''Test that export writes a whole export and closes it.'''
+
+        data = b"".join(b'{"RESOLVED_ENTITY": {"ENTITY_ID": %d}}\n' % i for i in range(500))
+        engine, native = make_engine(data)
+        writer = G2ExportWriter(self.directory.name, compression=None, shard_size=4096)
+        manifest = writer.export(engine, 7, chunk_size=1000)
+        self.assertEqual(b"".join(self.read_shards(manifest)), data)
+        self.assertEqual(manifest["lines"], 500)
+        self.assertEqual((native.exports, native.closed), ([("JSON", 7)], [42]))
+
+    def test_error(self):
+        '''Test that a failure of a worker is raised by close().'''
+
+        writer = G2ExportWriter(self.directory.name, prefix="missing/export")
+        writer.write(b"line\n")
+        with self.assertRaises(FileNotFoundError):
+            writer.close()
+        self.assertFalse(os.path.exists(writer.manifest_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#! /usr/bin/env python3
+
+import ctypes.util
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from senzing.G2Engine import G2Engine
+from senzing.G2Exception import G2BadInputException
+from senzing.G2Fingerprint import G2FingerprintStore, fingerprint
+from senzing.G2Library import set_library_path
+from senzing.G2Loader import G2Loader, G2ProcessLoader
+
+
+class FakeEngine(object):
+    '''Records the addRecord calls.'''
+
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def init(self, engine_name_, ini_params_, debug_=False):
+        pass
+
+    def destroy(self):
+        pass
+
+    def addRecord(self, dataSourceCode, recordId, jsonData, load_id=None):
+        with self.lock:
+            self.records.append((dataSourceCode, recordId, jsonData))
+
+
+def write_lines(path, lines):
+    with open(path, "wb") as file:
+        file.write(b"\n".join(lines))
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_canonical(self):
+        '''Test that canonical fingerprints ignore key order and whitespace.'''
+
+        first = fingerprint('{"RECORD_ID": "1", "NAME_FULL": "Robert Smith"}')
+        self.assertEqual(first, fingerprint(b'{"NAME_FULL":"Robert Smith","RECORD_ID":"1"}'))
+        self.assertNotEqual(first, fingerprint('{"RECORD_ID": "1", "NAME_FULL": "Bob Smith"}'))
+        self.assertNotEqual(
+            fingerprint('{"A": 1, "B": 2}', canonical=False),
+            fingerprint('{"B": 2, "A": 1}', canonical=False),
+        )
+        with self.assertRaises(G2BadInputException):
+            fingerprint("not json")
+
+
+class TestG2FingerprintStore(unittest.TestCase):
+
+    def test_store(self):
+        '''Test that fingerprints are visible before and after they are committed.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fingerprints.db")
+            with G2FingerprintStore(path, batch_size=2) as store:
+                self.assertIsNone(store.get("TEST", "1"))
+                store.put("TEST", "1", b"one")
+                self.assertTrue(store.unchanged("TEST", b"1", b"one"))
+                self.assertFalse(store.unchanged("TEST", "1", b"uno"))
+                store.put(b"TEST", b"2", b"two")
+                store.put("TEST", "3", b"three")
+                store.delete("TEST", "3")
+                self.assertIsNone(store.get("TEST", "3"))
+                self.assertEqual(len(store), 2)
+            with G2FingerprintStore(path) as store:
+                self.assertEqual(store.get("TEST", "2"), b"two")
+                self.assertIsNone(store.get("TEST", "3"))
+
+
+class TestSkipUnchanged(unittest.TestCase):
+
+    def test_loader(self):
+        '''Test that a reload only adds the new and changed records.'''
+
+        lines = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d", "N": 1}' % i for i in range(100)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl")
+            store_path = os.path.join(directory, "fingerprints.db")
+            write_lines(path, lines)
+            with G2FingerprintStore(store_path) as store:
+                engine = FakeEngine()
+                loader = G2Loader(engine, workers=4, fingerprints=store)
+                self.assertEqual(loader.load([path]), 100)
+                self.assertEqual(loader.skipped, 0)
+
+            lines[5] = b'{"DATA_SOURCE": "TEST", "RECORD_ID": "5", "N": 2}'
+            lines.append(b'{"DATA_SOURCE": "TEST", "RECORD_ID": "100", "N": 1}')
+            write_lines(path, lines)
+            with G2FingerprintStore(store_path) as store:
+                engine = FakeEngine()
+                loader = G2Loader(engine, workers=4, fingerprints=store)
+                self.assertEqual(loader.load([path]), 2)
+                self.assertEqual(loader.skipped, 99)
+                self.assertIn("99 skipped", loader.report())
+        self.assertEqual(sorted(record[1] for record in engine.records), [b"100", b"5"])
+
+    def test_process_loader(self):
+        '''Test that worker processes share the fingerprint file.'''
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not available")
+        lines = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d"}' % i for i in range(500)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl")
+            store_path = os.path.join(directory, "fingerprints.db")
+            write_lines(path, lines)
+            for loaded, skipped in ((500, 0), (0, 500)):
+                loader = G2ProcessLoader(
+                    "{}",
+                    processes=2,
+                    chunk_size=1024,
+                    start_method="fork",
+                    engine_class=FakeEngine,
+                    fingerprints=store_path,
+                )
+                self.assertEqual(loader.load([path]), loaded)
+                self.assertEqual(loader.skipped, skipped)
+
+    def test_add_records(self):
+        '''Test that addRecords skips unchanged records and stores the added ones.'''
+
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        try:
+            engine = G2Engine()
+        finally:
+            set_library_path("G2", None)
+        calls = []
+        engine.addRecord = lambda *args: calls.append(args)
+        records = [("TEST", str(i), '{"N": %d}' % i) for i in range(10)]
+        with tempfile.TemporaryDirectory() as directory:
+            with G2FingerprintStore(os.path.join(directory, "fingerprints.db")) as store:
+                self.assertFalse(any(result.skipped for result in engine.addRecords(records, workers=2, fingerprints=store)))
+                records[3] = ("TEST", "3", '{"N": 33}')
+                results = list(engine.addRecords(records, workers=2, fingerprints=store))
+        self.assertEqual([result.skipped for result in results], [i != 3 for i in range(10)])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(calls), 11)
+
+
+    def test_delete_records(self):
+        '''Test that deleteRecords forgets the fingerprints of the deleted records.'''
+
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        try:
+            engine = G2Engine()
+        finally:
+            set_library_path("G2", None)
+        engine.addRecord = lambda *args: None
+        engine.deleteRecord = lambda *args: None
+        records = [("TEST", str(i), '{"N": %d}' % i) for i in range(4)]
+        with tempfile.TemporaryDirectory() as directory:
+            with G2FingerprintStore(os.path.join(directory, "fingerprints.db")) as store:
+                list(engine.addRecords(records, workers=2, fingerprints=store))
+                list(engine.deleteRecords([("TEST", "1"), ("TEST", "2")], workers=2, fingerprints=store))
+                self.assertEqual(len(store), 2)
+                results = list(engine.addRecords(records, workers=2, fingerprints=store))
+        self.assertEqual([result.skipped for result in results], [True, False, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+#! /usr/bin/env python3
+
+import ctypes
+import ctypes.util
+import os
+import unittest
+
+from senzing.G2Library import (
+    ALLOCATOR_PROTOTYPES,
+    G2BufferPool,
+    G2NativeBuffer,
+    G2NativeFunctions,
+    G2ReturnBuffer,
+    bind_prototypes,
+    copy_response,
+    load_library,
+    set_library_path,
+)
+from senzing.G2Engine import G2Engine
+
+
+def load_c_runtime():
+    if os.name == "nt":
+        return ctypes.cdll.msvcrt
+    return ctypes.CDLL(ctypes.util.find_library("c"))
+
+
+class TestBindPrototypes(unittest.TestCase):
+
+    def test_bound_function_is_typed(self):
+        '''Test that bound functions carry the declared prototype.'''
+
+        native = bind_prototypes(
+            load_c_runtime(), {"strlen": ([ctypes.c_char_p], ctypes.c_size_t)}
+        )
+        self.assertEqual(list(native.strlen.argtypes), [ctypes.c_char_p])
+        self.assertEqual(native.strlen.restype, ctypes.c_size_t)
+        self.assertEqual(native.strlen(b"senzing"), 7)
+
+    def test_one_table_per_handle(self):
+        '''Test that binding the same handle again reuses its table.'''
+
+        lib_handle = load_c_runtime()
+        first = bind_prototypes(lib_handle, {"strlen": ([ctypes.c_char_p], ctypes.c_size_t)})
+        second = bind_prototypes(lib_handle, {"abs": ([ctypes.c_int], ctypes.c_int)})
+        self.assertIs(first, second)
+        self.assertEqual(second.abs(-3), 3)
+
+    def test_handle_attributes_untouched(self):
+        '''Test that binding does not change the handle's own function objects.'''
+
+        lib_handle = load_c_runtime()
+        bind_prototypes(lib_handle, {"strlen": ([ctypes.c_char_p], ctypes.c_size_t)})
+        self.assertIsNone(lib_handle.strlen.argtypes)
+
+    def test_missing_symbol_is_skipped(self):
+        '''Test that a symbol missing from the library is left unbound.'''
+
+        native = bind_prototypes(load_c_runtime(), {"G2_no_such_symbol": ([], ctypes.c_int)})
+        self.assertFalse(hasattr(native, "G2_no_such_symbol"))
+
+
+class TestLoadLibrary(unittest.TestCase):
+
+    def setUp(self):
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+
+    def tearDown(self):
+        set_library_path("G2", None)
+
+    def test_loaded_once(self):
+        '''Test that the library and its symbol table are shared by every caller.'''
+
+        prototypes = {"strlen": ([ctypes.c_char_p], ctypes.c_size_t)}
+        lib_handle, native = load_library("G2", prototypes)
+        self.assertEqual(load_library("G2", prototypes), (lib_handle, native))
+        self.assertEqual(load_library("G2", {})[0], lib_handle)
+        self.assertEqual(native.strlen(b"senzing"), 7)
+
+    def test_objects_share_handle(self):
+        '''Test that objects are created from the injected library without reloading it.'''
+
+        # The shared handle and functions are private to the engine.
+        # pylint: disable=protected-access
+        first = G2Engine()
+        second = G2Engine()
+        self.assertIs(first._lib_handle, second._lib_handle)
+        self.assertIs(first._native, second._native)
+
+    def test_path_change_reloads(self):
+        '''Test that setting a new path drops the loaded handle.'''
+
+        lib_handle, _ = load_library("G2", {})
+        set_library_path("G2", "no-such-libG2.so")
+        with self.assertRaises(OSError):
+            load_library("G2", {})
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        self.assertIsNot(load_library("G2", {})[0], lib_handle)
+
+
+class TestG2ReturnBuffer(unittest.TestCase):
+
+    def test_view_is_sized_by_response(self):
+        '''Test that the view covers only the response and shares the buffer's memory.'''
+
+        tls = G2ReturnBuffer()
+        ctypes.memmove(tls.buf, b"senzing\0", 8)
+        view = tls.view()
+        self.assertEqual(view, b"senzing")
+        self.assertTrue(view.readonly)
+        tls.buf[0] = b"S"
+        self.assertEqual(view, b"Senzing")
+
+    def test_copy_response(self):
+        '''Test that a copied response is unchanged by the next call.'''
+
+        tls = G2ReturnBuffer()
+        ctypes.memmove(tls.buf, b"senzing\0", 8)
+        copy = copy_response(tls.view())
+        tls.buf[0] = b"S"
+        self.assertEqual(copy, b"senzing")
+        self.assertIs(copy_response(copy), copy)
+        self.assertEqual(copy_response(bytearray(b"senzing")), b"senzing")
+
+
+def bind_c_allocator():
+    '''Binds the C runtime's malloc, realloc and free under the G2 names.'''
+
+    c_runtime = load_c_runtime()
+    native = G2NativeFunctions()
+    for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+        function = c_runtime[symbol[3:]]
+        function.argtypes = argtypes
+        function.restype = restype
+        setattr(native, symbol, function)
+    return native
+
+
+class TestG2NativeBuffer(unittest.TestCase):
+
+    def test_native_resize(self):
+        '''Test that the buffer is grown by the native realloc it hands out.'''
+
+        buffer = G2NativeBuffer(bind_c_allocator(), 16)
+        buffer.ptr.value = buffer.resize(buffer.ptr, 100000)
+        buffer.size.value = 100000
+        ctypes.memset(buffer.ptr, ord("x"), 99999)
+        ctypes.memset(buffer.ptr.value + 99999, 0, 1)
+        self.assertEqual(buffer.value(), b"x" * 99999)
+        self.assertEqual(len(buffer.view()), 99999)
+
+    def test_view_keeps_buffer(self):
+        '''Test that a buffer referenced by a view stays valid and out of the pool.'''
+
+        pool = G2BufferPool().bind(bind_c_allocator())
+        buffer = pool.acquire()
+        ctypes.memmove(buffer.ptr, b"senzing\0", 8)
+        view = buffer.view()
+        pool.release(buffer)
+        self.assertEqual(pool.pooled_bytes(), 0)
+        del buffer
+        other = pool.acquire()
+        ctypes.memmove(other.ptr, b"other\0", 6)
+        self.assertEqual(view, b"senzing")
+
+
+class TestG2BufferPool(unittest.TestCase):
+
+    def grow(self, buffer, size):
+        buffer.ptr.value = buffer.resize(buffer.ptr, size)
+        buffer.size.value = size
+
+    def test_buffers_are_reused(self):
+        '''Test that released buffers are handed out again and counted while idle.'''
+
+        pool = G2BufferPool().bind(bind_c_allocator())
+        buffer = pool.acquire()
+        pool.release(buffer)
+        self.assertEqual(pool.pooled_bytes(), pool.shrink_size)
+        self.assertIs(pool.acquire(), buffer)
+        self.assertEqual(pool.pooled_bytes(), 0)
+
+    def test_shrink_after_calls(self):
+        '''Test that an oversized buffer shrinks once it stops growing.'''
+
+        pool = G2BufferPool(shrink_size=1024, shrink_after=3)
+        pool.bind(bind_c_allocator())
+        buffer = pool.acquire()
+        self.grow(buffer, 100000)
+        pool.release(buffer)
+        for calls in range(2):
+            pool.release(pool.acquire())
+            self.assertEqual(buffer.size.value, 100000)
+        pool.release(pool.acquire())
+        self.assertEqual(buffer.size.value, 1024)
+        self.assertEqual(pool.pooled_bytes(), 1024)
+
+    def test_adaptive_sizing(self):
+        '''Test that buffers are sized from the method's earlier responses.'''
+
+        resizes = []
+        for adaptive in (False, True):
+            pool = G2BufferPool(adaptive=adaptive).bind(bind_c_allocator())
+            for calls in range(20):
+                buffer = pool.acquire("getEntityByEntityID")
+                if buffer.size.value < 200000:
+                    self.grow(buffer, 200000)
+                buffer.length = 199999
+                pool.release(buffer)
+                pool.clear()
+            stats = pool.stats()["getEntityByEntityID"]
+            self.assertEqual(stats["calls"], 20)
+            resizes.append(stats["resizes"])
+        self.assertEqual(resizes[0], 20)
+        self.assertLess(resizes[1], 5)
+        self.assertGreaterEqual(pool.acquire("getEntityByEntityID").size.value, 200000)
+
+    def test_pooled_bytes_are_capped(self):
+        '''Test that buffers beyond the cap are shrunk, then dropped.'''
+
+        pool = G2BufferPool(max_pooled_bytes=4096, shrink_size=1024)
+        pool.bind(bind_c_allocator())
+        buffers = [pool.acquire() for count in range(5)]
+        self.grow(buffers[0], 100000)
+        for buffer in buffers:
+            pool.release(buffer)
+        self.assertEqual(buffers[0].size.value, 1024)
+        self.assertEqual(pool.pooled_bytes(), 4096)
+        pool.clear()
+        self.assertEqual(pool.pooled_bytes(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
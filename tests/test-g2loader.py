@@ -0,0 +1,205 @@
+#! /usr/bin/env python3
+
+import bz2
+import gzip
+import io
+import lzma
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from senzing.G2Exception import G2BadInputException, G2ConfigurationException, G2RetryableException
+from senzing.G2Loader import G2Loader, G2ProcessLoader, open_records, parse_record, read_chunks
+
+
+class FakeEngine(object):
+    '''Records the addRecord calls a G2Loader makes.'''
+
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def addRecord(self, dataSourceCode, recordId, jsonData, load_id=None):
+        if recordId == b"retry":
+            raise G2RetryableException("0000E|Retry")
+        with self.lock:
+            self.records.append((dataSourceCode, recordId, jsonData, load_id))
+
+
+class FakeProcessEngine(FakeEngine):
+    '''Leaves a file named after its process in the directory passed as ini_params when destroyed.'''
+
+    def init(self, engine_name_, ini_params_, debug_=False):
+        self.directory = ini_params_
+
+    def destroy(self):
+        with open(os.path.join(self.directory, str(os.getpid())), "w") as file:
+            file.write(str(len(self.records)))
+
+
+class FailingProcessEngine(FakeProcessEngine):
+    '''Fails to initialize.'''
+
+    def init(self, engine_name_, ini_params_, debug_=False):
+        raise G2ConfigurationException("0000E|Invalid ini_params")
+
+
+class TestReading(unittest.TestCase):
+
+    def test_chunks_carry_partial_lines(self):
+        '''Test that lines spanning reads are carried into the next chunk.'''
+
+        data = b"one\ntwo\nthree\nfour"
+        chunks = list(read_chunks(io.BytesIO(data), chunk_size=5))
+        lines = [line for _, chunk in chunks for line in chunk]
+        self.assertEqual(lines, [b"one", b"two", b"three", b"four"])
+        first_lines = [line_number for line_number, _ in chunks]
+        self.assertEqual(first_lines[0], 1)
+        self.assertEqual(chunks[-1], (4, [b"four"]))
+
+    def test_compressed_files(self):
+        '''Test that gzip, bz2 and xz files are recognized by their contents.'''
+
+        data = b'{"DATA_SOURCE": "TEST", "RECORD_ID": "1"}\n'
+        with tempfile.TemporaryDirectory() as directory:
+            for name, opener in (("plain", open), ("gz", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)):
+                path = os.path.join(directory, name)
+                with opener(path, "wb") as file:
+                    file.write(data)
+                with open_records(path) as file:
+                    self.assertEqual(file.read(), data)
+
+
+class TestParsing(unittest.TestCase):
+
+    def test_plain_keys(self):
+        '''Test that plain string keys are extracted without parsing the line.'''
+
+        line = b'{"DATA_SOURCE": "TEST", "NAME_FULL": "Robert Smith", "RECORD_ID": "1001"}'
+        record = parse_record(line, 7)
+        self.assertEqual((record.data_source, record.record_id, record.line_number), (b"TEST", b"1001", 7))
+        self.assertIs(record.line, line)
+
+    def test_fallback_to_json(self):
+        '''Test that numeric, escaped and missing keys are read by parsing the line.'''
+
+        record = parse_record(b'{"DATA_SOURCE": "T\\"X", "RECORD_ID": 12}', 1)
+        self.assertEqual((record.data_source, record.record_id), (b'T"X', b"12"))
+        record = parse_record(b'{"RECORD_ID": "1"}', 1, data_source="DEFAULT")
+        self.assertEqual(record.data_source, b"DEFAULT")
+        for line in (b'{"RECORD_ID": "1"}', b"not json", b"[1, 2]"):
+            with self.assertRaises(G2BadInputException):
+                parse_record(line, 1)
+
+
+class TestG2Loader(unittest.TestCase):
+
+    def test_load(self):
+        '''Test that every record is added once and failures are reported with their line.'''
+
+        lines = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d"}' % i for i in range(1000)]
+        lines[10] = b"not json"
+        lines[20] = b'{"DATA_SOURCE": "TEST", "RECORD_ID": "retry"}'
+        lines[30] = b""
+        failures = []
+        engine = FakeEngine()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl.gz")
+            with gzip.open(path, "wb") as file:
+                file.write(b"\n".join(lines))
+            loader = G2Loader(
+                engine,
+                workers=4,
+                chunk_size=256,
+                queue_size=2,
+                load_id="LOAD",
+                on_failure=lambda *failure: failures.append(failure[:2]),
+            )
+            self.assertEqual(loader.load([path]), 997)
+
+        self.assertEqual(loader.failed, 2)
+        self.assertEqual(sorted(failures), [(path, 11), (path, 21)])
+        self.assertEqual(len(engine.records), 997)
+        self.assertEqual(len(set(record[1] for record in engine.records)), 997)
+        self.assertTrue(all(record[3] == "LOAD" for record in engine.records))
+        self.assertEqual([stage.records for stage in loader.stages()], [1000, 999, 998])
+        self.assertIn("records/s", loader.report())
+
+    def test_reader_error(self):
+        '''Test that an unreadable file stops the load with its error.'''
+
+        loader = G2Loader(FakeEngine(), workers=1)
+        with self.assertRaises(OSError):
+            loader.load(["/no/such/records.jsonl"])
+
+
+class TestG2ProcessLoader(unittest.TestCase):
+
+    def test_load(self):
+        '''Test that every worker loads its share of the records and destroys its engine.'''
+
+        lines = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d"}' % i for i in range(2000)]
+        lines[5] = b'{"DATA_SOURCE": "TEST", "RECORD_ID": "retry"}'
+        lines[6] = b"not json"
+        methods = [method for method in ("fork", "forkserver") if method in multiprocessing.get_all_start_methods()]
+        for method in methods:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "records.jsonl")
+                with open(path, "wb") as file:
+                    file.write(b"\n".join(lines))
+                engines = os.path.join(directory, "engines")
+                os.mkdir(engines)
+                failures = []
+                loader = G2ProcessLoader(
+                    engines,
+                    processes=3,
+                    chunk_size=1024,
+                    start_method=method,
+                    engine_class=FakeProcessEngine,
+                    on_failure=lambda *failure, failures=failures: failures.append(failure),
+                )
+                self.assertEqual(loader.load([path]), 1998, method)
+                counts = []
+                for name in os.listdir(engines):
+                    with open(os.path.join(engines, name)) as file:
+                        counts.append(int(file.read()))
+            self.assertEqual(len(counts), 3, method)
+            self.assertEqual(sum(counts), 1998, method)
+            self.assertEqual(sorted(failure[1] for failure in failures), [6, 7])
+            self.assertIsInstance(sorted(failures)[0][2], G2RetryableException)
+            self.assertIsInstance(sorted(failures)[1][2], G2BadInputException)
+            self.assertEqual([stage.records for stage in loader.stages()], [2000, 2000, 1999])
+
+    def test_init_failure(self):
+        '''Test that a load whose workers fail to initialize raises instead of waiting for them.'''
+
+        # Many chunks, and exactly as many chunks as the queue holds, so
+        # the workers fail while the last stop message waits for room.
+        line = b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d"}'
+        cases = [(2, 20000), (1, 20)]
+        methods = [method for method in ("fork", "forkserver") if method in multiprocessing.get_all_start_methods()]
+        for method in methods:
+            for processes, count in cases:
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, "records.jsonl")
+                    with open(path, "wb") as file:
+                        file.write(b"\n".join(line % i for i in range(count)))
+                    loader = G2ProcessLoader(
+                        directory,
+                        processes=processes,
+                        chunk_size=1024,
+                        start_method=method,
+                        engine_class=FailingProcessEngine,
+                    )
+                    with open(path, "rb") as file:
+                        if count == 20:
+                            self.assertEqual(len(list(read_chunks(file, 1024))), loader.queue_size)
+                    with self.assertRaises(G2ConfigurationException, msg=(method, processes)):
+                        loader.load([path])
+                    self.assertEqual(loader.loaded, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#! /usr/bin/env python3
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from senzing.G2LoadJournal import G2LoadJournal
+from senzing.G2Loader import G2Loader, G2ProcessLoader
+
+
+class CrashingEngine(object):
+    '''Records the addRecord calls, and raises a non-G2 error on one record.'''
+
+    def __init__(self, crash_on=None):
+        self.records = []
+        self.crash_on = crash_on
+        self.lock = threading.Lock()
+
+    def init(self, engine_name_, ini_params_, debug_=False):
+        pass
+
+    def destroy(self):
+        pass
+
+    def addRecord(self, dataSourceCode, recordId, jsonData, load_id=None):
+        if recordId == self.crash_on:
+            raise RuntimeError("crash")
+        with self.lock:
+            self.records.append(int(recordId))
+
+
+def write_records(path, count):
+    lines = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d"}' % i for i in range(1, count + 1)]
+    # A blank line and a bad line are committed with their chunk.
+    lines[9] = b""
+    lines[19] = b"not json"
+    with open(path, "wb") as file:
+        file.write(b"\n".join(lines))
+
+
+class TestG2LoadJournal(unittest.TestCase):
+
+    def test_out_of_order(self):
+        '''Test that ranges committed out of order move the watermark once the gap closes.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal = G2LoadJournal(os.path.join(directory, "journal"))
+            journal.commit("input", 11, 10)
+            journal.commit("input", 31, 10)
+            self.assertEqual(journal.committed("input"), 0)
+            self.assertEqual(journal.filter("input", 1, [b"a"] * 40)[9:12], [b"a", b"", b""])
+            journal.commit("input", 1, 10)
+            self.assertEqual(journal.committed("input"), 20)
+            journal.commit("input", 21, 10)
+            self.assertEqual(journal.committed("input"), 40)
+            self.assertIsNone(journal.filter("input", 1, [b"a"] * 40))
+            self.assertEqual(journal.filter("input", 41, [b"a"]), [b"a"])
+
+    def test_persisted(self):
+        '''Test that the journal is written atomically and read back.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal")
+            with G2LoadJournal(path, interval=3600) as journal:
+                journal.commit("input", 1, 5)
+                journal.commit("input", 8, 2)
+                self.assertFalse(os.path.exists(path))
+            with open(path) as file:
+                self.assertEqual(json.load(file)["inputs"]["input"], {"committed": 5, "ranges": [[8, 10]], "complete": False})
+            self.assertEqual(os.listdir(directory), ["journal"])
+            journal = G2LoadJournal(path)
+            self.assertEqual(journal.committed("input"), 5)
+            self.assertEqual(journal.filter("input", 6, [b"6", b"7", b"8", b"9", b"10"]), [b"6", b"7", b"", b"", b"10"])
+
+
+class TestResume(unittest.TestCase):
+
+    def test_loader_resume(self):
+        '''Test that a load stopped by an error resumes without adding committed records again.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl")
+            journal_path = os.path.join(directory, "journal")
+            write_records(path, 2000)
+            engine = CrashingEngine(crash_on=b"1500")
+            loader = G2Loader(engine, workers=4, chunk_size=512, journal=G2LoadJournal(journal_path))
+            with self.assertRaises(RuntimeError):
+                loader.load([path])
+            journal = G2LoadJournal(journal_path)
+            name = G2LoadJournal.input_name(path)
+            self.assertGreater(journal.committed(name), 0)
+            committed = [line for line in range(1, 2001) if journal.filter(name, line, [b"x"]) is None]
+
+            engine_again = CrashingEngine()
+            loader = G2Loader(engine_again, workers=4, chunk_size=512, journal=journal)
+            loader.load([path])
+            self.assertTrue(G2LoadJournal(journal_path).complete(name))
+            self.assertEqual(set(engine_again.records) & set(committed), set())
+            self.assertEqual(set(engine.records) | set(engine_again.records), set(range(1, 2001)) - {10, 20})
+
+            engine_done = CrashingEngine()
+            self.assertEqual(G2Loader(engine_done, journal=G2LoadJournal(journal_path)).load([path]), 0)
+            self.assertEqual(engine_done.records, [])
+
+    def test_process_loader_resume(self):
+        '''Test that the process loader commits the chunks its workers load.'''
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("fork is not available")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl")
+            journal_path = os.path.join(directory, "journal")
+            write_records(path, 1000)
+            journal = G2LoadJournal(journal_path)
+            name = G2LoadJournal.input_name(path)
+            journal.commit(name, 1, 500)
+            loader = G2ProcessLoader(
+                "{}",
+                processes=2,
+                chunk_size=512,
+                start_method="fork",
+                engine_class=CrashingEngine,
+                journal=journal,
+            )
+            self.assertEqual(loader.load([path]), 500)
+            journal = G2LoadJournal(journal_path)
+            self.assertTrue(journal.complete(name))
+            self.assertEqual(journal.committed(name), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
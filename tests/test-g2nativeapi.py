@@ -0,0 +1,304 @@
+#! /usr/bin/env python3
+
+import ctypes
+import ctypes.util
+import inspect
+import os
+import unittest
+
+from senzing.G2Exception import G2BadInputException, G2NotInitializedException
+from senzing.G2Library import ALLOCATOR_PROTOTYPES, G2BufferPool, G2ReturnBuffer
+from senzing.G2NativeApi import (
+    G2NativeApi,
+    G2NativeCall,
+    BOOL,
+    CONFIG_ID,
+    IGNORED,
+    INT64,
+    INT64_OUT,
+    NEW_HANDLE,
+    RESPONSE,
+    STRING,
+    prepare_interned_argument,
+    prepare_string_argument,
+    set_intern_cache_size,
+)
+
+# The fakes write into the buffers behind byref() arguments and replace the
+# native functions of the instances under test.
+# pylint: disable=protected-access
+
+
+def load_c_runtime():
+    if os.name == "nt":
+        return ctypes.cdll.msvcrt
+    return ctypes.CDLL(ctypes.util.find_library("c"))
+
+
+class FakeNative(object):
+    '''Stands in for the bound native functions of a library handle.'''
+
+    def __init__(self, api):
+        self.api = api
+        self.calls = []
+        self.ret_code = 0
+        c_runtime = load_c_runtime()
+        for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+            function = c_runtime[symbol[3:]]
+            function.argtypes = argtypes
+            function.restype = restype
+            setattr(self, symbol, function)
+
+    def Test_getLastException(self, buf, size):
+        ctypes.memmove(buf, b"0037E|Unknown resolved entity value '-1'\0", 42)
+        return 0
+
+    def Test_getEntity(self, entityID, flags, responseBuf, responseSize, resize):
+        self.calls.append((entityID, flags))
+        responseBuf = responseBuf._obj
+        responseSize = responseSize._obj
+        if responseSize.value < 4096:
+            responseBuf.value = resize(responseBuf, 4096)
+            responseSize.value = 4096
+        ctypes.memmove(responseBuf, b'{"ENTITY_ID":1}\0', 16)
+        return self.ret_code
+
+    def Test_addRecord(self, dataSourceCode, recordID, loadID, verbose):
+        self.calls.append((dataSourceCode, recordID, loadID, verbose))
+        return self.ret_code
+
+    def Test_getConfigID(self, configID):
+        configID._obj.value = 1234
+        return self.ret_code
+
+    def Test_open(self, configID, handle):
+        self.calls.append(configID)
+        handle._obj.value = 42
+        return self.ret_code
+
+
+def make_class(zero_copy=False, value_methods=False):
+    api = G2NativeApi(
+        "Test",
+        "Test_getLastException",
+        G2ReturnBuffer(),
+        [
+            G2NativeCall(
+                "getEntity",
+                "Test_getEntity",
+                [("entityID", INT64), ("response", RESPONSE), ("flags", INT64, 8)],
+                doc="""Get an entity""",
+            ),
+            G2NativeCall(
+                "addRecord",
+                "Test_addRecord",
+                [
+                    ("dataSourceCode", STRING),
+                    ("recordID", STRING),
+                    ("flags", IGNORED, 0),
+                    ("load_id", STRING, None),
+                    ("verbose", BOOL, False),
+                ],
+            ),
+            G2NativeCall("getConfigID", "Test_getConfigID", [("configID", INT64_OUT)]),
+            G2NativeCall(
+                "open", "Test_open", [("configID", CONFIG_ID)], returns=NEW_HANDLE
+            ),
+        ],
+        {"Test_getLastException": ([ctypes.c_char_p, ctypes.c_size_t], ctypes.c_int)},
+        response_views=True,
+        value_methods=value_methods,
+    )
+
+    @api.install
+    class Test(object):
+        def __init__(self):
+            self._native = FakeNative(api)
+            self.buffer_pool = G2BufferPool().bind(self._native)
+            self._zero_copy = zero_copy
+
+    return api, Test
+
+
+class TestG2NativeApi(unittest.TestCase):
+
+    def test_prototypes(self):
+        '''Test that prototypes list inputs, then outputs, then the returned handle.'''
+
+        api, _ = make_class()
+        argtypes, restype = api.prototypes["Test_getEntity"]
+        self.assertEqual(argtypes[:2], [ctypes.c_longlong, ctypes.c_longlong])
+        self.assertEqual(len(argtypes), 5)
+        self.assertEqual(restype, ctypes.c_int)
+        self.assertEqual(len(api.prototypes["Test_addRecord"][0]), 4)
+        self.assertEqual(
+            api.prototypes["Test_open"][0],
+            [ctypes.c_longlong, ctypes.POINTER(ctypes.c_void_p)],
+        )
+        self.assertIn("Test_getLastException", api.prototypes)
+
+    def test_generated_lazily(self):
+        '''Test that methods are generated on first use and then cached on the class.'''
+
+        _, Test = make_class()
+        self.assertFalse(inspect.isfunction(Test.__dict__["getEntity"]))
+        method = Test().getEntity
+        self.assertTrue(inspect.isfunction(Test.__dict__["getEntity"]))
+        self.assertIs(method.__func__, Test.__dict__["getEntity"])
+
+    def test_signature_and_doc(self):
+        '''Test that generated methods keep the declared signature and docstring.'''
+
+        _, Test = make_class()
+        self.assertEqual(
+            str(inspect.signature(Test.getEntity)),
+            "(self, entityID, response, flags=8, *args, **kwargs)",
+        )
+        self.assertEqual(Test.getEntity.__doc__, "Get an entity")
+        self.assertEqual(Test.getEntity.__qualname__, "Test.getEntity")
+
+    def test_response(self):
+        '''Test that the response replaces the contents of the bytearray.'''
+
+        _, Test = make_class()
+        test = Test()
+        response = bytearray(b"stale")
+        test.getEntity(1, response)
+        self.assertEqual(response, b'{"ENTITY_ID":1}')
+        self.assertEqual(test._native.calls, [(1, 8)])
+
+    def test_zero_copy_response(self):
+        '''Test that zero-copy mode returns a read-only view and leaves the response alone.'''
+
+        api, Test = make_class(zero_copy=True)
+        test = Test()
+        view = test.getEntity(1, None)
+        self.assertIsInstance(view, memoryview)
+        self.assertTrue(view.readonly)
+        self.assertEqual(view, b'{"ENTITY_ID":1}')
+        self.assertEqual(test.buffer_pool.pooled_bytes(), 0)
+        test.getEntity(1, None)
+        self.assertEqual(view, b'{"ENTITY_ID":1}')
+
+    def test_fetch_view(self):
+        '''Test that fetched chunks are joined into lines only when a line spans chunks.'''
+
+        api, Test = make_class(zero_copy=True)
+        chunks = [b"one\n", b"tw", b"o\n", b""]
+
+        def fetch_next(handle, buf, size):
+            chunk = chunks.pop(0)
+            ctypes.memmove(buf, chunk + b"\0", len(chunk) + 1)
+            return len(chunk)
+
+        native = Test()._native
+        first = api.fetch_view(native, fetch_next, 1)
+        self.assertEqual(first, b"one\n")
+        self.assertIs(first.obj, api.response_buffer.buf)
+        second = api.fetch_view(native, fetch_next, 1)
+        self.assertEqual(second, b"two\n")
+        self.assertTrue(second.readonly)
+        self.assertEqual(api.fetch_view(native, fetch_next, 1), b"")
+
+    def test_value_methods(self):
+        '''Test that value methods return the response as bytes or parsed JSON.'''
+
+        _, Test = make_class(zero_copy=True, value_methods=True)
+        test = Test()
+        self.assertEqual(
+            str(inspect.signature(Test.getEntityBytes)),
+            "(self, entityID, flags=8, parse=False, *args, **kwargs)",
+        )
+        response = test.getEntityBytes(1)
+        self.assertIs(type(response), bytes)
+        self.assertEqual(response, b'{"ENTITY_ID":1}')
+        self.assertEqual(test.getEntityBytes(2, parse=True), {"ENTITY_ID": 1})
+        self.assertEqual(test._native.calls, [(1, 8), (2, 8)])
+        self.assertGreater(test.buffer_pool.pooled_bytes(), 0)
+        self.assertFalse(hasattr(Test, "addRecordBytes"))
+        self.assertFalse(hasattr(Test, "openBytes"))
+
+    def test_argument_preparation(self):
+        '''Test that strings are encoded, booleans normalized and ignored arguments dropped.'''
+
+        _, Test = make_class()
+        test = Test()
+        test.addRecord("TEST", "1", 99, verbose="yes")
+        self.assertEqual(test._native.calls, [(b"TEST", b"1", b"", 1)])
+
+    def test_binary_arguments(self):
+        '''Test that bytes, bytearray and memoryview arguments reach the native call unchanged.'''
+
+        data = b'{"NAME_FULL": "Robert Smith"}'
+        self.assertIs(prepare_string_argument(data), data)
+        self.assertEqual(prepare_string_argument(bytearray(data)), data)
+        self.assertIs(prepare_string_argument(memoryview(data)), data)
+        self.assertEqual(prepare_string_argument(memoryview(data)[2:6]), b"NAME")
+        # Views of the whole object that are not in its order are copied.
+        self.assertEqual(prepare_string_argument(memoryview(b"abc")[::-1]), b"cba")
+        self.assertEqual(prepare_string_argument(memoryview(b"abcd").cast("B", (2, 2))[::-1]), b"cdab")
+        large = bytearray(b"x" * 10000)
+        prepared = prepare_string_argument(large)
+        self.assertEqual(ctypes.addressof(prepared), ctypes.addressof((ctypes.c_char * 1).from_buffer(large)))
+        self.assertIs(ctypes.c_char_p.from_param(prepared), prepared)
+        self.assertEqual(ctypes.string_at(ctypes.addressof(prepared)), bytes(large))
+
+    def test_interned_arguments(self):
+        '''Test that repeated low-cardinality arguments are encoded once, evicting the least recently used.'''
+
+        set_intern_cache_size(2)
+        try:
+            first = prepare_interned_argument("TEST")
+            self.assertIs(prepare_interned_argument("TEST"), first)
+            self.assertEqual(prepare_interned_argument(bytearray(b"BYTES")), b"BYTES")
+            self.assertEqual(prepare_interned_argument(memoryview(bytearray(b"BYTES"))), b"BYTES")
+            customers = prepare_interned_argument("CUSTOMERS")
+            self.assertIs(prepare_interned_argument("TEST"), first)
+            watchlist = prepare_interned_argument("WATCHLIST")
+            self.assertIs(prepare_interned_argument("WATCHLIST"), watchlist)
+            self.assertIs(prepare_interned_argument("TEST"), first)
+            self.assertIsNot(prepare_interned_argument("CUSTOMERS"), customers)
+            self.assertEqual(prepare_interned_argument(None), b"")
+            set_intern_cache_size(0)
+            self.assertIsNot(prepare_interned_argument("TEST"), prepare_interned_argument("TEST"))
+        finally:
+            set_intern_cache_size(256)
+
+    def test_outputs(self):
+        '''Test that output values and handles are returned to the caller.'''
+
+        _, Test = make_class()
+        test = Test()
+        configID = bytearray(b"stale")
+        test.getConfigID(configID)
+        self.assertEqual(configID, b"1234")
+        self.assertEqual(test.open("7"), 42)
+        self.assertEqual(test._native.calls, [7])
+
+    def test_errors(self):
+        '''Test that negative return codes raise the translated exception.'''
+
+        _, Test = make_class()
+        test = Test()
+        test._native.ret_code = -1
+        with self.assertRaises(G2NotInitializedException):
+            test.getEntity(1, bytearray())
+        test._native.ret_code = -2
+        with self.assertRaises(G2BadInputException):
+            test.getEntity(1, bytearray())
+
+    def test_written_out_method_conflict(self):
+        '''Test that a method cannot be both written out and generated.'''
+
+        api, _ = make_class()
+
+        class Conflict(object):
+            def getEntity(self):
+                pass
+
+        with self.assertRaises(ValueError):
+            api.install(Conflict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+#! /usr/bin/env python3
+
+import collections
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+import unittest
+
+from senzing.G2Engine import G2Engine
+from senzing.G2Exception import G2BadInputException, G2Exception, G2RetryableException
+from senzing.G2Library import ALLOCATOR_PROTOTYPES, G2BufferPool, G2NativeFunctions, set_library_path
+from senzing.G2RedoProcessor import G2RedoProcessor, redo_target
+from senzing.G2Retry import G2RetryScheduler
+
+
+class RedoEngine(object):
+    '''Engine with a redo queue, whose process calls take latency seconds.'''
+
+    def __init__(self, count, latency=0.001, fail=()):
+        self.queue = collections.deque(b'{"REDO": %d}' % i for i in range(count))
+        self.latency = latency
+        self.fail = dict(fail)
+        self.processed = []
+        self.gets = 0
+        self.single_passes = 0
+        self.running = 0
+        self.most_running = 0
+        self.lock = threading.Lock()
+
+    def getRedoRecordBytes(self):
+        with self.lock:
+            self.gets += 1
+            return self.queue.popleft() if self.queue else b""
+
+    def countRedoRecords(self):
+        return len(self.queue)
+
+    def process(self, record):
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+            exception = self.fail.get(record)
+            if exception is not None and isinstance(exception, G2RetryableException):
+                # Fails once.
+                del self.fail[record]
+        try:
+            time.sleep(self.latency)
+            if exception is not None:
+                raise exception
+            with self.lock:
+                self.processed.append(record)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def processWithInfoBytes(self, record, flags=0):
+        self.process(record)
+        return b'{"FLAGS": %d, "RECORD": %s}' % (flags, record)
+
+    def processRedoRecordWithInfoBytes(self, flags=0):
+        with self.lock:
+            self.single_passes += 1
+            record = self.queue.popleft() if self.queue else b""
+        if not record:
+            return record, record
+        try:
+            return record, self.processWithInfoBytes(record, flags)
+        except G2Exception as ex:
+            ex.redo_record = record
+            raise
+
+
+class TestG2RedoProcessor(unittest.TestCase):
+
+    def test_drain(self):
+        '''Test that drain processes every redo record once, on several workers.'''
+
+        engine = RedoEngine(200)
+        processor = G2RedoProcessor(engine, max_workers=4, records_per_worker=10, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(sorted(engine.processed), sorted(b'{"REDO": %d}' % i for i in range(200)))
+        self.assertEqual(processor.processed, 200)
+        self.assertEqual(engine.most_running, 4)
+        self.assertEqual(processor.metrics()["workers"], 0)
+        self.assertTrue(processor.report().startswith("redo"))
+
+    def test_autoscaling(self):
+        '''Test that the workers follow the backlog between min_workers and max_workers.'''
+
+        engine = RedoEngine(300, latency=0.005)
+        with G2RedoProcessor(engine, max_workers=6, min_workers=2, records_per_worker=20, scale_interval=0.01) as processor:
+            deadline = time.monotonic() + 5
+            while processor.metrics()["workers"] < 6 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            metrics = processor.metrics()
+            self.assertEqual(metrics["target"], 6)
+            self.assertGreater(metrics["backlog"], 0)
+            self.assertGreater(metrics["backlog_age"], 0)
+            while engine.queue or processor.metrics()["workers"] > 2:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.005)
+            time.sleep(0.05)
+            metrics = processor.metrics()
+            self.assertEqual(metrics["workers"], 2)
+            self.assertEqual(metrics["backlog"], 0)
+            self.assertEqual(metrics["backlog_age"], 0.0)
+            # New redo records are picked up by the remaining workers.
+            engine.queue.append(b'{"REDO": 300}')
+            while len(engine.processed) < 301:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.005)
+        self.assertEqual(processor.processed, 301)
+
+    def test_idle_backoff(self):
+        '''Test that idle workers wait longer and longer instead of polling the queue.'''
+
+        engine = RedoEngine(0)
+        with G2RedoProcessor(engine, max_workers=1, idle_delay=0.01, max_idle_delay=0.1):
+            time.sleep(0.5)
+        # 0.01 + 0.02 + 0.04 + 0.08, then every 0.1 seconds.
+        self.assertLessEqual(engine.gets, 10)
+
+    def test_failures(self):
+        '''Test that failed redo records are passed to on_failure, and retryable ones retried.'''
+
+        fail = {b'{"REDO": 3}': G2BadInputException("bad"), b'{"REDO": 5}': G2RetryableException("busy")}
+        engine = RedoEngine(10, fail=fail)
+        failures = []
+        retry = G2RetryScheduler(initial_delay=0.01)
+        processor = G2RedoProcessor(engine, max_workers=2, on_failure=lambda record, ex: failures.append(record), retry=retry, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(failures, [b'{"REDO": 3}'])
+        self.assertEqual(processor.failed, 1)
+        self.assertEqual(processor.processed, 9)
+        self.assertEqual(retry.retried, 1)
+        self.assertIn(b'{"REDO": 5}', engine.processed)
+
+    def test_with_info(self):
+        '''Test that with_info passes the info document of every record to on_info.'''
+
+        engine = RedoEngine(3)
+        infos = []
+        processor = G2RedoProcessor(engine, max_workers=1, with_info=True, on_info=infos.append, flags=4, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(sorted(infos), [b'{"FLAGS": 4, "RECORD": {"REDO": %d}}' % i for i in range(3)])
+        # Each record is fetched and processed in one pass, not by getRedoRecord and processWithInfo.
+        self.assertEqual(engine.gets, 0)
+        self.assertGreaterEqual(engine.single_passes, 4)
+
+    def test_with_info_failures(self):
+        '''Test that a redo record failing in the single pass with_info is retried, or passed to on_failure.'''
+
+        fail = {b'{"REDO": 3}': G2BadInputException("bad"), b'{"REDO": 5}': G2RetryableException("busy")}
+        engine = RedoEngine(10, fail=fail)
+        failures = []
+        infos = []
+        retry = G2RetryScheduler(initial_delay=0.01)
+        processor = G2RedoProcessor(engine, max_workers=2, with_info=True, on_info=infos.append, on_failure=lambda record, ex: failures.append(record), retry=retry, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(failures, [b'{"REDO": 3}'])
+        self.assertEqual((processor.failed, processor.processed, len(infos)), (1, 9, 9))
+        self.assertEqual(retry.retried, 1)
+        self.assertIn(b'{"REDO": 5}', engine.processed)
+
+    def test_redo_target(self):
+        '''Test that redo_target gives the same target to the records that redo the same work.'''
+
+        umf_proc = b'{"UMF_PROC": {"NAME": "UPDATE_RES_ENT", "PARAMS": [{"PARAM": {"NAME": "ENTITY_ID", "VALUE": "%d"}}, {"PARAM": {"NAME": "REASON", "VALUE": "%s"}}]}}'
+        self.assertEqual(redo_target(umf_proc % (1, b"A")), ("UMF_PROC", "UPDATE_RES_ENT", (("ENTITY_ID", "1"), ("REASON", "A"))))
+        self.assertEqual(redo_target(umf_proc % (1, b"A")), redo_target(b'{"UMF_PROC": {"PARAMS": [{"PARAM": {"VALUE": "A", "NAME": "REASON"}}, {"PARAM": {"NAME": "ENTITY_ID", "VALUE": "1"}}], "NAME": "UPDATE_RES_ENT"}}'))
+        self.assertNotEqual(redo_target(umf_proc % (1, b"A")), redo_target(umf_proc % (2, b"A")))
+        reevaluate = b'{"DATA_SOURCE": "CUSTOMERS", "RECORD_ID": "1001", "DSRC_ACTION": "X", "REASON": "%s"}'
+        self.assertEqual(redo_target(reevaluate % b"A"), ("X", "CUSTOMERS", "1001"))
+        self.assertEqual(redo_target(reevaluate % b"A"), redo_target(reevaluate % b"B"))
+        self.assertEqual(redo_target(b'{"REDO": 1}'), b'{"REDO": 1}')
+        self.assertEqual(redo_target(b'not json'), b'not json')
+        self.assertEqual(redo_target(b'{"UMF_PROC": "bad"}'), b'{"UMF_PROC": "bad"}')
+
+    def test_coalescing(self):
+        '''Test that prefetched redo records with the same target are processed once.'''
+
+        engine = RedoEngine(0)
+        targets = [b'{"DATA_SOURCE": "TEST", "RECORD_ID": "%d", "DSRC_ACTION": "X"}' % (i % 10) for i in range(100)]
+        engine.queue.extend(targets)
+        processor = G2RedoProcessor(engine, max_workers=2, prefetch=200, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(sorted(engine.processed), sorted(set(targets)))
+        metrics = processor.metrics()
+        self.assertEqual((metrics["fetched"], metrics["coalesced"], metrics["processed"]), (100, 90, 10))
+        self.assertEqual(metrics["coalescing_ratio"], 0.9)
+        self.assertTrue(processor.report().endswith(", 90 coalesced"))
+
+    def test_prefetch(self):
+        '''Test that prefetch without coalescing processes every redo record, in queue order on one worker.'''
+
+        engine = RedoEngine(50)
+        engine.queue.extend([b'{"REDO": 0}'] * 5)
+        processor = G2RedoProcessor(engine, max_workers=1, prefetch=8, coalesce=None, scale_interval=0.01)
+        processor.drain()
+        self.assertEqual(engine.processed, [b'{"REDO": %d}' % i for i in range(50)] + [b'{"REDO": 0}'] * 5)
+        self.assertEqual(processor.metrics()["coalesced"], 0)
+        self.assertEqual(processor.fetched, 55)
+
+
+# The tests below read the buffers behind byref() arguments and swap the
+# engine's native functions for a fake redo queue.
+# pylint: disable=protected-access
+
+
+def write_response(ptr, size, resize, response):
+    ptr = ptr._obj
+    size = size._obj
+    if size.value <= len(response):
+        ptr.value = resize(ptr, len(response) + 1)
+        size.value = len(response) + 1
+    ctypes.memmove(ptr, response + b"\0", len(response) + 1)
+
+
+class FakeRedoNative(G2NativeFunctions):
+    '''Native redo queue: G2_getRedoRecord takes the next record, G2_processWithInfo records what it is passed.'''
+
+    def __init__(self, records):
+        self.records = collections.deque(records)
+        self.processed = []
+        self.ret_code = 0
+        self.info_padding = 100000
+        c_runtime = ctypes.cdll.msvcrt if os.name == "nt" else ctypes.CDLL(ctypes.util.find_library("c"))
+        for symbol, (argtypes, restype) in ALLOCATOR_PROTOTYPES.items():
+            function = c_runtime[symbol[3:]]
+            function.argtypes = argtypes
+            function.restype = restype
+            setattr(self, symbol, function)
+
+    def G2_getLastException(self, buf, size):
+        ctypes.memmove(buf, b"0023E|Conflicting DATA_SOURCE values\0", 37)
+        return 0
+
+    def G2_getRedoRecord(self, ptr, size, resize):
+        write_response(ptr, size, resize, self.records.popleft() if self.records else b"")
+        return 0
+
+    def G2_processWithInfo(self, record, flags, ptr, size, resize):
+        self.processed.append((record, flags))
+        if self.ret_code == 0:
+            write_response(ptr, size, resize, b'{"AFFECTED_ENTITIES": [], "FLAGS": %d}' % flags + b" " * self.info_padding)
+        return self.ret_code
+
+
+class TestProcessRedoRecordWithInfo(unittest.TestCase):
+
+    def setUp(self):
+        set_library_path("G2", ctypes.util.find_library("c") or "msvcrt")
+        try:
+            self.engine = G2Engine()
+        finally:
+            set_library_path("G2", None)
+        self.native = FakeRedoNative([b'{"REDO": 1}', b'{"REDO": 2}'])
+        self.engine._native = self.native
+        self.engine.buffer_pool = G2BufferPool().bind(self.native)
+
+    def test_process_redo_record_with_info(self):
+        '''Test that the redo record fetched is processed and returned with its info, in one pass.'''
+
+        response = bytearray(b"old")
+        info = bytearray(b"old")
+        self.engine.processRedoRecordWithInfo(response, info, 3)
+        self.assertEqual(response, b'{"REDO": 1}')
+        self.assertEqual(info.rstrip(), b'{"AFFECTED_ENTITIES": [], "FLAGS": 3}')
+        self.assertEqual(self.native.processed, [(b'{"REDO": 1}', 3)])
+        record, record_info = self.engine.processRedoRecordWithInfoBytes()
+        self.assertEqual(record, b'{"REDO": 2}')
+        self.assertEqual(record_info.rstrip(), b'{"AFFECTED_ENTITIES": [], "FLAGS": 0}')
+        # The queue is empty.
+        self.engine.processRedoRecordWithInfo(response, info)
+        self.assertEqual((response, info), (b"", b""))
+        self.assertEqual(self.engine.processRedoRecordWithInfoBytes(), (b"", b""))
+        self.assertEqual(self.engine.processRedoRecordWithInfoBytes(parse=True), (None, None))
+        self.assertEqual(len(self.native.processed), 2)
+        # The info buffer grew for the large info, and keeps its capacity.
+        record_buffer, info_buffer = self.engine._redoBuffers()
+        self.assertEqual(record_buffer.size.value, self.engine.buffer_pool.shrink_size)
+        self.assertGreater(info_buffer.size.value, 100000)
+
+    def test_shrink_after(self):
+        '''Test that a grown info buffer is only shrunk after shrink_after small infos in a row.'''
+
+        self.engine.buffer_pool = G2BufferPool(shrink_after=3).bind(self.native)
+        self.native.records.extend(b'{"REDO": %d}' % i for i in range(3, 10))
+        self.engine.processRedoRecordWithInfoBytes()
+        record_buffer, info_buffer = self.engine._redoBuffers()
+        grown = info_buffer.size.value
+        self.assertGreater(grown, 100000)
+        # Large infos reuse the grown buffer.
+        self.engine.processRedoRecordWithInfoBytes()
+        self.assertEqual(info_buffer.size.value, grown)
+        self.native.info_padding = 0
+        for _ in range(2):
+            self.engine.processRedoRecordWithInfoBytes()
+            self.assertEqual(info_buffer.size.value, grown)
+        # A large info in between starts the count again.
+        self.native.info_padding = 100000
+        self.engine.processRedoRecordWithInfoBytes()
+        self.native.info_padding = 0
+        for _ in range(2):
+            self.engine.processRedoRecordWithInfoBytes()
+            self.assertEqual(info_buffer.size.value, grown)
+        self.engine.processRedoRecordWithInfoBytes()
+        self.assertEqual(info_buffer.size.value, self.engine.buffer_pool.shrink_size)
+        self.assertEqual(record_buffer.size.value, self.engine.buffer_pool.shrink_size)
+
+    def test_error(self):
+        '''Test that a failed processWithInfo raises its G2Exception with the redo record, and parse returns the JSON documents.'''
+
+        self.native.ret_code = -2
+        with self.assertRaises(G2BadInputException) as raised:
+            self.engine.processRedoRecordWithInfoBytes()
+        self.assertEqual(raised.exception.redo_record, b'{"REDO": 1}')
+        self.native.ret_code = 0
+        self.native.info_padding = 0
+        self.assertEqual(self.engine.processRedoRecordWithInfoBytes(5, parse=True), ({"REDO": 2}, {"AFFECTED_ENTITIES": [], "FLAGS": 5}))
+
+if __name__ == '__main__':
+    unittest.main()
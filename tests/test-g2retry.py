@@ -0,0 +1,185 @@
+#! /usr/bin/env python3
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from senzing.G2Bulk import bulk_map
+from senzing.G2Exception import G2BadInputException, G2RetryTimeoutExceededException
+from senzing.G2Loader import G2LoaderRecord, record_line
+from senzing.G2Retry import G2DeadLetterFile, G2RetryScheduler
+
+
+class FakeClock(object):
+    '''Clock that only moves when told to.'''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyFunction(object):
+    '''Fails each item with a retry timeout the given number of times.'''
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            self.calls[item] = self.calls.get(item, 0) + 1
+            calls = self.calls[item]
+        if calls <= self.failures.get(item, 0):
+            raise G2RetryTimeoutExceededException("retry timeout on {0}".format(item))
+        return item
+
+
+class TestG2RetryScheduler(unittest.TestCase):
+
+    def test_delay_limits(self):
+        '''Test that delays are jittered below an exponentially growing limit.'''
+
+        scheduler = G2RetryScheduler(initial_delay=0.1, max_delay=0.5, multiplier=2.0)
+        for attempts, limit in ((1, 0.1), (2, 0.2), (3, 0.4), (4, 0.5), (10, 0.5)):
+            delays = [scheduler.delay(attempts) for _ in range(200)]
+            self.assertTrue(all(0.0 <= delay <= limit for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_due(self):
+        '''Test that scheduled items are only returned once their delay has passed.'''
+
+        clock = FakeClock()
+        scheduler = G2RetryScheduler(initial_delay=1.0, clock=clock)
+        exception = G2RetryTimeoutExceededException("timeout")
+        self.assertTrue(scheduler.schedule("a", 1, exception, tag=0))
+        self.assertEqual(len(scheduler), 1)
+        self.assertLessEqual(scheduler.next_due(), 1.0)
+        clock.now = 1.0
+        self.assertEqual(scheduler.due(), [("a", 1, 0)])
+        self.assertEqual(len(scheduler), 0)
+        self.assertIsNone(scheduler.next_due())
+        self.assertEqual(scheduler.retried, 1)
+        # At most limit items at a time.
+        scheduler.schedule("b", 1, exception)
+        scheduler.schedule("c", 1, exception)
+        clock.now = 2.0
+        self.assertEqual(len(scheduler.due(1)), 1)
+        self.assertEqual(len(scheduler.due(1)), 1)
+        self.assertEqual(scheduler.due(1), [])
+
+    def test_not_retryable(self):
+        '''Test that exceptions that are not retryable are not scheduled.'''
+
+        scheduler = G2RetryScheduler()
+        self.assertFalse(scheduler.schedule("a", 1, G2BadInputException("bad")))
+        self.assertEqual(len(scheduler), 0)
+
+    def test_dead_letter(self):
+        '''Test that an item that failed every attempt goes to the dead letter handler.'''
+
+        dead = []
+        scheduler = G2RetryScheduler(max_attempts=3, dead_letter=lambda *args: dead.append(args))
+        exception = G2RetryTimeoutExceededException("timeout")
+        self.assertTrue(scheduler.schedule("a", 2, exception))
+        self.assertFalse(scheduler.schedule("b", 3, exception))
+        self.assertEqual(dead, [("b", 3, exception)])
+        self.assertEqual(scheduler.dead, 1)
+
+
+class TestG2DeadLetterFile(unittest.TestCase):
+
+    def test_lines(self):
+        '''Test that dead letters are appended one JSON line per item.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dead.jsonl")
+            with G2DeadLetterFile(path) as dead_letter:
+                dead_letter(("TEST", b"1", b'{"A": 1}'), 5, G2RetryTimeoutExceededException("timeout"))
+                dead_letter(("TEST", b"2", b'{"A": 2}'), 5, G2RetryTimeoutExceededException("timeout"))
+            self.assertEqual(dead_letter.written, 2)
+            with open(path, "rb") as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual(lines[0]["item"], ["TEST", "1", '{"A": 1}'])
+        self.assertEqual(lines[0]["attempts"], 5)
+        self.assertEqual(lines[1]["exception"], "G2RetryTimeoutExceededException")
+
+    def test_record_lines(self):
+        '''Test that failed loader records can be written as a file to load again.'''
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dead.jsonl")
+            record = G2LoaderRecord(b"TEST", b"1", b'{"DATA_SOURCE": "TEST", "RECORD_ID": "1"}', 7)
+            with G2DeadLetterFile(path, file_format=record_line) as dead_letter:
+                dead_letter(record, 5, G2RetryTimeoutExceededException("timeout"))
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), record.line + b"\n")
+
+
+class TestBulkMapRetry(unittest.TestCase):
+
+    def test_retried(self):
+        '''Test that items failing with a retryable exception are tried again.'''
+
+        function = FlakyFunction({1: 2, 3: 1})
+        scheduler = G2RetryScheduler(initial_delay=0.01)
+        results = list(bulk_map(function, range(6), workers=2, retry=scheduler))
+        self.assertEqual([result.index for result in results], list(range(6)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([result.attempts for result in results], [1, 3, 1, 2, 1, 1])
+        self.assertEqual(scheduler.retried, 3)
+
+    def test_unordered(self):
+        '''Test that unordered results of retried items come after the others.'''
+
+        function = FlakyFunction({0: 1})
+        results = list(bulk_map(function, range(4), workers=2, ordered=False, retry=G2RetryScheduler(initial_delay=0.05)))
+        self.assertEqual(sorted(result.index for result in results), [0, 1, 2, 3])
+        self.assertEqual(results[-1].index, 0)
+        self.assertEqual(results[-1].attempts, 2)
+
+    def test_attempts_capped(self):
+        '''Test that items failing every attempt are yielded as failures and dead lettered.'''
+
+        dead = []
+        function = FlakyFunction({2: 100})
+        scheduler = G2RetryScheduler(max_attempts=3, initial_delay=0.01, dead_letter=lambda *args: dead.append(args))
+        results = list(bulk_map(function, range(4), workers=2, retry=scheduler))
+        self.assertIsInstance(results[2].exception, G2RetryTimeoutExceededException)
+        self.assertEqual(results[2].attempts, 3)
+        self.assertEqual(function.calls[2], 3)
+        self.assertEqual([(item, attempts) for item, attempts, _ in dead], [(2, 3)])
+
+    def test_threads_not_held(self):
+        '''Test that a waiting retry does not hold a thread from the other items.'''
+
+        function = FlakyFunction({0: 1})
+        scheduler = G2RetryScheduler(initial_delay=0.5, multiplier=1.0)
+        scheduler.delay = lambda attempts: 0.5
+        results = bulk_map(function, range(20), workers=1, ordered=False, retry=scheduler)
+        self.assertEqual([result.index for result in results][:19], list(range(1, 20)))
+        self.assertEqual(len(scheduler), 0)
+
+    def test_ordered_not_held(self):
+        '''Test that in order, the results finished behind a waiting retry do not count toward max_pending.'''
+
+        flaky = FlakyFunction({0: 1})
+        calls = []
+
+        def function(item):
+            calls.append(item)
+            return flaky(item)
+
+        scheduler = G2RetryScheduler(initial_delay=0.5, multiplier=1.0)
+        scheduler.delay = lambda attempts: 0.5
+        results = bulk_map(function, range(20), workers=1, max_pending=2, retry=scheduler)
+        self.assertEqual([result.index for result in results], list(range(20)))
+        self.assertEqual(calls, list(range(20)) + [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
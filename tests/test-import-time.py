@@ -0,0 +1,97 @@
+#! /usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Test that "import senzing" only loads the submodules that are used, and
+# report the import time of each case, as measured by "python -X importtime".
+# -----------------------------------------------------------------------------
+
+import ast
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+import senzing
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(senzing.__file__)))
+
+REPEAT = 5
+
+
+def import_time(statement):
+    '''Return the loaded senzing modules and the fastest total import time in microseconds.'''
+
+    code = statement + "; import sys; print(sorted(m for m in sys.modules if m.startswith('senzing')))"
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    best = None
+    for _ in range(REPEAT):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, env=env, check=True,
+        )
+        total = 0
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            # Top level senzing imports; the modules they import are nested.
+            if len(fields) == 3 and fields[2].startswith(" senzing"):
+                total += int(fields[1])
+        best = total if best is None else min(best, total)
+    return ast.literal_eval(result.stdout), best
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_flags_only(self):
+        '''Test that importing G2EngineFlags does not load the engine or the exceptions.'''
+
+        modules, micros = import_time("from senzing import G2EngineFlags")
+        print("\nfrom senzing import G2EngineFlags: {0:8d} us".format(micros))
+        self.assertEqual(modules, ["senzing", "senzing.G2EngineFlags"])
+
+    def test_package_only(self):
+        '''Test that importing the package loads no submodules.'''
+
+        modules, micros = import_time("import senzing")
+        print("\nimport senzing:                    {0:8d} us".format(micros))
+        self.assertEqual(modules, ["senzing"])
+
+    def test_import_all(self):
+        '''Test that "from senzing import *" still loads every submodule.'''
+
+        modules, micros = import_time("from senzing import *")
+        print("\nfrom senzing import *:             {0:8d} us".format(micros))
+        self.assertIn("senzing.G2Engine", modules)
+        self.assertIn("senzing.G2Hasher", modules)
+
+    def test_all_matches_submodules(self):
+        '''Test that the static __all__ lists exactly what the submodules export.'''
+
+        exported = []
+        for submodule in senzing._SUBMODULE_EXPORTS:  # pylint: disable=protected-access
+            exported.extend(importlib.import_module("senzing." + submodule).__all__)
+        self.assertEqual(sorted(senzing.__all__), sorted(exported))
+
+    def test_linters_see_all(self):
+        '''Test that the imports only linters run bind exactly the names in __all__.'''
+
+        with open(senzing.__file__) as source:
+            tree = ast.parse(source.read())
+        imported = []
+        for node in tree.body:
+            if isinstance(node, ast.If) and getattr(node.test, "id", None) == "TYPE_CHECKING":
+                for statement in node.body:
+                    imported.extend(alias.name for alias in statement.names)
+        self.assertEqual(sorted(imported), sorted(senzing.__all__))
+
+    def test_submodule_import_keeps_classes(self):
+        '''Test that importing a submodule leaves the package attribute pointing at the class.'''
+
+        importlib.import_module("senzing.G2Engine")
+        self.assertIsInstance(senzing.G2Engine, type)
+        self.assertIsInstance(senzing.G2Exception, type)
+        self.assertEqual(senzing.G2EngineFlags.G2_ENTITY_INCLUDE_RECORD_DATA.name, "G2_ENTITY_INCLUDE_RECORD_DATA")
+
+
+if __name__ == '__main__':
+    unittest.main()